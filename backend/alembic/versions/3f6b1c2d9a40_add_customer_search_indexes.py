@@ -0,0 +1,68 @@
+"""add customer search indexes
+
+Revision ID: 3f6b1c2d9a40
+Revises: 09e92f963195
+Create Date: 2025-11-10 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b1c2d9a40'
+down_revision: Union[str, None] = '09e92f963195'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Extensions: trigram search, accent folding and btree columns inside GIN
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+    # unaccent() is STABLE, so it can't be used in an index expression.
+    # Wrapping it with an explicit dictionary makes it safe to mark IMMUTABLE.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+        $func$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $func$
+    """)
+
+    # Build indexes without locking the customers table for writes
+    with op.get_context().autocommit_block():
+        # Name search: trigram GIN on accent-folded name, scoped by tenant
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_tenant_name_trgm
+            ON customers USING gin (tenant_id, lower(f_unaccent(name)) gin_trgm_ops)
+        """)
+
+        # Phone prefix lookups ("5534999...")
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_tenant_phone_prefix
+            ON customers (tenant_id, whatsapp_number text_pattern_ops)
+        """)
+
+        # Phone suffix lookups ("...98888") via reversed number
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_tenant_phone_suffix
+            ON customers (tenant_id, reverse(whatsapp_number) text_pattern_ops)
+        """)
+
+        # Default listing order of /dashboard/customers
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_customers_tenant_last_order
+            ON customers (tenant_id, last_order_at DESC NULLS LAST)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_customers_tenant_last_order")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_customers_tenant_phone_suffix")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_customers_tenant_phone_prefix")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_customers_tenant_name_trgm")
+
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,74 @@
+"""add sales analytics fact tables
+
+Revision ID: 5a2c8e7d1b34
+Revises: 3f6b1c2d9a40
+Create Date: 2025-11-12 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2c8e7d1b34'
+down_revision: Union[str, None] = '3f6b1c2d9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('analytics_watermarks',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('value', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    op.create_table('fact_product_daily',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_name', sa.String(length=255), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'day', 'product_name')
+    )
+
+    op.create_table('fact_orders_hourly',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('hour', sa.SmallInteger(), nullable=False),
+    sa.Column('neighborhood', sa.String(length=255), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('delivery_fees', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'day', 'hour', 'neighborhood')
+    )
+
+    op.create_table('fact_orders_daily',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders_count', sa.Integer(), nullable=False),
+    sa.Column('cancelled_count', sa.Integer(), nullable=False),
+    sa.Column('items_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('delivery_fees', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'day')
+    )
+
+    # The refresh job finds new orders by created_at across all tenants
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_table('fact_orders_daily')
+    op.drop_table('fact_orders_hourly')
+    op.drop_table('fact_product_daily')
+    op.drop_table('analytics_watermarks')
@@ -0,0 +1,40 @@
+"""add llm usage daily
+
+Revision ID: 7c4e2a9f0d13
+Revises: 5a2c8e7d1b34
+Create Date: 2025-11-13 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4e2a9f0d13'
+down_revision: Union[str, None] = '5a2c8e7d1b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_usage_daily',
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('agent', sa.String(length=100), nullable=False),
+    sa.Column('model', sa.String(length=255), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('parse_failures', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('completion_tokens', sa.BigInteger(), nullable=False),
+    sa.Column('cost_usd', sa.Numeric(precision=12, scale=6), nullable=False),
+    sa.Column('latency_ms', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'day', 'agent', 'model')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('llm_usage_daily')
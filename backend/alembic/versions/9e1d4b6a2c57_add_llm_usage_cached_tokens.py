@@ -0,0 +1,25 @@
+"""add llm usage cached tokens
+
+Revision ID: 9e1d4b6a2c57
+Revises: 7c4e2a9f0d13
+Create Date: 2025-11-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9e1d4b6a2c57'
+down_revision: Union[str, None] = '7c4e2a9f0d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('llm_usage_daily', sa.Column('cached_tokens', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('llm_usage_daily', 'cached_tokens')
@@ -0,0 +1,72 @@
+"""partition webhook logs by day
+
+Revision ID: b3f5d7a1c9e2
+Revises: 9e1d4b6a2c57
+Create Date: 2025-11-27 09:00:00.000000
+
+"""
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f5d7a1c9e2'
+down_revision: Union[str, None] = '9e1d4b6a2c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primeiras partições; depois app.tasks.webhook_logs mantém as próximas
+INITIAL_PARTITION_DAYS = 4
+
+
+def upgrade() -> None:
+    # Os logs antigos ficam em webhook_logs_legacy até sair da retenção
+    # (app.tasks.webhook_logs apaga a tabela inteira); nada é copiado
+    op.rename_table('webhook_logs', 'webhook_logs_legacy')
+    op.execute('ALTER TABLE webhook_logs_legacy RENAME CONSTRAINT webhook_logs_pkey TO webhook_logs_legacy_pkey')
+
+    op.create_table('webhook_logs',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('tenant_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('event_type', sa.String(length=100), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('processed', sa.Boolean(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_webhook_logs_tenant_created', 'webhook_logs', ['tenant_id', 'created_at'])
+
+    today = datetime.utcnow().date()
+    for offset in range(INITIAL_PARTITION_DAYS):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE webhook_logs_p{day:%Y%m%d} PARTITION OF webhook_logs "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+
+
+def downgrade() -> None:
+    # Logs gravados nas partições são descartados
+    op.drop_table('webhook_logs')
+
+    if op.get_bind().execute(sa.text("SELECT to_regclass('webhook_logs_legacy')")).scalar():
+        op.execute('ALTER TABLE webhook_logs_legacy RENAME CONSTRAINT webhook_logs_legacy_pkey TO webhook_logs_pkey')
+        op.rename_table('webhook_logs_legacy', 'webhook_logs')
+        return
+
+    op.create_table('webhook_logs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=True),
+    sa.Column('event_type', sa.String(length=100), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('processed', sa.Boolean(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
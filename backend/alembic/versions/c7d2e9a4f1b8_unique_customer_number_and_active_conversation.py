@@ -0,0 +1,86 @@
+"""unique customer number and active conversation
+
+Revision ID: c7d2e9a4f1b8
+Revises: b3f5d7a1c9e2
+Create Date: 2025-11-28 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e9a4f1b8'
+down_revision: Union[str, None] = 'b3f5d7a1c9e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Concurrent first messages could create the same customer twice.
+    # Keep the oldest row per (tenant, number) and fold the others into it.
+    op.execute("""
+        CREATE TEMP TABLE customer_merges ON COMMIT DROP AS
+        SELECT id, keeper_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY tenant_id, whatsapp_number
+                ORDER BY created_at NULLS LAST, id
+            ) AS keeper_id
+            FROM customers
+        ) ranked
+        WHERE id <> keeper_id
+    """)
+    op.execute("""
+        UPDATE customers AS keeper
+        SET order_count = COALESCE(keeper.order_count, 0) + merged.order_count,
+            total_spent = COALESCE(keeper.total_spent, 0) + merged.total_spent,
+            last_order_at = GREATEST(keeper.last_order_at, merged.last_order_at)
+        FROM (
+            SELECT m.keeper_id,
+                   SUM(COALESCE(c.order_count, 0)) AS order_count,
+                   SUM(COALESCE(c.total_spent, 0)) AS total_spent,
+                   MAX(c.last_order_at) AS last_order_at
+            FROM customer_merges m
+            JOIN customers c ON c.id = m.id
+            GROUP BY m.keeper_id
+        ) merged
+        WHERE keeper.id = merged.keeper_id
+    """)
+    op.execute("""
+        UPDATE orders SET customer_id = m.keeper_id
+        FROM customer_merges m WHERE orders.customer_id = m.id
+    """)
+    op.execute("""
+        UPDATE conversations SET customer_id = m.keeper_id
+        FROM customer_merges m WHERE conversations.customer_id = m.id
+    """)
+    op.execute("DELETE FROM customers USING customer_merges m WHERE customers.id = m.id")
+
+    # Only the most recent active conversation per customer stays active
+    op.execute("""
+        UPDATE conversations SET status = 'abandoned', ended_at = now()
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY customer_id
+                ORDER BY started_at DESC NULLS LAST, id
+            ) AS position
+            FROM conversations
+            WHERE status = 'active' AND customer_id IS NOT NULL
+        ) ranked
+        WHERE conversations.id = ranked.id AND ranked.position > 1
+    """)
+
+    op.create_unique_constraint(
+        'uq_customers_tenant_whatsapp_number', 'customers', ['tenant_id', 'whatsapp_number']
+    )
+    op.create_index(
+        'uq_conversations_active_customer', 'conversations', ['customer_id'],
+        unique=True, postgresql_where=sa.text("status = 'active'")
+    )
+
+
+def downgrade() -> None:
+    # Merged customers are not split back
+    op.drop_index('uq_conversations_active_customer', table_name='conversations')
+    op.drop_constraint('uq_customers_tenant_whatsapp_number', 'customers', type_='unique')
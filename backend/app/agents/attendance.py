@@ -7,7 +7,11 @@ import json
 import logging
 
 from app.agents.base import BaseAgent, AgentContext, AgentResponse
+from app.agents.decisions import AttendanceDecision
+from app.agents.prompts import build_system_prompt
 from app.database.models import Product, Tenant
+from app.services.faq_cache import faq_cache
+from app.services.tenant_catalog import TenantCatalog
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -25,6 +29,45 @@ class AttendanceAgent(BaseAgent):
     - Guide customer to next steps
     """
 
+    AI_INSTRUCTIONS = """Você é o assistente virtual de uma distribuidora de gás e água via WhatsApp (dados da empresa abaixo).
+
+RESPONSABILIDADES:
+1. Cumprimentar clientes (especialmente se for primeira mensagem)
+2. Apresentar produtos quando solicitado
+3. Responder dúvidas gerais sobre a empresa
+4. Guiar cliente para fazer pedido
+5. Ser amigável e prestativo
+
+REGRAS DE RESPOSTA:
+1. Se cliente SAÚDA (oi/olá/bom dia):
+   → Cumprimente de volta
+   → Apresente-se brevemente
+   → Na primeira mensagem, pergunte como pode ajudar; depois, pergunte o que precisa
+
+2. Se cliente pergunta sobre PRODUTOS:
+   → Liste os produtos com preços
+   → Incentive a fazer pedido
+   → Exemplo: "Para fazer um pedido, me diga o que você quer!"
+
+3. Se cliente pede AJUDA ou tem DÚVIDA:
+   → Responda educadamente
+   → Se não souber, sugira falar com atendente
+
+4. Se cliente menciona PEDIDO/PRODUTO específico:
+   → Confirme interesse
+   → Sugira próximo passo (fazer pedido)
+
+IMPORTANTE:
+- Seja natural e amigável
+- Use emojis moderadamente (1-2 por mensagem)
+- Respostas curtas e objetivas
+- NUNCA invente informações (preços, horários, etc)
+- Se não souber algo, seja honesto
+
+RESPONDA chamando a função registrar_decisao:
+- mensagem_cliente: sua resposta em texto natural para o cliente
+- quer_fazer_pedido: true se o cliente demonstrou interesse em pedir algum produto"""
+
     def __init__(self):
         super().__init__(model_name="gpt-4-turbo-preview", temperature=0.8)
         self.cache_ttl = 300  # 5 minutes
@@ -163,7 +206,11 @@ Diga "Quero falar com atendente"
 Posso ajudar em algo mais?"""
 
     async def _handle_general(self, message: str, tenant: Tenant, context: AgentContext) -> str:
-        """Handle general questions using LLM"""
+        """Handle general questions using LLM (answers reused via the FAQ cache)"""
+
+        cached_answer = await faq_cache.lookup(tenant.id, message)
+        if cached_answer:
+            return cached_answer
 
         # Build address info safely
         address_info = ""
@@ -188,8 +235,20 @@ Incentive o cliente a fazer um pedido.
         messages = self._build_messages(message, context, system_prompt)
         response = await self._call_llm(messages)
 
+        # Earlier turns go into the prompt, so only first-turn answers are shared
+        if response != self.LLM_ERROR_REPLY and not self._earlier_turns(message, context):
+            await faq_cache.store(tenant.id, message, response)
+
         return response
 
+    @staticmethod
+    def _earlier_turns(message: str, context: AgentContext) -> List[dict]:
+        """History before this message (the webhook stores the message before replying)"""
+        history = context.message_history
+        if history and history[-1].get("role") == "user" and history[-1].get("content") == message:
+            return history[:-1]
+        return history
+
     async def _get_products(self, tenant_id: UUID, db: Session) -> List[Product]:
         """Get products with caching"""
 
@@ -256,93 +315,36 @@ Seja natural, use emojis moderadamente, e seja sempre educado."""
         """
         System prompt para AttendanceAgent responder com IA
 
-        NOVO: LLM responde TUDO (não usa templates hardcoded)
+        Instruções fixas, dados da empresa e produtos formam o prefixo
+        estável do tenant; o contexto da conversa vai no final.
         """
-        from app.database.models import Tenant, Product
-
-        try:
-            tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
-            products = db.query(Product).filter(
-                Product.tenant_id == context.tenant_id,
-                Product.is_available == True
-            ).order_by(Product.name).all()
-
-            # Formatar produtos
-            products_text = ""
-            for i, p in enumerate(products, 1):
-                products_text += f"{i}. {p.name} - R$ {p.price:.2f}"
-                if p.description:
-                    products_text += f" ({p.description})"
-                products_text += "\n"
-
-            # Informações da empresa
-            company_name = tenant.company_name if tenant else "Distribuidora"
-            phone = tenant.phone if tenant else ""
-
-            address_info = ""
-            if tenant and tenant.address and isinstance(tenant.address, dict):
-                street = tenant.address.get('street', '')
-                city = tenant.address.get('city', '')
-                if street or city:
-                    address_info = f"\n- Endereço: {street} - {city}"
-
-        except Exception as e:
-            logger.error(f"Error building system prompt: {e}")
-            company_name = "Distribuidora"
-            phone = ""
-            address_info = ""
-            products_text = "(erro ao carregar produtos)"
-
         ctx = self._format_full_context(context)
 
         # Detectar se é primeira interação
         is_first_message = len(context.message_history) == 0
 
-        return f"""Você é o assistente virtual da {company_name}, uma distribuidora de gás e água via WhatsApp.
-
-{ctx}
-
-INFORMAÇÕES DA EMPRESA:
-- Nome: {company_name}
-- Telefone: {phone}{address_info}
-
-PRODUTOS DISPONÍVEIS:
-{products_text}
-
-RESPONSABILIDADES:
-1. Cumprimentar clientes (especialmente se for primeira mensagem)
-2. Apresentar produtos quando solicitado
-3. Responder dúvidas gerais sobre a empresa
-4. Guiar cliente para fazer pedido
-5. Ser amigável e prestativo
-
-REGRAS DE RESPOSTA:
-1. Se cliente SAÚDA (oi/olá/bom dia):
-   → Cumprimente de volta
-   → Apresente-se brevemente
-   → {"Pergunte como pode ajudar" if is_first_message else "Pergunte o que precisa"}
-
-2. Se cliente pergunta sobre PRODUTOS:
-   → Liste os produtos com preços
-   → Incentive a fazer pedido
-   → Exemplo: "Para fazer um pedido, me diga o que você quer!"
+        dynamic = f"""{ctx}
 
-3. Se cliente pede AJUDA ou tem DÚVIDA:
-   → Responda educadamente
-   → Se não souber, sugira falar com atendente
+PRIMEIRA MENSAGEM DO CLIENTE: {"sim" if is_first_message else "não"}
+"""
 
-4. Se cliente menciona PEDIDO/PRODUTO específico:
-   → Confirme interesse
-   → Sugira próximo passo (fazer pedido)
+        return build_system_prompt(
+            db,
+            context.tenant_id,
+            key=self.agent_name,
+            static_instructions=self.AI_INSTRUCTIONS,
+            tenant_section=self._tenant_section,
+            dynamic=dynamic
+        )
 
-IMPORTANTE:
-- Seja natural e amigável
-- Use emojis moderadamente (1-2 por mensagem)
-- Respostas curtas e objetivas
-- NUNCA invente informações (preços, horários, etc)
-- Se não souber algo, seja honesto
+    @staticmethod
+    def _tenant_section(catalog: TenantCatalog) -> str:
+        return f"""INFORMAÇÕES DA EMPRESA:
+- Nome: {catalog.company_name}
+- Telefone: {catalog.phone}{catalog.address_info}
 
-RESPONDA DIRETAMENTE (não precisa JSON, apenas texto natural)"""
+PRODUTOS DISPONÍVEIS:
+{catalog.products_text}"""
 
     async def process_with_ai(self, message: str, context: AgentContext, db) -> AgentResponse:
         """
@@ -350,8 +352,9 @@ RESPONDA DIRETAMENTE (não precisa JSON, apenas texto natural)"""
 
         Fluxo:
         1. LLM recebe contexto completo + produtos
-        2. LLM responde diretamente (natural)
-        3. Sistema detecta próximo passo baseado na resposta
+        2. LLM responde via tool call (AttendanceDecision): texto natural +
+           se o cliente quer fazer pedido
+        3. Próximo passo vem da decisão (não de palavras-chave)
         """
         from langchain.schema import SystemMessage, HumanMessage
 
@@ -363,24 +366,20 @@ RESPONDA DIRETAMENTE (não precisa JSON, apenas texto natural)"""
             ]
 
             logger.info("🔄 AttendanceAgent calling LLM...")
-            response = await self._call_llm(messages)
+            decision = await self._call_llm_decision(messages, AttendanceDecision)
 
-            # Detectar próximo passo baseado no contexto
-            message_lower = message.lower()
-            next_agent = None
-            stage = None
-
-            # Se cliente está interessado em produtos/pedido
-            product_keywords = ["quero", "pedido", "produto", "botijão", "p13", "preço", "quanto"]
-            if any(word in message_lower for word in product_keywords):
-                next_agent = "order"
-                stage = "building_order"
+            if decision is None:
+                return AgentResponse(
+                    text="Desculpe, tive um problema ao processar sua mensagem. Pode repetir?",
+                    intent="error",
+                    should_end=False
+                )
 
             return AgentResponse(
-                text=response,
+                text=decision.mensagem_cliente,
                 intent="attendance",
-                next_agent=next_agent,
-                context_updates={"stage": stage} if stage else {},
+                next_agent="order" if decision.quer_fazer_pedido else None,
+                context_updates={"stage": "building_order"} if decision.quer_fazer_pedido else {},
                 should_end=False
             )
 
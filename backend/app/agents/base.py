@@ -2,7 +2,7 @@
 Base classes for LangChain agents
 """
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Type, TypeVar
 from datetime import datetime
 from uuid import UUID
 import logging
@@ -11,8 +11,14 @@ from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel
 
+from app.core.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.agents.decisions import decision_tool, parse_decision
+
 logger = logging.getLogger(__name__)
 
+DecisionT = TypeVar("DecisionT", bound=BaseModel)
+
 
 class AgentContext(BaseModel):
     """Context shared between agents"""
@@ -42,10 +48,16 @@ class AgentResponse(BaseModel):
 class BaseAgent(ABC):
     """Base class for all agents"""
 
+    # Returned by _call_llm when the call fails (never cache it as an answer)
+    LLM_ERROR_REPLY = "Desculpe, tive um problema ao processar sua mensagem. Pode repetir?"
+
     def __init__(self, model_name: str = "gpt-4-turbo-preview", temperature: float = 0.7):
+        # Retries are left to llm_gateway (deadline, hedge and fallback model)
         self.llm = ChatOpenAI(
             model=model_name,
-            temperature=temperature
+            temperature=temperature,
+            max_retries=1,
+            openai_api_base=settings.OPENAI_BASE_URL
         )
         self.agent_name = self.__class__.__name__
 
@@ -136,11 +148,27 @@ Sempre confirme informações importantes antes de prosseguir."""
     async def _call_llm(self, messages: List) -> str:
         """Call LLM and get response"""
         try:
-            response = await self.llm.ainvoke(messages)
-            return response.content
+            return await llm_gateway.generate(self.agent_name, self.llm, messages)
         except Exception as e:
             logger.error(f"Error calling LLM in {self.agent_name}: {e}")
-            return "Desculpe, tive um problema ao processar sua mensagem. Pode repetir?"
+            return self.LLM_ERROR_REPLY
+
+    async def _call_llm_decision(self, messages: List, decision_model: Type[DecisionT]) -> Optional[DecisionT]:
+        """
+        Call LLM forcing a tool call with the decision schema
+
+        Returns the validated decision, or None when the call failed or the
+        decision was invalid (counted per agent by parse_decision).
+        """
+        try:
+            arguments = await llm_gateway.generate_tool_call(
+                self.agent_name, self.llm, messages, decision_tool(decision_model)
+            )
+        except Exception as e:
+            logger.error(f"Error calling LLM in {self.agent_name}: {e}")
+            return None
+
+        return parse_decision(self.agent_name, decision_model, arguments)
 
     # REMOVED: _detect_intent() method
     # This was pure IF/ELSE with keyword lists
@@ -178,6 +206,7 @@ Sempre confirme informações importantes antes de prosseguir."""
 
             # Falha total
             logger.error(f"Não foi possível parsear JSON: {response_text}")
+            llm_gateway.record_parse_failure(self.agent_name)
             return {"erro": "resposta_invalida", "texto": response_text}
 
     def _format_full_context(self, context: AgentContext) -> str:
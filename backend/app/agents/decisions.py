@@ -0,0 +1,144 @@
+"""
+Typed decisions returned by the AI agents
+
+Each process_with_ai() flow forces a tool call (DECISION_TOOL_NAME) whose
+parameters are the JSON schema of the agent's decision model, so the
+response is decoded and validated in a single step instead of the
+json.loads + regex fallbacks of BaseAgent._parse_llm_response().
+
+Decisions that cannot be used (no tool call, malformed JSON, schema
+violation) are counted per agent in gasbot_agent_invalid_decisions_total.
+"""
+import logging
+from typing import Any, Dict, List, Literal, Optional, Type, TypeVar
+
+from pydantic import BaseModel, Field, ValidationError
+
+from app.core import metrics
+from app.services.llm_gateway import llm_gateway
+
+logger = logging.getLogger(__name__)
+
+DECISION_TOOL_NAME = "registrar_decisao"
+
+DecisionT = TypeVar("DecisionT", bound=BaseModel)
+
+
+class AttendanceDecision(BaseModel):
+    """Resposta do AttendanceAgent"""
+    mensagem_cliente: str = Field(description="Texto natural enviado ao cliente")
+    quer_fazer_pedido: bool = Field(
+        default=False,
+        description="Cliente demonstrou interesse em fazer um pedido"
+    )
+
+
+class OrderItemDecision(BaseModel):
+    produto_nome: str = Field(description="Nome do produto como aparece no catálogo")
+    quantidade: int = Field(default=1, ge=1, description="Quantidade")
+
+
+class OrderDecision(BaseModel):
+    """Ação do OrderAgent sobre o carrinho"""
+    acao: Literal[
+        "adicionar", "adicionar_multiplos", "remover",
+        "mostrar_resumo", "finalizar", "esclarecer"
+    ]
+    produto_nome: Optional[str] = Field(default=None, description="Produto (acao=adicionar)")
+    quantidade: int = Field(default=1, ge=1, description="Quantidade (acao=adicionar)")
+    produtos: List[OrderItemDecision] = Field(
+        default_factory=list,
+        description="Todos os produtos (acao=adicionar_multiplos)"
+    )
+    mensagem_cliente: str = Field(default="", description="Texto amigável da resposta")
+    proximo_passo: Optional[str] = Field(
+        default=None,
+        description="pedir_endereco | continuar_comprando | esclarecer"
+    )
+
+
+class AddressDecision(BaseModel):
+    """Endereço extraído pelo ValidationAgent"""
+    completo: bool = Field(description="Rua, número e bairro estão preenchidos")
+    rua: Optional[str] = None
+    numero: Optional[str] = None
+    bairro: Optional[str] = None
+    complemento: Optional[str] = None
+    referencia: Optional[str] = None
+    faltando: List[str] = Field(default_factory=list, description="Campos que faltam")
+    mensagem_cliente: str = Field(default="", description="Texto amigável da resposta")
+
+
+class ChangeValidation(BaseModel):
+    valido: bool = True
+    motivo: Optional[str] = None
+
+
+class PaymentDecision(BaseModel):
+    """Forma de pagamento detectada pelo PaymentAgent"""
+    metodo: Literal["pix", "dinheiro", "cartao", "desconhecido"]
+    troco_para: Optional[float] = Field(default=None, description="Valor informado para troco")
+    validacao_troco: ChangeValidation = Field(default_factory=ChangeValidation)
+    confirmado: bool = False
+    mensagem_cliente: str = Field(
+        default="",
+        description="Usado apenas se proximo_passo = esclarecer ou corrigir_valor"
+    )
+    proximo_passo: Literal["confirmar_pedido", "pedir_troco", "corrigir_valor", "esclarecer"] = "esclarecer"
+
+
+def _inline_refs(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve $ref/$defs do pydantic: o schema da função fica autocontido"""
+    definitions = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(definitions[node["$ref"].split("/")[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(item) for item in node]
+        return node
+
+    return resolve(schema)
+
+
+_tools: Dict[Type[BaseModel], Dict[str, Any]] = {}
+
+
+def decision_tool(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Definição da tool (function calling) para um modelo de decisão"""
+    if model not in _tools:
+        parameters = _inline_refs(model.model_json_schema())
+        parameters.pop("title", None)
+        _tools[model] = {
+            "type": "function",
+            "function": {
+                "name": DECISION_TOOL_NAME,
+                "description": (model.__doc__ or "Decisão do agente").strip(),
+                "parameters": parameters,
+            },
+        }
+    return _tools[model]
+
+
+def parse_decision(agent: str, model: Type[DecisionT], arguments: Optional[str]) -> Optional[DecisionT]:
+    """
+    Valida os argumentos da tool call
+
+    Returns:
+        Decisão tipada, ou None (já contabilizada como inválida)
+    """
+    if arguments is None:
+        reason = "missing_tool_call"
+    else:
+        try:
+            return model.model_validate_json(arguments)
+        except ValidationError as e:
+            invalid_json = any(error["type"] == "json_invalid" for error in e.errors())
+            reason = "invalid_json" if invalid_json else "schema"
+            logger.warning(f"{agent} invalid decision ({reason}): {e.errors()[:3]} | {arguments[:300]}")
+
+    metrics.agent_invalid_decisions.labels(agent=agent, reason=reason).inc()
+    llm_gateway.record_parse_failure(agent)
+    return None
@@ -11,7 +11,9 @@ from app.services.intervention import InterventionService
 from app.services.audio_processor import AudioProcessor
 from app.agents.message_extractor import MessageExtractor
 from app.services.context_manager import ConversationContext
-from app.services.intent_classifier import IntentClassifier
+from app.services.intent_classifier import IntentClassifier, match_routine
+from app.services import reply_templates
+from app.core import metrics
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -128,8 +130,19 @@ class MasterAgent(BaseAgent):
             logger.info("🚀 Using FINE-TUNED EXTRACTOR (new system)")
             logger.info(f"[A/B TEST] System: FINE-TUNED | Conversation: {context.conversation_id}")
 
-            # Extract information with fine-tuned model
-            extracted_info = await self.message_extractor.extract(message_text)
+            # Extract information with fine-tuned model (and the conversational
+            # intent too, when the extractor is configured to return it)
+            last_bot_message = None
+            if self.message_extractor.include_intent:
+                last_bot_message = ConversationContext(
+                    session_data=context.session_data,
+                    message_history=context.message_history
+                ).last_bot_question or None
+
+            extracted_info = await self.message_extractor.extract(
+                message_text,
+                last_bot_message=last_bot_message
+            )
             context.session_data["extracted_info"] = extracted_info
 
             # Log extracted info for debug
@@ -217,10 +230,16 @@ class MasterAgent(BaseAgent):
         logger.info(f"Context: {context_summary}")
 
         # 2. Classificar intent considerando contexto
-        intent = await self.intent_classifier.classify(
-            message=message,
-            last_bot_message=conv_context.last_bot_question
-        )
+        # (já vem do extractor com EXTRACTOR_INCLUDES_INTENT; se faltar ou
+        # vier inválido, faz a chamada separada do IntentClassifier)
+        intent = extracted_info.get("intent")
+        if intent:
+            logger.info(f"Intent from extractor: {intent}")
+        else:
+            intent = await self.intent_classifier.classify(
+                message=message,
+                last_bot_message=conv_context.last_bot_question
+            )
 
         logger.info(
             f"Routing - Intent: {intent}, Stage: {conv_context.current_stage}, "
@@ -622,7 +641,12 @@ RESPONDA **APENAS** EM JSON (não adicione texto antes ou depois):
                 should_end=False
             )
 
-        # 4. NOVO: LLM decide roteamento (substituindo IF/ELSE)
+        # 4. Passos de rotina: o estado já define a resposta (template, sem LLM)
+        response = await self._reply_without_llm(message_text, context, db)
+        if response:
+            return response
+
+        # 5. NOVO: LLM decide roteamento (substituindo IF/ELSE)
         from langchain.schema import SystemMessage, HumanMessage
 
         system_prompt = self._build_system_prompt_ai(context, db)
@@ -635,9 +659,112 @@ RESPONDA **APENAS** EM JSON (não adicione texto antes ou depois):
         response = await self._call_llm(messages)
         decision = self._parse_llm_response(response)
 
-        # 5. Executar decisão
+        # 6. Executar decisão
         return await self._execute_decision(decision, context, db, message_text)
 
+    async def _reply_without_llm(self, message_text: str, context: AgentContext, db) -> Optional[AgentResponse]:
+        """
+        Deterministic reply for routine turns in AI routing mode
+
+        Only short, unambiguous messages (match_routine) in a conversation
+        state where the next step is known are answered here: greeting with
+        catalog, product list, help, order summary, finishing the cart,
+        confirming the order (payment options) and choosing the payment
+        method. Everything else returns None and goes to the LLM router.
+        """
+        routine = match_routine(message_text)
+        if routine is None:
+            return None
+
+        conv_context = ConversationContext(
+            session_data=context.session_data,
+            message_history=context.message_history
+        )
+        stage = conv_context.current_stage
+        has_items = conv_context.has_items_in_cart
+        current_order = context.session_data.get("current_order") or {}
+        templates = reply_templates.reply_templates_for(db, context.tenant_id)
+
+        template = None
+        response = None
+
+        if routine == "greeting" and not has_items:
+            template = "greeting"
+            response = AgentResponse(
+                text=templates.greeting(returning=bool(conv_context.last_bot_message)),
+                intent="greeting",
+                should_end=False
+            )
+
+        elif routine == "product_inquiry":
+            template = "product_list"
+            starting = stage in ("greeting", "building_order", "completed")
+            response = AgentResponse(
+                text=templates.product_list(),
+                intent="product_inquiry",
+                next_agent="order" if starting else None,
+                context_updates={"stage": "building_order"} if starting else {},
+                should_end=False
+            )
+
+        elif routine == "help":
+            template = "help"
+            response = AgentResponse(text=templates.help(), intent="help", should_end=False)
+
+        elif routine == "show_summary" and has_items:
+            template = "order_summary"
+            response = AgentResponse(
+                text=reply_templates.order_summary(current_order),
+                intent="show_summary",
+                should_end=False
+            )
+
+        elif (routine == "answer_no" and has_items
+              and stage in ("greeting", "building_order")
+              and conv_context.awaiting_user_decision):
+            # "Deseja adicionar mais?" -> "só isso": próximo passo é o endereço
+            from app.agents.validation import ValidationAgent
+
+            template = "ask_address"
+            response = await ValidationAgent().ask_for_address(context)
+
+        elif routine == "answer_yes" and has_items and stage == "confirming_order":
+            template = "payment_options"
+            response = AgentResponse(
+                text=templates.payment_options(current_order.get("total", 0)),
+                intent="payment_method_needed",
+                context_updates={"stage": "payment"},
+                should_end=False
+            )
+
+        elif routine.startswith("pay_") and has_items and stage == "payment":
+            decision = self._payment_decision(routine, templates)
+            if decision:
+                from app.agents.payment import PaymentAgent
+
+                template = routine
+                response = await PaymentAgent()._execute_decision_ai(decision, context, db)
+
+        if response is None:
+            return None
+
+        logger.info(f"⚡ Routine '{routine}' answered by template '{template}' (stage={stage})")
+        metrics.template_replies.labels(template=template).inc()
+        return response
+
+    @staticmethod
+    def _payment_decision(routine: str, templates) -> Optional[Dict[str, Any]]:
+        """Same decision PaymentAgent's LLM returns for a bare payment method"""
+        methods = {m.lower() for m in templates.catalog.payment_methods}
+
+        if routine == "pay_pix" and templates.pix_available:
+            return {"metodo": "pix", "confirmado": True, "proximo_passo": "confirmar_pedido"}
+        if routine == "pay_card" and methods & {"cartao", "cartão"}:
+            return {"metodo": "cartao", "confirmado": True, "proximo_passo": "confirmar_pedido"}
+        if routine == "pay_cash" and "dinheiro" in methods:
+            return {"metodo": "dinheiro", "confirmado": False, "proximo_passo": "pedir_troco"}
+        return None
+
     def _build_system_prompt(self, context: AgentContext) -> str:
         """Build system prompt for master agent (legacy - kept for compatibility)"""
         return """Você é o orquestrador principal de um sistema de atendimento via WhatsApp.
@@ -6,14 +6,29 @@ Responsável por extrair:
 - Endereço (rua, número, bairro, complemento, referência, confidence)
 - Pagamento (método, troco, confidence)
 - Metadados (urgência, tom do cliente)
+- Intent conversacional (opcional, settings.EXTRACTOR_INCLUDES_INTENT)
 """
+import json
 import logging
-from typing import Dict, Any, Optional
-from openai import AsyncOpenAI
+from typing import Dict, Any, List, Optional
 from app.core.config import settings
+from app.services.intent_classifier import VALID_INTENTS
+from app.services.llm_gateway import llm_gateway
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "Você é um assistente especializado em extrair informações estruturadas de mensagens de pedidos de gás. Analise a mensagem e extraia todas as informações possíveis."
+
+INTENT_PROMPT = """
+Classifique também o campo intent, considerando a última mensagem do bot (se houver):
+- answer_yes: cliente concordou/confirmou (sim, ok, pode, beleza, confirmo)
+- answer_no: cliente negou/recusou/finalizou (não, finalizar, pronto, só isso)
+- greeting: saudação
+- product_inquiry: pergunta sobre produtos/preços
+- help: pedido de atendente humano
+- general: outros casos
+Se o bot perguntou "deseja adicionar mais?" e o cliente disse "finalizar/não/pronto", o intent é answer_no."""
+
 
 class MessageExtractor:
     """
@@ -24,12 +39,21 @@ class MessageExtractor:
     - address: endereço de entrega
     - payment: método de pagamento e troco
     - metadata: informações auxiliares (urgência, tom)
+    - intent: intenção conversacional, quando include_intent está ativo
     """
 
-    def __init__(self):
-        """Inicializa o extractor com o modelo fine-tuned"""
+    def __init__(self, include_intent: Optional[bool] = None):
+        """
+        Inicializa o extractor com o modelo fine-tuned
+
+        Args:
+            include_intent: Extrair também o intent; None usa
+                settings.EXTRACTOR_INCLUDES_INTENT
+        """
         self.model = settings.FINETUNED_EXTRACTOR_MODEL
-        self.client = AsyncOpenAI()
+        self.include_intent = (
+            settings.EXTRACTOR_INCLUDES_INTENT if include_intent is None else include_intent
+        )
         self.function_schema = self._build_function_schema()
 
     def _build_function_schema(self) -> Dict[str, Any]:
@@ -39,7 +63,7 @@ class MessageExtractor:
         Define a estrutura esperada do JSON de resposta
         com todos os campos necessários para extrair informações
         """
-        return {
+        schema = {
             "type": "function",
             "function": {
                 "name": "extract_order_info",
@@ -143,12 +167,25 @@ class MessageExtractor:
             }
         }
 
-    async def extract(self, message: str) -> Dict[str, Any]:
+        if self.include_intent:
+            parameters = schema["function"]["parameters"]
+            parameters["properties"]["intent"] = {
+                "type": "string",
+                "enum": list(VALID_INTENTS),
+                "description": "Intenção do cliente considerando a última mensagem do bot"
+            }
+            parameters["required"].append("intent")
+
+        return schema
+
+    async def extract(self, message: str, last_bot_message: Optional[str] = None) -> Dict[str, Any]:
         """
         Extrai informações estruturadas da mensagem usando function calling
 
         Args:
             message: Mensagem do cliente
+            last_bot_message: Última mensagem do bot; só é enviada quando
+                o intent também é extraído
 
         Returns:
             Dict com estrutura:
@@ -156,7 +193,8 @@ class MessageExtractor:
                 "product": {"name": str, "quantity": int, "confidence": float},
                 "address": {"street": str, "number": str, "neighborhood": str, ...},
                 "payment": {"method": str, "change_for": float, "confidence": float},
-                "metadata": {"is_urgent": bool, "customer_tone": str, ...}
+                "metadata": {"is_urgent": bool, "customer_tone": str, ...},
+                "intent": str | None  (apenas com include_intent)
             }
 
         Raises:
@@ -164,26 +202,22 @@ class MessageExtractor:
         """
         try:
             # Chamar API com function calling
-            response = await self.client.chat.completions.create(
+            response = await llm_gateway.chat_completion(
+                "message_extractor",
                 model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Você é um assistente especializado em extrair informações estruturadas de mensagens de pedidos de gás. Analise a mensagem e extraia todas as informações possíveis."
-                    },
-                    {
-                        "role": "user",
-                        "content": message
-                    }
-                ],
+                messages=self._build_messages(message, last_bot_message),
                 tools=[self.function_schema],
                 tool_choice={"type": "function", "function": {"name": "extract_order_info"}}
             )
 
             # Extrair function call da resposta
-            tool_call = response.choices[0].message.tool_calls[0]
-            import json
-            extracted_data = json.loads(tool_call.function.arguments)
+            try:
+                tool_call = response.choices[0].message.tool_calls[0]
+                extracted_data = json.loads(tool_call.function.arguments)
+            except (IndexError, TypeError, json.JSONDecodeError) as e:
+                llm_gateway.record_parse_failure("message_extractor")
+                logger.error(f"MessageExtractor - Invalid tool call: {e}")
+                return self._get_empty_structure()
 
             # Normalizar dados (garantir campos obrigatórios)
             normalized_data = self._normalize_extracted_data(extracted_data)
@@ -198,6 +232,30 @@ class MessageExtractor:
             # Retornar estrutura vazia em caso de erro
             return self._get_empty_structure()
 
+    def _build_messages(self, message: str, last_bot_message: Optional[str]) -> List[Dict[str, str]]:
+        if not self.include_intent:
+            return [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": message}
+            ]
+
+        # A mensagem do bot vai como turno do assistant: o texto do cliente
+        # continua chegando ao modelo fine-tuned igual ao treino
+        messages = [{"role": "system", "content": SYSTEM_PROMPT + "\n" + INTENT_PROMPT}]
+        if last_bot_message:
+            messages.append({"role": "assistant", "content": last_bot_message})
+        messages.append({"role": "user", "content": message})
+        return messages
+
+    def _normalize_intent(self, intent: Any) -> Optional[str]:
+        """Intent válido ou None (o MasterAgent então usa o IntentClassifier)"""
+        if isinstance(intent, str) and intent.strip().lower() in VALID_INTENTS:
+            return intent.strip().lower()
+
+        logger.warning(f"MessageExtractor - Invalid intent: {intent!r}")
+        llm_gateway.record_parse_failure("message_extractor")
+        return None
+
     def _normalize_extracted_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Normaliza dados extraídos, garantindo todos os campos obrigatórios
@@ -235,6 +293,9 @@ class MessageExtractor:
             }
         }
 
+        if self.include_intent:
+            normalized["intent"] = self._normalize_intent(data.get("intent"))
+
         return normalized
 
     def _get_empty_structure(self) -> Dict[str, Any]:
@@ -244,7 +305,7 @@ class MessageExtractor:
         Returns:
             Estrutura com todos os campos mas valores vazios/padrão
         """
-        return {
+        empty = {
             "product": {
                 "name": "",
                 "quantity": 1,
@@ -270,3 +331,8 @@ class MessageExtractor:
                 "customer_tone": "neutral"
             }
         }
+
+        if self.include_intent:
+            empty["intent"] = None
+
+        return empty
@@ -9,7 +9,11 @@ import logging
 import re
 
 from app.agents.base import BaseAgent, AgentContext, AgentResponse
+from app.agents.decisions import OrderDecision
+from app.agents.prompts import build_system_prompt
 from app.database.models import Product, Order, Customer, Tenant
+from app.services import reply_templates
+from app.services.realtime import publish_order_created
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,71 @@ class OrderAgent(BaseAgent):
     - Create order in database
     """
 
+    AI_INSTRUCTIONS = """Você gerencia o CARRINHO DE COMPRAS de pedidos de gás via WhatsApp.
+
+RESPONSABILIDADES:
+1. Adicionar produtos ao carrinho
+2. Remover produtos do carrinho
+3. Mostrar resumo do pedido
+4. Detectar quando cliente quer finalizar
+
+REGRAS DE INTERPRETAÇÃO:
+1. Se você perguntou "Deseja adicionar mais?" e cliente diz não/finalizar/pronto/só isso:
+   → NÃO adicione produto
+   → Ação = "finalizar"
+
+2. Se cliente menciona produto (por nome ou número da lista):
+   → Adicione ao carrinho
+
+3. Se cliente diz sim/ok/pode SEM você ter perguntado nada:
+   → Peça esclarecimento
+
+4. Se cliente menciona MÚLTIPLOS produtos (ex: "um gás e uma água"):
+   → Use ação "adicionar_multiplos"
+   → Liste TODOS os produtos em "produtos" array
+
+5. Entenda variações naturais:
+   - "quero um P13" = adicionar Botijão P13
+   - "pode seguir" após você perguntar = confirmação
+   - "só isso" / "mais nada" = finalizar
+   - "1" = produto número 1 da lista
+   - "dois p13" = 2x Botijão P13
+   - "um gás e uma água" = 1x gás + 1x água (múltiplos)
+
+RESPONDA chamando a função registrar_decisao com os campos:
+
+**Para UM produto**:
+{
+    "acao": "adicionar",
+    "produto_nome": "nome do produto",
+    "quantidade": número,
+    "mensagem_cliente": "texto amigável da resposta",
+    "proximo_passo": "pedir_endereco" | "continuar_comprando" | "esclarecer"
+}
+
+**Para MÚLTIPLOS produtos**:
+{
+    "acao": "adicionar_multiplos",
+    "produtos": [
+        {"produto_nome": "nome produto 1", "quantidade": número},
+        {"produto_nome": "nome produto 2", "quantidade": número}
+    ],
+    "mensagem_cliente": "texto amigável confirmando TODOS os produtos",
+    "proximo_passo": "continuar_comprando"
+}
+
+**Para outras ações**:
+{
+    "acao": "remover" | "mostrar_resumo" | "finalizar" | "esclarecer",
+    "mensagem_cliente": "texto amigável da resposta",
+    "proximo_passo": "..."
+}
+
+IMPORTANTE:
+- Identifique TODOS os produtos mencionados pelo cliente
+- Seja natural e amigável na mensagem_cliente
+- Confirme todos os produtos que foram adicionados"""
+
     def __init__(self):
         super().__init__(model_name="gpt-4-turbo-preview", temperature=0.5)
 
@@ -617,31 +686,12 @@ Por favor, me envie:
         """Build order summary text"""
 
         if added_item:
-            price_str = f"R$ {added_item['subtotal']:.2f}".replace(".", ",")
+            price_str = reply_templates.money(added_item['subtotal'])
             summary = f"✅ Adicionado: {added_item['quantity']}x {added_item['product_name']} - {price_str}\n\n"
         else:
             summary = ""
 
-        if not order["items"]:
-            return summary + "Seu pedido está vazio."
-
-        summary += "📋 *Resumo do Pedido:*\n\n"
-
-        for idx, item in enumerate(order["items"], 1):
-            price_str = f"R$ {item['subtotal']:.2f}".replace(".", ",")
-            summary += f"{idx}. {item['quantity']}x {item['product_name']}\n"
-            summary += f"   {price_str}\n\n"
-
-        # Totals
-        subtotal_str = f"R$ {order['subtotal']:.2f}".replace(".", ",")
-        delivery_str = f"R$ {order['delivery_fee']:.2f}".replace(".", ",")
-        total_str = f"R$ {order['total']:.2f}".replace(".", ",")
-
-        summary += f"Subtotal: {subtotal_str}\n"
-        summary += f"Taxa de entrega: {delivery_str}\n"
-        summary += f"*Total: {total_str}*"
-
-        return summary
+        return summary + reply_templates.order_summary(order)
 
     async def _handle_general_order_question(
         self,
@@ -717,17 +767,18 @@ Seja claro e objetivo."""
         )
 
         db.add(order_obj)
-        db.commit()
-        db.refresh(order_obj)
 
         # Update customer stats
         customer.order_count += 1
         customer.total_spent += Decimal(str(order["total"]))
         customer.last_order_at = datetime.utcnow()
         db.commit()
+        db.refresh(order_obj)
 
         logger.info(f"Order created: {order_obj.id} - Total: R$ {order['total']:.2f}")
 
+        await publish_order_created(order_obj)
+
         return order_obj
 
     # ================================================================
@@ -738,125 +789,48 @@ Seja claro e objetivo."""
         """
         System prompt para OrderAgent decidir ações com IA
 
-        NOVO: Usa LLM para gerenciar carrinho (não listas de palavras)
+        Instruções fixas e catálogo do tenant primeiro (prefixo estável,
+        aproveita o cache de prompt), carrinho e histórico por último.
         """
-        from app.database.models import Product, Tenant
-
-        try:
-            tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
-            products = db.query(Product).filter(
-                Product.tenant_id == context.tenant_id,
-                Product.is_available == True
-            ).all()
-
-            # Formatar produtos
-            products_text = ""
-            for i, p in enumerate(products, 1):
-                products_text += f"{i}. {p.name} - R$ {p.price:.2f}\n"
-
-            # Carrinho atual
-            current_order = context.session_data.get("current_order", {})
-            items = current_order.get("items", [])
-
-            cart_text = ""
-            if items:
-                for item in items:
-                    cart_text += f"- {item['quantity']}x {item['product_name']} (R$ {item['subtotal']:.2f})\n"
-                cart_text += f"Total: R$ {current_order.get('total', 0):.2f}"
-            else:
-                cart_text = "Carrinho vazio"
-
-            # Última pergunta do bot
-            last_bot_question = ""
-            for msg in reversed(context.message_history):
-                if msg.get("role") == "assistant":
-                    last_bot_question = msg.get("content", "")
-                    break
-
-        except Exception as e:
-            logger.error(f"Error building system prompt: {e}")
-            products_text = "(erro ao carregar produtos)"
+        # Carrinho atual
+        current_order = context.session_data.get("current_order", {})
+        items = current_order.get("items", [])
+
+        cart_text = ""
+        if items:
+            for item in items:
+                cart_text += f"- {item['quantity']}x {item['product_name']} (R$ {item['subtotal']:.2f})\n"
+            cart_text += f"Total: R$ {current_order.get('total', 0):.2f}"
+        else:
             cart_text = "Carrinho vazio"
-            last_bot_question = ""
+
+        # Última pergunta do bot
+        last_bot_question = ""
+        for msg in reversed(context.message_history):
+            if msg.get("role") == "assistant":
+                last_bot_question = msg.get("content", "")
+                break
 
         # Contexto
         ctx = self._format_full_context(context)
 
-        return f"""Você gerencia o CARRINHO DE COMPRAS de pedidos de gás via WhatsApp.
-
-{ctx}
-
-PRODUTOS DISPONÍVEIS:
-{products_text}
+        dynamic = f"""{ctx}
 
 CARRINHO ATUAL:
 {cart_text}
 
 ÚLTIMA PERGUNTA QUE VOCÊ FEZ:
 "{last_bot_question}"
+"""
 
-RESPONSABILIDADES:
-1. Adicionar produtos ao carrinho
-2. Remover produtos do carrinho
-3. Mostrar resumo do pedido
-4. Detectar quando cliente quer finalizar
-
-REGRAS DE INTERPRETAÇÃO:
-1. Se você perguntou "Deseja adicionar mais?" e cliente diz não/finalizar/pronto/só isso:
-   → NÃO adicione produto
-   → Ação = "finalizar"
-
-2. Se cliente menciona produto (por nome ou número da lista):
-   → Adicione ao carrinho
-
-3. Se cliente diz sim/ok/pode SEM você ter perguntado nada:
-   → Peça esclarecimento
-
-4. Se cliente menciona MÚLTIPLOS produtos (ex: "um gás e uma água"):
-   → Use ação "adicionar_multiplos"
-   → Liste TODOS os produtos em "produtos" array
-
-5. Entenda variações naturais:
-   - "quero um P13" = adicionar Botijão P13
-   - "pode seguir" após você perguntar = confirmação
-   - "só isso" / "mais nada" = finalizar
-   - "1" = produto número 1 da lista
-   - "dois p13" = 2x Botijão P13
-   - "um gás e uma água" = 1x gás + 1x água (múltiplos)
-
-RESPONDA **APENAS** EM JSON:
-
-**Para UM produto**:
-{{
-    "acao": "adicionar",
-    "produto_nome": "nome do produto",
-    "quantidade": número,
-    "mensagem_cliente": "texto amigável da resposta",
-    "proximo_passo": "pedir_endereco" | "continuar_comprando" | "esclarecer"
-}}
-
-**Para MÚLTIPLOS produtos**:
-{{
-    "acao": "adicionar_multiplos",
-    "produtos": [
-        {{"produto_nome": "nome produto 1", "quantidade": número}},
-        {{"produto_nome": "nome produto 2", "quantidade": número}}
-    ],
-    "mensagem_cliente": "texto amigável confirmando TODOS os produtos",
-    "proximo_passo": "continuar_comprando"
-}}
-
-**Para outras ações**:
-{{
-    "acao": "remover" | "mostrar_resumo" | "finalizar" | "esclarecer",
-    "mensagem_cliente": "texto amigável da resposta",
-    "proximo_passo": "..."
-}}
-
-IMPORTANTE:
-- Identifique TODOS os produtos mencionados pelo cliente
-- Seja natural e amigável na mensagem_cliente
-- Confirme todos os produtos que foram adicionados"""
+        return build_system_prompt(
+            db,
+            context.tenant_id,
+            key=self.agent_name,
+            static_instructions=self.AI_INSTRUCTIONS,
+            tenant_section=lambda catalog: f"PRODUTOS DISPONÍVEIS:\n{catalog.products_text}",
+            dynamic=dynamic
+        )
 
     async def _execute_decision_ai(self, decision: dict, context: AgentContext, db) -> AgentResponse:
         """
@@ -1057,10 +1031,15 @@ IMPORTANTE:
             ]
 
             logger.info("🔄 OrderAgent calling LLM...")
-            response = await self._call_llm(messages)
-            decision = self._parse_llm_response(response)
+            decision = await self._call_llm_decision(messages, OrderDecision)
+            if decision is None:
+                return AgentResponse(
+                    text="Desculpe, não entendi. Pode repetir de outro jeito?",
+                    intent="invalid_decision",
+                    should_end=False
+                )
 
-            return await self._execute_decision_ai(decision, context, db)
+            return await self._execute_decision_ai(decision.model_dump(), context, db)
 
         except Exception as e:
             logger.error(f"Error in process_with_ai: {e}")
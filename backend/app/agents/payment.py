@@ -7,7 +7,11 @@ from datetime import datetime
 import logging
 
 from app.agents.base import BaseAgent, AgentContext, AgentResponse
+from app.agents.decisions import PaymentDecision
+from app.agents.prompts import build_system_prompt
 from app.database.models import Tenant
+from app.services import reply_templates
+from app.services.tenant_catalog import TenantCatalog
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -26,6 +30,70 @@ class PaymentAgent(BaseAgent):
     NOTE: This is simplified - no actual payment validation
     """
 
+    AI_INSTRUCTIONS = """Você é responsável por coletar a FORMA DE PAGAMENTO do cliente.
+
+RESPONSABILIDADES:
+1. Detectar qual forma de pagamento o cliente escolheu
+2. Se for PIX ou CARTÃO: set confirmado=true, proximo_passo="confirmar_pedido"
+3. Se for DINHEIRO e cliente NÃO mencionou troco/valor: set confirmado=false, proximo_passo="pedir_troco"
+4. Se for DINHEIRO e cliente mencionou valor/troco: VALIDAR valor >= total, set confirmado=true
+5. Se for DINHEIRO e cliente disse "não preciso de troco" ou "valor exato": set confirmado=true, troco_para=null
+
+REGRAS DE DETECÇÃO:
+1. Variações comuns:
+   - "pix" / "no pix" / "vou pagar no pix" → PIX
+   - "dinheiro" / "espécie" / "na entrega" / "cash" → Dinheiro
+   - "cartão" / "cartao" / "débito" / "credito" / "na maquininha" → Cartão
+   - "100 reais" / "troco para 100" → valor informado pelo cliente
+
+2. VALIDAÇÃO DE TROCO (CRÍTICO):
+   - Se cliente mencionar valor para troco
+   - Verificar: valor_informado >= VALOR TOTAL DO PEDIDO (ver contexto abaixo)
+   - Se valor < total: REJEITAR (validacao_troco.valido=false)
+   - Se valor == total: aceitar como "valor exato, sem troco"
+   - Se valor > total: calcular troco normalmente
+
+3. EXEMPLOS DE RESPOSTAS:
+
+   Exemplo 1 - Só método:
+   Cliente: "dinheiro"
+   → {"metodo": "dinheiro", "troco_para": null, "confirmado": false, "proximo_passo": "pedir_troco"}
+
+   Exemplo 2 - Método + troco válido:
+   Cliente: "dinheiro, troco para 200"
+   → {"metodo": "dinheiro", "troco_para": 200, "confirmado": true, "proximo_passo": "confirmar_pedido", "validacao_troco": {"valido": true}}
+
+   Exemplo 3 - Método + não precisa troco:
+   Cliente: "dinheiro, valor exato" OU "não preciso de troco"
+   → {"metodo": "dinheiro", "troco_para": null, "confirmado": true, "proximo_passo": "confirmar_pedido"}
+
+   Exemplo 4 - PIX/Cartão:
+   Cliente: "pix"
+   → {"metodo": "pix", "troco_para": null, "confirmado": true, "proximo_passo": "confirmar_pedido"}
+
+   Exemplo 5 - Troco inválido:
+   Cliente: "dinheiro, troco para 50" (se total = R$ 110)
+   → {"metodo": "dinheiro", "troco_para": 50, "confirmado": false, "proximo_passo": "corrigir_valor", "validacao_troco": {"valido": false, "motivo": "Valor R$ 50,00 é menor que total R$ 110,00"}}
+
+RESPONDA chamando a função registrar_decisao com os campos:
+{
+    "metodo": "pix" | "dinheiro" | "cartao" | "desconhecido",
+    "troco_para": valor numérico ou null,
+    "validacao_troco": {
+        "valido": true/false,
+        "motivo": "se inválido, explicar"
+    },
+    "confirmado": true/false,
+    "mensagem_cliente": "texto amigável (usado apenas se proximo_passo = esclarecer ou corrigir_valor)",
+    "proximo_passo": "confirmar_pedido" | "pedir_troco" | "corrigir_valor" | "esclarecer"
+}
+
+IMPORTANTE:
+- Se cliente disse só "dinheiro" → confirmado=false, proximo_passo="pedir_troco"
+- Se cliente disse "pix" ou "cartão" → confirmado=true, proximo_passo="confirmar_pedido"
+- Se cliente informou troco válido → confirmado=true, proximo_passo="confirmar_pedido"
+- Sempre valide troco_para contra o VALOR TOTAL DO PEDIDO informado no contexto"""
+
     def __init__(self):
         super().__init__(model_name="gpt-4-turbo-preview", temperature=0.5)
 
@@ -320,68 +388,11 @@ Seu pedido já foi registrado e será preparado!"""
 
     async def _handle_cash_payment(self, tenant: Tenant, order: Dict[str, Any], change_for: Optional[float] = None) -> str:
         """Handle cash payment"""
-
-        total_str = f"R$ {order['total']:.2f}".replace(".", ",")
-
-        message = f"""✅ Pagamento em Dinheiro
-
-💵 *Valor:* {total_str}
-
-Você vai pagar em dinheiro na entrega."""
-
-        if change_for:
-            # Validação: valor informado deve ser >= total do pedido
-            if change_for < order['total']:
-                # Valor insuficiente - retornar mensagem de erro
-                change_str = f"R$ {change_for:.2f}".replace(".", ",")
-                return f"""❌ O valor informado ({change_str}) é menor que o total do pedido ({total_str}).
-
-Para pagar em dinheiro, você precisa ter no mínimo o valor do pedido.
-
-💡 Você pode:
-• Informar um valor maior (ex: R$ 150,00)
-• Pagar com o valor exato ({total_str})
-• Escolher outra forma de pagamento (PIX ou Cartão)
-
-Qual valor você vai usar?"""
-
-            elif change_for == order['total']:
-                # Valor exato (sem troco)
-                message += f"""
-
-💵 *Valor exato:* {total_str}
-✅ Sem necessidade de troco"""
-
-            else:
-                # Valor maior (com troco válido)
-                change_str = f"R$ {change_for:.2f}".replace(".", ",")
-                change_amount = change_for - order['total']
-                change_amount_str = f"R$ {change_amount:.2f}".replace(".", ",")
-                message += f"""
-
-💵 *Troco para:* {change_str}
-💰 *Troco:* {change_amount_str}"""
-        else:
-            message += """
-
-💡 *Dica:* Prepare o valor exato ou nos avise se precisa de troco!"""
-
-        return message
+        return reply_templates.cash_payment(order['total'], change_for)
 
     async def _handle_card_payment(self, tenant: Tenant, order: Dict[str, Any]) -> str:
         """Handle card payment"""
-
-        total_str = f"R$ {order['total']:.2f}".replace(".", ",")
-
-        message = f"""✅ Pagamento no Cartão
-
-💳 *Valor:* {total_str}
-
-Você vai pagar com cartão na entrega.
-
-Aceitamos débito e crédito!"""
-
-        return message
+        return reply_templates.card_payment(order['total'])
 
     def _build_system_prompt(self, context: AgentContext) -> str:
         """Build system prompt for payment agent"""
@@ -403,99 +414,34 @@ Seja claro e educado. Não valide pagamentos, apenas registre a forma escolhida.
         """
         System prompt para PaymentAgent detectar forma de pagamento com IA
 
-        NOVO: Usa LLM para detectar pagamento (não listas de palavras)
+        Regras e formas de pagamento do tenant formam o prefixo estável;
+        o total do pedido, que muda a cada pedido, vai no contexto final.
         """
-        from app.database.models import Tenant
-
-        try:
-            tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
-            payment_methods = tenant.payment_methods or ["Dinheiro"]
-            pix_enabled = tenant.pix_enabled
-
-            # Pedido atual
-            current_order = context.session_data.get("current_order", {})
-            total = current_order.get("total", 0)
-        except Exception as e:
-            logger.error(f"Error building system prompt: {e}")
-            payment_methods = ["Dinheiro"]
-            pix_enabled = False
-            total = 0
+        current_order = context.session_data.get("current_order", {})
+        total = current_order.get("total", 0)
 
         ctx = self._format_full_context(context)
 
-        methods_text = "\n".join([f"- {m}" for m in payment_methods])
-
-        return f"""Você é responsável por coletar a FORMA DE PAGAMENTO do cliente.
-
-{ctx}
+        dynamic = f"""{ctx}
 
 VALOR TOTAL DO PEDIDO: R$ {total:.2f}
+"""
 
-FORMAS DE PAGAMENTO ACEITAS:
+        return build_system_prompt(
+            db,
+            context.tenant_id,
+            key=self.agent_name,
+            static_instructions=self.AI_INSTRUCTIONS,
+            tenant_section=self._tenant_section,
+            dynamic=dynamic
+        )
+
+    @staticmethod
+    def _tenant_section(catalog: TenantCatalog) -> str:
+        methods_text = "\n".join([f"- {m}" for m in catalog.payment_methods])
+        return f"""FORMAS DE PAGAMENTO ACEITAS:
 {methods_text}
-{"- PIX (disponível)" if pix_enabled else ""}
-
-RESPONSABILIDADES:
-1. Detectar qual forma de pagamento o cliente escolheu
-2. Se for PIX ou CARTÃO: set confirmado=true, proximo_passo="confirmar_pedido"
-3. Se for DINHEIRO e cliente NÃO mencionou troco/valor: set confirmado=false, proximo_passo="pedir_troco"
-4. Se for DINHEIRO e cliente mencionou valor/troco: VALIDAR valor >= total, set confirmado=true
-5. Se for DINHEIRO e cliente disse "não preciso de troco" ou "valor exato": set confirmado=true, troco_para=null
-
-REGRAS DE DETECÇÃO:
-1. Variações comuns:
-   - "pix" / "no pix" / "vou pagar no pix" → PIX
-   - "dinheiro" / "espécie" / "na entrega" / "cash" → Dinheiro
-   - "cartão" / "cartao" / "débito" / "credito" / "na maquininha" → Cartão
-   - "100 reais" / "troco para 100" → valor informado pelo cliente
-
-2. VALIDAÇÃO DE TROCO (CRÍTICO):
-   - Se cliente mencionar valor para troco
-   - Verificar: valor_informado >= {total:.2f} (total do pedido)
-   - Se valor < total: REJEITAR (validacao_troco.valido=false)
-   - Se valor == total: aceitar como "valor exato, sem troco"
-   - Se valor > total: calcular troco normalmente
-
-3. EXEMPLOS DE RESPOSTAS:
-
-   Exemplo 1 - Só método:
-   Cliente: "dinheiro"
-   → {{"metodo": "dinheiro", "troco_para": null, "confirmado": false, "proximo_passo": "pedir_troco"}}
-
-   Exemplo 2 - Método + troco válido:
-   Cliente: "dinheiro, troco para 200"
-   → {{"metodo": "dinheiro", "troco_para": 200, "confirmado": true, "proximo_passo": "confirmar_pedido", "validacao_troco": {{"valido": true}}}}
-
-   Exemplo 3 - Método + não precisa troco:
-   Cliente: "dinheiro, valor exato" OU "não preciso de troco"
-   → {{"metodo": "dinheiro", "troco_para": null, "confirmado": true, "proximo_passo": "confirmar_pedido"}}
-
-   Exemplo 4 - PIX/Cartão:
-   Cliente: "pix"
-   → {{"metodo": "pix", "troco_para": null, "confirmado": true, "proximo_passo": "confirmar_pedido"}}
-
-   Exemplo 5 - Troco inválido:
-   Cliente: "dinheiro, troco para 50" (se total = R$ 110)
-   → {{"metodo": "dinheiro", "troco_para": 50, "confirmado": false, "proximo_passo": "corrigir_valor", "validacao_troco": {{"valido": false, "motivo": "Valor R$ 50,00 é menor que total R$ 110,00"}}}}
-
-RESPONDA **APENAS** EM JSON:
-{{
-    "metodo": "pix" | "dinheiro" | "cartao" | "desconhecido",
-    "troco_para": valor numérico ou null,
-    "validacao_troco": {{
-        "valido": true/false,
-        "motivo": "se inválido, explicar"
-    }},
-    "confirmado": true/false,
-    "mensagem_cliente": "texto amigável (usado apenas se proximo_passo = esclarecer ou corrigir_valor)",
-    "proximo_passo": "confirmar_pedido" | "pedir_troco" | "corrigir_valor" | "esclarecer"
-}}
-
-IMPORTANTE:
-- Se cliente disse só "dinheiro" → confirmado=false, proximo_passo="pedir_troco"
-- Se cliente disse "pix" ou "cartão" → confirmado=true, proximo_passo="confirmar_pedido"
-- Se cliente informou troco válido → confirmado=true, proximo_passo="confirmar_pedido"
-- Sempre valide troco_para contra o total do pedido (R$ {total:.2f})"""
+{"- PIX (disponível)" if catalog.pix_enabled else ""}"""
 
     async def _execute_decision_ai(self, decision: dict, context: AgentContext, db) -> AgentResponse:
         """
@@ -534,20 +480,8 @@ IMPORTANTE:
                     # LLM falhou em detectar - aplicar correção via código
                     logger.error(f"💳 FAILSAFE: Troco inválido não detectado pelo LLM! Valor: {troco_para}, Total: {total_pedido}")
 
-                    total_str = f"R$ {total_pedido:.2f}".replace(".", ",")
-                    troco_str = f"R$ {troco_para:.2f}".replace(".", ",")
-
                     return AgentResponse(
-                        text=f"""❌ O valor informado ({troco_str}) é menor que o total do pedido ({total_str}).
-
-Para pagar em dinheiro, você precisa ter no mínimo o valor do pedido.
-
-💡 Você pode:
-• Informar um valor maior (ex: R$ 150,00)
-• Pagar com o valor exato ({total_str})
-• Escolher outra forma de pagamento (PIX ou Cartão)
-
-Qual valor você vai usar?""",
+                        text=reply_templates.change_too_low(troco_para, total_pedido),
                         intent="payment_correction_needed",
                         context_updates={"stage": "payment"},
                         should_end=False
@@ -556,13 +490,14 @@ Qual valor você vai usar?""",
             # Pegar próximo passo da decisão da IA
             proximo_passo = decision.get("proximo_passo", "")
 
+            templates = reply_templates.reply_templates_for(db, context.tenant_id)
+
             # Se método não detectado
             if metodo == "desconhecido":
-                tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
                 current_order = context.session_data.get("current_order", {})
 
                 return AgentResponse(
-                    text=await self._build_payment_options(tenant, current_order),
+                    text=templates.payment_options(current_order.get("total", 0)),
                     intent="payment_method_needed",
                     context_updates={"stage": "payment"},
                     should_end=False
@@ -571,18 +506,11 @@ Qual valor você vai usar?""",
             # Se precisa pedir troco (dinheiro sem valor informado)
             if metodo == "dinheiro" and proximo_passo == "pedir_troco" and not troco_para:
                 current_order = context.session_data.get("current_order", {})
-                total_str = f"R$ {current_order.get('total', 0):.2f}".replace(".", ",")
 
                 logger.info(f"💳 PaymentAgent: Pedindo informação de troco")
 
                 return AgentResponse(
-                    text=f"""✅ Pagamento em Dinheiro
-
-💵 *Valor do pedido:* {total_str}
-
-Você vai precisar de troco? Se sim, para quanto?
-
-Ou se tiver o valor exato, só confirmar que está ok!""",
+                    text=reply_templates.cash_change_question(current_order.get("total", 0)),
                     intent="awaiting_change_info",
                     context_updates={"stage": "payment", "payment_method": "dinheiro"},
                     should_end=False
@@ -600,18 +528,16 @@ Ou se tiver o valor exato, só confirmar que está ok!""",
 
             # Se não confirmado sem mensagem, pedir esclarecimento
             if not confirmado:
-                tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
                 current_order = context.session_data.get("current_order", {})
 
                 return AgentResponse(
-                    text=await self._build_payment_options(tenant, current_order),
+                    text=templates.payment_options(current_order.get("total", 0)),
                     intent="payment_method_needed",
                     context_updates={"stage": "payment"},
                     should_end=False
                 )
 
             # Método detectado e confirmado
-            tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
             current_order = context.session_data.get("current_order")
 
             if not current_order or not current_order.get("items"):
@@ -626,15 +552,16 @@ Ou se tiver o valor exato, só confirmar que está ok!""",
                 context.session_data["change_for"] = troco_para
 
             # Processar baseado no método
-            if metodo == "pix":
-                response_text = await self._handle_pix_payment(tenant, current_order)
+            total = current_order["total"]
+            if metodo == "pix" and templates.pix_available:
+                response_text = templates.pix_payment(total)
             elif metodo == "dinheiro":
-                response_text = await self._handle_cash_payment(tenant, current_order, troco_para)
+                response_text = reply_templates.cash_payment(total, troco_para)
             elif metodo == "cartao":
-                response_text = await self._handle_card_payment(tenant, current_order)
+                response_text = reply_templates.card_payment(total)
             else:
                 return AgentResponse(
-                    text=await self._build_payment_options(tenant, current_order),
+                    text=templates.payment_options(total),
                     intent="payment_method_needed",
                     should_end=False
                 )
@@ -705,12 +632,17 @@ Obrigado pela preferência! 😊"""
             ]
 
             logger.info("🔄 PaymentAgent calling LLM...")
-            response = await self._call_llm(messages)
-            decision = self._parse_llm_response(response)
+            decision = await self._call_llm_decision(messages, PaymentDecision)
+            if decision is None:
+                return AgentResponse(
+                    text="Desculpe, não entendi. Pode repetir de outro jeito?",
+                    intent="invalid_decision",
+                    should_end=False
+                )
 
             logger.info(f"💳 PaymentAgent LLM decision: {decision}")
 
-            return await self._execute_decision_ai(decision, context, db)
+            return await self._execute_decision_ai(decision.model_dump(), context, db)
 
         except Exception as e:
             logger.error(f"Error in process_with_ai: {e}")
@@ -0,0 +1,44 @@
+"""
+Prompt assembly for the AI agents
+
+System prompts are laid out as
+
+    [static instructions] [tenant section] [conversation context]
+
+The first two parts are compiled once per tenant and agent (cached in
+TenantCatalog), so every call for that tenant starts with the same
+prefix and can be served from the provider's prompt cache. Anything
+that changes per turn (cart, stage, history, partial address, totals)
+belongs in the dynamic part only.
+"""
+from typing import Callable
+from uuid import UUID
+
+from app.services.tenant_catalog import TenantCatalog, tenant_catalog
+
+DYNAMIC_HEADER = "=== CONTEXTO DA CONVERSA ==="
+
+
+def build_system_prompt(
+    db,
+    tenant_id: UUID,
+    key: str,
+    static_instructions: str,
+    tenant_section: Callable[[TenantCatalog], str],
+    dynamic: str
+) -> str:
+    """
+    Monta o system prompt com prefixo estável
+
+    Args:
+        key: Identifica o prefixo no cache do tenant (nome do agente)
+        static_instructions: Texto fixo do agente (sem dados do tenant/turno)
+        tenant_section: Renderiza a parte do tenant a partir do catálogo
+        dynamic: Contexto do turno, sempre no final
+    """
+    catalog = tenant_catalog.get(db, tenant_id)
+    prefix = catalog.prefix(
+        key,
+        lambda c: f"{static_instructions.strip()}\n\n{tenant_section(c).strip()}"
+    )
+    return f"{prefix}\n\n{DYNAMIC_HEADER}\n{dynamic.strip()}"
@@ -8,6 +8,8 @@ import logging
 import re
 
 from app.agents.base import BaseAgent, AgentContext, AgentResponse
+from app.agents.decisions import AddressDecision
+from app.agents.prompts import build_system_prompt
 from app.database.models import (
     DeliveryArea, NeighborhoodConfig, RadiusConfig,
     HybridRule, AddressCache, Tenant
@@ -16,6 +18,7 @@ from sqlalchemy.orm import Session
 import googlemaps
 
 from app.core.config import settings
+from app.services import reply_templates
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +33,72 @@ class ValidationAgent(BaseAgent):
     3. Hybrid - Combina ambos (prioriza bairros, fallback para raio)
     """
 
+    AI_INSTRUCTIONS = """Você é responsável por EXTRAIR e VALIDAR endereços de entrega via WhatsApp.
+
+RESPONSABILIDADES:
+1. Extrair endereço completo da mensagem do cliente
+2. Identificar componentes: rua, número, bairro, complemento, referência
+3. Detectar se o endereço está completo ou faltam dados
+4. Validar formato e clareza do endereço
+
+REGRAS DE EXTRAÇÃO:
+1. **PRIORIDADE**: Se há "ENDEREÇO PARCIAL JÁ INFORMADO" no contexto abaixo:
+   → COMBINE as informações parciais com a nova mensagem do cliente
+   → NÃO peça informações que já foram fornecidas (marcadas com ✅)
+   → APENAS peça o que ainda falta (marcado com ❌)
+
+2. Endereço completo deve ter: rua/avenida + número + bairro (TODOS preenchidos)
+
+3. Complemento (apto, bloco) e referência são opcionais
+
+4. Variações comuns:
+   - "morada 15" = endereço número 15
+   - "Rua ABC 123" = Rua ABC, número 123
+   - "av paulista 1000 bela vista" = Av Paulista 1000, Bela Vista
+   - "rua flores centro" (SEM número) = incompleto
+   - "granada" (quando já tem rua/número) = bairro
+
+5. Se falta informação, identifique O QUE falta (sem repetir o que já foi informado)
+
+EXEMPLOS DE FLUXO INCREMENTAL:
+
+**Exemplo 1**:
+- Cliente: "av angelino favato 155"
+- Não há parcial
+- Extrair: rua="av angelino favato", numero="155", bairro=null
+- completo=false, faltando=["bairro"]
+- Mensagem: "Qual o bairro?"
+
+**Exemplo 2 (CONTINUAÇÃO)**:
+- PARCIAL: rua="av angelino favato", numero="155", bairro=null
+- Cliente: "granada"
+- Combinar: rua="av angelino favato", numero="155", bairro="granada"
+- completo=TRUE ✅
+- Mensagem: "Perfeito! Vou validar seu endereço..."
+
+RESPONDA chamando a função registrar_decisao com os campos:
+{
+    "completo": true/false,
+    "rua": "nome da rua/avenida ou null",
+    "numero": "número ou null",
+    "bairro": "nome do bairro ou null",
+    "complemento": "apto/bloco ou null",
+    "referencia": "ponto de referência ou null",
+    "faltando": ["lista de campos faltantes"] ou [],
+    "mensagem_cliente": "texto amigável da resposta"
+}
+
+IMPORTANTE:
+- Se completo=false, pergunte educadamente APENAS o que falta
+- NÃO repita perguntas sobre informações já fornecidas
+- Combine informações parciais com novas informações do cliente"""
+
     def __init__(self):
         super().__init__(model_name="gpt-4-turbo-preview", temperature=0.3)
-        self.gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+        self.gmaps = googlemaps.Client(
+            key=settings.GOOGLE_MAPS_API_KEY,
+            base_url=settings.GOOGLE_MAPS_BASE_URL
+        )
         self.cache_duration_days = 30
 
     async def ask_for_address(self, context: AgentContext) -> AgentResponse:
@@ -706,21 +772,9 @@ Gostaria de:
         """
         System prompt para ValidationAgent extrair/validar endereço com IA
 
-        NOVO: Usa LLM para extrair endereço (não regex)
+        Instruções fixas e modo de entrega do tenant no início (prefixo
+        estável); o endereço parcial muda a cada turno e fica no final.
         """
-        from app.database.models import Tenant, DeliveryArea
-
-        try:
-            tenant = db.query(Tenant).filter(Tenant.id == context.tenant_id).first()
-            delivery_config = db.query(DeliveryArea).filter(
-                DeliveryArea.tenant_id == context.tenant_id
-            ).first()
-
-            mode = delivery_config.delivery_mode if delivery_config else "neighborhood"
-        except Exception as e:
-            logger.error(f"Error getting delivery config: {e}")
-            mode = "neighborhood"
-
         ctx = self._format_full_context(context)
 
         # Endereço parcial já informado (se houver)
@@ -732,69 +786,14 @@ Gostaria de:
             partial_text += f"- Número: {partial_address.get('numero', '❌ não informado')}\n"
             partial_text += f"- Bairro: {partial_address.get('bairro', '❌ não informado')}\n"
 
-        return f"""Você é responsável por EXTRAIR e VALIDAR endereços de entrega via WhatsApp.
-
-{ctx}{partial_text}
-
-MODO DE ENTREGA: {mode}
-
-RESPONSABILIDADES:
-1. Extrair endereço completo da mensagem do cliente
-2. Identificar componentes: rua, número, bairro, complemento, referência
-3. Detectar se o endereço está completo ou faltam dados
-4. Validar formato e clareza do endereço
-
-REGRAS DE EXTRAÇÃO:
-1. **PRIORIDADE**: Se há "ENDEREÇO PARCIAL JÁ INFORMADO" acima:
-   → COMBINE as informações parciais com a nova mensagem do cliente
-   → NÃO peça informações que já foram fornecidas (marcadas com ✅)
-   → APENAS peça o que ainda falta (marcado com ❌)
-
-2. Endereço completo deve ter: rua/avenida + número + bairro (TODOS preenchidos)
-
-3. Complemento (apto, bloco) e referência são opcionais
-
-4. Variações comuns:
-   - "morada 15" = endereço número 15
-   - "Rua ABC 123" = Rua ABC, número 123
-   - "av paulista 1000 bela vista" = Av Paulista 1000, Bela Vista
-   - "rua flores centro" (SEM número) = incompleto
-   - "granada" (quando já tem rua/número) = bairro
-
-5. Se falta informação, identifique O QUE falta (sem repetir o que já foi informado)
-
-EXEMPLOS DE FLUXO INCREMENTAL:
-
-**Exemplo 1**:
-- Cliente: "av angelino favato 155"
-- Não há parcial
-- Extrair: rua="av angelino favato", numero="155", bairro=null
-- completo=false, faltando=["bairro"]
-- Mensagem: "Qual o bairro?"
-
-**Exemplo 2 (CONTINUAÇÃO)**:
-- PARCIAL: rua="av angelino favato", numero="155", bairro=null
-- Cliente: "granada"
-- Combinar: rua="av angelino favato", numero="155", bairro="granada"
-- completo=TRUE ✅
-- Mensagem: "Perfeito! Vou validar seu endereço..."
-
-RESPONDA **APENAS** EM JSON:
-{{
-    "completo": true/false,
-    "rua": "nome da rua/avenida ou null",
-    "numero": "número ou null",
-    "bairro": "nome do bairro ou null",
-    "complemento": "apto/bloco ou null",
-    "referencia": "ponto de referência ou null",
-    "faltando": ["lista de campos faltantes"] ou [],
-    "mensagem_cliente": "texto amigável da resposta"
-}}
-
-IMPORTANTE:
-- Se completo=false, pergunte educadamente APENAS o que falta
-- NÃO repita perguntas sobre informações já fornecidas
-- Combine informações parciais com novas informações do cliente"""
+        return build_system_prompt(
+            db,
+            context.tenant_id,
+            key=self.agent_name,
+            static_instructions=self.AI_INSTRUCTIONS,
+            tenant_section=lambda catalog: f"MODO DE ENTREGA: {catalog.delivery_mode}",
+            dynamic=f"{ctx}{partial_text}"
+        )
 
     async def _execute_decision_ai(self, decision: dict, context: AgentContext, db) -> AgentResponse:
         """
@@ -867,22 +866,7 @@ IMPORTANTE:
             if validation_result["is_deliverable"]:
                 # Sucesso
                 fee = validation_result.get("delivery_fee", 0)
-                fee_str = f"R$ {fee:.2f}".replace(".", ",")
-
-                response_text = f"""✅ Ótimo! Entregamos no seu endereço!
-
-📍 *Endereço confirmado:*
-{validation_result['normalized_address']}"""
-
-                if referencia:
-                    response_text += f"\n🏠 *Referência:* {referencia}"
-
-                response_text += f"""
-
-🚚 *Taxa de entrega:* {fee_str if fee > 0 else 'GRÁTIS'}
-⏱️ *Tempo estimado:* {validation_result.get('delivery_time', 60)} minutos
-
-Está correto? Podemos continuar com o pedido?"""
+                response_text = reply_templates.address_accepted(validation_result, referencia)
 
                 return AgentResponse(
                     text=response_text,
@@ -901,11 +885,7 @@ Está correto? Podemos continuar com o pedido?"""
                 reason = validation_result.get("reason", "endereço fora da área")
 
                 return AgentResponse(
-                    text=f"""😔 Infelizmente não entregamos neste endereço.
-
-Motivo: {reason}
-
-Gostaria de tentar outro endereço?""",
+                    text=reply_templates.address_out_of_area(reason),
                     intent="address_rejected",
                     requires_human=True,
                     context_updates={
@@ -942,10 +922,15 @@ Gostaria de tentar outro endereço?""",
             ]
 
             logger.info("🔄 ValidationAgent calling LLM...")
-            response = await self._call_llm(messages)
-            decision = self._parse_llm_response(response)
+            decision = await self._call_llm_decision(messages, AddressDecision)
+            if decision is None:
+                return AgentResponse(
+                    text="Desculpe, não entendi. Pode repetir de outro jeito?",
+                    intent="invalid_decision",
+                    should_end=False
+                )
 
-            return await self._execute_decision_ai(decision, context, db)
+            return await self._execute_decision_ai(decision.model_dump(), context, db)
 
         except Exception as e:
             logger.error(f"Error in process_with_ai: {e}")
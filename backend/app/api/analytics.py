@@ -0,0 +1,133 @@
+"""
+Analytics API - Vendas por produto, bairro e horário, e consumo de LLM
+
+Lê apenas as tabelas agregadas mantidas pelas tasks app.tasks.analytics
+e app.tasks.llm_usage; nenhuma consulta aqui varre orders.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional, Tuple
+from datetime import date, datetime, timedelta
+
+from app.database.base import get_db
+from app.database.models import Tenant
+from app.middleware.tenant import get_current_tenant
+from app.services.analytics import AnalyticsService
+
+router = APIRouter(prefix="/api/v1/dashboard/analytics", tags=["analytics"])
+
+DEFAULT_PERIOD_DAYS = 30
+MAX_PERIOD_DAYS = 366
+
+
+def _parse_period(date_from: Optional[str], date_to: Optional[str]) -> Tuple[date, date]:
+    """Período YYYY-MM-DD inclusivo; padrão: últimos 30 dias"""
+    try:
+        day_to = datetime.strptime(date_to, '%Y-%m-%d').date() if date_to else date.today()
+        day_from = (
+            datetime.strptime(date_from, '%Y-%m-%d').date() if date_from
+            else day_to - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Formato de data inválido. Use YYYY-MM-DD")
+
+    if day_from > day_to:
+        raise HTTPException(status_code=400, detail="date_from deve ser anterior a date_to")
+
+    if (day_to - day_from).days >= MAX_PERIOD_DAYS:
+        raise HTTPException(status_code=400, detail=f"Período máximo de {MAX_PERIOD_DAYS} dias")
+
+    return day_from, day_to
+
+
+def _envelope(service: AnalyticsService, day_from: date, day_to: date, **data) -> dict:
+    last_refresh = service.last_refresh()
+    return {
+        "date_from": day_from.isoformat(),
+        "date_to": day_to.isoformat(),
+        "updated_until": last_refresh.isoformat() if last_refresh else None,
+        **data
+    }
+
+
+@router.get("/sales")
+async def get_sales(
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Pedidos, receita, taxas de entrega e ticket médio por dia
+    """
+    day_from, day_to = _parse_period(date_from, date_to)
+    service = AnalyticsService(db)
+    result = service.daily(current_tenant.id, day_from, day_to)
+    return _envelope(service, day_from, day_to, **result)
+
+
+@router.get("/products")
+async def get_product_mix(
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Mix de produtos vendidos no período
+    """
+    day_from, day_to = _parse_period(date_from, date_to)
+    service = AnalyticsService(db)
+    products = service.products(current_tenant.id, day_from, day_to, limit)
+    return _envelope(service, day_from, day_to, products=products)
+
+
+@router.get("/neighborhoods")
+async def get_neighborhood_demand(
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Demanda por bairro no período
+    """
+    day_from, day_to = _parse_period(date_from, date_to)
+    service = AnalyticsService(db)
+    neighborhoods = service.neighborhoods(current_tenant.id, day_from, day_to, limit)
+    return _envelope(service, day_from, day_to, neighborhoods=neighborhoods)
+
+
+@router.get("/hourly")
+async def get_hourly_demand(
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    neighborhood: Optional[str] = Query(None, description="Filtra por bairro"),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Pedidos por hora do dia (0-23), opcionalmente de um bairro
+    """
+    day_from, day_to = _parse_period(date_from, date_to)
+    service = AnalyticsService(db)
+    hours = service.hourly(current_tenant.id, day_from, day_to, neighborhood)
+    return _envelope(service, day_from, day_to, hours=hours)
+
+
+@router.get("/llm-usage")
+async def get_llm_usage(
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Chamadas, tokens, custo estimado e latência média de LLM por agente
+    """
+    day_from, day_to = _parse_period(date_from, date_to)
+    service = AnalyticsService(db)
+    usage = service.llm_usage(current_tenant.id, day_from, day_to)
+    return {"date_from": day_from.isoformat(), "date_to": day_to.isoformat(), **usage}
@@ -7,13 +7,13 @@ from sqlalchemy import and_
 from typing import Optional
 from datetime import datetime
 from uuid import UUID
-import json
 
 from app.database.base import get_db
 from app.database.models import Conversation, HumanIntervention, Customer, Tenant
 from app.middleware.tenant import get_current_tenant
 from app.services.intervention import InterventionService
 from app.services.evolution import EvolutionAPIService
+from app.services.realtime import manager, publish_event, publish_intervention, publish_message
 
 router = APIRouter(prefix="/api/v1/conversations", tags=["conversations"])
 
@@ -57,6 +57,14 @@ async def start_intervention(
 
     db.commit()
 
+    await publish_intervention(
+        current_tenant.id,
+        conversation_id,
+        started=True,
+        intervention_id=intervention.id,
+        reason=intervention.reason
+    )
+
     # Enviar mensagem para o cliente
     customer = db.query(Customer).filter(
         Customer.id == conversation.customer_id
@@ -118,6 +126,13 @@ async def resume_bot(
 
     db.commit()
 
+    await publish_intervention(
+        current_tenant.id,
+        conversation_id,
+        started=False,
+        intervention_id=intervention.id if intervention else None
+    )
+
     # Notificar cliente
     customer = db.query(Customer).filter(
         Customer.id == conversation.customer_id
@@ -191,67 +206,46 @@ async def send_manual_message(
         intervention.messages_during_intervention = messages
         db.commit()
 
+    await publish_message(
+        current_tenant.id,
+        conversation_id,
+        customer.whatsapp_number,
+        {"role": "operator", "content": message, "timestamp": datetime.now().isoformat()}
+    )
+
     return {"message": "Mensagem enviada com sucesso"}
 
 
 # WebSocket para atualizações em tempo real
-class ConnectionManager:
-    """Gerencia conexões WebSocket para dashboard real-time"""
-
-    def __init__(self):
-        self.active_connections: dict[str, list[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, tenant_id: str):
-        await websocket.accept()
-        if tenant_id not in self.active_connections:
-            self.active_connections[tenant_id] = []
-        self.active_connections[tenant_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, tenant_id: str):
-        if tenant_id in self.active_connections:
-            self.active_connections[tenant_id].remove(websocket)
-
-    async def broadcast_to_tenant(self, tenant_id: str, message: dict):
-        """Envia mensagem para todos os clientes conectados de um tenant"""
-        if tenant_id in self.active_connections:
-            for connection in self.active_connections[tenant_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    pass
-
-
-manager = ConnectionManager()
-
-
 @router.websocket("/ws/{tenant_id}")
 async def websocket_endpoint(websocket: WebSocket, tenant_id: str):
     """
     WebSocket para receber atualizações em tempo real do dashboard
     """
-    await manager.connect(websocket, tenant_id)
+    connection = await manager.connect(websocket, tenant_id)
 
     try:
         while True:
             # Manter conexão aberta
             data = await websocket.receive_text()
 
-            # Echo back para keep-alive
+            # Echo back para keep-alive (pela fila do socket: um único
+            # escritor por conexão)
             if data == "ping":
-                await websocket.send_text("pong")
+                connection.enqueue("pong")
 
     except WebSocketDisconnect:
-        manager.disconnect(websocket, tenant_id)
+        pass
+    except RuntimeError:
+        # Socket fechado pelo servidor (consumidor lento)
+        pass
+    finally:
+        await manager.disconnect(connection)
 
 
 async def notify_dashboard_update(tenant_id: str, event_type: str, data: dict):
     """
     Função auxiliar para notificar dashboard sobre atualizações
-    Chamada de outros serviços quando há novos pedidos, mensagens, etc.
+    Mantida por compatibilidade; os caminhos de escrita usam app.services.realtime
     """
-    message = {
-        "type": event_type,
-        "data": data,
-        "timestamp": datetime.now().isoformat()
-    }
-    await manager.broadcast_to_tenant(str(tenant_id), message)
+    await publish_event(tenant_id, event_type, data)
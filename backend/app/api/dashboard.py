@@ -3,9 +3,10 @@ Dashboard API endpoints
 Fornece dados em tempo real para o dashboard administrativo
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc, cast, Text
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from uuid import UUID
 from pydantic import BaseModel
@@ -17,13 +18,45 @@ from app.database.models import (
 )
 from app.database.schemas import (
     OrderResponse, ConversationResponse,
-    DashboardSummary, CustomerResponse
+    DashboardSummary, CustomerResponse, CustomerSearchResult
 )
 from app.middleware.tenant import get_current_tenant, get_current_user
+from app.services.customer_search import CustomerSearchService
+from app.services.export import EXPORT_FORMATS, ExportService, parquet_available
+from app.services.realtime import manager, publish_order_status_changed
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
 
 
+def _parse_date_range(
+    date_from: Optional[str],
+    date_to: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Converte os filtros YYYY-MM-DD do dashboard em datetimes
+
+    date_to inclui o dia inteiro (até 23:59:59.999999).
+    """
+    date_from_dt = None
+    date_to_dt = None
+
+    if date_from:
+        try:
+            date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de data_from inválido. Use YYYY-MM-DD")
+
+    if date_to:
+        try:
+            date_to_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(
+                hour=23, minute=59, second=59, microsecond=999999
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Formato de date_to inválido. Use YYYY-MM-DD")
+
+    return date_from_dt, date_to_dt
+
+
 @router.get("/summary", response_model=DashboardSummary)
 async def get_dashboard_summary(
     db: Session = Depends(get_db),
@@ -108,23 +141,12 @@ async def get_recent_orders(
     if status:
         query = query.filter(Order.status == status)
 
-    # Filtro de data inicial
-    if date_from:
-        try:
-            date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-            query = query.filter(Order.created_at >= date_from_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de data_from inválido. Use YYYY-MM-DD")
-
-    # Filtro de data final (inclui o dia inteiro)
-    if date_to:
-        try:
-            date_to_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(
-                hour=23, minute=59, second=59, microsecond=999999
-            )
-            query = query.filter(Order.created_at <= date_to_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de date_to inválido. Use YYYY-MM-DD")
+    # Filtro de data (date_to inclui o dia inteiro)
+    date_from_dt, date_to_dt = _parse_date_range(date_from, date_to)
+    if date_from_dt:
+        query = query.filter(Order.created_at >= date_from_dt)
+    if date_to_dt:
+        query = query.filter(Order.created_at <= date_to_dt)
 
     orders = query.order_by(desc(Order.created_at)).offset(offset).limit(limit).all()
 
@@ -151,6 +173,8 @@ async def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Pedido não encontrado")
 
+    old_status = order.status
+    conversation = None
     order.status = status
 
     if status == 'delivered':
@@ -175,6 +199,13 @@ async def update_order_status(
     db.commit()
     db.refresh(order)
 
+    if old_status != order.status:
+        await publish_order_status_changed(
+            order,
+            old_status,
+            conversation_ended=conversation is not None
+        )
+
     return {"message": "Status atualizado", "order": order}
 
 
@@ -201,23 +232,12 @@ async def get_conversations(
     if intervention_only:
         query = query.filter(Conversation.human_intervention == True)
 
-    # Filtro de data inicial
-    if date_from:
-        try:
-            date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-            query = query.filter(Conversation.started_at >= date_from_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de data_from inválido. Use YYYY-MM-DD")
-
-    # Filtro de data final (inclui o dia inteiro)
-    if date_to:
-        try:
-            date_to_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(
-                hour=23, minute=59, second=59, microsecond=999999
-            )
-            query = query.filter(Conversation.started_at <= date_to_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de date_to inválido. Use YYYY-MM-DD")
+    # Filtro de data (date_to inclui o dia inteiro)
+    date_from_dt, date_to_dt = _parse_date_range(date_from, date_to)
+    if date_from_dt:
+        query = query.filter(Conversation.started_at >= date_from_dt)
+    if date_to_dt:
+        query = query.filter(Conversation.started_at <= date_to_dt)
 
     conversations = query.order_by(desc(Conversation.started_at)).limit(limit).all()
 
@@ -273,23 +293,12 @@ async def get_active_interventions(
     if active_only:
         query = query.filter(HumanIntervention.ended_at.is_(None))
 
-    # Filtro de data inicial
-    if date_from:
-        try:
-            date_from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-            query = query.filter(HumanIntervention.started_at >= date_from_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de data_from inválido. Use YYYY-MM-DD")
-
-    # Filtro de data final (inclui o dia inteiro)
-    if date_to:
-        try:
-            date_to_dt = datetime.strptime(date_to, '%Y-%m-%d').replace(
-                hour=23, minute=59, second=59, microsecond=999999
-            )
-            query = query.filter(HumanIntervention.started_at <= date_to_dt)
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Formato de date_to inválido. Use YYYY-MM-DD")
+    # Filtro de data (date_to inclui o dia inteiro)
+    date_from_dt, date_to_dt = _parse_date_range(date_from, date_to)
+    if date_from_dt:
+        query = query.filter(HumanIntervention.started_at >= date_from_dt)
+    if date_to_dt:
+        query = query.filter(HumanIntervention.started_at <= date_to_dt)
 
     interventions = query.all()
 
@@ -329,40 +338,67 @@ async def get_customers(
     query = db.query(Customer).filter(Customer.tenant_id == current_tenant.id)
 
     if search:
-        query = query.filter(
-            (Customer.name.ilike(f"%{search}%")) |
-            (Customer.whatsapp_number.ilike(f"%{search}%"))
-        )
+        # Usa os mesmos predicados indexados do typeahead (trigram/telefone)
+        search_filter = CustomerSearchService(db).build_filter(search)
+        if search_filter is None:
+            return []
+        query = query.filter(search_filter)
 
-    customers = query.order_by(desc(Customer.last_order_at)).limit(limit).all()
+    customers = query.order_by(desc(Customer.last_order_at).nullslast()).limit(limit).all()
 
     return customers
 
 
+@router.get("/customers/search", response_model=List[CustomerSearchResult])
+async def search_customers(
+    q: str = Query(..., min_length=1, description="Nome (com ou sem acento) ou telefone (prefixo/sufixo)"),
+    limit: int = Query(CustomerSearchService.DEFAULT_LIMIT, ge=1, le=CustomerSearchService.MAX_LIMIT),
+    db: Session = Depends(get_db),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Typeahead de clientes para o painel do operador
+
+    Retorna resultados ranqueados: match exato, começa com,
+    similaridade do nome e, por fim, pedido mais recente.
+    """
+    return CustomerSearchService(db).search(current_tenant.id, q, limit)
+
+
 @router.get("/realtime-stats")
 async def get_realtime_stats(
     db: Session = Depends(get_db),
     current_tenant: Tenant = Depends(get_current_tenant)
 ):
     """
-    Estatísticas em tempo real para atualização via WebSocket
+    Snapshot dos últimos 5 minutos
+
+    As atualizações contínuas chegam como eventos pelo WebSocket
+    (/api/v1/conversations/ws/{tenant_id}); este endpoint só é usado para
+    ressincronizar o dashboard ao (re)conectar. Projeta apenas as colunas
+    exibidas em vez de carregar os pedidos inteiros.
     """
-    # Últimos 5 minutos
     recent_time = datetime.now() - timedelta(minutes=5)
 
-    recent_orders = db.query(Order).filter(
+    recent_orders = db.query(
+        Order.id,
+        Order.order_number,
+        Order.total,
+        Order.status,
+        Order.created_at
+    ).filter(
         and_(
             Order.tenant_id == current_tenant.id,
             Order.created_at >= recent_time
         )
-    ).all()
+    ).order_by(desc(Order.created_at)).limit(50).all()
 
-    recent_conversations = db.query(Conversation).filter(
+    recent_conversations = db.query(func.count(Conversation.id)).filter(
         and_(
             Conversation.tenant_id == current_tenant.id,
             Conversation.started_at >= recent_time
         )
-    ).count()
+    ).scalar()
 
     return {
         "recent_orders_count": len(recent_orders),
@@ -377,10 +413,54 @@ async def get_realtime_stats(
             for order in recent_orders
         ],
         "recent_conversations": recent_conversations,
+        "realtime": await manager.cluster_stats(str(current_tenant.id)),
         "timestamp": datetime.now().isoformat()
     }
 
 
+# ============================================================================
+# EXPORT ENDPOINTS
+# ============================================================================
+
+@router.get("/export/{entity}")
+async def export_data(
+    entity: str,
+    format: str = Query("csv", description="csv, jsonl ou parquet"),
+    status: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
+    date_to: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
+    current_tenant: Tenant = Depends(get_current_tenant)
+):
+    """
+    Exporta pedidos, clientes ou conversas de um período
+
+    O arquivo é gerado em streaming a partir de um cursor do servidor,
+    sem limite de linhas e com memória constante.
+    """
+    if entity not in ExportService.ENTITIES:
+        raise HTTPException(status_code=404, detail="Exportação não encontrada. Use orders, customers ou conversations")
+
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use csv, jsonl ou parquet")
+
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Exportação Parquet indisponível neste servidor. Use csv ou jsonl")
+
+    date_from_dt, date_to_dt = _parse_date_range(date_from, date_to)
+
+    media_type, extension = EXPORT_FORMATS[format]
+    period = f"_{date_from or 'inicio'}_{date_to or 'hoje'}" if (date_from or date_to) else ""
+    filename = f"{entity}{period}.{extension}"
+
+    service = ExportService(current_tenant.id)
+
+    return StreamingResponse(
+        service.stream(entity, format, date_from_dt, date_to_dt, status),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
 # ============================================================================
 # DELIVERY DRIVER ENDPOINTS
 # ============================================================================
@@ -473,11 +553,14 @@ Boa entrega! 🏍️"""
         )
 
         # Atualizar pedido
+        old_status = order.status
         order.driver_name = driver.name
         order.status = 'confirmed'
 
         db.commit()
 
+        await publish_order_status_changed(order, old_status)
+
         return {
             "success": True,
             "message": f"Ticket enviado para {driver.name}",
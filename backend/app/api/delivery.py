@@ -15,6 +15,8 @@ from app.services.delivery_modes import DeliveryModeService
 from app.services.neighborhood_delivery import NeighborhoodDeliveryService
 from app.services.radius_delivery import RadiusDeliveryService
 from app.services.hybrid_delivery import HybridDeliveryService
+from app.services.faq_cache import faq_cache
+from app.services.tenant_catalog import tenant_catalog
 
 
 router = APIRouter(prefix="/api/v1/delivery", tags=["delivery"])
@@ -181,6 +183,8 @@ async def update_delivery_mode(
         free_delivery_minimum=config_data.free_delivery_minimum,
         default_fee=config_data.default_fee
     )
+    tenant_catalog.invalidate(current_tenant.id)
+    await faq_cache.invalidate(current_tenant.id)
 
     return {
         "success": True,
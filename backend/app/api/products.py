@@ -10,6 +10,8 @@ from app.database.base import get_db
 from app.database.models import Product, Tenant
 from app.database.schemas import ProductCreate, ProductUpdate, ProductResponse
 from app.middleware.tenant import get_current_tenant
+from app.services.faq_cache import faq_cache
+from app.services.tenant_catalog import tenant_catalog
 
 
 router = APIRouter(prefix="/api/v1/products", tags=["Products"])
@@ -39,6 +41,8 @@ async def create_product(
     db.add(product)
     db.commit()
     db.refresh(product)
+    tenant_catalog.invalidate(tenant.id)
+    await faq_cache.invalidate(tenant.id)
     return product
 
 
@@ -88,6 +92,8 @@ async def update_product(
 
     db.commit()
     db.refresh(product)
+    tenant_catalog.invalidate(tenant.id)
+    await faq_cache.invalidate(tenant.id)
     return product
 
 
@@ -111,4 +117,6 @@ async def delete_product(
 
     db.delete(product)
     db.commit()
+    tenant_catalog.invalidate(tenant.id)
+    await faq_cache.invalidate(tenant.id)
     return None
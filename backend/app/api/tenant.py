@@ -11,6 +11,9 @@ from app.database.base import get_db
 from app.database.models import Tenant
 from app.middleware.tenant import get_current_tenant, get_current_user
 from app.services.tenant import TenantService
+from app.services.faq_cache import faq_cache
+from app.services.tenant_catalog import tenant_catalog
+from app.services.conversation_resolver import tenant_cache
 
 
 router = APIRouter(prefix="/api/v1/tenant", tags=["Tenant"])
@@ -116,6 +119,9 @@ async def update_tenant(
         tenant_id=tenant.id,
         **update_data
     )
+    tenant_catalog.invalidate(tenant.id)
+    tenant_cache.invalidate(tenant.id)
+    await faq_cache.invalidate(tenant.id)
 
     return TenantResponse(
         id=str(updated_tenant.id),
@@ -0,0 +1,11 @@
+"""
+Redis client compartilhado (asyncio)
+
+A conexão é aberta sob demanda no primeiro comando; importar este módulo
+não exige Redis disponível.
+"""
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
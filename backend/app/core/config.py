@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     # Database
@@ -8,7 +8,13 @@ class Settings(BaseSettings):
 
     # APIs
     OPENAI_API_KEY: str
+    # Aponta AsyncOpenAI/ChatOpenAI para outro servidor compatível
+    # (ex.: scripts/fakes/openai_server.py em http://localhost:8089/v1)
+    OPENAI_BASE_URL: Optional[str] = None
     GOOGLE_MAPS_API_KEY: Optional[str] = None
+    # Outro servidor compatível com a API de Geocoding
+    # (ex.: scripts/fakes/maps_server.py em http://localhost:8091)
+    GOOGLE_MAPS_BASE_URL: str = "https://maps.googleapis.com"
     EVOLUTION_API_URL: str
     EVOLUTION_API_KEY: str
 
@@ -28,12 +34,104 @@ class Settings(BaseSettings):
     # Fine-tuned Models
     FINETUNED_EXTRACTOR_MODEL: str = "ft:gpt-4.1-mini-2025-04-14:carvalho-ia:botgas:CTt20bmy"
     USE_FINETUNED_EXTRACTOR: bool = True  # Toggle para A/B test
+    # Extractor também devolve o intent conversacional (dispensa a chamada
+    # separada do IntentClassifier). Avaliar com scripts/evaluate_intent_merge.py
+    EXTRACTOR_INCLUDES_INTENT: bool = False
 
     # AI Agents (NEW: Agentes com IA Real)
     USE_AI_AGENTS: bool = False  # Toggle para ativar agentes com IA (não IF/ELSE)
                                   # Quando True: usa process_with_ai_routing()
                                   # Quando False: usa process() legado
 
+    # FAQ cache do AttendanceAgent (app.services.faq_cache): reaproveita a
+    # resposta de perguntas gerais com similaridade >= mínimo (0-1)
+    FAQ_CACHE_ENABLED: bool = True
+    FAQ_CACHE_MIN_SIMILARITY: float = 0.75
+
+    # Áudio (app.services.audio_transcoder): processos ffmpeg simultâneos
+    # para formatos que o Whisper não aceita (0 = núcleos da máquina)
+    AUDIO_TRANSCODE_CONCURRENCY: int = 0
+    AUDIO_TRANSCODE_TIMEOUT_SECONDS: float = 20.0
+    # Transcrições simultâneas por processo (app.services.transcription_pool)
+    # e quantos áudios na fila antes de avisar "ouvindo seu áudio"
+    AUDIO_TRANSCRIPTION_WORKERS: int = 4
+    AUDIO_ACK_QUEUE_DEPTH: int = 2
+    # Download de mídia (app.services.media_download): sessão HTTP compartilhada
+    MEDIA_DOWNLOAD_TIMEOUT_SECONDS: float = 30.0
+    MEDIA_DOWNLOAD_MAX_CONNECTIONS: int = 20
+    # Motor de transcrição (app.services.transcription_backends): "whisper_api"
+    # ou "local" (faster-whisper na CPU, opcional); Tenant.settings
+    # ["transcription_backend"] sobrepõe por tenant
+    TRANSCRIPTION_BACKEND: str = "whisper_api"
+    LOCAL_STT_MODEL: str = "small"
+    LOCAL_STT_COMPUTE_TYPE: str = "int8"
+    LOCAL_STT_WORKERS: int = 2
+    LOCAL_STT_CPU_THREADS: int = 2
+    LOCAL_STT_BEAM_SIZE: int = 1
+    # Cache de transcrições pelo hash do áudio (app.services.transcription_cache)
+    TRANSCRIPTION_CACHE_ENABLED: bool = True
+    TRANSCRIPTION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    TRANSCRIPTION_CACHE_LOCAL_ENTRIES: int = 512
+    # Corte de silêncio antes do Whisper (app.services.audio_compaction):
+    # limiar mínimo de fala, pausa máxima mantida no meio e ganho mínimo
+    # para trocar o original pela versão compacta
+    AUDIO_SILENCE_TRIM_ENABLED: bool = True
+    AUDIO_VAD_THRESHOLD_DBFS: float = -45.0
+    AUDIO_MAX_INNER_SILENCE_SECONDS: float = 0.4
+    AUDIO_TRIM_MIN_SAVED_SECONDS: float = 1.0
+
+    # Dedup de mensagens reenviadas pela Evolution (app.services.webhook_dedup)
+    WEBHOOK_DEDUP_ENABLED: bool = True
+    WEBHOOK_DEDUP_TTL_SECONDS: int = 24 * 3600
+
+    # Log dos webhooks (app.services.webhook_log): gravação em lote em
+    # background, amostragem por evento (0-1; erro sempre grava) e retenção
+    # por partição diária
+    WEBHOOK_LOG_ENABLED: bool = True
+    WEBHOOK_LOG_SAMPLE_RATES: Dict[str, float] = {
+        "messages.upsert": 1.0,
+        "messages.upsert:fromMe": 0.0,
+        "connection.update": 0.1,
+        "qrcode.updated": 0.0,
+    }
+    WEBHOOK_LOG_DEFAULT_SAMPLE_RATE: float = 0.1
+    WEBHOOK_LOG_BATCH_SIZE: int = 200
+    WEBHOOK_LOG_FLUSH_SECONDS: float = 2.0
+    WEBHOOK_LOG_MAX_BUFFER: int = 5000
+    WEBHOOK_LOG_RETENTION_DAYS: int = 14
+    WEBHOOK_LOG_PARTITIONS_AHEAD: int = 3
+
+    # LLM resilience (app.services.llm_gateway)
+    # Prazo total por etapa, em segundos (inclui hedge e fallback)
+    LLM_DEFAULT_TIMEOUT_SECONDS: float = 15.0
+    LLM_STAGE_TIMEOUTS: Dict[str, float] = {
+        "intent_classifier": 5.0,
+        "message_extractor": 8.0,
+        "transcription": 25.0,
+    }
+    # Requisição duplicada quando a primeira passa do p95 recente
+    LLM_HEDGING_ENABLED: bool = True
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    # Fallback por modelo; LLM_AGENT_FALLBACK_MODELS sobrepõe por agente
+    # ("" desliga o fallback daquele agente)
+    LLM_FALLBACK_MODELS: Dict[str, str] = {"gpt-4-turbo-preview": "gpt-4o-mini"}
+    LLM_AGENT_FALLBACK_MODELS: Dict[str, str] = {}
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Cotas de LLM por tenant (app.services.llm_scheduler), por processo.
+    # Chave = Tenant.subscription_plan em minúsculas; sem plano = "trial",
+    # plano desconhecido = LLM_DEFAULT_PLAN. weight = peso na fila justa.
+    LLM_MAX_CONCURRENCY: int = 32
+    LLM_QUEUE_MAX_WAIT_SECONDS: float = 8.0
+    LLM_DEFAULT_PLAN: str = "basic"
+    LLM_PLAN_QUOTAS: Dict[str, Dict[str, int]] = {
+        "trial": {"weight": 1, "max_concurrency": 2, "tokens_per_minute": 40000, "max_queue": 10},
+        "basic": {"weight": 2, "max_concurrency": 4, "tokens_per_minute": 120000, "max_queue": 20},
+        "premium": {"weight": 4, "max_concurrency": 8, "tokens_per_minute": 300000, "max_queue": 40},
+        "enterprise": {"weight": 8, "max_concurrency": 16, "tokens_per_minute": 800000, "max_queue": 80},
+    }
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,195 @@
+"""
+Métricas Prometheus da aplicação
+
+Exposto em /metrics (ver app.main). Com vários workers do uvicorn, defina
+PROMETHEUS_MULTIPROC_DIR para que cada processo grave suas métricas num
+diretório compartilhado e o endpoint agregue todos.
+
+Tenant NÃO é label aqui: com centenas de tenants a cardinalidade explode.
+O consumo por tenant vai para o rollup diário (app.services.llm_gateway).
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+)
+from prometheus_client import multiprocess
+
+# Buckets pensados para chamadas de LLM (100ms a 1min)
+LLM_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0, 21.0, 34.0, 60.0)
+
+llm_call_duration = Histogram(
+    "gasbot_llm_call_duration_seconds",
+    "Latência das chamadas ao provedor de LLM",
+    ["agent", "model", "outcome"],
+    buckets=LLM_LATENCY_BUCKETS,
+)
+
+llm_calls = Counter(
+    "gasbot_llm_calls_total",
+    "Chamadas ao provedor de LLM por resultado",
+    ["agent", "model", "outcome"],
+)
+
+llm_tokens = Counter(
+    "gasbot_llm_tokens_total",
+    "Tokens consumidos (prompt/completion; cached = parte do prompt servida do cache do provedor)",
+    ["agent", "model", "kind"],
+)
+
+llm_cost = Counter(
+    "gasbot_llm_cost_usd_total",
+    "Custo estimado em dólares",
+    ["agent", "model"],
+)
+
+llm_parse_failures = Counter(
+    "gasbot_llm_parse_failures_total",
+    "Respostas do LLM que não puderam ser interpretadas",
+    ["agent"],
+)
+
+agent_invalid_decisions = Counter(
+    "gasbot_agent_invalid_decisions_total",
+    "Decisões estruturadas dos agentes descartadas (sem tool call, JSON ou schema inválido)",
+    ["agent", "reason"],
+)
+
+llm_hedges = Counter(
+    "gasbot_llm_hedges_total",
+    "Requisições duplicadas disparadas após o p95 (result: launched, won)",
+    ["agent", "model", "result"],
+)
+
+llm_fallbacks = Counter(
+    "gasbot_llm_fallbacks_total",
+    "Chamadas desviadas para o modelo de fallback",
+    ["agent", "model", "fallback_model", "reason"],
+)
+
+llm_circuit_opened = Counter(
+    "gasbot_llm_circuit_opened_total",
+    "Vezes que o circuit breaker de um modelo abriu",
+    ["model"],
+)
+
+llm_circuit_state = Gauge(
+    "gasbot_llm_circuit_open",
+    "1 enquanto o circuito do modelo está aberto",
+    ["model"],
+    multiprocess_mode="max",
+)
+
+llm_queue_wait = Histogram(
+    "gasbot_llm_queue_wait_seconds",
+    "Espera por uma vaga na fila de LLM do tenant",
+    ["plan"],
+    buckets=(0.005, 0.05, 0.25, 0.5, 1, 2, 4, 8, 15),
+)
+
+llm_shed = Counter(
+    "gasbot_llm_shed_total",
+    "Chamadas recusadas pela cota do tenant (reason: queue_full, wait_timeout)",
+    ["agent", "plan", "reason"],
+)
+
+bot_turns = Counter(
+    "gasbot_bot_turns_total",
+    "Mensagens processadas pelo bot por chamadas de LLM no turno (llm_calls: 0, 1, 2, 3+)",
+    ["routing", "llm_calls"],
+)
+
+template_replies = Counter(
+    "gasbot_template_replies_total",
+    "Turnos respondidos por template, sem passar pelo LLM",
+    ["template"],
+)
+
+faq_cache_lookups = Counter(
+    "gasbot_faq_cache_lookups_total",
+    "Consultas ao cache de FAQ do AttendanceAgent (result: hit, miss)",
+    ["result"],
+)
+
+webhook_stage_duration = Histogram(
+    "gasbot_webhook_stage_seconds",
+    "Tempo de cada etapa do processamento de uma mensagem recebida "
+    "(stage: setup, inbound, agents, reply)",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+)
+
+db_queries = Counter(
+    "gasbot_db_queries_total",
+    "Comandos SQL executados (statement: select, insert, update, delete, other)",
+    ["statement"],
+)
+
+transcription_queue_depth = Gauge(
+    "gasbot_transcription_queue_depth",
+    "Áudios no pool de transcrição (state: waiting, running)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+transcription_queue_wait = Histogram(
+    "gasbot_transcription_queue_wait_seconds",
+    "Espera por um worker de transcrição",
+    buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 20, 40),
+)
+
+transcription_cache_lookups = Counter(
+    "gasbot_transcription_cache_lookups_total",
+    "Consultas ao cache de transcrições (source: media, content; result: hit_local, hit_redis, miss)",
+    ["source", "result"],
+)
+
+transcription_duration = Histogram(
+    "gasbot_transcription_seconds",
+    "Tempo de transcrição por backend (whisper_api, local)",
+    ["backend"],
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 20, 30),
+)
+
+transcription_fallbacks = Counter(
+    "gasbot_transcription_fallbacks_total",
+    "Transcrições que falharam no backend do tenant e foram para o Whisper da OpenAI",
+    ["backend"],
+)
+
+audio_trimmed_seconds = Counter(
+    "gasbot_audio_trimmed_seconds_total",
+    "Segundos de silêncio cortados antes do Whisper",
+)
+
+audio_speech_ratio = Histogram(
+    "gasbot_audio_speech_ratio",
+    "Fração da nota de voz que sobra após o corte de silêncio",
+    buckets=(0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+webhook_duplicates = Counter(
+    "gasbot_webhook_duplicates_total",
+    "Mensagens reentregues pela Evolution e descartadas pelo dedup",
+)
+
+webhook_log_entries = Counter(
+    "gasbot_webhook_log_entries_total",
+    "Logs de webhook (outcome: written, sampled_out, dropped)",
+    ["outcome"],
+)
+
+audio_acks = Counter(
+    "gasbot_audio_acks_total",
+    'Avisos de "ouvindo seu áudio" enviados com a fila de transcrição cheia',
+)
+
+
+def render_metrics():
+    """Corpo e content-type da resposta de /metrics"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core import metrics
 
 # Create database engine
 engine = create_engine(
@@ -12,6 +13,16 @@ engine = create_engine(
     echo=False  # Set to True for SQL debugging
 )
 
+COUNTED_STATEMENTS = ("select", "insert", "update", "delete")
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    """Counts SQL statements (gasbot_db_queries_total, queries per turn in benchmarks)"""
+    verb = statement.lstrip()[:6].lower()
+    metrics.db_queries.labels(statement=verb if verb in COUNTED_STATEMENTS else "other").inc()
+
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -4,8 +4,9 @@ SQLAlchemy Models for GasBot
 import uuid
 from datetime import datetime
 from sqlalchemy import (
-    Boolean, Column, DateTime, String, Text, Integer,
-    Numeric, ForeignKey, ARRAY, JSON
+    Boolean, Column, Date, DateTime, String, Text, Integer,
+    Numeric, ForeignKey, ARRAY, JSON, SmallInteger, BigInteger,
+    Index, UniqueConstraint, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -184,6 +185,10 @@ class HybridRule(Base):
 
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Um cliente por número em cada tenant (alvo do upsert do webhook)
+        UniqueConstraint("tenant_id", "whatsapp_number", name="uq_customers_tenant_whatsapp_number"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
@@ -279,6 +284,13 @@ class Order(Base):
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # No máximo uma conversa ativa por cliente (alvo do upsert do webhook)
+        Index(
+            "uq_conversations_active_customer", "customer_id",
+            unique=True, postgresql_where=text("status = 'active'")
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
@@ -329,12 +341,82 @@ class HumanIntervention(Base):
 # ============================================================================
 
 class WebhookLog(Base):
+    """Particionada por dia em created_at (app.services.webhook_log); sem FK, é só log"""
     __tablename__ = "webhook_logs"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"))
+    tenant_id = Column(UUID(as_uuid=True))
     event_type = Column(String(100))
     payload = Column(JSON)
     processed = Column(Boolean, default=False)
     error = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+
+
+# ============================================================================
+# ANALYTICS (Tabelas fato pré-agregadas, mantidas por app.tasks.analytics)
+# ============================================================================
+
+class AnalyticsWatermark(Base):
+    __tablename__ = "analytics_watermarks"
+
+    name = Column(String(100), primary_key=True)
+    value = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class FactProductDaily(Base):
+    """Itens vendidos por produto e dia (horário de Brasília)"""
+    __tablename__ = "fact_product_daily"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    product_name = Column(String(255), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    orders_count = Column(Integer, nullable=False, default=0)
+
+
+class FactOrdersHourly(Base):
+    """Pedidos por bairro, dia e hora (horário de Brasília)"""
+    __tablename__ = "fact_orders_hourly"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    hour = Column(SmallInteger, primary_key=True)
+    neighborhood = Column(String(255), primary_key=True)  # '' quando não informado
+    orders_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    delivery_fees = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class FactOrdersDaily(Base):
+    """Totais do dia: pedidos, receita, taxas de entrega (ticket médio = revenue / orders_count)"""
+    __tablename__ = "fact_orders_daily"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    orders_count = Column(Integer, nullable=False, default=0)
+    cancelled_count = Column(Integer, nullable=False, default=0)
+    items_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Numeric(12, 2), nullable=False, default=0)
+    delivery_fees = Column(Numeric(12, 2), nullable=False, default=0)
+
+
+class LLMUsageDaily(Base):
+    """Consumo de LLM por tenant, dia, agente e modelo (rollup de app.services.llm_gateway)"""
+    __tablename__ = "llm_usage_daily"
+
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    agent = Column(String(100), primary_key=True)
+    model = Column(String(255), primary_key=True)
+    calls = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    parse_failures = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    cached_tokens = Column(BigInteger, nullable=False, default=0)  # parte de prompt_tokens
+    cost_usd = Column(Numeric(12, 6), nullable=False, default=0)
+    latency_ms = Column(BigInteger, nullable=False, default=0)  # soma; média = latency_ms / calls
@@ -219,6 +219,16 @@ class CustomerResponse(CustomerBase):
     last_order_at: Optional[datetime] = None
 
 
+class CustomerSearchResult(BaseModel):
+    """Item do typeahead de clientes"""
+    id: UUID
+    name: Optional[str] = None
+    whatsapp_number: str
+    order_count: int = 0
+    last_order_at: Optional[datetime] = None
+    match: str  # phone_exact, phone_prefix, phone_suffix, name_exact, name_prefix, name
+
+
 # ============================================================================
 # ORDER SCHEMAS
 # ============================================================================
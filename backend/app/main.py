@@ -1,10 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.metrics import render_metrics
 from app.middleware.tenant import TenantMiddleware
+from app.services.realtime import manager as realtime_manager
+from app.services.media_download import media_downloader
+from app.services.transcription_backends import transcription_backends
+from app.services.webhook_log import webhook_log_writer
 
 # Import routers
-from app.api import auth, tenant, whatsapp, delivery, dashboard, conversations, trial, products, delivery_drivers
+from app.api import auth, tenant, whatsapp, delivery, dashboard, conversations, trial, products, delivery_drivers, analytics
 from app.webhooks import whatsapp as whatsapp_webhook
 
 app = FastAPI(
@@ -31,16 +36,40 @@ app.include_router(tenant.router)
 app.include_router(whatsapp.router)
 app.include_router(delivery.router)
 app.include_router(dashboard.router)
+app.include_router(analytics.router)
 app.include_router(conversations.router)
 app.include_router(trial.router)
 app.include_router(products.router)
 app.include_router(delivery_drivers.router)
 app.include_router(whatsapp_webhook.router)
 
+@app.on_event("startup")
+async def start_realtime():
+    # Assinatura Redis dos eventos do dashboard (fan-out entre workers)
+    await realtime_manager.start()
+
+@app.on_event("shutdown")
+async def stop_realtime():
+    await realtime_manager.stop()
+
+@app.on_event("shutdown")
+async def flush_webhook_logs():
+    await webhook_log_writer.stop()
+
+@app.on_event("shutdown")
+async def close_audio_clients():
+    await media_downloader.close()
+    await transcription_backends.close()
+
 @app.get("/")
 async def root():
     return {"message": "GasBot API is running"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
@@ -0,0 +1,394 @@
+"""
+Analytics service - Fatos de vendas pré-agregados
+
+O refresh (task app.tasks.analytics.refresh_sales_facts) é incremental:
+1. Pedidos criados desde a última marca d'água (menos SAFETY_LAG, para não
+   perder transações que ainda não tinham feito commit) marcam o par
+   (tenant, dia) como sujo
+2. Os últimos RESTATE_DAYS dias também são recalculados, porque o status
+   do pedido muda depois da criação (entregue, cancelado)
+3. Cada (tenant, dia) sujo é recalculado por inteiro a partir de orders
+   (DELETE + INSERT na mesma transação), então rodar duas vezes dá o mesmo
+   resultado
+
+Os endpoints de analytics leem só as tabelas fato, nunca orders.
+
+Dias e horas são no horário de Brasília; orders.created_at é UTC.
+Pedidos cancelados não entram em receita/quantidade, só em cancelled_count.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import logging
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.database.models import (
+    AnalyticsWatermark, FactOrdersDaily, FactOrdersHourly, FactProductDaily,
+    LLMUsageDaily
+)
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TIMEZONE = "America/Sao_Paulo"
+
+LOCAL_TS = "((o.created_at AT TIME ZONE 'UTC') AT TIME ZONE :tz)"
+
+# Itens vêm da extração do LLM ("", "dois", "2 un"): só converte o que é
+# número, senão um item ruim derrubaria o refresh de todos os tenants
+NUMERIC_PATTERN = r"^\s*-?\d+(\.\d+)?([eE][-+]?\d+)?\s*$"
+
+
+def item_numeric(field: str) -> str:
+    """Campo numérico do item e (json) como numeric, ou NULL se não é número"""
+    value = f"(e->>'{field}')"
+    return f"(CASE WHEN {value} ~ '{NUMERIC_PATTERN}' THEN {value}::numeric END)"
+
+
+def _money(value) -> float:
+    return float(value or Decimal("0"))
+
+
+class AnalyticsService:
+    """Refresh e leitura das tabelas fato de vendas"""
+
+    WATERMARK_NAME = "sales_facts"
+    SAFETY_LAG = timedelta(minutes=2)
+    RESTATE_DAYS = 2
+    # Chave do advisory lock: impede dois refresh simultâneos (beat atrasado)
+    LOCK_KEY = 730_301
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Materializa os fatos dos dias com pedidos novos ou recentes
+
+        Returns:
+            {"status": "success" | "skipped", "dirty_days": int, "watermark": str}
+        """
+        now = now or datetime.utcnow()
+        db = self.db
+
+        locked = db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": self.LOCK_KEY}
+        ).scalar()
+        if not locked:
+            db.rollback()
+            return {"status": "skipped", "reason": "refresh já em andamento"}
+
+        watermark_row = db.query(AnalyticsWatermark).filter(
+            AnalyticsWatermark.name == self.WATERMARK_NAME
+        ).first()
+        watermark = watermark_row.value if watermark_row else datetime(1970, 1, 1)
+        upper = max(watermark, now - self.SAFETY_LAG)
+        restate_from = now - timedelta(days=self.RESTATE_DAYS)
+
+        params = {"tz": LOCAL_TIMEZONE, "watermark": watermark, "upper": upper, "restate_from": restate_from}
+
+        db.execute(text(f"""
+            CREATE TEMP TABLE analytics_dirty_days ON COMMIT DROP AS
+            SELECT DISTINCT o.tenant_id, {LOCAL_TS}::date AS day
+            FROM orders o
+            WHERE (o.created_at > :watermark AND o.created_at <= :upper)
+               OR o.created_at >= :restate_from
+        """), params)
+
+        dirty_days, min_day = db.execute(
+            text("SELECT count(*), min(day) FROM analytics_dirty_days")
+        ).one()
+
+        if dirty_days:
+            # Margem de 1 dia cobre a diferença entre UTC e horário local
+            scan_from = datetime.combine(min_day, time()) - timedelta(days=1)
+            self._rebuild_dirty_days({"tz": LOCAL_TIMEZONE, "scan_from": scan_from})
+
+        if watermark_row:
+            watermark_row.value = upper
+            watermark_row.updated_at = now
+        else:
+            db.add(AnalyticsWatermark(name=self.WATERMARK_NAME, value=upper, updated_at=now))
+
+        db.commit()
+
+        logger.info(f"Sales facts refreshed: {dirty_days} tenant-days, watermark {upper.isoformat()}")
+
+        return {
+            "status": "success",
+            "dirty_days": dirty_days,
+            "watermark": upper.isoformat()
+        }
+
+    def _rebuild_dirty_days(self, params: Dict[str, Any]) -> None:
+        db = self.db
+
+        # Pedidos dos dias sujos, com timestamp local já calculado
+        db.execute(text(f"""
+            CREATE TEMP TABLE analytics_dirty_orders ON COMMIT DROP AS
+            SELECT
+                o.id, o.tenant_id, {LOCAL_TS} AS local_ts, o.status,
+                o.total, o.delivery_fee, o.delivery_address,
+                CASE WHEN json_typeof(o.items) = 'array' THEN o.items ELSE '[]'::json END AS items
+            FROM orders o
+            JOIN analytics_dirty_days d
+              ON d.tenant_id = o.tenant_id AND d.day = {LOCAL_TS}::date
+            WHERE o.created_at >= :scan_from
+        """), params)
+
+        for table in ("fact_product_daily", "fact_orders_hourly", "fact_orders_daily"):
+            db.execute(text(f"""
+                DELETE FROM {table} f
+                USING analytics_dirty_days d
+                WHERE f.tenant_id = d.tenant_id AND f.day = d.day
+            """))
+
+        db.execute(text(f"""
+            INSERT INTO fact_product_daily (tenant_id, day, product_name, quantity, revenue, orders_count)
+            SELECT
+                s.tenant_id,
+                s.local_ts::date,
+                COALESCE(NULLIF(TRIM(e->>'product_name'), ''), '(sem nome)'),
+                SUM(COALESCE({item_numeric('quantity')}, 0))::int,
+                SUM(COALESCE(
+                    {item_numeric('subtotal')},
+                    {item_numeric('price')} * {item_numeric('quantity')},
+                    0
+                )),
+                COUNT(DISTINCT s.id)
+            FROM analytics_dirty_orders s
+            CROSS JOIN LATERAL json_array_elements(s.items) e
+            WHERE s.status <> 'cancelled' AND json_typeof(e) = 'object'
+            GROUP BY 1, 2, 3
+        """))
+
+        db.execute(text("""
+            INSERT INTO fact_orders_hourly (
+                tenant_id, day, hour, neighborhood,
+                orders_count, cancelled_count, revenue, delivery_fees
+            )
+            SELECT
+                s.tenant_id,
+                s.local_ts::date,
+                EXTRACT(HOUR FROM s.local_ts)::smallint,
+                COALESCE(INITCAP(LOWER(NULLIF(TRIM(s.delivery_address->>'neighborhood'), ''))), ''),
+                COUNT(*) FILTER (WHERE s.status <> 'cancelled'),
+                COUNT(*) FILTER (WHERE s.status = 'cancelled'),
+                COALESCE(SUM(s.total) FILTER (WHERE s.status <> 'cancelled'), 0),
+                COALESCE(SUM(s.delivery_fee) FILTER (WHERE s.status <> 'cancelled'), 0)
+            FROM analytics_dirty_orders s
+            GROUP BY 1, 2, 3, 4
+        """))
+
+        db.execute(text(f"""
+            INSERT INTO fact_orders_daily (
+                tenant_id, day, orders_count, cancelled_count,
+                items_count, revenue, delivery_fees
+            )
+            SELECT
+                s.tenant_id,
+                s.local_ts::date,
+                COUNT(*) FILTER (WHERE s.status <> 'cancelled'),
+                COUNT(*) FILTER (WHERE s.status = 'cancelled'),
+                COALESCE(SUM(items.quantity) FILTER (WHERE s.status <> 'cancelled'), 0),
+                COALESCE(SUM(s.total) FILTER (WHERE s.status <> 'cancelled'), 0),
+                COALESCE(SUM(s.delivery_fee) FILTER (WHERE s.status <> 'cancelled'), 0)
+            FROM analytics_dirty_orders s
+            CROSS JOIN LATERAL (
+                SELECT COALESCE(SUM({item_numeric('quantity')}), 0)::int AS quantity
+                FROM json_array_elements(s.items) e
+                WHERE json_typeof(e) = 'object'
+            ) items
+            GROUP BY 1, 2
+        """))
+
+    # ------------------------------------------------------------------
+    # Leitura (apenas tabelas fato)
+    # ------------------------------------------------------------------
+
+    def last_refresh(self) -> Optional[datetime]:
+        row = self.db.query(AnalyticsWatermark.value).filter(
+            AnalyticsWatermark.name == self.WATERMARK_NAME
+        ).first()
+        return row.value if row else None
+
+    def daily(self, tenant_id: UUID, day_from: date, day_to: date) -> Dict[str, Any]:
+        """Série diária + totais do período (pedidos, receita, taxas, ticket médio)"""
+        rows = self.db.query(
+            FactOrdersDaily.day,
+            FactOrdersDaily.orders_count,
+            FactOrdersDaily.cancelled_count,
+            FactOrdersDaily.items_count,
+            FactOrdersDaily.revenue,
+            FactOrdersDaily.delivery_fees,
+        ).filter(
+            FactOrdersDaily.tenant_id == tenant_id,
+            FactOrdersDaily.day.between(day_from, day_to)
+        ).order_by(FactOrdersDaily.day).all()
+
+        series = []
+        totals = {"orders_count": 0, "cancelled_count": 0, "items_count": 0, "revenue": 0.0, "delivery_fees": 0.0}
+        for row in rows:
+            series.append({
+                "day": row.day.isoformat(),
+                "orders_count": row.orders_count,
+                "cancelled_count": row.cancelled_count,
+                "items_count": row.items_count,
+                "revenue": _money(row.revenue),
+                "delivery_fees": _money(row.delivery_fees),
+                "average_ticket": round(_money(row.revenue) / row.orders_count, 2) if row.orders_count else 0.0,
+            })
+            totals["orders_count"] += row.orders_count
+            totals["cancelled_count"] += row.cancelled_count
+            totals["items_count"] += row.items_count
+            totals["revenue"] += _money(row.revenue)
+            totals["delivery_fees"] += _money(row.delivery_fees)
+
+        totals["revenue"] = round(totals["revenue"], 2)
+        totals["delivery_fees"] = round(totals["delivery_fees"], 2)
+        totals["average_ticket"] = (
+            round(totals["revenue"] / totals["orders_count"], 2) if totals["orders_count"] else 0.0
+        )
+
+        return {"series": series, "totals": totals}
+
+    def products(self, tenant_id: UUID, day_from: date, day_to: date, limit: int = 20) -> List[Dict[str, Any]]:
+        """Mix de produtos do período, do mais vendido ao menos vendido"""
+        quantity = func.sum(FactProductDaily.quantity).label("quantity")
+        revenue = func.sum(FactProductDaily.revenue).label("revenue")
+        orders_count = func.sum(FactProductDaily.orders_count).label("orders_count")
+
+        rows = self.db.query(
+            FactProductDaily.product_name, quantity, revenue, orders_count
+        ).filter(
+            FactProductDaily.tenant_id == tenant_id,
+            FactProductDaily.day.between(day_from, day_to)
+        ).group_by(FactProductDaily.product_name).order_by(
+            quantity.desc()
+        ).limit(limit).all()
+
+        return [
+            {
+                "product_name": row.product_name,
+                "quantity": int(row.quantity or 0),
+                "revenue": _money(row.revenue),
+                "orders_count": int(row.orders_count or 0),
+            }
+            for row in rows
+        ]
+
+    def neighborhoods(self, tenant_id: UUID, day_from: date, day_to: date, limit: int = 50) -> List[Dict[str, Any]]:
+        """Demanda por bairro no período"""
+        orders_count = func.sum(FactOrdersHourly.orders_count).label("orders_count")
+        revenue = func.sum(FactOrdersHourly.revenue).label("revenue")
+        delivery_fees = func.sum(FactOrdersHourly.delivery_fees).label("delivery_fees")
+
+        rows = self.db.query(
+            FactOrdersHourly.neighborhood, orders_count, revenue, delivery_fees
+        ).filter(
+            FactOrdersHourly.tenant_id == tenant_id,
+            FactOrdersHourly.day.between(day_from, day_to)
+        ).group_by(FactOrdersHourly.neighborhood).order_by(
+            orders_count.desc()
+        ).limit(limit).all()
+
+        return [
+            {
+                "neighborhood": row.neighborhood or None,
+                "orders_count": int(row.orders_count or 0),
+                "revenue": _money(row.revenue),
+                "delivery_fees": _money(row.delivery_fees),
+                "average_ticket": round(_money(row.revenue) / row.orders_count, 2) if row.orders_count else 0.0,
+            }
+            for row in rows
+        ]
+
+    def hourly(
+        self,
+        tenant_id: UUID,
+        day_from: date,
+        day_to: date,
+        neighborhood: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Pedidos por hora do dia (0-23) no período, opcionalmente de um bairro"""
+        orders_count = func.sum(FactOrdersHourly.orders_count).label("orders_count")
+        revenue = func.sum(FactOrdersHourly.revenue).label("revenue")
+
+        query = self.db.query(FactOrdersHourly.hour, orders_count, revenue).filter(
+            FactOrdersHourly.tenant_id == tenant_id,
+            FactOrdersHourly.day.between(day_from, day_to)
+        )
+        if neighborhood is not None:
+            query = query.filter(FactOrdersHourly.neighborhood == neighborhood)
+
+        by_hour = {row.hour: row for row in query.group_by(FactOrdersHourly.hour).all()}
+
+        return [
+            {
+                "hour": hour,
+                "orders_count": int(by_hour[hour].orders_count) if hour in by_hour else 0,
+                "revenue": _money(by_hour[hour].revenue) if hour in by_hour else 0.0,
+            }
+            for hour in range(24)
+        ]
+
+    def llm_usage(self, tenant_id: UUID, day_from: date, day_to: date) -> Dict[str, Any]:
+        """Consumo de LLM do tenant por agente/modelo e custo por dia"""
+        calls = func.sum(LLMUsageDaily.calls).label("calls")
+        errors = func.sum(LLMUsageDaily.errors).label("errors")
+        parse_failures = func.sum(LLMUsageDaily.parse_failures).label("parse_failures")
+        prompt_tokens = func.sum(LLMUsageDaily.prompt_tokens).label("prompt_tokens")
+        completion_tokens = func.sum(LLMUsageDaily.completion_tokens).label("completion_tokens")
+        cached_tokens = func.sum(LLMUsageDaily.cached_tokens).label("cached_tokens")
+        cost = func.sum(LLMUsageDaily.cost_usd).label("cost_usd")
+        latency = func.sum(LLMUsageDaily.latency_ms).label("latency_ms")
+
+        period = (
+            LLMUsageDaily.tenant_id == tenant_id,
+            LLMUsageDaily.day.between(day_from, day_to)
+        )
+
+        by_agent = self.db.query(
+            LLMUsageDaily.agent, LLMUsageDaily.model,
+            calls, errors, parse_failures, prompt_tokens, completion_tokens,
+            cached_tokens, cost, latency
+        ).filter(*period).group_by(
+            LLMUsageDaily.agent, LLMUsageDaily.model
+        ).order_by(cost.desc()).all()
+
+        by_day = self.db.query(LLMUsageDaily.day, calls, cost).filter(*period).group_by(
+            LLMUsageDaily.day
+        ).order_by(LLMUsageDaily.day).all()
+
+        return {
+            "by_agent": [
+                {
+                    "agent": row.agent,
+                    "model": row.model,
+                    "calls": int(row.calls or 0),
+                    "errors": int(row.errors or 0),
+                    "parse_failures": int(row.parse_failures or 0),
+                    "prompt_tokens": int(row.prompt_tokens or 0),
+                    "completion_tokens": int(row.completion_tokens or 0),
+                    "cached_tokens": int(row.cached_tokens or 0),
+                    "cached_ratio": (
+                        round(int(row.cached_tokens or 0) / row.prompt_tokens, 3)
+                        if row.prompt_tokens else 0.0
+                    ),
+                    "cost_usd": round(float(row.cost_usd or 0), 4),
+                    "avg_latency_ms": round(int(row.latency_ms or 0) / row.calls) if row.calls else 0,
+                }
+                for row in by_agent
+            ],
+            "by_day": [
+                {"day": row.day.isoformat(), "calls": int(row.calls or 0), "cost_usd": round(float(row.cost_usd or 0), 4)}
+                for row in by_day
+            ],
+            "total_cost_usd": round(sum(float(row.cost_usd or 0) for row in by_day), 4),
+        }
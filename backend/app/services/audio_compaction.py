@@ -0,0 +1,156 @@
+"""
+Audio compaction - Corta silêncio antes do Whisper
+
+Nota de voz do WhatsApp tem silêncio no começo (o dedo ainda no botão), no
+fim e no meio (o cliente pensando no endereço). O Whisper cobra por segundo
+e demora proporcionalmente; aqui o áudio é decodificado para PCM 16kHz
+mono (ffmpeg, via app.services.audio_transcoder), um VAD por energia
+marca os trechos de fala e o resultado volta como OGG/Opus de 24kbps:
+
+- Silêncio no começo e no fim: removido (com uma folga de SPEECH_PADDING_SECONDS)
+- Silêncio no meio: encurtado para settings.AUDIO_MAX_INNER_SILENCE_SECONDS
+  (pausa curta ajuda o Whisper a pontuar e separar "rua 5, número 30")
+- Limiar: ruído de fundo da própria nota + NOISE_MARGIN_DB (no máximo
+  pico - PEAK_HEADROOM_DB, para nota sem pausa nenhuma), nunca abaixo de
+  settings.AUDIO_VAD_THRESHOLD_DBFS
+
+Se quase nada seria cortado e o original já é leve (Opus do WhatsApp), o
+original segue como está e a segunda passada do ffmpeg é poupada.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.audio_transcoder import TranscodeError, audio_transcoder
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)
+SPEECH_PADDING_SECONDS = 0.2
+NOISE_MARGIN_DB = 8.0
+PEAK_HEADROOM_DB = 15.0
+# 10º percentil da energia dos quadros = ruído de fundo da gravação
+NOISE_FLOOR_PERCENTILE = 10
+# 32kbps: acima disso vale reenviar em Opus mesmo sem silêncio para cortar
+COMPACT_BYTES_PER_SECOND = 4000
+
+
+def frame_levels(samples: np.ndarray) -> np.ndarray:
+    """Energia (dBFS) de cada quadro de FRAME_SAMPLES amostras int16"""
+    frames = len(samples) // FRAME_SAMPLES
+    blocks = samples[:frames * FRAME_SAMPLES].astype(np.float32).reshape(frames, FRAME_SAMPLES)
+    power = np.mean(np.square(blocks / 32768.0), axis=1)
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def trim_silence(
+    samples: np.ndarray,
+    threshold_dbfs: float = -45.0,
+    max_inner_silence: float = 0.4
+) -> np.ndarray:
+    """
+    Amostras int16 16kHz só com a fala (vazio se nenhum quadro passa do limiar)
+    """
+    levels = frame_levels(samples)
+    if not len(levels):
+        return samples[:0]
+
+    floor = np.percentile(levels, NOISE_FLOOR_PERCENTILE)
+    threshold = max(threshold_dbfs, min(floor + NOISE_MARGIN_DB, levels.max() - PEAK_HEADROOM_DB))
+    speech = levels > threshold
+    if not speech.any():
+        return samples[:0]
+
+    # Folga em volta de cada trecho de fala (começo de consoante, fim de sílaba)
+    padding = int(round(SPEECH_PADDING_SECONDS / FRAME_SECONDS))
+    speech = np.convolve(speech.astype(np.int8), np.ones(2 * padding + 1, dtype=np.int8), mode="same") > 0
+
+    # Posição de cada quadro dentro da sua sequência de silêncio
+    index = np.arange(len(speech))
+    silent = ~speech
+    run_starts = silent & np.concatenate(([True], speech[:-1]))
+    position = index - np.maximum.accumulate(np.where(run_starts, index, 0))
+
+    keep = speech | (silent & (position < int(round(max_inner_silence / FRAME_SECONDS))))
+    first = int(np.argmax(speech))
+    last = len(speech) - int(np.argmax(speech[::-1]))
+    keep[:first] = False
+    keep[last:] = False
+
+    frames = samples[:len(levels) * FRAME_SAMPLES].reshape(len(levels), FRAME_SAMPLES)
+    return frames[keep].reshape(-1)
+
+
+@dataclass(frozen=True)
+class CompactedAudio:
+    """Áudio pronto para o Whisper (OGG/Opus 16kHz mono)"""
+    data: bytes
+    original_seconds: float
+    speech_seconds: float
+
+    @property
+    def saved_seconds(self) -> float:
+        return self.original_seconds - self.speech_seconds
+
+
+class AudioCompactor:
+    """Decodifica, corta silêncio e recodifica notas de voz"""
+
+    async def compact(self, audio_bytes: bytes) -> Optional[CompactedAudio]:
+        """
+        Versão compacta do áudio, ou None para enviar o original
+
+        None quando desligado, quando o ffmpeg falha, quando não há fala
+        detectável (o Whisper decide) ou quando não há o que ganhar.
+        """
+        if not settings.AUDIO_SILENCE_TRIM_ENABLED:
+            return None
+
+        try:
+            pcm = await audio_transcoder.transcode(audio_bytes, "pcm")
+        except TranscodeError as e:
+            logger.warning(f"Audio decode for silence trimming failed: {e}")
+            return None
+
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2")
+        original_seconds = len(samples) / SAMPLE_RATE
+
+        speech = await asyncio.to_thread(
+            trim_silence,
+            samples,
+            settings.AUDIO_VAD_THRESHOLD_DBFS,
+            settings.AUDIO_MAX_INNER_SILENCE_SECONDS
+        )
+        if not len(speech):
+            return None
+
+        speech_seconds = len(speech) / SAMPLE_RATE
+        saved = original_seconds - speech_seconds
+        if saved < settings.AUDIO_TRIM_MIN_SAVED_SECONDS and \
+                len(audio_bytes) <= original_seconds * COMPACT_BYTES_PER_SECOND:
+            return None
+
+        try:
+            data = await audio_transcoder.transcode(speech.tobytes(), "ogg", input_format="pcm")
+        except TranscodeError as e:
+            logger.warning(f"Audio encode after silence trimming failed: {e}")
+            return None
+
+        metrics.audio_trimmed_seconds.inc(saved)
+        metrics.audio_speech_ratio.observe(speech_seconds / original_seconds)
+        logger.info(
+            f"Audio compacted: {original_seconds:.1f}s -> {speech_seconds:.1f}s, "
+            f"{len(audio_bytes)} -> {len(data)} bytes"
+        )
+        return CompactedAudio(data, original_seconds, speech_seconds)
+
+
+# Global instance
+audio_compactor = AudioCompactor()
@@ -1,21 +1,56 @@
 """
 Audio processing service using OpenAI Whisper
+
+Audio stays in memory end to end: formats Whisper accepts (WhatsApp voice
+notes are OGG/Opus) are uploaded as-is, anything else is converted by an
+ffmpeg subprocess over pipes (app.services.audio_transcoder).
+
+Transcriptions are cached by the SHA-256 of the audio
+(app.services.transcription_cache): forwarded voice notes and Evolution
+retries skip Whisper, and when the payload carries fileSha256 the lookup
+happens before the download. On a miss, silence is trimmed locally
+(app.services.audio_compaction) so Whisper bills and waits for speech only.
+
+Downloads go through app.services.media_download (shared session, streamed
+and capped at MAX_AUDIO_SIZE_MB). The speech-to-text engine is per tenant
+(app.services.transcription_backends): OpenAI Whisper or a local model.
 """
 import base64
-import tempfile
 import logging
-from typing import Dict, Any, Optional
-from pathlib import Path
-import aiohttp
-import asyncio
+from typing import Dict, Any, Optional, Tuple
 
-from openai import AsyncOpenAI
-from pydub import AudioSegment
-
-from app.core.config import settings
+from app.services.audio_compaction import audio_compactor
+from app.services.audio_transcoder import TranscodeError, audio_transcoder
+from app.services.llm_gateway import llm_gateway
+from app.services.media_download import MediaTooLarge, base64_decoded_size, media_downloader
+from app.services.transcription_backends import AudioUpload, TranscriptionBackend, transcription_backends
+from app.services.transcription_cache import content_hash, media_hash, transcription_cache
 
 logger = logging.getLogger(__name__)
 
+# Base mimetypes Whisper accepts directly -> file extension it expects
+WHISPER_FORMATS = {
+    "audio/ogg": "ogg",
+    "audio/opus": "ogg",
+    "audio/webm": "webm",
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/mp4": "m4a",
+    "audio/m4a": "m4a",
+    "audio/x-m4a": "m4a",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/wave": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+}
+
+# Voice notes without a mimetype are WhatsApp's OGG/Opus
+DEFAULT_MIMETYPE = "audio/ogg"
+
+# Returned when Whisper hears nothing; never cached, the next try may do better
+EMPTY_TRANSCRIPTION = "[Áudio vazio ou inaudível. Pode repetir?]"
+
 
 class AudioProcessor:
     """Process WhatsApp audio messages using Whisper"""
@@ -23,9 +58,6 @@ class AudioProcessor:
     MAX_AUDIO_DURATION_SECONDS = 60
     MAX_AUDIO_SIZE_MB = 10
 
-    def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
     async def process_whatsapp_audio(self, audio_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process audio from WhatsApp/Evolution API
@@ -33,9 +65,13 @@ class AudioProcessor:
         Args:
             audio_data: {
                 "base64": str (optional),
+                "instance": str (optional, with message_id: Evolution base64 endpoint),
+                "message_id": str (optional),
                 "url": str (optional),
                 "mimetype": str,
-                "duration": int (seconds)
+                "duration": int (seconds),
+                "sha256": str (optional, audioMessage fileSha256),
+                "transcription_backend": str (optional, tenant setting)
             }
 
         Returns:
@@ -44,6 +80,7 @@ class AudioProcessor:
                 "type": "audio",
                 "duration": int,
                 "success": bool,
+                "cached": bool (optional),
                 "error": str (optional)
             }
         """
@@ -58,8 +95,25 @@ class AudioProcessor:
                     "error": "duration_exceeded"
                 }
 
+            backend = transcription_backends.resolve(audio_data.get("transcription_backend"))
+
+            # Same voice note seen before: no download, no Whisper
+            announced_hash = media_hash(audio_data.get("sha256"))
+            cached = await transcription_cache.get(announced_hash, backend.variant, source="media")
+            if cached is not None:
+                return self._cached_result(cached, audio_data)
+
             # Get audio bytes
-            audio_bytes = await self._get_audio_bytes(audio_data)
+            try:
+                audio_bytes = await self._get_audio_bytes(audio_data)
+            except MediaTooLarge as e:
+                logger.warning(f"Audio rejected: {e}")
+                return {
+                    "text": f"Desculpe, áudio muito grande. Tamanho máximo: {self.MAX_AUDIO_SIZE_MB}MB.",
+                    "type": "audio",
+                    "success": False,
+                    "error": "size_exceeded"
+                }
 
             if not audio_bytes:
                 return {
@@ -79,14 +133,26 @@ class AudioProcessor:
                     "error": "size_exceeded"
                 }
 
-            # Prepare audio file
-            audio_file_path = await self._prepare_audio_file(audio_bytes, audio_data.get("mimetype"))
+            audio_hash = content_hash(audio_bytes)
+            if audio_hash != announced_hash:
+                cached = await transcription_cache.get(audio_hash, backend.variant)
+                if cached is not None:
+                    return self._cached_result(cached, audio_data)
+
+            # Speech only, 16kHz mono Opus; otherwise the original (converted
+            # only if Whisper can't read the format)
+            compacted = await audio_compactor.compact(audio_bytes)
+            if compacted:
+                upload = ("audio.ogg", compacted.data, "audio/ogg")
+                billed_seconds = compacted.speech_seconds
+            else:
+                upload = await self._prepare_audio(audio_bytes, audio_data.get("mimetype"))
+                billed_seconds = duration
 
             # Transcribe
-            transcription = await self._transcribe(audio_file_path)
-
-            # Cleanup
-            self._cleanup_file(audio_file_path)
+            transcription, backend = await self._transcribe(upload, billed_seconds, backend)
+            if transcription != EMPTY_TRANSCRIPTION:
+                await transcription_cache.store(audio_hash, backend.variant, transcription)
 
             return {
                 "text": transcription,
@@ -105,105 +171,111 @@ class AudioProcessor:
                 "error": str(e)
             }
 
+    def _cached_result(self, text: str, audio_data: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info(f"Audio transcription served from cache: {text[:50]}...")
+        return {
+            "text": text,
+            "type": "audio",
+            "duration": audio_data.get("duration", 0),
+            "success": True,
+            "cached": True,
+            "original_format": audio_data.get("mimetype", "unknown")
+        }
+
     async def _get_audio_bytes(self, audio_data: Dict[str, Any]) -> Optional[bytes]:
-        """Get audio bytes from base64 or URL"""
+        """
+        Get audio bytes from inline base64, Evolution's base64 endpoint or URL
+
+        Raises:
+            MediaTooLarge: the audio is over MAX_AUDIO_SIZE_MB (no other source is tried)
+        """
+        max_bytes = self.MAX_AUDIO_SIZE_MB * 1024 * 1024
 
         # Try base64 first
         if audio_data.get("base64"):
+            if base64_decoded_size(audio_data["base64"]) > max_bytes:
+                raise MediaTooLarge(max_bytes, base64_decoded_size(audio_data["base64"]))
             try:
                 return base64.b64decode(audio_data["base64"])
             except Exception as e:
                 logger.error(f"Error decoding base64 audio: {e}")
 
+        # Decrypted media from Evolution (the WhatsApp URL serves it encrypted)
+        if audio_data.get("instance") and audio_data.get("message_id"):
+            try:
+                return await media_downloader.evolution_media(
+                    audio_data["instance"], audio_data["message_id"], max_bytes
+                )
+            except MediaTooLarge:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching audio from Evolution: {e}")
+
         # Try URL
         if audio_data.get("url"):
             try:
-                return await self._download_audio(audio_data["url"])
+                return await media_downloader.download(audio_data["url"], max_bytes)
+            except MediaTooLarge:
+                raise
             except Exception as e:
                 logger.error(f"Error downloading audio: {e}")
 
         return None
 
-    async def _download_audio(self, url: str) -> bytes:
-        """Download audio from URL"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                if response.status == 200:
-                    return await response.read()
-                else:
-                    raise Exception(f"Failed to download audio: HTTP {response.status}")
-
-    async def _prepare_audio_file(self, audio_bytes: bytes, mimetype: Optional[str]) -> str:
+    async def _prepare_audio(self, audio_bytes: bytes, mimetype: Optional[str]) -> AudioUpload:
         """
-        Prepare audio file for Whisper
-        WhatsApp sends OGG/OPUS, may need conversion
-        """
-        # Create temp file
-        temp_dir = Path(tempfile.gettempdir())
-        temp_file = temp_dir / f"audio_{asyncio.current_task().get_name()}.ogg"
-
-        # Write original audio
-        with open(temp_file, "wb") as f:
-            f.write(audio_bytes)
-
-        # Check if conversion needed
-        if mimetype and "ogg" in mimetype.lower():
-            # WhatsApp OGG format - convert to MP3 for better compatibility
-            try:
-                output_file = temp_dir / f"audio_{asyncio.current_task().get_name()}.mp3"
-                audio = AudioSegment.from_ogg(str(temp_file))
-                audio.export(str(output_file), format="mp3")
-
-                # Cleanup original
-                temp_file.unlink()
+        Build the Whisper upload in memory
 
-                return str(output_file)
-            except Exception as e:
-                logger.warning(f"Audio conversion failed, using original: {e}")
-                return str(temp_file)
+        Formats in WHISPER_FORMATS go as they are; others are converted to
+        MP3 by ffmpeg (outside the event loop). If conversion fails the
+        original bytes are sent and Whisper gets the final say.
+        """
+        content_type = (mimetype or DEFAULT_MIMETYPE).split(";")[0].strip().lower()
 
-        return str(temp_file)
+        extension = WHISPER_FORMATS.get(content_type)
+        if extension:
+            return f"audio.{extension}", audio_bytes, content_type
 
-    async def _transcribe(self, audio_file_path: str) -> str:
+        try:
+            converted = await audio_transcoder.transcode(audio_bytes, "mp3")
+            return "audio.mp3", converted, "audio/mpeg"
+        except TranscodeError as e:
+            logger.warning(f"Audio conversion from {content_type} failed, using original: {e}")
+            return f"audio.{content_type.split('/')[-1]}", audio_bytes, content_type
+
+    async def _transcribe(
+        self,
+        upload: AudioUpload,
+        duration: float,
+        backend: TranscriptionBackend
+    ) -> Tuple[str, TranscriptionBackend]:
         """
-        Transcribe audio using OpenAI Whisper API
+        Transcribe audio with the tenant's backend
+
+        Returns the text and the backend that produced it (a failing local
+        engine falls back to the Whisper API).
         """
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                response = await self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language="pt",
-                    prompt="Transcreva o pedido do cliente para distribuidora de g�s e �gua. Contexto: atendimento comercial."
-                )
-
-            transcription = response.text.strip()
+            transcription, backend = await transcription_backends.transcribe(backend, upload, duration)
 
             if not transcription:
-                return "[Áudio vazio ou inaudível. Pode repetir?]"
+                return EMPTY_TRANSCRIPTION, backend
 
-            logger.info(f"Audio transcribed successfully: {transcription[:50]}...")
+            logger.info(f"Audio transcribed successfully ({backend.name}): {transcription[:50]}...")
 
-            return transcription
+            return transcription, backend
 
         except Exception as e:
-            logger.error(f"Whisper transcription error: {e}")
+            logger.error(f"Transcription error ({backend.name}): {e}")
             raise Exception("Transcription failed")
 
-    def _cleanup_file(self, file_path: str):
-        """Delete temporary file"""
-        try:
-            Path(file_path).unlink(missing_ok=True)
-        except Exception as e:
-            logger.warning(f"Failed to cleanup audio file {file_path}: {e}")
-
     async def text_to_speech(self, text: str, voice: str = "alloy") -> bytes:
         """
         Convert text to speech (optional feature)
         Can be used to send voice responses
         """
         try:
-            response = await self.client.audio.speech.create(
+            response = await llm_gateway.client.audio.speech.create(
                 model="tts-1",
                 voice=voice,
                 input=text[:4096]  # Max length
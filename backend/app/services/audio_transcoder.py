@@ -0,0 +1,119 @@
+"""
+Audio transcoder - Conversão de áudio em memória via ffmpeg
+
+Para formatos que o Whisper não aceita (AMR, 3GP, ...): os bytes entram no
+stdin de um processo ffmpeg e o MP3 sai pelo stdout, sem arquivo
+temporário e sem decodificar no event loop. O número de ffmpeg
+simultâneos é limitado (settings.AUDIO_TRANSCODE_CONCURRENCY, padrão =
+núcleos da máquina); o excedente espera vaga.
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Mono 16kHz é o que o Whisper usa internamente; 32kbps basta para voz
+# (24kbps em Opus). "pcm" = amostras cruas para análise (audio_compaction)
+FFMPEG_OUTPUT_ARGS = {
+    "mp3": ["-ac", "1", "-ar", "16000", "-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3"],
+    "ogg": ["-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k", "-application", "voip", "-f", "ogg"],
+    "pcm": ["-ac", "1", "-ar", "16000", "-c:a", "pcm_s16le", "-f", "s16le"],
+}
+
+# Entradas sem cabeçalho precisam do formato explícito
+FFMPEG_INPUT_ARGS = {
+    "pcm": ["-f", "s16le", "-ar", "16000", "-ac", "1"],
+}
+
+
+class TranscodeError(Exception):
+    """ffmpeg falhou, estourou o prazo ou não está instalado"""
+
+
+class AudioTranscoder:
+    """Pool de processos ffmpeg (um por conversão, limitado por semáforo)"""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        ffmpeg: str = "ffmpeg"
+    ):
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self.ffmpeg = ffmpeg
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def max_concurrency(self) -> int:
+        if self._max_concurrency:
+            return self._max_concurrency
+        return settings.AUDIO_TRANSCODE_CONCURRENCY or os.cpu_count() or 2
+
+    @property
+    def timeout(self) -> float:
+        if self._timeout is not None:
+            return self._timeout
+        return settings.AUDIO_TRANSCODE_TIMEOUT_SECONDS
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Criado no primeiro uso, dentro do event loop que vai usá-lo
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def transcode(
+        self,
+        data: bytes,
+        output_format: str = "mp3",
+        input_format: Optional[str] = None
+    ) -> bytes:
+        """
+        Converte o áudio para output_format
+
+        Sem input_format o ffmpeg detecta o formato de entrada; "pcm" indica
+        amostras cruas no formato de FFMPEG_OUTPUT_ARGS["pcm"].
+
+        Raises:
+            TranscodeError
+        """
+        args = [
+            self.ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin",
+            *FFMPEG_INPUT_ARGS.get(input_format, []),
+            "-i", "pipe:0", "-vn", *FFMPEG_OUTPUT_ARGS[output_format], "pipe:1",
+        ]
+
+        async with self._slots():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *args,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                raise TranscodeError(f"ffmpeg unavailable: {e}") from e
+
+            try:
+                output, errors = await asyncio.wait_for(process.communicate(data), self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise TranscodeError(f"ffmpeg timed out after {self.timeout}s")
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+
+        if process.returncode != 0 or not output:
+            message = errors.decode("utf-8", "replace").strip()[-300:]
+            raise TranscodeError(f"ffmpeg exited with {process.returncode}: {message}")
+
+        return output
+
+
+# Global instance
+audio_transcoder = AudioTranscoder()
@@ -0,0 +1,208 @@
+"""
+Conversation resolver - Tenant, cliente e conversa de uma mensagem recebida
+
+Antes de os agentes começarem, o webhook fazia SELECT do tenant, SELECT do
+cliente (+ INSERT, COMMIT e REFRESH se novo) e SELECT da conversa (+ INSERT,
+COMMIT e REFRESH): até sete idas ao banco por mensagem. E duas primeiras
+mensagens simultâneas do mesmo número criavam dois clientes ou duas
+conversas ativas.
+
+Agora:
+- o tenant vem de um cache por processo (TTL curto + invalidação quando o
+  próprio processo o altera) e é anexado à sessão com merge(load=False),
+  sem SELECT;
+- cliente e conversa são resolvidos com um statement cada:
+  INSERT ... ON CONFLICT DO NOTHING RETURNING, unido ao SELECT da linha
+  existente. As constraints únicas (tenant_id, whatsapp_number) e uma
+  conversa 'active' por cliente garantem que corridas terminem na mesma
+  linha;
+- um único COMMIT, e só quando algo foi criado.
+
+Se duas transações inserem a mesma chave ao mesmo tempo, a que perde não
+enxerga a linha da outra no snapshot do próprio statement e recebe zero
+linhas; nesse caso um SELECT simples (novo snapshot) encontra a vencedora.
+"""
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+import logging
+
+from sqlalchemy import exists, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database.models import Conversation, Customer, Tenant
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 60
+
+INSTANCE_PREFIX = "tenant_"
+
+
+def tenant_id_from_instance(instance_name: Optional[str]) -> Optional[UUID]:
+    """UUID do tenant a partir do nome da instância (tenant_{uuid})"""
+    if not instance_name or not instance_name.startswith(INSTANCE_PREFIX):
+        return None
+    try:
+        return UUID(instance_name[len(INSTANCE_PREFIX):])
+    except ValueError:
+        return None
+
+
+class TenantCache:
+    """
+    Cache em memória de Tenant por id
+
+    Guarda uma cópia desanexada da sessão em que foi carregada; cada
+    requisição recebe sua própria instância via merge(load=False), então
+    alterações e lazy loads funcionam normalmente na sessão da requisição.
+    Com vários workers, a invalidação só atinge o processo que fez a
+    alteração; os demais enxergam a mudança em até CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: Dict[UUID, Tuple[float, Tenant]] = {}
+
+    def get(self, db: Session, tenant_id: UUID) -> Optional[Tenant]:
+        entry = self._entries.get(tenant_id)
+        if entry and entry[0] > time.monotonic():
+            return db.merge(entry[1], load=False)
+
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+        if tenant is None:
+            return None
+
+        # A instância carregada vira a cópia do cache; a requisição recebe
+        # outra, anexada à sessão
+        db.expunge(tenant)
+        self._entries[tenant_id] = (time.monotonic() + self.ttl, tenant)
+        return db.merge(tenant, load=False)
+
+    def invalidate(self, tenant_id: Optional[UUID] = None) -> None:
+        """Descarta o tenant (ou todos, sem argumento)"""
+        if tenant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tenant_id, None)
+
+
+def customer_upsert(tenant_id: UUID, phone_number: str, name: Optional[str], customer_id: UUID):
+    """Cria o cliente se o número ainda não existe no tenant; devolve a linha em qualquer caso"""
+    table = Customer.__table__
+    inserted = (
+        insert(table)
+        .values(
+            id=customer_id,
+            tenant_id=tenant_id,
+            whatsapp_number=phone_number,
+            name=name or phone_number,
+            addresses=[],
+            order_count=0,
+            total_spent=0,
+            created_at=datetime.utcnow()
+        )
+        .on_conflict_do_nothing(index_elements=[table.c.tenant_id, table.c.whatsapp_number])
+        .returning(*table.c)
+        .cte("inserted_customer")
+    )
+    existing = select(table).where(
+        table.c.tenant_id == tenant_id,
+        table.c.whatsapp_number == phone_number,
+        ~exists(select(inserted.c.id))
+    )
+    return select(Customer).from_statement(union_all(select(inserted), existing))
+
+
+def conversation_upsert(tenant_id: UUID, customer_id: UUID, session_id: str, conversation_id: UUID):
+    """Abre uma conversa se o cliente não tem uma ativa; devolve a ativa em qualquer caso"""
+    table = Conversation.__table__
+    inserted = (
+        insert(table)
+        .values(
+            id=conversation_id,
+            tenant_id=tenant_id,
+            customer_id=customer_id,
+            session_id=session_id,
+            messages=[],
+            context={},
+            status="active",
+            started_at=datetime.utcnow(),
+            human_intervention=False,
+            total_messages=0
+        )
+        # Literal (não parâmetro) para o Postgres inferir o índice parcial
+        .on_conflict_do_nothing(
+            index_elements=[table.c.customer_id],
+            index_where=text("status = 'active'")
+        )
+        .returning(*table.c)
+        .cte("inserted_conversation")
+    )
+    existing = select(table).where(
+        table.c.tenant_id == tenant_id,
+        table.c.customer_id == customer_id,
+        table.c.status == "active",
+        ~exists(select(inserted.c.id))
+    )
+    return select(Conversation).from_statement(union_all(select(inserted), existing))
+
+
+@dataclass
+class Resolution:
+    customer: Customer
+    conversation: Conversation
+    customer_created: bool
+    conversation_created: bool
+
+
+class ConversationResolver:
+    """Cliente e conversa ativa de um número, criados se preciso"""
+
+    def resolve(
+        self,
+        db: Session,
+        tenant_id: UUID,
+        phone_number: str,
+        name: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Resolution:
+        new_customer_id = uuid.uuid4()
+        customer = db.execute(
+            customer_upsert(tenant_id, phone_number, name, new_customer_id)
+        ).scalars().first()
+        if customer is None:
+            # Perdeu a corrida para outra transação: a linha dela já está commitada
+            customer = db.query(Customer).filter(
+                Customer.tenant_id == tenant_id,
+                Customer.whatsapp_number == phone_number
+            ).one()
+
+        new_conversation_id = uuid.uuid4()
+        conversation = db.execute(
+            conversation_upsert(tenant_id, customer.id, session_id or phone_number, new_conversation_id)
+        ).scalars().first()
+        if conversation is None:
+            conversation = db.query(Conversation).filter(
+                Conversation.customer_id == customer.id,
+                Conversation.status == "active"
+            ).one()
+
+        resolution = Resolution(
+            customer=customer,
+            conversation=conversation,
+            customer_created=customer.id == new_customer_id,
+            conversation_created=conversation.id == new_conversation_id
+        )
+        if resolution.customer_created or resolution.conversation_created:
+            db.commit()
+        return resolution
+
+
+# Global instances
+tenant_cache = TenantCache()
+conversation_resolver = ConversationResolver()
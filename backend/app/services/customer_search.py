@@ -0,0 +1,203 @@
+"""
+Customer search service - Typeahead de clientes apoiado em índices
+
+Usa os índices criados na migration 3f6b1c2d9a40:
+- GIN pg_trgm sobre lower(f_unaccent(name)) para busca por nome sem acento
+- btree text_pattern_ops sobre whatsapp_number (prefixo: "5534...")
+- btree text_pattern_ops sobre reverse(whatsapp_number) (sufixo: "...8888")
+
+As expressões SQL abaixo precisam ser idênticas às dos índices,
+caso contrário o planner volta para seq scan.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List
+from uuid import UUID
+import logging
+
+from sqlalchemy import and_, case, func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.database.models import Customer
+
+logger = logging.getLogger(__name__)
+
+# Caracteres aceitos em uma busca por telefone ("+55 (34) 99999-8888")
+PHONE_QUERY_PATTERN = re.compile(r'^[\d\s()+\-.]+$')
+
+
+def fold_text(text: str) -> str:
+    """
+    Normaliza texto para comparação: minúsculas e sem acentos
+
+    Deve produzir o mesmo resultado que lower(f_unaccent(...)) no Postgres
+    para os caracteres usados em nomes brasileiros.
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def classify_query(term: str) -> Dict[str, Any]:
+    """
+    Decide se a busca é por telefone ou por nome
+
+    Returns:
+        {"kind": "phone", "value": "5534..."} ou
+        {"kind": "name", "value": "joao silva"} ou
+        {"kind": "empty", "value": ""}
+    """
+    term = (term or "").strip()
+
+    if PHONE_QUERY_PATTERN.match(term):
+        digits = re.sub(r'\D', '', term)
+        if len(digits) >= CustomerSearchService.MIN_PHONE_DIGITS:
+            return {"kind": "phone", "value": digits}
+
+    folded = fold_text(term)
+    if len(folded) >= CustomerSearchService.MIN_NAME_CHARS:
+        return {"kind": "name", "value": folded}
+
+    return {"kind": "empty", "value": ""}
+
+
+def _escape_like(value: str) -> str:
+    """Escapa curingas do LIKE digitados pelo operador"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class CustomerSearchService:
+    """
+    Busca de clientes para o typeahead do dashboard
+
+    Features:
+    - Busca por nome tolerante a acentos e erros de digitação (pg_trgm)
+    - Busca por prefixo e sufixo de telefone
+    - Ranking: match exato > começa com > similaridade > pedido mais recente
+    - Projeção só das colunas exibidas (sem carregar objetos ORM)
+    """
+
+    MIN_PHONE_DIGITS = 3
+    MIN_NAME_CHARS = 2
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def folded_name():
+        """Expressão indexada do nome (idêntica ao índice GIN)"""
+        return func.lower(func.f_unaccent(Customer.name))
+
+    @staticmethod
+    def reversed_phone():
+        """Expressão indexada do telefone invertido (idêntica ao índice de sufixo)"""
+        return func.reverse(Customer.whatsapp_number)
+
+    def build_filter(self, term: str):
+        """
+        Monta o filtro WHERE para um termo de busca
+
+        Usado tanto pelo typeahead quanto pela listagem /dashboard/customers.
+        Retorna None se o termo for curto demais para usar os índices.
+        """
+        query = classify_query(term)
+
+        if query["kind"] == "phone":
+            digits = query["value"]
+            return or_(
+                Customer.whatsapp_number.like(f"{digits}%"),
+                self.reversed_phone().like(f"{digits[::-1]}%")
+            )
+
+        if query["kind"] == "name":
+            value = query["value"]
+            return or_(
+                self.folded_name().like(f"%{_escape_like(value)}%"),
+                literal(value).op("<%")(self.folded_name())
+            )
+
+        return None
+
+    def search(
+        self,
+        tenant_id: UUID,
+        term: str,
+        limit: int = DEFAULT_LIMIT
+    ) -> List[Dict[str, Any]]:
+        """
+        Typeahead de clientes de um tenant
+
+        Returns:
+            [
+                {
+                    "id": UUID,
+                    "name": str,
+                    "whatsapp_number": str,
+                    "order_count": int,
+                    "last_order_at": datetime,
+                    "match": "phone_exact" | "phone_prefix" | "phone_suffix" |
+                             "name_exact" | "name_prefix" | "name"
+                }
+            ]
+        """
+        query = classify_query(term)
+        if query["kind"] == "empty":
+            return []
+
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        value = query["value"]
+
+        columns = [
+            Customer.id,
+            Customer.name,
+            Customer.whatsapp_number,
+            Customer.order_count,
+            Customer.last_order_at,
+        ]
+
+        if query["kind"] == "phone":
+            match_rank = case(
+                (Customer.whatsapp_number == value, 0),
+                (Customer.whatsapp_number.like(f"{value}%"), 1),
+                else_=2
+            )
+            score = literal(1.0)
+            labels = {0: "phone_exact", 1: "phone_prefix", 2: "phone_suffix"}
+        else:
+            escaped = _escape_like(value)
+            match_rank = case(
+                (self.folded_name() == value, 0),
+                (self.folded_name().like(f"{escaped}%"), 1),
+                else_=2
+            )
+            score = func.word_similarity(value, self.folded_name())
+            labels = {0: "name_exact", 1: "name_prefix", 2: "name"}
+
+        rows = self.db.query(
+            *columns,
+            match_rank.label("match_rank"),
+            score.label("score")
+        ).filter(
+            and_(
+                Customer.tenant_id == tenant_id,
+                self.build_filter(term)
+            )
+        ).order_by(
+            match_rank,
+            score.desc(),
+            Customer.last_order_at.desc().nullslast()
+        ).limit(limit).all()
+
+        return [
+            {
+                "id": row.id,
+                "name": row.name,
+                "whatsapp_number": row.whatsapp_number,
+                "order_count": row.order_count or 0,
+                "last_order_at": row.last_order_at,
+                "match": labels[row.match_rank],
+            }
+            for row in rows
+        ]
@@ -0,0 +1,305 @@
+"""
+Export service - Exportação em massa de pedidos, clientes e conversas
+
+Gera o arquivo em pedaços direto do cursor do servidor (yield_per +
+stream_results), então a memória usada não depende do tamanho do período.
+
+Formatos:
+- csv: separador ";" e BOM UTF-8 (abre direto no Excel pt-BR)
+- jsonl: um objeto JSON por linha
+- parquet: um row group por lote (requer pyarrow instalado)
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+import logging
+
+from sqlalchemy import and_
+
+from app.database.base import SessionLocal
+from app.database.models import Conversation, Customer, Order
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# Colunas de cada entidade, na ordem do arquivo
+COLUMNS = {
+    "orders": [
+        "id", "order_number", "created_at", "status", "customer_name",
+        "customer_phone", "items", "subtotal", "delivery_fee", "total",
+        "payment_method", "address", "neighborhood", "driver_name", "delivered_at",
+    ],
+    "customers": [
+        "id", "name", "whatsapp_number", "order_count", "total_spent",
+        "created_at", "last_order_at",
+    ],
+    "conversations": [
+        "id", "customer_name", "customer_phone", "status", "started_at",
+        "ended_at", "human_intervention", "total_messages", "messages",
+    ],
+}
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Tipo não serializável: {type(value)}")
+
+
+def _text(value: Any) -> Optional[str]:
+    """Valor como texto para colunas tabulares (CSV/Parquet)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=_json_default)
+    return str(value)
+
+
+def _order_row(row) -> Dict[str, Any]:
+    address = row.delivery_address or {}
+    return {
+        "id": row.id,
+        "order_number": row.order_number,
+        "created_at": row.created_at,
+        "status": row.status,
+        "customer_name": row.customer_name,
+        "customer_phone": row.customer_phone,
+        "items": row.items or [],
+        "subtotal": row.subtotal,
+        "delivery_fee": row.delivery_fee,
+        "total": row.total,
+        "payment_method": row.payment_method,
+        "address": address.get("normalized_address") or address.get("address"),
+        "neighborhood": address.get("neighborhood"),
+        "driver_name": row.driver_name,
+        "delivered_at": row.delivered_at,
+    }
+
+
+def _customer_row(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "name": row.name,
+        "whatsapp_number": row.whatsapp_number,
+        "order_count": row.order_count or 0,
+        "total_spent": row.total_spent or 0,
+        "created_at": row.created_at,
+        "last_order_at": row.last_order_at,
+    }
+
+
+def _conversation_row(row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "customer_name": row.customer_name,
+        "customer_phone": row.customer_phone,
+        "status": row.status,
+        "started_at": row.started_at,
+        "ended_at": row.ended_at,
+        "human_intervention": row.human_intervention,
+        "total_messages": row.total_messages or 0,
+        "messages": row.messages or [],
+    }
+
+
+class ExportService:
+    """
+    Exportação streaming por tenant e período
+
+    Cada entidade define as colunas projetadas (sem carregar objetos ORM),
+    a coluna de data usada no filtro e a conversão de linha.
+    """
+
+    CHUNK_SIZE = 1000
+
+    ENTITIES = ("orders", "customers", "conversations")
+
+    def __init__(self, tenant_id: UUID):
+        self.tenant_id = tenant_id
+
+    def _build_query(self, db, entity: str, status: Optional[str]):
+        if entity == "orders":
+            query = db.query(
+                Order.id, Order.order_number, Order.created_at, Order.status,
+                Order.items, Order.subtotal, Order.delivery_fee, Order.total,
+                Order.payment_method, Order.delivery_address, Order.driver_name,
+                Order.delivered_at,
+                Customer.name.label("customer_name"),
+                Customer.whatsapp_number.label("customer_phone"),
+            ).outerjoin(Customer, Customer.id == Order.customer_id).filter(
+                Order.tenant_id == self.tenant_id
+            )
+            if status:
+                query = query.filter(Order.status == status)
+            return query, Order.created_at, _order_row
+
+        if entity == "customers":
+            query = db.query(
+                Customer.id, Customer.name, Customer.whatsapp_number,
+                Customer.order_count, Customer.total_spent,
+                Customer.created_at, Customer.last_order_at,
+            ).filter(Customer.tenant_id == self.tenant_id)
+            return query, Customer.created_at, _customer_row
+
+        query = db.query(
+            Conversation.id, Conversation.status, Conversation.started_at,
+            Conversation.ended_at, Conversation.human_intervention,
+            Conversation.total_messages, Conversation.messages,
+            Customer.name.label("customer_name"),
+            Customer.whatsapp_number.label("customer_phone"),
+        ).outerjoin(Customer, Customer.id == Conversation.customer_id).filter(
+            Conversation.tenant_id == self.tenant_id
+        )
+        if status:
+            query = query.filter(Conversation.status == status)
+        return query, Conversation.started_at, _conversation_row
+
+    def iter_rows(
+        self,
+        entity: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lotes de linhas do período, lidos por cursor do servidor
+
+        Abre a própria sessão: o gerador roda durante o envio da resposta,
+        depois que a dependência get_db do endpoint já foi encerrada.
+        """
+        db = SessionLocal()
+        try:
+            query, date_column, to_row = self._build_query(db, entity, status)
+
+            filters = []
+            if date_from:
+                filters.append(date_column >= date_from)
+            if date_to:
+                filters.append(date_column <= date_to)
+            if filters:
+                query = query.filter(and_(*filters))
+
+            result = query.order_by(date_column).execution_options(
+                stream_results=True,
+                yield_per=self.CHUNK_SIZE
+            )
+
+            chunk = []
+            for row in result:
+                chunk.append(to_row(row))
+                if len(chunk) >= self.CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        finally:
+            db.close()
+
+    def stream(
+        self,
+        entity: str,
+        export_format: str,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """Arquivo exportado em pedaços de bytes"""
+        chunks = self.iter_rows(entity, date_from, date_to, status)
+        writer: Callable[[Iterator[List[Dict[str, Any]]], List[str]], Iterator[bytes]] = {
+            "csv": _write_csv,
+            "jsonl": _write_jsonl,
+            "parquet": _write_parquet,
+        }[export_format]
+        return writer(chunks, COLUMNS[entity])
+
+
+def _write_csv(chunks: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    buffer.write("\ufeff")
+    writer.writerow(columns)
+    yield buffer.getvalue().encode("utf-8")
+
+    for chunk in chunks:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=";")
+        for row in chunk:
+            writer.writerow(["" if row[c] is None else _text(row[c]) for c in columns])
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _write_jsonl(chunks: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    for chunk in chunks:
+        lines = [json.dumps(row, ensure_ascii=False, default=_json_default) for row in chunk]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Arquivo só-escrita que acumula bytes até serem drenados"""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _write_parquet(chunks: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Tudo como texto: mantém o arquivo idêntico ao CSV e evita inferir
+    # tipos diferentes entre row groups
+    schema = pa.schema([(column, pa.string()) for column in columns])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+
+    try:
+        for chunk in chunks:
+            data = {column: [_text(row[column]) for row in chunk] for column in columns}
+            writer.write_table(pa.table(data, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
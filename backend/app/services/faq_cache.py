@@ -0,0 +1,228 @@
+"""
+FAQ cache - Respostas já geradas para perguntas gerais, por tenant
+
+"Que horas fecha?", "aceita cartão?", "qual o preço do gás?" chegam milhares
+de vezes com pequenas variações e cada uma custava uma chamada de LLM no
+AttendanceAgent. Aqui as respostas geradas ficam guardadas por tenant e uma
+pergunta parecida o bastante (similaridade de cosseno entre vetores TF-IDF
+de n-gramas de caracteres, calculados localmente) reaproveita a resposta.
+
+- Armazenamento: lista no Redis por tenant (faq:{tenant_id}), compartilhada
+  entre workers, limitada a MAX_ENTRIES e com expiração
+- Índice: montado em memória a partir da lista e recarregado a cada
+  LOCAL_TTL_SECONDS (ou na hora, no processo que gravou/invalidou)
+- Invalidação: os endpoints que alteram produtos, dados do tenant ou modo
+  de entrega chamam faq_cache.invalidate(), que apaga a lista
+
+N-gramas de caracteres toleram erro de digitação e falta de acento, que
+são a regra no WhatsApp ("q horas fecha", "aceita cartao"). Mas "botijão
+13kg" e "botijão 45kg" diferem em poucos n-gramas: perguntas com números ou
+unidades diferentes nunca se casam, seja qual for a similaridade.
+"""
+import json
+import logging
+import math
+import re
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "faq:"
+MAX_ENTRIES = 300
+ENTRY_TTL_SECONDS = 7 * 24 * 3600
+LOCAL_TTL_SECONDS = 30
+NGRAM_SIZES = (3, 4)
+# Mensagens mais curtas que isso ("ok", "sim") nunca são perguntas de FAQ
+MIN_QUESTION_CHARS = 8
+
+
+def normalize_question(text: str) -> str:
+    text = unicodedata.normalize("NFKD", (text or "").lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9 ]+", " ", text)
+    return " ".join(text.split())
+
+
+# Unidades que mudam o produto da pergunta ("13kg", "20 litros")
+UNITS = {"kg": "kg", "quilo": "kg", "quilos": "kg", "l": "l", "litro": "l", "litros": "l", "ml": "ml"}
+QUANTITY_PATTERN = re.compile(r"\d+|(?:(?<=\d)|\b)(?:kg|quilos?|ml|l|litros?)\b")
+
+
+def quantity_tokens(text: str) -> frozenset:
+    """Números e unidades da pergunta normalizada ("p45", "13kg" -> 45 / 13, kg)"""
+    return frozenset(UNITS.get(token, token) for token in QUANTITY_PATTERN.findall(text))
+
+
+def char_ngrams(text: str) -> Counter:
+    """N-gramas de caracteres de cada palavra (com bordas), com contagem"""
+    grams: Counter = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                grams[padded[i:i + size]] += 1
+    return grams
+
+
+class FaqIndex:
+    """Índice TF-IDF de um tenant (perguntas normalizadas -> respostas)"""
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        self.entries = entries
+        grams = [char_ngrams(question) for question, _ in entries]
+
+        document_frequency: Counter = Counter()
+        for counts in grams:
+            document_frequency.update(counts.keys())
+
+        total = len(entries)
+        # IDF suavizado: n-gramas presentes em todas as perguntas ainda contam
+        self._idf = {
+            gram: math.log((1 + total) / (1 + frequency)) + 1
+            for gram, frequency in document_frequency.items()
+        }
+        self._default_idf = math.log(1 + total) + 1
+        self._vectors = [self._vector(counts) for counts in grams]
+        self._quantities = [quantity_tokens(question) for question, _ in entries]
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        vector = {
+            gram: count * self._idf.get(gram, self._default_idf)
+            for gram, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if not norm:
+            return {}
+        return {gram: weight / norm for gram, weight in vector.items()}
+
+    def best_match(self, question: str) -> Optional[Tuple[float, str, str]]:
+        """
+        (similaridade, pergunta, resposta) mais próxima entre as perguntas com
+        os mesmos números e unidades, ou None se não há nenhuma
+        """
+        if not self.entries:
+            return None
+
+        query = self._vector(char_ngrams(question))
+        quantities = quantity_tokens(question)
+        best = None
+        for (cached_question, answer), vector, cached_quantities in zip(
+            self.entries, self._vectors, self._quantities
+        ):
+            if cached_quantities != quantities:
+                continue
+            # Itera no menor dos dois vetores esparsos
+            small, large = (query, vector) if len(query) < len(vector) else (vector, query)
+            score = sum(weight * large.get(gram, 0.0) for gram, weight in small.items())
+            if best is None or score > best[0]:
+                best = (score, cached_question, answer)
+        return best
+
+
+class FaqCache:
+    """Cache de respostas de FAQ por tenant"""
+
+    def __init__(self, min_similarity: Optional[float] = None):
+        self._min_similarity = min_similarity
+        self._indexes: Dict[UUID, Tuple[float, FaqIndex]] = {}
+
+    @property
+    def min_similarity(self) -> float:
+        if self._min_similarity is not None:
+            return self._min_similarity
+        return settings.FAQ_CACHE_MIN_SIMILARITY
+
+    async def lookup(self, tenant_id: UUID, question: str) -> Optional[str]:
+        """Resposta guardada para uma pergunta parecida, ou None"""
+        if not settings.FAQ_CACHE_ENABLED:
+            return None
+
+        normalized = normalize_question(question)
+        if len(normalized) < MIN_QUESTION_CHARS:
+            return None
+
+        index = await self._index(tenant_id)
+        match = index.best_match(normalized) if index else None
+
+        if match and match[0] >= self.min_similarity:
+            score, cached_question, answer = match
+            logger.info(f"FAQ cache hit ({score:.2f}): {question[:60]!r} ~ {cached_question[:60]!r}")
+            metrics.faq_cache_lookups.labels(result="hit").inc()
+            return answer
+
+        metrics.faq_cache_lookups.labels(result="miss").inc()
+        return None
+
+    async def store(self, tenant_id: UUID, question: str, answer: str) -> None:
+        """Guarda a resposta gerada pelo LLM para uma pergunta geral"""
+        if not settings.FAQ_CACHE_ENABLED or not answer:
+            return
+
+        normalized = normalize_question(question)
+        if len(normalized) < MIN_QUESTION_CHARS:
+            return
+
+        try:
+            from app.core.cache import redis_client
+
+            key = f"{KEY_PREFIX}{tenant_id}"
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.rpush(key, json.dumps({"q": normalized, "a": answer}, ensure_ascii=False))
+            pipe.ltrim(key, -MAX_ENTRIES, -1)
+            pipe.expire(key, ENTRY_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"FAQ cache store skipped: {e}")
+            return
+
+        # Este processo passa a enxergar a resposta imediatamente
+        cached = self._indexes.get(tenant_id)
+        if cached:
+            entries = (cached[1].entries + [(normalized, answer)])[-MAX_ENTRIES:]
+            self._indexes[tenant_id] = (cached[0], FaqIndex(entries))
+
+    async def invalidate(self, tenant_id: UUID) -> None:
+        """Descarta as respostas do tenant (produtos, horário ou pagamento mudaram)"""
+        self._indexes.pop(tenant_id, None)
+        try:
+            from app.core.cache import redis_client
+
+            await redis_client.delete(f"{KEY_PREFIX}{tenant_id}")
+        except Exception as e:
+            logger.warning(f"FAQ cache invalidation failed for {tenant_id}: {e}")
+
+    async def _index(self, tenant_id: UUID) -> Optional[FaqIndex]:
+        cached = self._indexes.get(tenant_id)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        try:
+            from app.core.cache import redis_client
+
+            raw = await redis_client.lrange(f"{KEY_PREFIX}{tenant_id}", 0, -1)
+        except Exception as e:
+            logger.warning(f"FAQ cache unavailable: {e}")
+            return None
+
+        entries = []
+        for item in raw:
+            try:
+                data = json.loads(item)
+                entries.append((data["q"], data["a"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        index = FaqIndex(entries)
+        self._indexes[tenant_id] = (time.monotonic() + LOCAL_TTL_SECONDS, index)
+        return index
+
+
+# Global instance
+faq_cache = FaqCache()
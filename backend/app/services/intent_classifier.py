@@ -2,12 +2,78 @@
 Intent Classifier - Classifica intenção do usuário considerando contexto
 """
 import logging
+import re
+import unicodedata
 from typing import Optional
-from openai import AsyncOpenAI
-from app.core.config import settings
+from app.services.llm_gateway import llm_gateway
 
 logger = logging.getLogger(__name__)
 
+# Intents conversacionais (também retornados pelo MessageExtractor quando
+# settings.EXTRACTOR_INCLUDES_INTENT está ativo)
+VALID_INTENTS = (
+    "answer_yes", "answer_no", "greeting",
+    "product_inquiry", "help", "general"
+)
+
+# Mensagens curtas e inequívocas reconhecidas sem LLM (ver match_routine).
+# A mensagem inteira precisa bater com uma das frases (sem acento/pontuação).
+ROUTINE_PHRASES = {
+    "greeting": (
+        "oi", "oie", "ola", "opa", "salve", "bom dia", "boa tarde", "boa noite",
+        "oi bom dia", "oi boa tarde", "oi boa noite", "ola bom dia", "ola boa tarde",
+        "ola boa noite", "e ai", "eai", "oi tudo bem", "ola tudo bem",
+    ),
+    "product_inquiry": (
+        "cardapio", "catalogo", "produtos", "precos", "tabela", "tabela de precos",
+        "lista de produtos", "ver produtos", "ver cardapio", "quais produtos",
+        "quais os produtos", "quais produtos voces tem", "o que voces tem",
+        "o que voces vendem", "quais os precos",
+    ),
+    "help": ("ajuda", "menu"),
+    "answer_yes": (
+        "sim", "s", "ok", "pode", "beleza", "blz", "certo", "isso", "isso mesmo",
+        "confirmo", "perfeito", "exato", "correto", "esta correto", "ta certo",
+        "tudo certo", "pode seguir", "pode continuar", "sim pode", "sim esta correto",
+    ),
+    "answer_no": (
+        "nao", "n", "so isso", "e so isso", "somente isso", "apenas isso",
+        "mais nada", "nada mais", "pronto", "finalizar", "pode finalizar",
+        "fechar pedido", "nao obrigado", "nao obrigada", "nao so isso",
+    ),
+    "show_summary": ("resumo", "meu pedido", "ver pedido", "ver carrinho", "carrinho"),
+    "pay_pix": ("pix", "no pix", "via pix", "pagar no pix", "vou pagar no pix", "pix por favor"),
+    "pay_card": (
+        "cartao", "no cartao", "debito", "credito", "cartao de debito",
+        "cartao de credito", "maquininha", "na maquininha",
+    ),
+    "pay_cash": ("dinheiro", "em dinheiro", "no dinheiro", "especie", "em especie"),
+}
+
+_ROUTINES = {
+    phrase: routine
+    for routine, phrases in ROUTINE_PHRASES.items()
+    for phrase in phrases
+}
+
+
+def _normalize_routine_text(message: str) -> str:
+    text = unicodedata.normalize("NFKD", message.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9 ]+", " ", text)
+    return " ".join(text.split())
+
+
+def match_routine(message: str) -> Optional[str]:
+    """
+    Reconhece mensagens de rotina sem chamar o LLM
+
+    Returns:
+        Chave de ROUTINE_PHRASES (greeting, answer_yes, pay_pix...) ou
+        None se a mensagem não for exatamente uma das frases conhecidas
+    """
+    return _ROUTINES.get(_normalize_routine_text(message or ""))
+
 
 class IntentClassifier:
     """
@@ -20,7 +86,6 @@ class IntentClassifier:
 
     def __init__(self):
         """Inicializa o classificador"""
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.model = "gpt-4o-mini"
 
     async def classify(
@@ -83,7 +148,8 @@ CLASSIFICAÇÕES:
 Responda APENAS a classificação."""
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await llm_gateway.chat_completion(
+                "intent_classifier",
                 model=self.model,
                 messages=[
                     {
@@ -98,13 +164,9 @@ Responda APENAS a classificação."""
             intent = response.choices[0].message.content.strip().lower()
 
             # Validar resposta
-            valid_intents = [
-                "answer_yes", "answer_no", "greeting",
-                "product_inquiry", "help", "general"
-            ]
-
-            if intent not in valid_intents:
+            if intent not in VALID_INTENTS:
                 logger.warning(f"Intent inválido retornado: {intent}. Usando 'general'.")
+                llm_gateway.record_parse_failure("intent_classifier")
                 intent = "general"
 
             logger.info(f"IntentClassifier: '{message[:30]}...' → {intent}")
@@ -9,6 +9,8 @@ import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
+from app.services.realtime import publish_intervention
+
 logger = logging.getLogger(__name__)
 
 
@@ -115,6 +117,14 @@ class InterventionService:
 
         logger.info(f"Human intervention started for conversation {conversation_id}")
 
+        await publish_intervention(
+            tenant_id,
+            conversation_id,
+            started=True,
+            intervention_id=intervention.id,
+            reason=intervention.reason
+        )
+
         return {
             "intervention_id": intervention.id,
             "started_at": now,
@@ -133,7 +143,9 @@ class InterventionService:
         """
         from app.database.models import Conversation, HumanIntervention
 
-        conversation = self.db.query(Conversation).first()
+        conversation = self.db.query(Conversation).filter(
+            Conversation.id == conversation_id
+        ).first()
 
         if not conversation:
             return False
@@ -162,6 +174,14 @@ class InterventionService:
         reason = "Auto-expired" if auto_ended else "Manual"
         logger.info(f"Human intervention ended for conversation {conversation_id} - {reason}")
 
+        await publish_intervention(
+            conversation.tenant_id,
+            conversation_id,
+            started=False,
+            intervention_id=intervention.id if intervention else None,
+            reason=reason
+        )
+
         return True
 
     async def log_message_during_intervention(
@@ -0,0 +1,616 @@
+"""
+LLM gateway - Ponto único de chamada aos modelos da OpenAI
+
+Todas as chamadas (agentes LangChain, MessageExtractor, IntentClassifier,
+Whisper) passam por aqui e registram:
+- Latência (histograma), chamadas por resultado (success, error, timeout,
+  rate_limited) e falhas de parse -> Prometheus, por agente e modelo
+- Tokens de prompt/completion (e quantos do prompt vieram do cache de
+  prompt do provedor) e custo estimado -> Prometheus e rollup
+  diário por tenant no Redis (llm:usage:{dia}:{tenant}), descarregado na
+  tabela llm_usage_daily pela task app.tasks.llm_usage
+
+O tenant vem de um contextvar definido no início do processamento da
+mensagem (llm_scope), então os agentes não precisam repassá-lo.
+
+Controle de cauda de latência (configurável em settings.LLM_*):
+- Prazo total por etapa (LLM_STAGE_TIMEOUTS), cobrindo hedge e fallback
+- Hedge: se a chamada passa do p95 recente daquele agente/modelo, uma
+  segunda idêntica é disparada e vale a primeira que responder
+- Circuit breaker por modelo e fallback para um modelo mais rápido
+  (ex.: gpt-4-turbo-preview -> gpt-4o-mini) em timeout, erro transitório
+  ou circuito aberto
+
+Cotas por tenant (app.services.llm_scheduler): cada chamada espera uma vaga
+na fila do tenant, com concorrência e tokens/minuto conforme o plano
+(Tenant.subscription_plan, via llm_scope). Acima da cota a chamada falha
+com LLMQuotaExceeded e o turno é marcado como descartado (LLMTurn.shed)
+para o webhook responder com uma mensagem de espera.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import logging
+
+import openai
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.core import metrics
+from app.services.llm_resilience import CircuitBreaker, CircuitOpenError, LatencyWindow
+from app.services.llm_scheduler import LLMQuotaExceeded, LLMScheduler, PlanQuota
+
+logger = logging.getLogger(__name__)
+
+_current_tenant: ContextVar[Optional[str]] = ContextVar("llm_tenant", default=None)
+_current_plan: ContextVar[Optional[str]] = ContextVar("llm_plan", default=None)
+# Turno atual (ver llm_turn)
+_current_turn: ContextVar[Optional["LLMTurn"]] = ContextVar("llm_turn", default=None)
+
+# Preço por 1M tokens (entrada, entrada em cache, saída) em USD, por prefixo
+# do modelo. Entrada em cache = prefixo do prompt servido pelo cache de
+# prompt do provedor; None quando o modelo não tem desconto de cache.
+# A ordem importa: prefixos mais específicos primeiro.
+MODEL_PRICING: List[Tuple[str, Tuple[float, Optional[float], float]]] = [
+    ("ft:gpt-4.1-mini", (0.80, 0.20, 3.20)),
+    ("ft:gpt-4o-mini", (0.30, 0.15, 1.20)),
+    ("gpt-4.1-mini", (0.40, 0.10, 1.60)),
+    ("gpt-4.1-nano", (0.10, 0.025, 0.40)),
+    ("gpt-4.1", (2.00, 0.50, 8.00)),
+    ("gpt-4o-mini", (0.15, 0.075, 0.60)),
+    ("gpt-4o", (2.50, 1.25, 10.00)),
+    ("gpt-4-turbo", (10.00, None, 30.00)),
+    ("gpt-3.5-turbo", (0.50, None, 1.50)),
+]
+
+WHISPER_PRICE_PER_MINUTE = 0.006
+
+USAGE_KEY_PREFIX = "llm:usage:"
+USAGE_KEY_TTL_SECONDS = 3 * 24 * 3600
+USAGE_TIMEZONE = ZoneInfo("America/Sao_Paulo")
+NO_TENANT = "_"
+
+# Com fallback configurado, a chamada principal fica com esta fração do
+# prazo da etapa e o fallback com o restante (no mínimo FALLBACK_MIN_SECONDS)
+PRIMARY_BUDGET_SHARE = 0.6
+FALLBACK_MIN_SECONDS = 3.0
+
+# Resultados contabilizados como erro no rollup (hedge_lost não é erro)
+ERROR_OUTCOMES = ("error", "timeout", "rate_limited")
+
+# (modelo efetivo, tokens de prompt, tokens de completion, custo,
+#  tokens de prompt servidos do cache do provedor)
+Usage = Tuple[str, int, int, float, int]
+
+
+@dataclass
+class LLMTurn:
+    # Chamadas de chat (não transcrição) feitas no turno
+    calls: int = 0
+    # Motivo do descarte (queue_full, wait_timeout) se alguma chamada
+    # do turno foi recusada pela cota do tenant
+    shed: Optional[str] = None
+
+
+@contextmanager
+def llm_scope(tenant_id, plan: Optional[str] = None):
+    """Associa as chamadas de LLM dentro do bloco a um tenant (e seu plano)"""
+    tenant_token = _current_tenant.set(str(tenant_id) if tenant_id else None)
+    plan_token = _current_plan.set(plan)
+    try:
+        yield
+    finally:
+        _current_plan.reset(plan_token)
+        _current_tenant.reset(tenant_token)
+
+
+def current_tenant() -> Optional[str]:
+    return _current_tenant.get()
+
+
+@contextmanager
+def llm_turn():
+    """
+    Acompanha as chamadas de LLM de um turno (uma mensagem do cliente)
+
+    Uso: with llm_turn() as turn: ...; ao sair, turn.calls tem o total de
+    chamadas de chat e turn.shed indica se a cota do tenant recusou alguma.
+    """
+    turn = LLMTurn()
+    token = _current_turn.set(turn)
+    try:
+        yield turn
+    finally:
+        _current_turn.reset(token)
+
+
+def _count_turn_call() -> None:
+    turn = _current_turn.get()
+    if turn is not None:
+        turn.calls += 1
+
+
+def resolve_plan(plan: Optional[str]) -> str:
+    """Chave de LLM_PLAN_QUOTAS do plano (sem plano = trial)"""
+    key = (plan or "trial").strip().lower()
+    return key if key in settings.LLM_PLAN_QUOTAS else settings.LLM_DEFAULT_PLAN
+
+
+def plan_quota(plan: str) -> PlanQuota:
+    return PlanQuota(**settings.LLM_PLAN_QUOTAS.get(plan, {}))
+
+
+def estimate_cost(
+    model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+) -> float:
+    """
+    Custo estimado em USD; 0 para modelos fora da tabela
+
+    cached_tokens é a parte de prompt_tokens servida do cache de prompt.
+    """
+    for prefix, (input_price, cached_price, output_price) in MODEL_PRICING:
+        if model.startswith(prefix):
+            if cached_price is None:
+                cached_price = input_price
+            uncached_tokens = prompt_tokens - cached_tokens
+            return (
+                uncached_tokens * input_price
+                + cached_tokens * cached_price
+                + completion_tokens * output_price
+            ) / 1_000_000
+    return 0.0
+
+
+def _outcome_for(error: Exception) -> str:
+    if isinstance(error, (asyncio.TimeoutError, openai.APITimeoutError)):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    return "error"
+
+
+def _is_transient(error: Exception) -> bool:
+    """Erros que justificam tentar outro modelo (400/401 se repetiriam)"""
+    if isinstance(error, (
+        CircuitOpenError,
+        asyncio.TimeoutError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+    )):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+class LLMGateway:
+    """Cliente OpenAI compartilhado + instrumentação e resiliência das chamadas"""
+
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+        self._background: set = set()
+        self._latency = LatencyWindow()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self.scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_wait=settings.LLM_QUEUE_MAX_WAIT_SECONDS
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        # Um único cliente (e pool HTTP) para o processo inteiro. Só um
+        # retry interno: prazo, hedge e fallback são tratados aqui.
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL,
+                max_retries=1
+            )
+        return self._client
+
+    async def chat_completion(self, agent: str, **kwargs) -> Any:
+        """
+        chat.completions.create instrumentado
+
+        Args:
+            agent: Nome do agente/etapa (label das métricas)
+            **kwargs: Parâmetros repassados à API (model, messages, tools...)
+        """
+        model = kwargs.get("model", "unknown")
+        _count_turn_call()
+
+        def call(target_model: str) -> Awaitable[Any]:
+            return self.client.chat.completions.create(**{**kwargs, "model": target_model})
+
+        def usage_of(response, target_model: str) -> Usage:
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached_tokens = getattr(details, "cached_tokens", 0) or 0
+            return (
+                target_model, prompt_tokens, completion_tokens,
+                estimate_cost(target_model, prompt_tokens, completion_tokens, cached_tokens),
+                cached_tokens
+            )
+
+        return await self._execute(agent, model, call, usage_of)
+
+    async def generate(self, agent: str, llm, messages: List, **kwargs) -> str:
+        """
+        Chamada via LangChain (ChatOpenAI) instrumentada
+
+        Usa agenerate() em vez de ainvoke() porque só o LLMResult traz
+        o token_usage da resposta. No fallback o modelo é trocado por
+        kwarg, que o ChatOpenAI repassa à API.
+        """
+        result = await self._generate_result(agent, llm, messages, **kwargs)
+        return result.generations[0][0].text
+
+    async def generate_tool_call(
+        self, agent: str, llm, messages: List, tool: Dict[str, Any], **kwargs
+    ) -> Optional[str]:
+        """
+        Chamada via LangChain forçando uma tool call (saída estruturada)
+
+        Returns:
+            Argumentos (JSON) da tool call, ou None se o modelo respondeu texto
+        """
+        kwargs = {
+            **kwargs,
+            "tools": [tool],
+            "tool_choice": {"type": "function", "function": {"name": tool["function"]["name"]}},
+        }
+        result = await self._generate_result(agent, llm, messages, **kwargs)
+
+        message = getattr(result.generations[0][0], "message", None)
+        tool_calls = (getattr(message, "additional_kwargs", None) or {}).get("tool_calls") or []
+        if not tool_calls:
+            return None
+        return tool_calls[0].get("function", {}).get("arguments")
+
+    async def _generate_result(self, agent: str, llm, messages: List, **kwargs) -> Any:
+        model = getattr(llm, "model_name", "unknown")
+        _count_turn_call()
+
+        def call(target_model: str) -> Awaitable[Any]:
+            if target_model != model:
+                return llm.agenerate([messages], **{**kwargs, "model": target_model})
+            return llm.agenerate([messages], **kwargs)
+
+        def usage_of(result, target_model: str) -> Usage:
+            usage = (result.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0) or 0
+            completion_tokens = usage.get("completion_tokens", 0) or 0
+            details = usage.get("prompt_tokens_details") or {}
+            cached_tokens = details.get("cached_tokens", 0) or 0
+            return (
+                target_model, prompt_tokens, completion_tokens,
+                estimate_cost(target_model, prompt_tokens, completion_tokens, cached_tokens),
+                cached_tokens
+            )
+
+        return await self._execute(agent, model, call, usage_of)
+
+    async def transcribe(self, agent: str, audio_seconds: float = 0, **kwargs) -> Any:
+        """
+        audio.transcriptions.create instrumentado (custo por minuto de áudio)
+
+        Sem hedge: uma transcrição duplicada cobra o áudio inteiro de novo.
+        O arquivo deve ir como (nome, bytes, mimetype), que pode ser reenviado
+        no fallback (um handle aberto já estaria consumido).
+        """
+        model = kwargs.get("model", "whisper-1")
+
+        def call(target_model: str) -> Awaitable[Any]:
+            return self.client.audio.transcriptions.create(**{**kwargs, "model": target_model})
+
+        def usage_of(response, target_model: str) -> Usage:
+            return target_model, 0, 0, (audio_seconds / 60) * WHISPER_PRICE_PER_MINUTE, 0
+
+        return await self._execute(agent, model, call, usage_of, hedge=False)
+
+    def record_parse_failure(self, agent: str) -> None:
+        """Resposta recebida mas inutilizável (JSON inválido, intent desconhecido...)"""
+        metrics.llm_parse_failures.labels(agent=agent).inc()
+        self._schedule_rollup(agent, "-", {"parse_failures": 1})
+
+    # ------------------------------------------------------------------
+    # Prazo, hedge, circuit breaker e fallback
+    # ------------------------------------------------------------------
+
+    def stage_timeout(self, agent: str) -> float:
+        return settings.LLM_STAGE_TIMEOUTS.get(agent, settings.LLM_DEFAULT_TIMEOUT_SECONDS)
+
+    def fallback_model(self, agent: str, model: str) -> Optional[str]:
+        if agent in settings.LLM_AGENT_FALLBACK_MODELS:
+            fallback = settings.LLM_AGENT_FALLBACK_MODELS[agent]
+        else:
+            fallback = settings.LLM_FALLBACK_MODELS.get(model)
+        return fallback if fallback and fallback != model else None
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(
+                failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS
+            )
+        return self._breakers[model]
+
+    async def _execute(
+        self,
+        agent: str,
+        model: str,
+        call: Callable[[str], Awaitable[Any]],
+        usage_of: Callable[[Any, str], Usage],
+        hedge: bool = True
+    ) -> Any:
+        """Vaga na fila do tenant, depois a chamada dentro do prazo da etapa"""
+        tenant = current_tenant() or NO_TENANT
+        plan = resolve_plan(_current_plan.get())
+        deadline = self.stage_timeout(agent)
+        queued = time.perf_counter()
+
+        try:
+            # Sobra ao menos FALLBACK_MIN_SECONDS do prazo para a chamada em si
+            await self.scheduler.acquire(
+                tenant, plan_quota(plan), timeout=max(deadline - FALLBACK_MIN_SECONDS, 0.0)
+            )
+        except LLMQuotaExceeded as e:
+            metrics.llm_shed.labels(agent=agent, plan=plan, reason=e.reason).inc()
+            logger.warning(f"LLM call shed agent={agent} tenant={tenant} plan={plan} reason={e.reason}")
+            turn = _current_turn.get()
+            if turn is not None:
+                turn.shed = e.reason
+            raise
+
+        waited = time.perf_counter() - queued
+        metrics.llm_queue_wait.labels(plan=plan).observe(waited)
+        try:
+            # O tempo na fila sai do prazo da etapa
+            return await self._call_with_fallback(
+                agent, model, call, usage_of, max(deadline - waited, FALLBACK_MIN_SECONDS), hedge
+            )
+        finally:
+            self.scheduler.release(tenant)
+
+    async def _call_with_fallback(
+        self,
+        agent: str,
+        model: str,
+        call: Callable[[str], Awaitable[Any]],
+        usage_of: Callable[[Any, str], Usage],
+        deadline: float,
+        hedge: bool
+    ) -> Any:
+        """Chamada principal dentro do prazo, com fallback se houver"""
+        fallback = self.fallback_model(agent, model)
+        started = time.perf_counter()
+
+        budget = deadline * PRIMARY_BUDGET_SHARE if fallback else deadline
+        try:
+            return await self._guarded_call(agent, model, call, usage_of, budget, hedge)
+        except Exception as e:
+            if not fallback or not _is_transient(e):
+                raise
+            reason = "circuit_open" if isinstance(e, CircuitOpenError) else _outcome_for(e)
+
+        metrics.llm_fallbacks.labels(
+            agent=agent, model=model, fallback_model=fallback, reason=reason
+        ).inc()
+        logger.warning(f"LLM fallback agent={agent} {model} -> {fallback} reason={reason}")
+
+        remaining = max(deadline - (time.perf_counter() - started), FALLBACK_MIN_SECONDS)
+        return await self._guarded_call(agent, fallback, call, usage_of, remaining, hedge=False)
+
+    async def _guarded_call(
+        self,
+        agent: str,
+        model: str,
+        call: Callable[[str], Awaitable[Any]],
+        usage_of: Callable[[Any, str], Usage],
+        budget: float,
+        hedge: bool
+    ) -> Any:
+        breaker = self._breaker(model)
+        if not breaker.allow():
+            raise CircuitOpenError(model)
+
+        try:
+            response = await self._hedged_call(agent, model, call, usage_of, budget, hedge)
+        except Exception as e:
+            if not _is_transient(e):
+                # O modelo respondeu (ex.: 400); não conta contra o circuito
+                breaker.record_success()
+            elif breaker.record_failure():
+                metrics.llm_circuit_opened.labels(model=model).inc()
+                logger.warning(
+                    f"LLM circuit opened for {model} after {breaker.failures} failures"
+                )
+            metrics.llm_circuit_state.labels(model=model).set(
+                1 if breaker.state == CircuitBreaker.OPEN else 0
+            )
+            raise
+
+        breaker.record_success()
+        metrics.llm_circuit_state.labels(model=model).set(0)
+        return response
+
+    def _hedge_delay(self, agent: str, model: str, budget: float) -> Optional[float]:
+        if not settings.LLM_HEDGING_ENABLED:
+            return None
+        p95 = self._latency.percentile(agent, model)
+        if p95 is None:
+            return None
+        delay = max(p95, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+        # Hedge disparado perto do prazo só gasta tokens
+        return delay if delay < budget * 0.8 else None
+
+    async def _hedged_call(
+        self,
+        agent: str,
+        model: str,
+        call: Callable[[str], Awaitable[Any]],
+        usage_of: Callable[[Any, str], Usage],
+        budget: float,
+        hedge: bool
+    ) -> Any:
+        """
+        Chamada com prazo; passado o p95 dispara uma cópia e usa a
+        primeira resposta. A tentativa que sobra é cancelada.
+        """
+        started = time.perf_counter()
+        # Como registrar tentativas canceladas: perdedora do hedge ou timeout
+        cancel_outcome = {"value": "hedge_lost"}
+
+        async def attempt() -> Any:
+            attempt_started = time.perf_counter()
+            try:
+                response = await call(model)
+            except asyncio.CancelledError:
+                self._record(agent, model, cancel_outcome["value"], attempt_started)
+                raise
+            except Exception as e:
+                self._record(agent, model, _outcome_for(e), attempt_started)
+                raise
+
+            effective_model, prompt_tokens, completion_tokens, cost, cached_tokens = usage_of(
+                response, model
+            )
+            self._latency.observe(agent, model, time.perf_counter() - attempt_started)
+            self._record(
+                agent, effective_model, "success", attempt_started,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                cost=cost,
+                cached_tokens=cached_tokens
+            )
+            return response
+
+        primary = asyncio.create_task(attempt())
+        pending = {primary}
+        hedge_task = None
+        last_error: Optional[BaseException] = None
+
+        try:
+            delay = self._hedge_delay(agent, model, budget) if hedge else None
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done:
+                    hedge_task = asyncio.create_task(attempt())
+                    pending.add(hedge_task)
+                    metrics.llm_hedges.labels(agent=agent, model=model, result="launched").inc()
+
+            while pending:
+                remaining = budget - (time.perf_counter() - started)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(remaining, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    cancel_outcome["value"] = "timeout"
+                    raise asyncio.TimeoutError(f"LLM call exceeded {budget:.1f}s ({agent}/{model})")
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            metrics.llm_hedges.labels(agent=agent, model=model, result="won").inc()
+                        return task.result()
+                    last_error = task.exception()
+
+            raise last_error
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def _record(
+        self,
+        agent: str,
+        model: str,
+        outcome: str,
+        started: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cost: float = 0.0,
+        cached_tokens: int = 0
+    ) -> None:
+        elapsed = time.perf_counter() - started
+
+        if prompt_tokens or completion_tokens:
+            # Consumo real conta na cota de tokens/minuto do tenant
+            self.scheduler.record_tokens(current_tenant() or NO_TENANT, prompt_tokens + completion_tokens)
+
+        metrics.llm_call_duration.labels(agent=agent, model=model, outcome=outcome).observe(elapsed)
+        metrics.llm_calls.labels(agent=agent, model=model, outcome=outcome).inc()
+        if prompt_tokens:
+            metrics.llm_tokens.labels(agent=agent, model=model, kind="prompt").inc(prompt_tokens)
+        if completion_tokens:
+            metrics.llm_tokens.labels(agent=agent, model=model, kind="completion").inc(completion_tokens)
+        if cached_tokens:
+            # Subconjunto de "prompt": não somar os dois
+            metrics.llm_tokens.labels(agent=agent, model=model, kind="cached").inc(cached_tokens)
+        if cost:
+            metrics.llm_cost.labels(agent=agent, model=model).inc(cost)
+
+        logger.info(
+            f"LLM call agent={agent} model={model} outcome={outcome} "
+            f"latency={elapsed * 1000:.0f}ms tokens={prompt_tokens}+{completion_tokens} "
+            f"cached={cached_tokens} "
+            f"cost=${cost:.6f} tenant={current_tenant() or '-'}"
+        )
+
+        self._schedule_rollup(agent, model, {
+            "calls": 1,
+            "errors": 1 if outcome in ERROR_OUTCOMES else 0,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "cost_usd": cost,
+            "latency_ms": int(elapsed * 1000),
+        })
+
+    def _schedule_rollup(self, agent: str, model: str, values: Dict[str, float]) -> None:
+        # Fora do caminho da resposta: o cliente não espera pelo Redis
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self._rollup(current_tenant() or NO_TENANT, agent, model, values)
+            )
+        except RuntimeError:
+            return
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _rollup(self, tenant: str, agent: str, model: str, values: Dict[str, float]) -> None:
+        try:
+            from app.core.cache import redis_client
+
+            day = datetime.now(USAGE_TIMEZONE).date().isoformat()
+            key = f"{USAGE_KEY_PREFIX}{day}:{tenant}"
+
+            pipe = redis_client.pipeline(transaction=False)
+            for metric, value in values.items():
+                if not value:
+                    continue
+                field = f"{agent}|{model}|{metric}"
+                if isinstance(value, float):
+                    pipe.hincrbyfloat(key, field, value)
+                else:
+                    pipe.hincrby(key, field, value)
+            pipe.expire(key, USAGE_KEY_TTL_SECONDS)
+            await pipe.execute()
+
+        except Exception as e:
+            logger.debug(f"LLM usage rollup skipped: {str(e)}")
+
+
+# Global instance
+llm_gateway = LLMGateway()
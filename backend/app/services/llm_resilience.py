@@ -0,0 +1,109 @@
+"""
+LLM resilience - Peças de controle de cauda de latência do LLM gateway
+
+- LatencyWindow: janela móvel das latências de sucesso por (agente, modelo),
+  usada para calcular o p95 que dispara a requisição duplicada (hedge)
+- CircuitBreaker: por modelo; após falhas seguidas o modelo fica "aberto"
+  por um tempo e as chamadas vão direto para o modelo de fallback
+
+Sem dependências externas para poder ser testado isoladamente.
+"""
+import math
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+
+class LatencyWindow:
+    """Últimas N latências (segundos) de chamadas bem-sucedidas"""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self.size = size
+        self.min_samples = min_samples
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+
+    def observe(self, agent: str, model: str, seconds: float) -> None:
+        key = (agent, model)
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self.size)
+        self._samples[key].append(seconds)
+
+    def percentile(self, agent: str, model: str, pct: float = 95) -> Optional[float]:
+        """Percentil da janela; None enquanto não há amostras suficientes"""
+        samples = self._samples.get((agent, model))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+
+class CircuitOpenError(Exception):
+    """Modelo com circuito aberto e sem fallback configurado"""
+
+    def __init__(self, model: str):
+        super().__init__(f"Circuit open for model {model}")
+        self.model = model
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um modelo
+
+    closed -> open após FAILURE_THRESHOLD falhas seguidas; open ->
+    half_open depois de reset_timeout segundos, quando uma única chamada
+    de teste é liberada: sucesso fecha o circuito, falha reabre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Se uma chamada a este modelo pode ser feita agora"""
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        # half_open: só uma chamada de teste por vez
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> bool:
+        """Registra a falha; True se o circuito acabou de abrir"""
+        self._probe_in_flight = False
+        self.failures += 1
+
+        if self.state == self.HALF_OPEN or (
+            self.state == self.CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.state = self.OPEN
+            self._opened_at = self._clock()
+            return True
+        return False
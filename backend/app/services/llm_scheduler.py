@@ -0,0 +1,243 @@
+"""
+LLM scheduler - Cotas por tenant e fila justa na frente do LLM gateway
+
+Toda chamada do gateway (agentes, extractor, classifier, Whisper) pede uma
+vaga aqui antes de ir ao provedor:
+
+- Vagas globais (max_concurrency) divididas entre tenants
+- Por tenant, conforme o plano: chamadas simultâneas e tokens por minuto
+  (janela móvel de 60s com os tokens efetivamente consumidos)
+- Sem vaga, a chamada entra na fila do tenant; quando uma vaga abre, o
+  próximo tenant é escolhido por round-robin ponderado pelo peso do plano
+  (smooth weighted round-robin), então um tenant com a fila cheia não
+  impede os outros de serem atendidos
+- Fila do tenant acima de max_queue, ou espera maior que o limite:
+  LLMQuotaExceeded (o turno responde com uma mensagem de "aguarde")
+
+Os limites valem por processo: com N workers o total é N vezes maior.
+Sem dependências externas para poder ser testado isoladamente.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+TOKEN_WINDOW_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class PlanQuota:
+    weight: int = 1
+    max_concurrency: int = 4
+    tokens_per_minute: int = 100_000
+    max_queue: int = 20
+
+
+class LLMQuotaExceeded(Exception):
+    """Chamada descartada: fila do tenant cheia ou espera longa demais"""
+
+    def __init__(self, tenant: str, reason: str):
+        super().__init__(f"LLM quota exceeded for tenant {tenant} ({reason})")
+        self.tenant = tenant
+        self.reason = reason
+
+
+@dataclass
+class _TenantState:
+    quota: PlanQuota
+    running: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    tokens: Deque[Tuple[float, int]] = field(default_factory=deque)
+    current_weight: int = 0
+
+
+class LLMScheduler:
+    """Fila de chamadas de LLM com cotas por tenant"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_wait: float = 10.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self._clock = clock
+        self._running = 0
+        self._tenants: Dict[str, _TenantState] = {}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._wakeup_at = 0.0
+        self._wakeup_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def acquire(self, tenant: str, quota: PlanQuota, timeout: Optional[float] = None) -> None:
+        """
+        Espera uma vaga para o tenant
+
+        Raises:
+            LLMQuotaExceeded: fila cheia (queue_full) ou sem vaga dentro
+                do prazo (wait_timeout)
+        """
+        state = self._state(tenant, quota)
+
+        if not state.waiters and self._running < self.max_concurrency and self._eligible(state):
+            self._start(state)
+            return
+
+        if len(state.waiters) >= quota.max_queue:
+            raise LLMQuotaExceeded(tenant, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        self._schedule_wakeup()
+
+        wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        try:
+            await asyncio.wait({waiter}, timeout=wait)
+        except asyncio.CancelledError:
+            self._abandon(tenant, state, waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(tenant, state, waiter)
+            raise LLMQuotaExceeded(tenant, "wait_timeout")
+
+    def release(self, tenant: str) -> None:
+        state = self._tenants.get(tenant)
+        if state is None or state.running == 0:
+            return
+        state.running -= 1
+        self._running -= 1
+        self._dispatch()
+        self._forget_if_idle(tenant, state)
+
+    def record_tokens(self, tenant: str, tokens: int) -> None:
+        """Tokens consumidos por uma chamada (conta na janela de 1 minuto)"""
+        state = self._tenants.get(tenant)
+        if state is not None and tokens:
+            state.tokens.append((self._clock(), tokens))
+
+    @asynccontextmanager
+    async def slot(self, tenant: str, quota: PlanQuota, timeout: Optional[float] = None):
+        await self.acquire(tenant, quota, timeout)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    def tokens_in_window(self, tenant: str) -> int:
+        state = self._tenants.get(tenant)
+        if state is None:
+            return 0
+        self._expire_tokens(state)
+        return sum(tokens for _, tokens in state.tokens)
+
+    def queued(self, tenant: str) -> int:
+        state = self._tenants.get(tenant)
+        return len(state.waiters) if state else 0
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _state(self, tenant: str, quota: PlanQuota) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _TenantState(quota=quota)
+        else:
+            # O plano pode ter mudado desde a última chamada
+            state.quota = quota
+        return state
+
+    def _expire_tokens(self, state: _TenantState) -> None:
+        limit = self._clock() - TOKEN_WINDOW_SECONDS
+        while state.tokens and state.tokens[0][0] <= limit:
+            state.tokens.popleft()
+
+    def _eligible(self, state: _TenantState) -> bool:
+        if state.running >= state.quota.max_concurrency:
+            return False
+        self._expire_tokens(state)
+        return sum(tokens for _, tokens in state.tokens) < state.quota.tokens_per_minute
+
+    def _start(self, state: _TenantState) -> None:
+        state.running += 1
+        self._running += 1
+
+    def _pick(self) -> Optional[_TenantState]:
+        """Smooth weighted round-robin entre tenants com fila e cota livre"""
+        candidates = []
+        for state in self._tenants.values():
+            while state.waiters and state.waiters[0].done():
+                state.waiters.popleft()
+            if state.waiters and self._eligible(state):
+                candidates.append(state)
+
+        if not candidates:
+            return None
+
+        total = sum(state.quota.weight for state in candidates)
+        for state in candidates:
+            state.current_weight += state.quota.weight
+        chosen = max(candidates, key=lambda state: state.current_weight)
+        chosen.current_weight -= total
+        return chosen
+
+    def _dispatch(self) -> None:
+        while self._running < self.max_concurrency:
+            state = self._pick()
+            if state is None:
+                break
+            waiter = state.waiters.popleft()
+            self._start(state)
+            waiter.set_result(None)
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """Acorda a fila quando tokens antigos saem da janela de 1 minuto"""
+        next_expiry = None
+        for state in self._tenants.values():
+            if state.waiters and state.tokens and state.running < state.quota.max_concurrency:
+                expiry = state.tokens[0][0] + TOKEN_WINDOW_SECONDS
+                next_expiry = expiry if next_expiry is None else min(next_expiry, expiry)
+
+        if next_expiry is None:
+            return
+        loop = asyncio.get_running_loop()
+        # Timer de outro event loop (ex.: asyncio.run por task) não dispara mais
+        if self._wakeup is not None and self._wakeup_loop is loop:
+            if self._wakeup_at <= next_expiry:
+                return
+            self._wakeup.cancel()
+
+        self._wakeup_at = next_expiry
+        self._wakeup_loop = loop
+        self._wakeup = loop.call_later(
+            max(next_expiry - self._clock(), 0.01), self._on_wakeup
+        )
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def _abandon(self, tenant: str, state: _TenantState, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # A vaga foi concedida junto com o cancelamento/timeout: devolve
+            self.release(tenant)
+            return
+        waiter.cancel()
+        try:
+            state.waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._forget_if_idle(tenant, state)
+
+    def _forget_if_idle(self, tenant: str, state: _TenantState) -> None:
+        self._expire_tokens(state)
+        if not state.running and not state.waiters and not state.tokens:
+            self._tenants.pop(tenant, None)
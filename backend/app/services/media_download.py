@@ -0,0 +1,186 @@
+"""
+Media download - Download de mídia do WhatsApp com teto de tamanho
+
+Um único aiohttp.ClientSession por processo (pool de conexões reaproveitado
+entre downloads) e leitura em streaming: o download é abortado assim que
+passa de max_bytes, antes até de começar quando o Content-Length já
+denuncia. Mídia grande ou maliciosa nunca ocupa mais que o teto em memória.
+
+Pelo endpoint de base64 da Evolution (chat/getBase64FromMediaMessage) o
+JSON de resposta também é lido em pedaços e o campo "base64" decodificado
+conforme chega (Base64StreamDecoder), sem montar o JSON inteiro.
+"""
+import asyncio
+import base64
+import logging
+import re
+from typing import Dict, Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+# Campos do JSON da Evolution além do base64 (mimetype, fileName, size...)
+JSON_OVERHEAD_BYTES = 64 * 1024
+
+_BASE64_FIELD = re.compile(rb'"base64"\s*:\s*"')
+_FIELD_LOOKBEHIND = 32
+
+
+class MediaDownloadError(Exception):
+    """Mídia indisponível (HTTP != 200, resposta sem base64, ...)"""
+
+
+class MediaTooLarge(MediaDownloadError):
+    """A mídia passa do teto; nada além do teto foi lido"""
+
+    def __init__(self, max_bytes: int, size: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.size = size
+        detail = f"{size} bytes" if size is not None else "more"
+        super().__init__(f"Media too large: {detail} > {max_bytes} bytes")
+
+
+def base64_decoded_size(encoded: str) -> int:
+    """Tamanho (aproximado para cima) do conteúdo de uma string base64"""
+    return len(encoded) * 3 // 4
+
+
+class Base64StreamDecoder:
+    """
+    Decodifica, em pedaços, o valor do campo "base64" de um JSON em streaming
+
+    feed() recebe os bytes crus da resposta na ordem; o resultado acumulado
+    fica em .data e passar de max_bytes levanta MediaTooLarge na hora.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.data = bytearray()
+        self.done = False
+        self._scan = b""
+        self._inside = False
+        self._pending = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+
+        if not self._inside:
+            self._scan += chunk
+            match = _BASE64_FIELD.search(self._scan)
+            if not match:
+                # Só o fim pode conter o começo do nome do campo
+                self._scan = self._scan[-_FIELD_LOOKBEHIND:]
+                return
+            chunk = self._scan[match.end():]
+            self._scan = b""
+            self._inside = True
+
+        end = chunk.find(b'"')
+        if end != -1:
+            chunk = chunk[:end]
+            self.done = True
+
+        self._decode(self._pending + chunk)
+
+    def _decode(self, encoded: bytes) -> None:
+        # Escapes de JSON possíveis dentro de base64: "\/" e quebras de linha.
+        # Uma barra no fim pode ser metade de um escape; espera o resto
+        if not self.done and encoded.endswith(b"\\"):
+            encoded, tail = encoded[:-1], b"\\"
+        else:
+            tail = b""
+        encoded = encoded.replace(b"\\/", b"/").replace(b"\\n", b"").replace(b"\\r", b"")
+
+        usable = len(encoded) if self.done else len(encoded) - len(encoded) % 4
+        self._pending = encoded[usable:] + tail
+        if usable:
+            self.data += base64.b64decode(encoded[:usable])
+        if len(self.data) > self.max_bytes:
+            raise MediaTooLarge(self.max_bytes)
+
+
+class MediaDownloader:
+    """Downloads com sessão HTTP compartilhada e teto de bytes"""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _client(self) -> aiohttp.ClientSession:
+        # Criada no primeiro uso, dentro do event loop que vai usá-la
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.MEDIA_DOWNLOAD_TIMEOUT_SECONDS),
+                connector=aiohttp.TCPConnector(limit=settings.MEDIA_DOWNLOAD_MAX_CONNECTIONS)
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def _check_length(response: aiohttp.ClientResponse, limit: int, max_bytes: int) -> None:
+        if response.status != 200:
+            raise MediaDownloadError(f"Media download failed: HTTP {response.status}")
+        if response.content_length is not None and response.content_length > limit:
+            raise MediaTooLarge(max_bytes, response.content_length)
+
+    async def download(self, url: str, max_bytes: int, headers: Optional[Dict[str, str]] = None) -> bytes:
+        """
+        Corpo da resposta de um GET, com no máximo max_bytes
+
+        Raises:
+            MediaTooLarge, MediaDownloadError, aiohttp.ClientError
+        """
+        async with self._client().get(url, headers=headers) as response:
+            self._check_length(response, max_bytes, max_bytes)
+
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                body += chunk
+                if len(body) > max_bytes:
+                    raise MediaTooLarge(max_bytes)
+            return bytes(body)
+
+    async def evolution_media(self, instance_name: str, message_id: str, max_bytes: int) -> bytes:
+        """
+        Mídia decifrada de uma mensagem, pelo endpoint de base64 da Evolution
+
+        Raises:
+            MediaTooLarge, MediaDownloadError, aiohttp.ClientError
+        """
+        base_url = settings.EVOLUTION_API_URL.rstrip('/')
+        url = f"{base_url}/chat/getBase64FromMediaMessage/{instance_name}"
+        payload = {"message": {"key": {"id": message_id}}, "convertToMp4": False}
+        # Base64 cresce 4/3 sobre o conteúdo
+        limit = max_bytes * 4 // 3 + JSON_OVERHEAD_BYTES
+
+        async with self._client().post(url, json=payload, headers={"apikey": settings.EVOLUTION_API_KEY}) as response:
+            self._check_length(response, limit, max_bytes)
+
+            decoder = Base64StreamDecoder(max_bytes)
+            received = 0
+            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                received += len(chunk)
+                if received > limit:
+                    raise MediaTooLarge(max_bytes)
+                decoder.feed(chunk)
+                if decoder.done:
+                    break
+
+        if not decoder.done:
+            raise MediaDownloadError("Evolution media response without base64")
+        return bytes(decoder.data)
+
+
+# Global instance
+media_downloader = MediaDownloader()
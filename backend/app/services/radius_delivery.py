@@ -30,7 +30,10 @@ class RadiusDeliveryService:
     def __init__(self, db: Session):
         self.db = db
         self.cache_service = AddressCacheService(db)
-        self.gmaps = googlemaps.Client(key=settings.GOOGLE_MAPS_API_KEY)
+        self.gmaps = googlemaps.Client(
+            key=settings.GOOGLE_MAPS_API_KEY,
+            base_url=settings.GOOGLE_MAPS_BASE_URL
+        )
 
     async def validate_address(
         self,
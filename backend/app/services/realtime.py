@@ -0,0 +1,530 @@
+"""
+Realtime service - Eventos de domínio enviados ao dashboard via WebSocket
+
+Os caminhos de escrita (webhook, agentes, endpoints do dashboard) publicam
+eventos depois do commit. O dashboard aplica os deltas recebidos em vez de
+refazer as consultas, então não há polling durante o expediente.
+
+Com vários workers do uvicorn, o evento é publicado no Redis
+(canal dashboard:{tenant_id}) e cada worker que tem dashboards daquele
+tenant conectados o entrega aos seus sockets locais. Cada socket tem uma
+fila própria e uma task de envio, então um navegador travado não atrasa
+os demais: se a fila enche, o socket é desconectado e o cliente
+ressincroniza ao reconectar.
+
+Formato da mensagem enviada ao navegador:
+    {
+        "type": "order_created",
+        "data": {...},
+        "summary_delta": {"orders_today": 1, "pending_orders": 1},
+        "timestamp": "2025-11-10T14:00:00"
+    }
+"""
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+import logging
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento publicados
+ORDER_CREATED = "order_created"
+ORDER_STATUS_CHANGED = "order_status_changed"
+MESSAGE_RECEIVED = "message_received"
+MESSAGE_SENT = "message_sent"
+CONVERSATION_STARTED = "conversation_started"
+CUSTOMER_CREATED = "customer_created"
+INTERVENTION_STARTED = "intervention_started"
+INTERVENTION_ENDED = "intervention_ended"
+
+# Status que contam como receita no resumo do dashboard
+REVENUE_STATUSES = ("completed", "delivered")
+
+# Tamanho máximo do texto de mensagem enviado no evento
+MESSAGE_PREVIEW_CHARS = 200
+
+CHANNEL_PREFIX = "dashboard:"
+STATS_KEY = "realtime:workers"
+
+
+def tenant_channel(tenant_id) -> str:
+    return f"{CHANNEL_PREFIX}{tenant_id}"
+
+
+class SocketConnection:
+    """
+    Um dashboard conectado neste worker
+
+    Mensagens entram numa fila limitada e são enviadas por uma task
+    própria, com timeout por envio.
+    """
+
+    QUEUE_SIZE = 100
+    SEND_TIMEOUT_SECONDS = 5.0
+    SLOW_CONSUMER_CLOSE_CODE = 1013  # Try Again Later
+
+    def __init__(self, websocket: WebSocket, tenant_id: str, manager: "ConnectionManager"):
+        self.websocket = websocket
+        self.tenant_id = tenant_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        self.connected_at = time.time()
+        self.closed = False
+        self._manager = manager
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._sender = asyncio.create_task(self._send_loop())
+
+    def enqueue(self, payload: Any, published_at: Optional[float] = None) -> bool:
+        """Enfileira sem bloquear; False se o socket não acompanha o ritmo"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait((published_at or time.time(), payload))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                published_at, payload = await self.queue.get()
+                if isinstance(payload, str):
+                    send = self.websocket.send_text(payload)
+                else:
+                    send = self.websocket.send_json(payload)
+                await asyncio.wait_for(send, timeout=self.SEND_TIMEOUT_SECONDS)
+                self._manager.record_send_lag(time.time() - published_at)
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            logger.warning(f"Dashboard socket send timed out for tenant {self.tenant_id}")
+            await self.close(self.SLOW_CONSUMER_CLOSE_CODE)
+        except Exception:
+            # Socket fechado pelo navegador
+            self.closed = True
+            self._manager.forget(self)
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._sender and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        self._manager.forget(self)
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+
+
+class ConnectionManager:
+    """
+    Gerencia conexões WebSocket para dashboard real-time
+
+    Mantém os sockets locais deste worker e a assinatura Redis por tenant:
+    o worker assina dashboard:{tenant_id} quando o primeiro dashboard do
+    tenant conecta e cancela quando o último sai.
+    """
+
+    STATS_INTERVAL_SECONDS = 10
+    STATS_STALE_SECONDS = 30
+    LAG_SMOOTHING = 0.2
+
+    def __init__(self):
+        self.active_connections: Dict[str, Set[SocketConnection]] = {}
+        self.worker_id = f"{os.getpid()}"
+        self.dropped_events = 0
+        self.slow_consumer_disconnects = 0
+        self.delivered_events = 0
+        self.send_lag_avg_ms = 0.0
+        self.send_lag_max_ms = 0.0
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._stats_task: Optional[asyncio.Task] = None
+        self._redis_ok = False
+
+    # ------------------------------------------------------------------
+    # Sockets locais
+    # ------------------------------------------------------------------
+
+    async def connect(self, websocket: WebSocket, tenant_id: str) -> SocketConnection:
+        await websocket.accept()
+        connection = SocketConnection(websocket, tenant_id, self)
+        connection.start()
+
+        first = not self.active_connections.get(tenant_id)
+        self.active_connections.setdefault(tenant_id, set()).add(connection)
+        if first:
+            await self._subscribe(tenant_id)
+
+        return connection
+
+    async def disconnect(self, connection: SocketConnection) -> None:
+        await connection.close()
+        await self._maybe_unsubscribe(connection.tenant_id)
+
+    def forget(self, connection: SocketConnection) -> None:
+        connections = self.active_connections.get(connection.tenant_id)
+        if connections:
+            connections.discard(connection)
+
+    def has_connections(self, tenant_id: str) -> bool:
+        return bool(self.active_connections.get(tenant_id))
+
+    def deliver_local(self, tenant_id: str, message: dict, published_at: Optional[float] = None) -> None:
+        """
+        Entrega um evento aos sockets deste worker sem aguardar o envio
+
+        Socket com fila cheia perdeu eventos e teria o resumo errado:
+        é desconectado para que o navegador reconecte e ressincronize.
+        """
+        for connection in list(self.active_connections.get(tenant_id, ())):
+            if connection.closed:
+                continue
+            if connection.enqueue(message, published_at):
+                self.delivered_events += 1
+                continue
+
+            self.dropped_events += 1
+            self.slow_consumer_disconnects += 1
+            logger.warning(f"Disconnecting slow dashboard consumer for tenant {tenant_id}")
+            asyncio.create_task(connection.close(SocketConnection.SLOW_CONSUMER_CLOSE_CODE))
+
+    async def broadcast_to_tenant(self, tenant_id: str, message: dict):
+        """Envia mensagem para todos os dashboards do tenant, em qualquer worker"""
+        published_at = time.time()
+
+        if self._redis_ok:
+            try:
+                from app.core.cache import redis_client
+
+                await redis_client.publish(
+                    tenant_channel(tenant_id),
+                    json.dumps({"message": message, "published_at": published_at}, default=str)
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Redis publish failed, delivering locally only: {str(e)}")
+
+        self.deliver_local(tenant_id, message, published_at)
+
+    def record_send_lag(self, lag_seconds: float) -> None:
+        lag_ms = max(0.0, lag_seconds * 1000)
+        self.send_lag_avg_ms += self.LAG_SMOOTHING * (lag_ms - self.send_lag_avg_ms)
+        self.send_lag_max_ms = max(self.send_lag_max_ms, lag_ms)
+
+    # ------------------------------------------------------------------
+    # Redis pub/sub
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Inicia o listener Redis deste worker (startup da aplicação)"""
+        try:
+            from app.core.cache import redis_client
+
+            await redis_client.ping()
+            self._pubsub = redis_client.pubsub()
+            self._redis_ok = True
+        except Exception as e:
+            logger.warning(f"Redis unavailable, realtime events limited to this worker: {str(e)}")
+            return
+
+        self._listener = asyncio.create_task(self._listen())
+        self._stats_task = asyncio.create_task(self._report_stats())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._stats_task):
+            if task:
+                task.cancel()
+
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                await connection.close(1001)  # Going Away
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception:
+                pass
+
+        if self._redis_ok:
+            try:
+                from app.core.cache import redis_client
+
+                await redis_client.hdel(STATS_KEY, self.worker_id)
+            except Exception:
+                pass
+
+    async def _subscribe(self, tenant_id: str) -> None:
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.subscribe(tenant_channel(tenant_id))
+        except Exception as e:
+            logger.warning(f"Failed to subscribe to tenant {tenant_id}: {str(e)}")
+
+    async def _maybe_unsubscribe(self, tenant_id: str) -> None:
+        if self.active_connections.get(tenant_id):
+            return
+        self.active_connections.pop(tenant_id, None)
+        if self._pubsub is None:
+            return
+        try:
+            await self._pubsub.unsubscribe(tenant_channel(tenant_id))
+        except Exception as e:
+            logger.warning(f"Failed to unsubscribe from tenant {tenant_id}: {str(e)}")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(0.5)
+                    continue
+
+                item = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if not item or item.get("type") != "message":
+                    continue
+
+                tenant_id = item["channel"][len(CHANNEL_PREFIX):]
+                envelope = json.loads(item["data"])
+                self.deliver_local(tenant_id, envelope["message"], envelope.get("published_at"))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime listener error: {str(e)}")
+                await asyncio.sleep(1)
+
+    # ------------------------------------------------------------------
+    # Estatísticas
+    # ------------------------------------------------------------------
+
+    def local_stats(self) -> Dict[str, Any]:
+        connections = [c for conns in self.active_connections.values() for c in conns]
+        return {
+            "worker_id": self.worker_id,
+            "tenants": {tenant: len(conns) for tenant, conns in self.active_connections.items() if conns},
+            "connections": len(connections),
+            "max_queue_depth": max((c.queue.qsize() for c in connections), default=0),
+            "send_lag_avg_ms": round(self.send_lag_avg_ms, 2),
+            "send_lag_max_ms": round(self.send_lag_max_ms, 2),
+            "delivered_events": self.delivered_events,
+            "dropped_events": self.dropped_events,
+            "slow_consumer_disconnects": self.slow_consumer_disconnects,
+            "redis": self._redis_ok,
+            "reported_at": time.time(),
+        }
+
+    async def _report_stats(self) -> None:
+        from app.core.cache import redis_client
+
+        while True:
+            try:
+                await redis_client.hset(STATS_KEY, self.worker_id, json.dumps(self.local_stats()))
+                # Pico de lag é por janela de relatório
+                self.send_lag_max_ms = 0.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Failed to report realtime stats: {str(e)}")
+            await asyncio.sleep(self.STATS_INTERVAL_SECONDS)
+
+    async def cluster_stats(self, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Agrega as estatísticas de todos os workers ativos
+
+        Workers que não reportam há STATS_STALE_SECONDS são ignorados.
+        """
+        workers = [self.local_stats()]
+
+        if self._redis_ok:
+            try:
+                from app.core.cache import redis_client
+
+                reported = await redis_client.hgetall(STATS_KEY)
+                now = time.time()
+                workers = [
+                    stats for stats in (json.loads(v) for v in reported.values())
+                    if now - stats.get("reported_at", 0) <= self.STATS_STALE_SECONDS
+                    and stats.get("worker_id") != self.worker_id
+                ] + workers
+            except Exception as e:
+                logger.warning(f"Failed to read realtime stats: {str(e)}")
+
+        result = {
+            "workers": len(workers),
+            "connections": sum(w["connections"] for w in workers),
+            "send_lag_avg_ms": round(max((w["send_lag_avg_ms"] for w in workers), default=0.0), 2),
+            "send_lag_max_ms": round(max((w["send_lag_max_ms"] for w in workers), default=0.0), 2),
+            "dropped_events": sum(w["dropped_events"] for w in workers),
+            "slow_consumer_disconnects": sum(w["slow_consumer_disconnects"] for w in workers),
+        }
+        if tenant_id is not None:
+            result["tenant_connections"] = sum(w["tenants"].get(str(tenant_id), 0) for w in workers)
+        return result
+
+
+manager = ConnectionManager()
+
+
+def _is_today(value: Optional[datetime]) -> bool:
+    return bool(value) and value.date() == datetime.now().date()
+
+
+def order_payload(order) -> Dict[str, Any]:
+    """Serializa um pedido no mesmo formato de OrderResponse"""
+    return {
+        "id": str(order.id),
+        "tenant_id": str(order.tenant_id),
+        "customer_id": str(order.customer_id),
+        "order_number": order.order_number,
+        "items": order.items or [],
+        "delivery_address": order.delivery_address or {},
+        "delivery_fee": float(order.delivery_fee or 0),
+        "subtotal": float(order.subtotal or 0),
+        "total": float(order.total or 0),
+        "payment_method": order.payment_method,
+        "status": order.status,
+        "notes": order.notes,
+        "driver_name": order.driver_name,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "delivered_at": order.delivered_at.isoformat() if order.delivered_at else None,
+    }
+
+
+def order_created_delta(order) -> Dict[str, float]:
+    """Delta do resumo do dashboard para um pedido novo"""
+    delta = {"orders_today": 1}
+    if order.status == "new":
+        delta["pending_orders"] = 1
+    return delta
+
+
+def order_status_delta(order, old_status: str) -> Dict[str, float]:
+    """
+    Delta do resumo do dashboard para uma mudança de status
+
+    Espelha as regras de /dashboard/summary: pendentes = status 'new',
+    receita de hoje = pedidos de hoje em status de receita.
+    """
+    new_status = order.status
+    delta: Dict[str, float] = {}
+
+    if old_status == "new" and new_status != "new":
+        delta["pending_orders"] = -1
+    elif old_status != "new" and new_status == "new":
+        delta["pending_orders"] = 1
+
+    if _is_today(order.created_at):
+        was_revenue = old_status in REVENUE_STATUSES
+        is_revenue = new_status in REVENUE_STATUSES
+        if is_revenue and not was_revenue:
+            delta["revenue_today"] = float(order.total or 0)
+        elif was_revenue and not is_revenue:
+            delta["revenue_today"] = -float(order.total or 0)
+
+    return delta
+
+
+async def publish_event(
+    tenant_id,
+    event_type: str,
+    data: Dict[str, Any],
+    summary_delta: Optional[Dict[str, float]] = None
+) -> None:
+    """
+    Publica um evento de domínio para os dashboards do tenant
+
+    Deve ser chamado depois do commit. Nunca levanta exceção: falha ao
+    notificar o dashboard não pode quebrar o atendimento do cliente.
+    """
+    tenant_key = str(tenant_id)
+
+    message = {
+        "type": event_type,
+        "data": data,
+        "summary_delta": summary_delta or {},
+        "timestamp": datetime.now().isoformat()
+    }
+
+    try:
+        await manager.broadcast_to_tenant(tenant_key, message)
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} for tenant {tenant_key}: {str(e)}")
+
+
+async def publish_order_created(order) -> None:
+    await publish_event(
+        order.tenant_id,
+        ORDER_CREATED,
+        {"order": order_payload(order)},
+        order_created_delta(order)
+    )
+
+
+async def publish_order_status_changed(
+    order,
+    old_status: str,
+    conversation_ended: bool = False
+) -> None:
+    await publish_event(
+        order.tenant_id,
+        ORDER_STATUS_CHANGED,
+        {
+            "order": order_payload(order),
+            "old_status": old_status,
+            "conversation_ended": conversation_ended,
+        },
+        order_status_delta(order, old_status)
+    )
+
+
+async def publish_message(
+    tenant_id,
+    conversation_id,
+    customer_phone: str,
+    message: Dict[str, Any]
+) -> None:
+    """Publica uma mensagem nova (do cliente ou do bot) de uma conversa"""
+    event_type = MESSAGE_RECEIVED if message.get("role") == "user" else MESSAGE_SENT
+    content = message.get("content") or ""
+
+    await publish_event(
+        tenant_id,
+        event_type,
+        {
+            "conversation_id": str(conversation_id),
+            "customer_phone": customer_phone,
+            "message": {
+                "role": message.get("role"),
+                "content": content[:MESSAGE_PREVIEW_CHARS],
+                "timestamp": message.get("timestamp"),
+                "message_type": message.get("type", "text"),
+            },
+        }
+    )
+
+
+async def publish_intervention(
+    tenant_id,
+    conversation_id,
+    started: bool,
+    intervention_id=None,
+    reason: Optional[str] = None
+) -> None:
+    await publish_event(
+        tenant_id,
+        INTERVENTION_STARTED if started else INTERVENTION_ENDED,
+        {
+            "conversation_id": str(conversation_id),
+            "intervention_id": str(intervention_id) if intervention_id else None,
+            "reason": reason,
+        },
+        {"active_interventions": 1 if started else -1}
+    )
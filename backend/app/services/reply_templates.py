@@ -0,0 +1,252 @@
+"""
+Reply templates - Respostas determinísticas dos agentes
+
+Saudação com catálogo, lista de produtos, resumo do pedido, formas de
+pagamento, instruções de PIX/cartão/dinheiro e endereço aceito ou fora da
+área não dependem do LLM: o estado da conversa já define a resposta.
+
+ReplyTemplates compila uma vez por tenant (junto do TenantCatalog, com o
+mesmo TTL e invalidação) os textos que usam dados do tenant; por turno só
+entram os valores que mudam (total, troco, taxa, itens) via string.Template.
+Os textos que não dependem do tenant são funções do módulo, usadas também
+pelos fluxos legados dos agentes.
+"""
+from string import Template
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from app.services.tenant_catalog import TenantCatalog, tenant_catalog
+
+
+def money(value: float) -> str:
+    """R$ no formato brasileiro (R$ 110,00)"""
+    return f"R$ {value:.2f}".replace(".", ",")
+
+
+def order_summary(order: Dict[str, Any]) -> str:
+    """Resumo do carrinho com subtotal, taxa e total"""
+    if not order.get("items"):
+        return "Seu pedido está vazio."
+
+    summary = "📋 *Resumo do Pedido:*\n\n"
+
+    for idx, item in enumerate(order["items"], 1):
+        summary += f"{idx}. {item['quantity']}x {item['product_name']}\n"
+        summary += f"   {money(item['subtotal'])}\n\n"
+
+    summary += f"Subtotal: {money(order.get('subtotal', 0))}\n"
+    summary += f"Taxa de entrega: {money(order.get('delivery_fee', 0))}\n"
+    summary += f"*Total: {money(order.get('total', 0))}*"
+
+    return summary
+
+
+def change_too_low(change_for: float, total: float) -> str:
+    return f"""❌ O valor informado ({money(change_for)}) é menor que o total do pedido ({money(total)}).
+
+Para pagar em dinheiro, você precisa ter no mínimo o valor do pedido.
+
+💡 Você pode:
+• Informar um valor maior (ex: R$ 150,00)
+• Pagar com o valor exato ({money(total)})
+• Escolher outra forma de pagamento (PIX ou Cartão)
+
+Qual valor você vai usar?"""
+
+
+def cash_change_question(total: float) -> str:
+    return f"""✅ Pagamento em Dinheiro
+
+💵 *Valor do pedido:* {money(total)}
+
+Você vai precisar de troco? Se sim, para quanto?
+
+Ou se tiver o valor exato, só confirmar que está ok!"""
+
+
+def cash_payment(total: float, change_for: Optional[float] = None) -> str:
+    """Confirmação de pagamento em dinheiro (com ou sem troco)"""
+    if change_for and change_for < total:
+        return change_too_low(change_for, total)
+
+    message = f"""✅ Pagamento em Dinheiro
+
+💵 *Valor:* {money(total)}
+
+Você vai pagar em dinheiro na entrega."""
+
+    if not change_for:
+        return message + """
+
+💡 *Dica:* Prepare o valor exato ou nos avise se precisa de troco!"""
+
+    if change_for == total:
+        return message + f"""
+
+💵 *Valor exato:* {money(total)}
+✅ Sem necessidade de troco"""
+
+    return message + f"""
+
+💵 *Troco para:* {money(change_for)}
+💰 *Troco:* {money(change_for - total)}"""
+
+
+def card_payment(total: float) -> str:
+    return f"""✅ Pagamento no Cartão
+
+💳 *Valor:* {money(total)}
+
+Você vai pagar com cartão na entrega.
+
+Aceitamos débito e crédito!"""
+
+
+def address_accepted(validation_result: Dict[str, Any], reference: Optional[str] = None) -> str:
+    fee = validation_result.get("delivery_fee", 0) or 0
+
+    text = f"""✅ Ótimo! Entregamos no seu endereço!
+
+📍 *Endereço confirmado:*
+{validation_result['normalized_address']}"""
+
+    if reference:
+        text += f"\n🏠 *Referência:* {reference}"
+
+    text += f"""
+
+🚚 *Taxa de entrega:* {money(fee) if fee > 0 else 'GRÁTIS'}
+⏱️ *Tempo estimado:* {validation_result.get('delivery_time', 60)} minutos
+
+Está correto? Podemos continuar com o pedido?"""
+
+    return text
+
+
+def address_out_of_area(reason: str) -> str:
+    return f"""😔 Infelizmente não entregamos neste endereço.
+
+Motivo: {reason}
+
+Gostaria de tentar outro endereço?"""
+
+
+class ReplyTemplates:
+    """Textos com dados do tenant, montados uma vez por TenantCatalog"""
+
+    def __init__(self, catalog: TenantCatalog):
+        self.catalog = catalog
+        self._product_list = self._compile_product_list()
+        self._welcome = f"""Olá! Bem-vindo à {catalog.company_name}! 😊
+
+Sou seu assistente virtual e estou aqui para ajudar.
+
+{self._product_list}"""
+        self._welcome_back = f"""Olá novamente! 😊
+
+{self._product_list}"""
+        self._help = f"""🤖 Como posso ajudar você:
+
+*Para fazer um pedido:*
+Diga o produto que você quer e a quantidade
+Exemplo: "Quero 2 botijões de 13kg"
+
+*Para consultar produtos:*
+Pergunte "Quais produtos vocês têm?"
+
+*Para falar com atendente:*
+Diga "Quero falar com atendente"
+
+*Horário de funcionamento:*
+{catalog.business_hours}
+
+Posso ajudar em algo mais?"""
+        self._payment_options = Template(
+            "💰 *Total do pedido: $total*\n\nComo você quer pagar?\n\n"
+            + self._compile_payment_methods()
+            + "\nEscolha uma opção acima."
+        )
+        self._pix = Template(self._compile_pix())
+
+    @staticmethod
+    def _escape(text: str) -> str:
+        """Dados do tenant não podem virar placeholders do Template"""
+        return text.replace("$", "$$")
+
+    def _compile_product_list(self) -> str:
+        if not self.catalog.products:
+            return """No momento não temos produtos cadastrados.
+
+Gostaria de falar com um atendente?"""
+
+        text = "📋 *Nossos Produtos:*\n\n"
+        for idx, (name, price, description) in enumerate(self.catalog.products, 1):
+            text += f"{idx}. *{name}*\n"
+            if description:
+                text += f"   {description}\n"
+            text += f"   💰 {money(price)}\n\n"
+
+        return text + "Para fazer um pedido, me diga o que você quer! 😊"
+
+    def _compile_payment_methods(self) -> str:
+        lines = ""
+        for method in self.catalog.payment_methods:
+            if method.lower() == "pix" and self.catalog.pix_enabled:
+                lines += "• 📱 PIX\n"
+            elif method.lower() == "dinheiro":
+                lines += "• 💵 Dinheiro\n"
+            elif method.lower() in ["cartao", "cartão"]:
+                lines += "• 💳 Cartão (débito/crédito)\n"
+        return lines
+
+    def _compile_pix(self) -> str:
+        catalog = self.catalog
+        if not self.pix_available:
+            return "Desculpe, PIX não está disponível no momento. Escolha outra forma de pagamento."
+
+        text = f"""✅ Pagamento via PIX
+
+💰 *Valor:* $total
+
+📱 *Chave PIX:*
+`{self._escape(catalog.pix_key)}`
+
+👤 *Nome:* {self._escape(catalog.pix_name or catalog.company_name)}
+
+"""
+        if catalog.payment_instructions:
+            text += f"\n📝 {self._escape(catalog.payment_instructions)}\n"
+
+        text += """
+Após realizar o pagamento, pode enviar o comprovante ou apenas confirmar.
+
+Seu pedido já foi registrado e será preparado!"""
+        return text
+
+    @property
+    def pix_available(self) -> bool:
+        return bool(self.catalog.pix_enabled and self.catalog.pix_key)
+
+    def greeting(self, returning: bool = False) -> str:
+        """Saudação já com o catálogo"""
+        return self._welcome_back if returning else self._welcome
+
+    def product_list(self) -> str:
+        return self._product_list
+
+    def help(self) -> str:
+        return self._help
+
+    def payment_options(self, total: float) -> str:
+        return self._payment_options.substitute(total=money(total))
+
+    def pix_payment(self, total: float) -> str:
+        return self._pix.substitute(total=money(total))
+
+
+def reply_templates_for(db, tenant_id: UUID) -> ReplyTemplates:
+    """Templates do tenant (compilados junto do catálogo em cache)"""
+    catalog = tenant_catalog.get(db, tenant_id)
+    if catalog.replies is None:
+        catalog.replies = ReplyTemplates(catalog)
+    return catalog.replies
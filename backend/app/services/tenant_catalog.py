@@ -0,0 +1,135 @@
+"""
+Tenant catalog - Dados do tenant usados nos prompts dos agentes
+
+Empresa, produtos disponíveis, formas de pagamento e modo de entrega mudam
+raramente, mas eram consultados no banco e reformatados a cada mensagem.
+Aqui ficam em cache por processo (TTL curto + invalidação nos endpoints
+que os alteram) junto com os prefixos de prompt já montados por agente,
+para que o início do system prompt seja idêntico entre chamadas e
+aproveite o cache de prompt do provedor.
+
+Com vários workers, a invalidação só atinge o processo que recebeu a
+alteração; os demais enxergam a mudança em até CACHE_TTL_SECONDS.
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.database.models import DeliveryArea, Product, Tenant
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL_SECONDS = 60
+
+
+DEFAULT_BUSINESS_HOURS = "Seg-Sex: 8h-18h, Sáb: 8h-12h"
+
+
+@dataclass
+class TenantCatalog:
+    tenant_id: UUID
+    company_name: str = "Distribuidora"
+    phone: str = ""
+    address_info: str = ""
+    products_text: str = "(nenhum produto disponível)"
+    # (nome, preço, descrição) dos produtos disponíveis, por nome
+    products: List[Tuple[str, float, Optional[str]]] = field(default_factory=list)
+    payment_methods: List[str] = field(default_factory=lambda: ["Dinheiro"])
+    pix_enabled: bool = False
+    pix_key: Optional[str] = None
+    pix_name: Optional[str] = None
+    payment_instructions: Optional[str] = None
+    business_hours: str = DEFAULT_BUSINESS_HOURS
+    delivery_mode: str = "neighborhood"
+    # Prefixos de prompt montados (estático + seção do tenant), por agente
+    prefixes: Dict[str, str] = field(default_factory=dict)
+    # ReplyTemplates compilados (app.services.reply_templates)
+    replies: Any = None
+
+    def prefix(self, key: str, render: Callable[["TenantCatalog"], str]) -> str:
+        """Prefixo do agente, montado na primeira chamada e reaproveitado"""
+        if key not in self.prefixes:
+            self.prefixes[key] = render(self)
+        return self.prefixes[key]
+
+
+class TenantCatalogCache:
+    """Cache em memória de TenantCatalog por tenant"""
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: Dict[UUID, Tuple[float, TenantCatalog]] = {}
+
+    def get(self, db: Session, tenant_id: UUID) -> TenantCatalog:
+        entry = self._entries.get(tenant_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        catalog, complete = self._load(db, tenant_id)
+        if complete:
+            self._entries[tenant_id] = (time.monotonic() + self.ttl, catalog)
+        return catalog
+
+    def invalidate(self, tenant_id: Optional[UUID] = None) -> None:
+        """Descarta o catálogo do tenant (ou de todos, sem argumento)"""
+        if tenant_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(tenant_id, None)
+
+    def _load(self, db: Session, tenant_id: UUID) -> Tuple[TenantCatalog, bool]:
+        catalog = TenantCatalog(tenant_id=tenant_id)
+
+        try:
+            tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+            products = db.query(Product).filter(
+                Product.tenant_id == tenant_id,
+                Product.is_available == True
+            ).order_by(Product.name).all()
+            delivery_config = db.query(DeliveryArea.delivery_mode).filter(
+                DeliveryArea.tenant_id == tenant_id
+            ).first()
+        except Exception as e:
+            logger.error(f"Error loading tenant catalog {tenant_id}: {e}")
+            catalog.products_text = "(erro ao carregar produtos)"
+            # Catálogo padrão, sem cache: a próxima mensagem tenta de novo
+            return catalog, False
+
+        if tenant:
+            catalog.company_name = tenant.company_name
+            catalog.phone = tenant.phone or ""
+            catalog.payment_methods = tenant.payment_methods or ["Dinheiro"]
+            catalog.pix_enabled = bool(tenant.pix_enabled)
+            catalog.pix_key = tenant.pix_key
+            catalog.pix_name = tenant.pix_name
+            catalog.payment_instructions = tenant.payment_instructions
+            catalog.business_hours = (tenant.settings or {}).get('business_hours', DEFAULT_BUSINESS_HOURS)
+
+            if isinstance(tenant.address, dict):
+                street = tenant.address.get('street', '')
+                city = tenant.address.get('city', '')
+                if street or city:
+                    catalog.address_info = f"\n- Endereço: {street} - {city}"
+
+        if products:
+            catalog.products = [(p.name, float(p.price), p.description) for p in products]
+            lines = []
+            for i, p in enumerate(products, 1):
+                line = f"{i}. {p.name} - R$ {p.price:.2f}"
+                if p.description:
+                    line += f" ({p.description})"
+                lines.append(line)
+            catalog.products_text = "\n".join(lines)
+
+        if delivery_config and delivery_config.delivery_mode:
+            catalog.delivery_mode = delivery_config.delivery_mode
+
+        return catalog, True
+
+
+# Global instance
+tenant_catalog = TenantCatalogCache()
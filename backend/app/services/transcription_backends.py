@@ -0,0 +1,217 @@
+"""
+Transcription backends - Quem transforma a nota de voz em texto
+
+- "whisper_api": Whisper da OpenAI via llm_gateway (padrão)
+- "local": faster-whisper (CTranslate2, modelo quantizado int8) na CPU da
+  própria máquina, num pool de processos; sem ida e volta à OpenAI e sem
+  custo por segundo. Dependência opcional: pip install faster-whisper
+
+O backend é escolhido por tenant em Tenant.settings["transcription_backend"]
+(padrão settings.TRANSCRIPTION_BACKEND). Se o local não está instalado ou
+falha, a transcrição cai para o Whisper da OpenAI.
+
+Comparar latência, vazão e WER: scripts/benchmark_transcription.py
+"""
+import asyncio
+import importlib.util
+import io
+import logging
+import multiprocessing
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.transcription_cache import transcription_variant
+
+logger = logging.getLogger(__name__)
+
+WHISPER_MODEL = "whisper-1"
+WHISPER_LANGUAGE = "pt"
+WHISPER_PROMPT = "Transcreva o pedido do cliente para distribuidora de gás e água. Contexto: atendimento comercial."
+
+# (filename, bytes, content type), as the OpenAI SDK takes file uploads
+AudioUpload = Tuple[str, bytes, str]
+
+
+class TranscriptionBackendError(Exception):
+    """O backend não conseguiu transcrever (indisponível ou falhou)"""
+
+
+class TranscriptionBackend(ABC):
+    """Interface: transcribe() recebe o upload em memória e devolve o texto"""
+
+    name = "base"
+
+    @property
+    @abstractmethod
+    def variant(self) -> str:
+        """Parte da chave do transcription_cache: muda quando o resultado pode mudar"""
+
+    @abstractmethod
+    async def transcribe(self, upload: AudioUpload, duration: float = 0) -> str:
+        """Texto da nota de voz; levanta TranscriptionBackendError se não conseguir"""
+
+    async def close(self) -> None:
+        pass
+
+
+class WhisperAPIBackend(TranscriptionBackend):
+    """Whisper da OpenAI (cobrado por segundo de áudio)"""
+
+    name = "whisper_api"
+
+    @property
+    def variant(self) -> str:
+        return transcription_variant(WHISPER_MODEL, WHISPER_LANGUAGE, WHISPER_PROMPT)
+
+    async def transcribe(self, upload: AudioUpload, duration: float = 0) -> str:
+        response = await llm_gateway.transcribe(
+            "transcription",
+            audio_seconds=duration,
+            model=WHISPER_MODEL,
+            file=upload,
+            language=WHISPER_LANGUAGE,
+            prompt=WHISPER_PROMPT
+        )
+        return response.text.strip()
+
+
+# Modelo carregado uma vez por processo do pool (initializer)
+_local_model = None
+
+
+def _load_local_model(model_name: str, compute_type: str, cpu_threads: int) -> None:
+    global _local_model
+    from faster_whisper import WhisperModel
+
+    _local_model = WhisperModel(model_name, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads)
+
+
+def _transcribe_locally(data: bytes, language: str, prompt: str, beam_size: int) -> str:
+    # Roda no processo do pool; faster-whisper decodifica o áudio em memória
+    segments, _ = _local_model.transcribe(
+        io.BytesIO(data),
+        language=language,
+        initial_prompt=prompt,
+        beam_size=beam_size,
+        condition_on_previous_text=False
+    )
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def local_stt_available() -> bool:
+    return importlib.util.find_spec("faster_whisper") is not None
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """faster-whisper quantizado num pool de processos (um modelo por processo)"""
+
+    name = "local"
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        compute_type: Optional[str] = None,
+        workers: Optional[int] = None,
+        cpu_threads: Optional[int] = None,
+        beam_size: Optional[int] = None
+    ):
+        self.model = model or settings.LOCAL_STT_MODEL
+        self.compute_type = compute_type or settings.LOCAL_STT_COMPUTE_TYPE
+        self.workers = workers or settings.LOCAL_STT_WORKERS
+        self.cpu_threads = cpu_threads or settings.LOCAL_STT_CPU_THREADS
+        self.beam_size = beam_size or settings.LOCAL_STT_BEAM_SIZE
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def variant(self) -> str:
+        return transcription_variant(
+            f"faster-whisper:{self.model}:{self.compute_type}:beam{self.beam_size}",
+            WHISPER_LANGUAGE,
+            WHISPER_PROMPT
+        )
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # spawn: o processo do webhook tem threads e event loop, fork não é seguro
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_local_model,
+                initargs=(self.model, self.compute_type, self.cpu_threads)
+            )
+        return self._executor
+
+    async def transcribe(self, upload: AudioUpload, duration: float = 0) -> str:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool(),
+                _transcribe_locally,
+                upload[1],
+                WHISPER_LANGUAGE,
+                WHISPER_PROMPT,
+                self.beam_size
+            )
+        except Exception as e:
+            # BrokenProcessPool (modelo não carregou) não se recupera sozinho
+            await self.close()
+            raise TranscriptionBackendError(f"Local transcription failed: {e}") from e
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class TranscriptionBackends:
+    """Registro dos backends (instâncias únicas por processo)"""
+
+    def __init__(self):
+        self.default = WhisperAPIBackend()
+        self._backends: Dict[str, TranscriptionBackend] = {self.default.name: self.default}
+        self._warned = set()
+
+    def resolve(self, name: Optional[str] = None) -> TranscriptionBackend:
+        """Backend pelo nome (tenant ou padrão); desconhecido/indisponível = Whisper API"""
+        name = (name or settings.TRANSCRIPTION_BACKEND or self.default.name).lower()
+
+        if name not in self._backends:
+            if name == LocalWhisperBackend.name and local_stt_available():
+                self._backends[name] = LocalWhisperBackend()
+            else:
+                if name not in self._warned:
+                    logger.warning(f"Transcription backend {name!r} unavailable, using {self.default.name}")
+                    self._warned.add(name)
+                return self.default
+
+        return self._backends[name]
+
+    async def transcribe(self, backend: TranscriptionBackend, upload: AudioUpload, duration: float = 0) -> Tuple[str, TranscriptionBackend]:
+        """
+        Texto e o backend que de fato transcreveu (falha local cai no padrão)
+        """
+        started = time.perf_counter()
+        try:
+            text = await backend.transcribe(upload, duration)
+        except TranscriptionBackendError as e:
+            if backend is self.default:
+                raise
+            logger.warning(f"{e}; falling back to {self.default.name}")
+            metrics.transcription_fallbacks.labels(backend=backend.name).inc()
+            return await self.transcribe(self.default, upload, duration)
+
+        metrics.transcription_duration.labels(backend=backend.name).observe(time.perf_counter() - started)
+        return text, backend
+
+    async def close(self) -> None:
+        for backend in self._backends.values():
+            await backend.close()
+
+
+# Global instance
+transcription_backends = TranscriptionBackends()
@@ -0,0 +1,135 @@
+"""
+Transcription cache - Transcrições já feitas, pelo conteúdo do áudio
+
+Cliente encaminha a mesma nota de voz para vários números e a Evolution
+reentrega o mesmo evento em retry; cada cópia custava uma chamada paga (e
+lenta) ao Whisper. A chave é o SHA-256 dos bytes do áudio mais uma
+"variante" (modelo, idioma e prompt do Whisper), então mudar o prompt não
+reaproveita transcrições antigas.
+
+- Redis (transcription:{sha256}:{variante}) com TTL, compartilhado entre
+  workers; LRU em memória na frente para repetições no mesmo processo
+- O fileSha256 do audioMessage é o SHA-256 do arquivo já decifrado, ou
+  seja, a mesma chave: com ele a consulta acontece antes do download
+- Falha no Redis nunca derruba a transcrição; só vira miss
+"""
+import base64
+import binascii
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "transcription:"
+
+
+def content_hash(audio_bytes: bytes) -> str:
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+def media_hash(file_sha256) -> Optional[str]:
+    """
+    fileSha256 do payload da Evolution (base64 ou hex) em hex, ou None
+
+    Versões que serializam o campo como objeto de bytes são ignoradas.
+    """
+    if not isinstance(file_sha256, str) or not file_sha256:
+        return None
+
+    value = file_sha256.strip()
+    if len(value) == 64:
+        try:
+            bytes.fromhex(value)
+            return value.lower()
+        except ValueError:
+            pass
+
+    try:
+        digest = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return digest.hex() if len(digest) == 32 else None
+
+
+def transcription_variant(model: str, language: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\n{language}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+
+
+class TranscriptionCache:
+    """Cache de transcrições (LRU local + Redis)"""
+
+    def __init__(self, local_entries: Optional[int] = None):
+        self._local_entries = local_entries
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+
+    @property
+    def local_entries(self) -> int:
+        if self._local_entries is not None:
+            return self._local_entries
+        return settings.TRANSCRIPTION_CACHE_LOCAL_ENTRIES
+
+    @staticmethod
+    def _key(audio_hash: str, variant: str) -> str:
+        return f"{KEY_PREFIX}{audio_hash}:{variant}"
+
+    def _remember(self, key: str, text: str) -> None:
+        self._local[key] = text
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_entries:
+            self._local.popitem(last=False)
+
+    async def get(self, audio_hash: Optional[str], variant: str, source: str = "content") -> Optional[str]:
+        """
+        Transcrição guardada para o áudio, ou None
+
+        source só rotula a métrica: "media" (fileSha256, antes do download)
+        ou "content" (hash calculado dos bytes).
+        """
+        if not settings.TRANSCRIPTION_CACHE_ENABLED or not audio_hash:
+            return None
+
+        key = self._key(audio_hash, variant)
+        text = self._local.get(key)
+        if text is not None:
+            self._local.move_to_end(key)
+            metrics.transcription_cache_lookups.labels(source=source, result="hit_local").inc()
+            return text
+
+        try:
+            from app.core.cache import redis_client
+
+            text = await redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Transcription cache unavailable: {e}")
+            text = None
+
+        if text is None:
+            metrics.transcription_cache_lookups.labels(source=source, result="miss").inc()
+            return None
+
+        self._remember(key, text)
+        metrics.transcription_cache_lookups.labels(source=source, result="hit_redis").inc()
+        return text
+
+    async def store(self, audio_hash: str, variant: str, text: str) -> None:
+        """Guarda a transcrição do áudio (local e Redis)"""
+        if not settings.TRANSCRIPTION_CACHE_ENABLED or not audio_hash or not text:
+            return
+
+        key = self._key(audio_hash, variant)
+        self._remember(key, text)
+        try:
+            from app.core.cache import redis_client
+
+            await redis_client.setex(key, settings.TRANSCRIPTION_CACHE_TTL_SECONDS, text)
+        except Exception as e:
+            logger.warning(f"Transcription cache store skipped: {e}")
+
+
+# Global instance
+transcription_cache = TranscriptionCache()
@@ -0,0 +1,72 @@
+"""
+Transcription pool - Limite de transcrições simultâneas
+
+Áudios chegam em rajadas (o cliente manda três notas de voz seguidas) e cada
+transcrição segura uma conexão com o Whisper por segundos. Aqui no máximo
+settings.AUDIO_TRANSCRIPTION_WORKERS rodam ao mesmo tempo por processo,
+independente das vagas de LLM dos agentes; as demais esperam na fila.
+
+A espera roda na task do próprio webhook, então o tenant do llm_scope
+(rollup de uso e cotas) continua valendo durante a transcrição.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.audio_processor import audio_processor
+
+
+class TranscriptionPool:
+    """Fila de transcrições com N workers"""
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = workers
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.running = 0
+
+    @property
+    def workers(self) -> int:
+        return self._workers or settings.AUDIO_TRANSCRIPTION_WORKERS
+
+    def _slots(self) -> asyncio.Semaphore:
+        # Criado no primeiro uso, dentro do event loop que vai usá-lo
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+        return self._semaphore
+
+    def is_backlogged(self) -> bool:
+        """Um áudio que chegasse agora esperaria atrás de outros na fila"""
+        return self.running >= self.workers and self.waiting >= settings.AUDIO_ACK_QUEUE_DEPTH
+
+    def _publish(self) -> None:
+        metrics.transcription_queue_depth.labels(state="waiting").set(self.waiting)
+        metrics.transcription_queue_depth.labels(state="running").set(self.running)
+
+    async def transcribe(self, audio_data: Dict[str, Any]) -> Dict[str, Any]:
+        """audio_processor.process_whatsapp_audio dentro de uma vaga do pool"""
+        queued = time.perf_counter()
+        self.waiting += 1
+        self._publish()
+
+        try:
+            await self._slots().acquire()
+        finally:
+            self.waiting -= 1
+            self._publish()
+
+        metrics.transcription_queue_wait.observe(time.perf_counter() - queued)
+        self.running += 1
+        self._publish()
+        try:
+            return await audio_processor.process_whatsapp_audio(audio_data)
+        finally:
+            self.running -= 1
+            self._slots().release()
+            self._publish()
+
+
+# Global instance
+transcription_pool = TranscriptionPool()
@@ -0,0 +1,90 @@
+"""
+Webhook dedup - Cada mensagem do WhatsApp é processada uma vez só
+
+A Evolution reenvia o webhook quando a resposta demora (justamente quando
+os agentes estão trabalhando) e o WhatsApp reentrega mensagens depois de
+reconexão. Sem dedup isso virava duas cadeias de LLM, duas respostas e às
+vezes dois pedidos.
+
+A chave é instância + data.key.id, reservada com SET NX EX no Redis
+(compartilhado entre workers) antes de qualquer consulta a tenant,
+cliente ou conversa. Se o processamento falha, a reserva é liberada e uma
+nova entrega tenta de novo. Sem Redis, um registro em memória por processo
+cobre os reenvios que caem no mesmo worker.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "webhook:msg:"
+LOCAL_MAX_ENTRIES = 10000
+
+
+class MessageDeduplicator:
+    """Reserva de ids de mensagem (Redis SET NX, memória como reserva)"""
+
+    def __init__(self):
+        self._local: "OrderedDict[str, float]" = OrderedDict()
+
+    @staticmethod
+    def _key(instance: str, message_id: str) -> str:
+        return f"{KEY_PREFIX}{instance}:{message_id}"
+
+    async def claim(self, instance: Optional[str], message_id: Optional[str]) -> bool:
+        """
+        True se esta é a primeira entrega da mensagem (processar), False se duplicada
+
+        Sem id não há como deduplicar: sempre True.
+        """
+        if not settings.WEBHOOK_DEDUP_ENABLED or not message_id:
+            return True
+
+        key = self._key(instance or "-", message_id)
+        try:
+            from app.core.cache import redis_client
+
+            first = bool(await redis_client.set(key, "1", nx=True, ex=settings.WEBHOOK_DEDUP_TTL_SECONDS))
+        except Exception as e:
+            logger.warning(f"Webhook dedup unavailable, using local registry: {e}")
+            first = self._claim_locally(key)
+
+        if not first:
+            metrics.webhook_duplicates.inc()
+            logger.info(f"Duplicate webhook dropped: {instance} {message_id}")
+        return first
+
+    async def release(self, instance: Optional[str], message_id: Optional[str]) -> None:
+        """Libera a reserva (o processamento falhou; a próxima entrega tenta de novo)"""
+        if not settings.WEBHOOK_DEDUP_ENABLED or not message_id:
+            return
+
+        key = self._key(instance or "-", message_id)
+        self._local.pop(key, None)
+        try:
+            from app.core.cache import redis_client
+
+            await redis_client.delete(key)
+        except Exception as e:
+            logger.warning(f"Webhook dedup release failed for {key}: {e}")
+
+    def _claim_locally(self, key: str) -> bool:
+        now = time.monotonic()
+        expires = self._local.get(key)
+        if expires is not None and expires > now:
+            return False
+
+        self._local[key] = now + settings.WEBHOOK_DEDUP_TTL_SECONDS
+        self._local.move_to_end(key)
+        while len(self._local) > LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+        return True
+
+
+# Global instance
+message_deduplicator = MessageDeduplicator()
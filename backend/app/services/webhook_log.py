@@ -0,0 +1,258 @@
+"""
+Webhook log - Registro dos webhooks da Evolution fora do caminho da resposta
+
+O webhook só chama webhook_log_writer.record() (sem I/O): a entrada vai
+para um buffer em memória e uma task de fundo grava em lote (um INSERT
+multi-linha numa thread) a cada WEBHOOK_LOG_BATCH_SIZE entradas ou
+WEBHOOK_LOG_FLUSH_SECONDS. Buffer cheio (banco fora) descarta as mais
+antigas; perder log nunca atrasa nem derruba o atendimento.
+
+- Amostragem por tipo de evento (settings.WEBHOOK_LOG_SAMPLE_RATES, 0-1);
+  os ecos das nossas próprias mensagens são "messages.upsert:fromMe".
+  Evento com erro é sempre gravado
+- Base64 de mídia embutido no payload não é gravado, só o tamanho
+- webhook_logs é particionada por dia (created_at, UTC): partições são
+  criadas com antecedência e a retenção apaga partições inteiras
+  (DROP TABLE, sem DELETE nem VACUUM). Ver app.tasks.webhook_logs
+"""
+import asyncio
+import logging
+import random
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.core import metrics
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TABLE = "webhook_logs"
+LEGACY_TABLE = "webhook_logs_legacy"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_p(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{TABLE}_p{day:%Y%m%d}"
+
+
+def ensure_partitions(db, today: date, ahead: int) -> List[str]:
+    """Cria (se faltar) as partições de today até today + ahead; devolve as criadas"""
+    from sqlalchemy import text
+
+    existing = set(_partitions(db))
+    created = []
+    for offset in range(ahead + 1):
+        day = today + timedelta(days=offset)
+        name = partition_name(day)
+        if name in existing:
+            continue
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        ))
+        created.append(name)
+    db.commit()
+    return created
+
+
+def drop_expired_partitions(db, today: date, retention_days: int) -> List[str]:
+    """Apaga as partições com todos os dias anteriores à retenção; devolve as apagadas"""
+    from sqlalchemy import text
+
+    oldest_kept = today - timedelta(days=retention_days)
+    dropped = []
+    for name in _partitions(db):
+        match = _PARTITION_NAME.match(name)
+        if match and datetime.strptime(match.group(1), "%Y%m%d").date() < oldest_kept:
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    # Tabela anterior ao particionamento: sai inteira quando fica velha
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": LEGACY_TABLE}).scalar():
+        last = db.execute(text(f"SELECT max(created_at) FROM {LEGACY_TABLE}")).scalar()
+        if last is None or last.date() < oldest_kept:
+            db.execute(text(f"DROP TABLE IF EXISTS {LEGACY_TABLE}"))
+            dropped.append(LEGACY_TABLE)
+
+    db.commit()
+    return dropped
+
+
+def _partitions(db) -> List[str]:
+    from sqlalchemy import text
+
+    return list(db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": TABLE}).scalars())
+
+
+def event_category(payload: Dict[str, Any]) -> str:
+    """Chave de amostragem: o evento, com ":fromMe" para os ecos do próprio bot"""
+    event = str(payload.get("event") or "unknown")
+    data = payload.get("data")
+    if isinstance(data, dict) and (data.get("key") or {}).get("fromMe"):
+        return f"{event}:fromMe"
+    return event
+
+
+def tenant_from_instance(instance: Any) -> Optional[UUID]:
+    if not isinstance(instance, str) or not instance.startswith("tenant_"):
+        return None
+    try:
+        return UUID(instance[len("tenant_"):])
+    except ValueError:
+        return None
+
+
+def loggable_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Payload sem o base64 da mídia (copia só o que muda)"""
+    data = payload.get("data")
+    message = data.get("message") if isinstance(data, dict) else None
+    if not isinstance(message, dict) or not isinstance(message.get("base64"), str):
+        return payload
+
+    message = {**message, "base64": f"<omitted {len(message['base64'])} chars>"}
+    return {**payload, "data": {**data, "message": message}}
+
+
+# Partições conferidas por este processo desde o último erro de gravação
+_partitions_ready = False
+
+
+def _insert_rows(rows: List[Dict[str, Any]]) -> None:
+    # Roda numa thread: sessão síncrona própria, um INSERT para o lote todo
+    global _partitions_ready
+    from sqlalchemy import insert
+
+    from app.database.base import SessionLocal
+    from app.database.models import WebhookLog
+
+    db = SessionLocal()
+    try:
+        if not _partitions_ready:
+            ensure_partitions(db, datetime.utcnow().date(), settings.WEBHOOK_LOG_PARTITIONS_AHEAD)
+            _partitions_ready = True
+        db.execute(insert(WebhookLog), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        # Pode ter faltado partição: confere de novo no próximo lote
+        _partitions_ready = False
+        raise
+    finally:
+        db.close()
+
+
+class WebhookLogWriter:
+    """Buffer de logs de webhook com gravação em lote em background"""
+
+    def __init__(self, write: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self._write = write or _insert_rows
+        self._buffer: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def sample_rate(category: str) -> float:
+        rates = settings.WEBHOOK_LOG_SAMPLE_RATES
+        if category in rates:
+            return rates[category]
+        return settings.WEBHOOK_LOG_DEFAULT_SAMPLE_RATE
+
+    def record(self, payload: Dict[str, Any], processed: bool = False, error: Optional[str] = None) -> None:
+        """Enfileira o log do webhook (sem I/O; amostrado por tipo de evento)"""
+        if not isinstance(payload, dict):
+            return
+        self.record_deferred(
+            event_category(payload), payload.get("instance"), lambda: payload, processed, error
+        )
+
+    def record_deferred(
+        self,
+        category: str,
+        instance: Any,
+        load_payload: Callable[[], Dict[str, Any]],
+        processed: bool = False,
+        error: Optional[str] = None
+    ) -> None:
+        """Como record(), mas o payload só é montado se o evento entrar na amostra"""
+        if not settings.WEBHOOK_LOG_ENABLED:
+            return
+
+        rate = self.sample_rate(category)
+        if not error and (rate <= 0 or random.random() >= rate):
+            metrics.webhook_log_entries.labels(outcome="sampled_out").inc()
+            return
+
+        self._buffer.append({
+            "tenant_id": tenant_from_instance(instance),
+            "event_type": category,
+            "payload": loggable_payload(load_payload()),
+            "processed": processed,
+            "error": error,
+            "created_at": datetime.utcnow(),
+        })
+
+        overflow = len(self._buffer) - settings.WEBHOOK_LOG_MAX_BUFFER
+        if overflow > 0:
+            del self._buffer[:overflow]
+            metrics.webhook_log_entries.labels(outcome="dropped").inc(overflow)
+
+        self._ensure_task()
+        if self._wakeup is not None and len(self._buffer) >= settings.WEBHOOK_LOG_BATCH_SIZE:
+            self._wakeup.set()
+
+    def _ensure_task(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.WEBHOOK_LOG_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Grava o que está no buffer, em lotes; devolve quantas entradas gravou"""
+        written = 0
+        while self._buffer:
+            batch = self._buffer[:settings.WEBHOOK_LOG_BATCH_SIZE]
+            del self._buffer[:len(batch)]
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                logger.warning(f"Webhook log batch of {len(batch)} dropped: {e}")
+                metrics.webhook_log_entries.labels(outcome="dropped").inc(len(batch))
+                break
+            metrics.webhook_log_entries.labels(outcome="written").inc(len(batch))
+            written += len(batch)
+        return written
+
+    async def stop(self) -> None:
+        """Para a task de fundo e grava o que sobrou (shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+# Global instance
+webhook_log_writer = WebhookLogWriter()
@@ -0,0 +1,31 @@
+"""
+Celery Tasks para analytics de vendas
+"""
+from app.tasks.celery_app import celery_app
+from app.database.base import SessionLocal
+from app.services.analytics import AnalyticsService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name='app.tasks.analytics.refresh_sales_facts')
+def refresh_sales_facts():
+    """
+    Task periódica (a cada 5 minutos) que atualiza as tabelas fato de vendas
+    a partir dos pedidos novos desde a última execução
+    """
+    db = SessionLocal()
+
+    try:
+        return AnalyticsService(db).refresh()
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro na task refresh_sales_facts: {str(e)}")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        db.close()
@@ -9,7 +9,7 @@ celery_app = Celery(
     "gasbot",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
-    include=['app.tasks.trial']
+    include=['app.tasks.trial', 'app.tasks.analytics', 'app.tasks.llm_usage', 'app.tasks.webhook_logs']
 )
 
 # Configurações do Celery
@@ -34,4 +34,16 @@ celery_app.conf.beat_schedule = {
         'task': 'app.tasks.trial.notify_expiring_trials',
         'schedule': 86400.0,  # A cada 24 horas
     },
+    'refresh-sales-facts': {
+        'task': 'app.tasks.analytics.refresh_sales_facts',
+        'schedule': 300.0,  # A cada 5 minutos
+    },
+    'flush-llm-usage': {
+        'task': 'app.tasks.llm_usage.flush_llm_usage',
+        'schedule': 300.0,  # A cada 5 minutos
+    },
+    'maintain-webhook-log-partitions': {
+        'task': 'app.tasks.webhook_logs.maintain_webhook_log_partitions',
+        'schedule': 3600.0,  # A cada 1 hora
+    },
 }
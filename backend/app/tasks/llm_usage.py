@@ -0,0 +1,81 @@
+"""
+Celery Tasks para consumo de LLM por tenant
+"""
+from datetime import date
+from decimal import Decimal
+import logging
+
+import redis
+from sqlalchemy.dialects.postgresql import insert
+
+from app.tasks.celery_app import celery_app
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.database.models import LLMUsageDaily
+from app.services.llm_gateway import USAGE_KEY_PREFIX, NO_TENANT
+
+logger = logging.getLogger(__name__)
+
+USAGE_METRICS = (
+    "calls", "errors", "parse_failures", "prompt_tokens",
+    "completion_tokens", "cached_tokens", "cost_usd", "latency_ms",
+)
+
+
+@celery_app.task(name='app.tasks.llm_usage.flush_llm_usage')
+def flush_llm_usage():
+    """
+    Task periódica (a cada 5 minutos) que copia o rollup diário do Redis
+    para llm_usage_daily
+
+    O Redis guarda o acumulado do dia, então a linha é sobrescrita
+    (não somada): rodar a task duas vezes não duplica consumo.
+    """
+    client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    db = SessionLocal()
+
+    try:
+        rows = {}
+
+        for key in client.scan_iter(match=f"{USAGE_KEY_PREFIX}*", count=500):
+            day, tenant = key[len(USAGE_KEY_PREFIX):].split(":", 1)
+            if tenant == NO_TENANT:
+                continue
+
+            for field, value in client.hgetall(key).items():
+                agent, model, metric = field.rsplit("|", 2)
+                if metric not in USAGE_METRICS:
+                    continue
+                row = rows.setdefault((tenant, day, agent, model), {m: 0 for m in USAGE_METRICS})
+                row[metric] = Decimal(value) if metric == "cost_usd" else int(float(value))
+
+        for (tenant, day, agent, model), values in rows.items():
+            statement = insert(LLMUsageDaily).values(
+                tenant_id=tenant,
+                day=date.fromisoformat(day),
+                agent=agent,
+                model=model,
+                **values
+            )
+            db.execute(statement.on_conflict_do_update(
+                index_elements=["tenant_id", "day", "agent", "model"],
+                set_={metric: statement.excluded[metric] for metric in USAGE_METRICS}
+            ))
+
+        db.commit()
+
+        return {
+            "status": "success",
+            "rows": len(rows)
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro na task flush_llm_usage: {str(e)}")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        db.close()
+        client.close()
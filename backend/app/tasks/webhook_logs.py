@@ -0,0 +1,49 @@
+"""
+Celery Tasks para manutenção de webhook_logs (partições diárias)
+"""
+from datetime import datetime
+import logging
+
+from app.tasks.celery_app import celery_app
+from app.core.config import settings
+from app.database.base import SessionLocal
+from app.services.webhook_log import drop_expired_partitions, ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name='app.tasks.webhook_logs.maintain_webhook_log_partitions')
+def maintain_webhook_log_partitions():
+    """
+    Task periódica (a cada 1 hora) que cria as partições dos próximos
+    WEBHOOK_LOG_PARTITIONS_AHEAD dias e apaga as que passaram de
+    WEBHOOK_LOG_RETENTION_DAYS
+
+    Apagar uma partição é um DROP TABLE: instantâneo, sem DELETE linha a
+    linha e sem inchar a tabela.
+    """
+    db = SessionLocal()
+
+    try:
+        today = datetime.utcnow().date()
+        created = ensure_partitions(db, today, settings.WEBHOOK_LOG_PARTITIONS_AHEAD)
+        dropped = drop_expired_partitions(db, today, settings.WEBHOOK_LOG_RETENTION_DAYS)
+
+        if created or dropped:
+            logger.info(f"webhook_logs: partições criadas {created}, apagadas {dropped}")
+
+        return {
+            "status": "success",
+            "created": created,
+            "dropped": dropped
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro na task maintain_webhook_log_partitions: {str(e)}")
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+    finally:
+        db.close()
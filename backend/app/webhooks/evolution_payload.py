@@ -0,0 +1,218 @@
+"""
+Evolution payload - Decodificação tipada dos webhooks da Evolution API v2
+
+O webhook fazia request.json() do corpo inteiro (dicts aninhados, inclusive
+o base64 da mídia e contextInfo que ninguém lê) e depois procurava à mão
+as chaves de message. Aqui o corpo é decodificado com msgspec direto para
+Structs com só os campos usados:
+
+- primeiro só o envelope (event, instance); data fica como Raw, sem parse.
+  Eventos que o backend não trata (presence.update, messages.update,
+  chats.upsert...) param aí;
+- messages.upsert e connection.update decodificam data no Struct do
+  evento, ignorando campos desconhecidos sem montar objetos para eles;
+- MessageData.kind classifica a mensagem (texto, áudio, mídia) a partir
+  dos campos já decodificados.
+
+O dict completo só é montado quando o log de webhook amostra o evento
+(WebhookEvent.as_dict).
+"""
+from typing import Any, Dict, Optional
+
+import msgspec
+
+MESSAGES_UPSERT = "messages.upsert"
+CONNECTION_UPDATE = "connection.update"
+QRCODE_UPDATED = "qrcode.updated"
+
+HANDLED_EVENTS = frozenset({MESSAGES_UPSERT, CONNECTION_UPDATE, QRCODE_UPDATED})
+
+# Tipos de mensagem (MessageData.kind)
+TEXT = "text"
+AUDIO = "audio"
+MEDIA = "media"
+UNKNOWN = "unknown"
+
+
+class MessageKey(msgspec.Struct, rename="camel"):
+    remote_jid: str = ""
+    from_me: bool = False
+    id: Optional[str] = None
+
+
+class TextContent(msgspec.Struct):
+    text: str = ""
+
+
+def _string(value: Any) -> Optional[str]:
+    return value if isinstance(value, str) and value else None
+
+
+def _seconds(value: Any) -> int:
+    if isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+class AudioContent(msgspec.Struct, rename="camel"):
+    # Campos folha chegam com tipos diferentes entre versões da Evolution
+    # (fileSha256 como objeto de bytes, seconds como string). São aceitos
+    # como Any e normalizados aqui: um tipo inesperado não pode descartar a
+    # mensagem. fileSha256 fica como veio; media_hash() ignora o que não é
+    # string.
+    url: Any = None
+    mimetype: Any = None
+    seconds: Any = 0
+    file_sha256: Any = None
+
+    def __post_init__(self):
+        self.url = _string(self.url)
+        self.mimetype = _string(self.mimetype)
+        self.seconds = _seconds(self.seconds)
+
+
+class MediaContent(msgspec.Struct):
+    """Mídia ainda não é processada: basta saber que veio (campos são pulados)"""
+
+
+class MessageContent(msgspec.Struct, rename="camel"):
+    conversation: Optional[str] = None
+    extended_text_message: Optional[TextContent] = None
+    audio_message: Optional[AudioContent] = None
+    image_message: Optional[MediaContent] = None
+    video_message: Optional[MediaContent] = None
+    document_message: Optional[MediaContent] = None
+    # Áudio inline quando a instância tem webhook_base64 habilitado
+    base64: Optional[str] = None
+
+
+class MessageData(msgspec.Struct, rename="camel"):
+    key: MessageKey = msgspec.field(default_factory=MessageKey)
+    push_name: Any = None
+    message: Optional[MessageContent] = None
+    message_type: Any = None
+
+    def __post_init__(self):
+        self.push_name = _string(self.push_name)
+        self.message_type = _string(self.message_type)
+
+    @property
+    def kind(self) -> str:
+        message = self.message
+        if message is None:
+            return UNKNOWN
+        if message.conversation is not None or message.extended_text_message is not None:
+            return TEXT
+        if message.audio_message is not None:
+            return AUDIO
+        if (
+            message.image_message is not None
+            or message.video_message is not None
+            or message.document_message is not None
+        ):
+            return MEDIA
+        return UNKNOWN
+
+    @property
+    def text(self) -> str:
+        message = self.message
+        if message is None:
+            return ""
+        if message.conversation is not None:
+            return message.conversation
+        if message.extended_text_message is not None:
+            return message.extended_text_message.text
+        return ""
+
+    @property
+    def media_type(self) -> Optional[str]:
+        message = self.message
+        if message is None:
+            return None
+        if message.image_message is not None:
+            return "imageMessage"
+        if message.video_message is not None:
+            return "videoMessage"
+        if message.document_message is not None:
+            return "documentMessage"
+        return None
+
+
+class ConnectionData(msgspec.Struct):
+    state: Any = None
+
+    def __post_init__(self):
+        self.state = _string(self.state)
+
+
+class _Envelope(msgspec.Struct):
+    event: str = ""
+    instance: Optional[str] = None
+    data: msgspec.Raw = msgspec.Raw()
+
+
+class _KeyOnly(msgspec.Struct):
+    key: Optional[MessageKey] = None
+
+
+_envelope_decoder = msgspec.json.Decoder(_Envelope)
+_message_decoder = msgspec.json.Decoder(MessageData)
+_connection_decoder = msgspec.json.Decoder(ConnectionData)
+_key_decoder = msgspec.json.Decoder(_KeyOnly)
+
+
+class WebhookEvent:
+    """Envelope decodificado; data é decodificado sob demanda, no tipo do evento"""
+
+    __slots__ = ("body", "event", "instance", "_raw_data", "_message")
+
+    def __init__(self, body: bytes):
+        envelope = _envelope_decoder.decode(body)
+        self.body = body
+        self.event = envelope.event
+        self.instance = envelope.instance
+        self._raw_data = envelope.data
+        self._message: Optional[MessageData] = None
+
+    @property
+    def handled(self) -> bool:
+        return self.event in HANDLED_EVENTS
+
+    def message(self) -> MessageData:
+        """data de messages.upsert"""
+        if self._message is None:
+            self._message = _message_decoder.decode(self._raw_data or b"{}")
+        return self._message
+
+    def connection(self) -> ConnectionData:
+        """data de connection.update"""
+        return _connection_decoder.decode(self._raw_data or b"{}")
+
+    @property
+    def category(self) -> str:
+        """Chave de amostragem do log (mesma regra de webhook_log.event_category)"""
+        event = self.event or "unknown"
+        if self._message is not None:
+            from_me = self._message.key.from_me
+        else:
+            try:
+                key = _key_decoder.decode(self._raw_data or b"{}").key
+            except msgspec.ValidationError:
+                # data que não é objeto (lista em alguns eventos)
+                key = None
+            from_me = key is not None and key.from_me
+        return f"{event}:fromMe" if from_me else event
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Payload completo em dicts (só para o log de webhook)"""
+        return msgspec.json.decode(self.body)
+
+
+def decode_webhook(body: bytes) -> WebhookEvent:
+    """Decodifica o envelope; levanta msgspec.DecodeError se o corpo não é JSON válido"""
+    return WebhookEvent(body)
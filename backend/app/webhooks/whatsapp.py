@@ -4,115 +4,192 @@ WhatsApp webhook handler for Evolution API events
 from fastapi import APIRouter, Request, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+from uuid import UUID
 import logging
+import time
 from datetime import datetime
 
 from app.database.base import get_db
-from app.database.models import Tenant, Customer, Conversation, WebhookLog
-from app.services.audio_processor import audio_processor
+from app.database.models import Tenant, Customer, Conversation
+from app.services.transcription_pool import transcription_pool
+from app.services.conversation_resolver import conversation_resolver, tenant_cache, tenant_id_from_instance
 from app.services.evolution import evolution_service
+from app.services.webhook_dedup import message_deduplicator
+from app.services.webhook_log import webhook_log_writer
+from app.webhooks.evolution_payload import (
+    AUDIO, CONNECTION_UPDATE, MEDIA, MESSAGES_UPSERT, QRCODE_UPDATED, TEXT,
+    ConnectionData, MessageData, decode_webhook
+)
+from app.services import realtime
+from app.core import metrics
+from app.services.llm_gateway import llm_scope, llm_turn
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/webhook", tags=["Webhooks"])
 
+# Sent when the tenant's LLM quota sheds the turn (app.services.llm_scheduler)
+LLM_BUSY_REPLY = (
+    "Estamos com muitos pedidos neste momento 🙏 "
+    "Pode me mandar sua mensagem de novo em instantes?"
+)
+
+# Sent before transcribing when the transcription queue is long
+AUDIO_ACK_REPLY = "🎧 Ouvindo seu áudio… já te respondo!"
+
 
 async def get_tenant_from_instance(instance_name: str, db: Session) -> Optional[Tenant]:
     """
-    Get tenant from instance name
+    Get tenant from instance name (served from tenant_cache)
 
     Args:
         instance_name: Instance name (format: tenant_{uuid})
         db: Database session
 
     Returns:
-        Tenant object or None
+        Tenant object attached to db, or None
     """
-    if not instance_name.startswith("tenant_"):
+    tenant_id = tenant_id_from_instance(instance_name)
+    if tenant_id is None:
         return None
 
-    tenant_id = instance_name.replace("tenant_", "")
-
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    return tenant
+    return tenant_cache.get(db, tenant_id)
 
 
-async def get_or_create_customer(
+async def resolve_customer_and_conversation(
     db: Session,
-    tenant_id: str,
+    tenant_id: UUID,
     phone_number: str,
     name: Optional[str] = None
-) -> Customer:
+) -> Tuple[Customer, Conversation]:
     """
-    Get existing customer or create new one
+    Get or create the customer and its active conversation
+
+    One upsert statement each; commits only when something was created.
 
     Args:
         db: Database session
         tenant_id: Tenant UUID
-        phone_number: Customer WhatsApp number
-        name: Optional customer name
+        phone_number: Customer WhatsApp number (also the session id)
+        name: Optional customer name (used on creation)
 
     Returns:
-        Customer object
+        (customer, conversation)
     """
-    customer = db.query(Customer).filter(
-        Customer.tenant_id == tenant_id,
-        Customer.whatsapp_number == phone_number
-    ).first()
-
-    if not customer:
-        customer = Customer(
-            tenant_id=tenant_id,
-            whatsapp_number=phone_number,
-            name=name or phone_number
+    resolution = conversation_resolver.resolve(db, tenant_id, phone_number, name)
+    customer, conversation = resolution.customer, resolution.conversation
+
+    if resolution.customer_created:
+        await realtime.publish_event(
+            tenant_id,
+            realtime.CUSTOMER_CREATED,
+            {"customer_id": str(customer.id), "whatsapp_number": phone_number},
+            {"total_customers": 1}
         )
-        db.add(customer)
-        db.commit()
-        db.refresh(customer)
 
-    return customer
+    if resolution.conversation_created:
+        await realtime.publish_event(
+            tenant_id,
+            realtime.CONVERSATION_STARTED,
+            {"conversation_id": str(conversation.id), "customer_id": str(customer.id)},
+            {"active_conversations": 1}
+        )
 
+    return customer, conversation
 
-async def get_or_create_conversation(
-    db: Session,
-    tenant_id: str,
-    customer_id: str,
-    session_id: str
-) -> Conversation:
+
+async def store_user_message(
+    tenant: Tenant,
+    customer: Customer,
+    conversation: Conversation,
+    user_message: Dict[str, Any],
+    db: Session
+) -> None:
     """
-    Get active conversation or create new one
+    Append the customer's message to the conversation and publish it
 
     Args:
+        tenant: Tenant object
+        customer: Customer object
+        conversation: Conversation object
+        user_message: Message entry (role "user")
         db: Database session
-        tenant_id: Tenant UUID
-        customer_id: Customer UUID
-        session_id: Session identifier (phone number)
+    """
+    started = time.perf_counter()
 
-    Returns:
-        Conversation object
+    messages = conversation.messages or []
+    messages.append(user_message)
+    conversation.messages = messages
+    conversation.total_messages = len(messages)
+
+    # Mark the JSONB field as modified so SQLAlchemy detects the change
+    flag_modified(conversation, "messages")
+
+    db.commit()
+
+    await realtime.publish_message(tenant.id, conversation.id, customer.whatsapp_number, user_message)
+    metrics.webhook_stage_duration.labels(stage="inbound").observe(time.perf_counter() - started)
+
+
+async def send_agent_response(
+    tenant: Tenant,
+    customer: Customer,
+    conversation: Conversation,
+    response,
+    db: Session
+) -> None:
     """
-    # Get active conversation
-    conversation = db.query(Conversation).filter(
-        Conversation.tenant_id == tenant_id,
-        Conversation.customer_id == customer_id,
-        Conversation.status == "active"
-    ).first()
-
-    if not conversation:
-        conversation = Conversation(
-            tenant_id=tenant_id,
-            customer_id=customer_id,
-            session_id=session_id,
-            status="active",
-            messages=[],
-            context={}
-        )
-        db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+    Store the bot's reply (and context updates) and send it via Evolution API
+
+    Args:
+        tenant: Tenant object
+        customer: Customer object
+        conversation: Conversation object
+        response: AgentResponse to deliver
+        db: Database session
+    """
+    reply_started = time.perf_counter()
 
-    return conversation
+    # Add assistant response to conversation
+    assistant_message = {
+        "role": "assistant",
+        "content": response.text,
+        "timestamp": datetime.utcnow().isoformat(),
+        "type": "text",
+        "intent": response.intent
+    }
+    messages = conversation.messages or []
+    messages.append(assistant_message)
+    conversation.messages = messages
+    conversation.total_messages = len(messages)
+
+    # Update context if agent provided updates
+    if response.context_updates:
+        context_data = conversation.context or {}
+        context_data.update(response.context_updates)
+        conversation.context = context_data
+        flag_modified(conversation, "context")
+
+    flag_modified(conversation, "messages")
+    db.commit()
+
+    await realtime.publish_message(
+        tenant.id, conversation.id, customer.whatsapp_number, assistant_message
+    )
+
+    # Send response back to WhatsApp via Evolution API
+    instance_name = f"tenant_{str(tenant.id)}"
+    await evolution_service.send_text_message(
+        instance_name=instance_name,
+        number=customer.whatsapp_number,
+        message=response.text
+    )
+    metrics.webhook_stage_duration.labels(stage="reply").observe(
+        time.perf_counter() - reply_started
+    )
+
+    logger.info(f"Bot response sent to {customer.whatsapp_number}: {response.text[:50]}")
 
 
 async def process_text_message(
@@ -132,27 +209,38 @@ async def process_text_message(
         message_text: Message text
         db: Database session
     """
-    # Add message to conversation
-    messages = conversation.messages or []
-    messages.append({
+    user_message = {
         "role": "user",
         "content": message_text,
         "timestamp": datetime.utcnow().isoformat(),
         "type": "text"
-    })
-    conversation.messages = messages
-    conversation.total_messages = len(messages)
+    }
+    await store_user_message(tenant, customer, conversation, user_message, db)
 
-    # Mark the JSONB field as modified so SQLAlchemy detects the change
-    flag_modified(conversation, "messages")
+    logger.info(f"Text message received from {customer.whatsapp_number}: {message_text[:50]}")
+    await reply_with_agents(tenant, customer, conversation, message_text, db)
 
-    db.commit()
 
-    # Process with AI agents
-    logger.info(f"Text message received from {customer.whatsapp_number}: {message_text[:50]}")
+async def reply_with_agents(
+    tenant: Tenant,
+    customer: Customer,
+    conversation: Conversation,
+    message_text: str,
+    db: Session
+) -> None:
+    """
+    Run the agent pipeline on the customer's message (typed or transcribed)
+    and send the reply
 
+    Args:
+        tenant: Tenant object
+        customer: Customer object
+        conversation: Conversation object (already holding the message)
+        message_text: Message text
+        db: Database session
+    """
     try:
-        from app.agents import MasterAgent, AgentContext
+        from app.agents import MasterAgent, AgentContext, AgentResponse
         from uuid import UUID
 
         # Build agent context
@@ -170,54 +258,40 @@ async def process_text_message(
         master_agent = MasterAgent()
 
         # Use AI routing if enabled, otherwise use legacy system
-        if settings.USE_AI_AGENTS:
-            logger.info("🤖 Using AI-powered routing (process_with_ai_routing)")
-            response = await master_agent.process_with_ai_routing(
-                message={"type": "text", "content": message_text},
-                context=agent_context,
-                db=db
-            )
-        else:
-            logger.info("📌 Using legacy routing (process)")
-            response = await master_agent.process(
-                message={"type": "text", "content": message_text},
-                context=agent_context,
-                db=db
+        with llm_turn() as turn, metrics.webhook_stage_duration.labels(stage="agents").time():
+            if settings.USE_AI_AGENTS:
+                logger.info("🤖 Using AI-powered routing (process_with_ai_routing)")
+                response = await master_agent.process_with_ai_routing(
+                    message={"type": "text", "content": message_text},
+                    context=agent_context,
+                    db=db
+                )
+            else:
+                logger.info("📌 Using legacy routing (process)")
+                response = await master_agent.process(
+                    message={"type": "text", "content": message_text},
+                    context=agent_context,
+                    db=db
+                )
+
+        # Share of turns answered without any LLM call (templates)
+        metrics.bot_turns.labels(
+            routing="ai" if settings.USE_AI_AGENTS else "legacy",
+            llm_calls=str(turn.calls) if turn.calls < 3 else "3+"
+        ).inc()
+
+        if turn.shed and response:
+            # The tenant's LLM quota refused a call: whatever the agents
+            # produced is an error reply, so ask the customer to wait instead
+            logger.warning(f"Turn shed for tenant {tenant.id} ({turn.shed})")
+            response = AgentResponse(
+                text=LLM_BUSY_REPLY,
+                intent="llm_busy"
             )
 
         # If agent returned a response, send it back to customer
         if response:
-            # Add assistant response to conversation
-            messages = conversation.messages or []
-            messages.append({
-                "role": "assistant",
-                "content": response.text,
-                "timestamp": datetime.utcnow().isoformat(),
-                "type": "text",
-                "intent": response.intent
-            })
-            conversation.messages = messages
-            conversation.total_messages = len(messages)
-
-            # Update context if agent provided updates
-            if response.context_updates:
-                context_data = conversation.context or {}
-                context_data.update(response.context_updates)
-                conversation.context = context_data
-                flag_modified(conversation, "context")
-
-            flag_modified(conversation, "messages")
-            db.commit()
-
-            # Send response back to WhatsApp via Evolution API
-            instance_name = f"tenant_{str(tenant.id)}"
-            await evolution_service.send_text_message(
-                instance_name=instance_name,
-                number=customer.whatsapp_number,
-                message=response.text
-            )
-
-            logger.info(f"Bot response sent to {customer.whatsapp_number}: {response.text[:50]}")
+            await send_agent_response(tenant, customer, conversation, response, db)
         else:
             logger.info(f"No response sent (human intervention active or other reason)")
 
@@ -239,46 +313,64 @@ async def process_audio_message(
     tenant: Tenant,
     customer: Customer,
     conversation: Conversation,
-    audio_url: str,
+    audio: Dict[str, Any],
     db: Session
 ) -> None:
     """
-    Process incoming audio message
+    Process incoming audio message: transcribe it, then reply like a text
 
     Args:
         tenant: Tenant object
         customer: Customer object
         conversation: Conversation object
-        audio_url: URL of audio file
+        audio: media references and audioMessage fields (see process_whatsapp_audio)
         db: Database session
     """
-    # Transcribe audio
-    transcription_result = await audio_processor.process_whatsapp_audio(audio_url)
+    from app.agents import AgentResponse
+
+    instance_name = f"tenant_{str(tenant.id)}"
+
+    if transcription_pool.is_backlogged():
+        # Transcription will take a while: let the customer know we got it
+        metrics.audio_acks.inc()
+        try:
+            await evolution_service.send_text_message(
+                instance_name=instance_name,
+                number=customer.whatsapp_number,
+                message=AUDIO_ACK_REPLY
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send audio acknowledgement: {str(e)}")
+
+    transcription_result = await transcription_pool.transcribe(audio)
 
     transcribed_text = transcription_result.get("text", "")
     success = transcription_result.get("success", False)
 
     # Add message to conversation
-    messages = conversation.messages or []
-    messages.append({
+    user_message = {
         "role": "user",
-        "content": transcribed_text,
+        "content": transcribed_text if success else "[Áudio não transcrito]",
         "timestamp": datetime.utcnow().isoformat(),
         "type": "audio",
-        "audio_url": audio_url,
+        "audio_url": audio.get("url"),
         "transcription_success": success,
         "duration": transcription_result.get("duration")
-    })
-    conversation.messages = messages
-    conversation.total_messages = len(messages)
-
-    # Mark the JSONB field as modified so SQLAlchemy detects the change
-    flag_modified(conversation, "messages")
-
-    db.commit()
+    }
+    await store_user_message(tenant, customer, conversation, user_message, db)
+
+    if not success:
+        # The processor's text explains the failure to the customer
+        logger.info(f"Audio from {customer.whatsapp_number} not transcribed: {transcription_result.get('error')}")
+        await send_agent_response(
+            tenant, customer, conversation,
+            AgentResponse(text=transcribed_text, intent="audio_error"),
+            db
+        )
+        return
 
-    # TODO: Process with AI agents (Session 5)
     logger.info(f"Audio transcribed from {customer.whatsapp_number}: {transcribed_text[:50]}")
+    await reply_with_agents(tenant, customer, conversation, transcribed_text, db)
 
 
 @router.post("/evolution")
@@ -292,171 +384,176 @@ async def evolution_webhook(request: Request):
     - CONNECTION_UPDATE: Connection status changes
     - etc.
     """
-    try:
-        payload = await request.json()
-
-        # Log webhook
-        db = next(get_db())
-        webhook_log = WebhookLog(
-            event_type=payload.get("event"),
-            payload=payload,
-            processed=False
-        )
-        db.add(webhook_log)
-        db.commit()
+    webhook = None
+    db = None
 
-        # Extract event type
-        event = payload.get("event")
+    try:
+        # Only the envelope is decoded here; data is decoded per event type
+        webhook = decode_webhook(await request.body())
+        event = webhook.event
 
         logger.info(f"Webhook received: {event}")
 
         # Handle different event types
-        if event == "messages.upsert":
-            await handle_message_upsert(payload, db)
-            webhook_log.processed = True
+        processed = True
+        if event == MESSAGES_UPSERT:
+            db = next(get_db())
+            await handle_message_upsert(webhook.instance, webhook.message(), db)
 
-        elif event == "connection.update":
-            await handle_connection_update(payload, db)
-            webhook_log.processed = True
+        elif event == CONNECTION_UPDATE:
+            db = next(get_db())
+            await handle_connection_update(webhook.instance, webhook.connection(), db)
 
-        elif event == "qrcode.updated":
+        elif event == QRCODE_UPDATED:
             logger.info("QR code updated")
-            webhook_log.processed = True
 
         else:
             logger.info(f"Unhandled event: {event}")
+            processed = False
 
-        db.commit()
+        # Buffered and written in batches in the background (no I/O here)
+        webhook_log_writer.record_deferred(
+            webhook.category, webhook.instance, webhook.as_dict, processed=processed
+        )
         return {"status": "ok"}
 
     except Exception as e:
         logger.error(f"Webhook error: {str(e)}")
+        if webhook is not None:
+            webhook_log_writer.record_deferred(
+                webhook.category, webhook.instance, webhook.as_dict, processed=False, error=str(e)
+            )
         return {"status": "error", "message": str(e)}
 
+    finally:
+        if db is not None:
+            db.close()
 
-async def handle_message_upsert(payload: Dict[str, Any], db: Session):
+
+async def handle_message_upsert(instance: Optional[str], data: MessageData, db: Session):
     """
     Handle incoming message event
 
     Args:
-        payload: Webhook payload
+        instance: Evolution instance name (format: tenant_{uuid})
+        data: Decoded messages.upsert data
         db: Database session
     """
-    try:
-        data = payload.get("data", {})
-        instance = payload.get("instance")
+    started = time.perf_counter()
+
+    key = data.key
+
+    # Ignore messages from bot (sent by us)
+    if key.from_me:
+        return
 
+    # Evolution retries slow webhooks: only the first delivery is processed
+    if not await message_deduplicator.claim(instance, key.id):
+        return
+
+    try:
         # Get tenant from instance
         tenant = await get_tenant_from_instance(instance, db)
         if not tenant:
             logger.warning(f"Tenant not found for instance: {instance}")
             return
 
-        # Extract message info
-        message = data.get("message", {})
-        key = data.get("key", {})
+        # LLM calls below are attributed to this tenant (usage rollup and plan quotas)
+        with llm_scope(tenant.id, plan=tenant.subscription_plan):
+            # Get sender info
+            remote_jid = key.remote_jid
 
-        # Ignore messages from bot (sent by us)
-        if key.get("fromMe"):
-            return
+            # Ignore group messages (groups end with @g.us)
+            if remote_jid.endswith("@g.us"):
+                logger.info(f"Ignoring group message from: {remote_jid}")
+                return
 
-        # Get sender info
-        remote_jid = key.get("remoteJid", "")
+            phone_number = remote_jid.replace("@s.whatsapp.net", "")
 
-        # Ignore group messages (groups end with @g.us)
-        if remote_jid.endswith("@g.us"):
-            logger.info(f"Ignoring group message from: {remote_jid}")
-            return
+            push_name = data.push_name or phone_number
 
-        phone_number = remote_jid.replace("@s.whatsapp.net", "")
-
-        push_name = message.get("pushName", phone_number)
-
-        # Get or create customer
-        customer = await get_or_create_customer(
-            db=db,
-            tenant_id=str(tenant.id),
-            phone_number=phone_number,
-            name=push_name
-        )
-
-        # Get or create conversation
-        conversation = await get_or_create_conversation(
-            db=db,
-            tenant_id=str(tenant.id),
-            customer_id=str(customer.id),
-            session_id=phone_number
-        )
-
-        # Check if human intervention is active
-        if conversation.human_intervention:
-            # TODO: Handle human intervention (just log for now)
-            logger.info(f"Human intervention active for {phone_number}")
-            await process_text_message(
-                tenant, customer, conversation,
-                "[Durante intervenção humana]",
-                db
+            # Get or create customer and its active conversation
+            customer, conversation = await resolve_customer_and_conversation(
+                db=db,
+                tenant_id=tenant.id,
+                phone_number=phone_number,
+                name=push_name
             )
-            return
-
-        # Process message based on type
-        # Evolution API v2 doesn't send messageType, check for content fields instead
+            metrics.webhook_stage_duration.labels(stage="setup").observe(time.perf_counter() - started)
+
+            # Check if human intervention is active
+            if conversation.human_intervention:
+                # TODO: Handle human intervention (just log for now)
+                logger.info(f"Human intervention active for {phone_number}")
+                await process_text_message(
+                    tenant, customer, conversation,
+                    "[Durante intervenção humana]",
+                    db
+                )
+                return
+
+            # Process message based on type (classified while decoding)
+            kind = data.kind
+
+            if kind == TEXT:
+                await process_text_message(tenant, customer, conversation, data.text, db)
+
+            elif kind == AUDIO:
+                message = data.message
+                audio_msg = message.audio_message
+                audio = {
+                    # Inline when the instance has webhook base64 enabled
+                    "base64": message.base64,
+                    "instance": instance,
+                    "message_id": key.id,
+                    "url": audio_msg.url,
+                    "mimetype": audio_msg.mimetype,
+                    "duration": audio_msg.seconds,
+                    "sha256": audio_msg.file_sha256,
+                    "transcription_backend": (tenant.settings or {}).get("transcription_backend")
+                }
+
+                if audio["base64"] or audio["message_id"] or audio["url"]:
+                    await process_audio_message(tenant, customer, conversation, audio, db)
+                else:
+                    logger.warning("Audio message without media reference")
+
+            elif kind == MEDIA:
+                # Media message (future implementation)
+                logger.info(f"Media message received: {data.media_type}")
+                await process_text_message(
+                    tenant, customer, conversation,
+                    "[Mensagem de mídia recebida - processamento futuro]",
+                    db
+                )
 
-        if "conversation" in message:
-            # Simple text message
-            text = message.get("conversation", "")
-            await process_text_message(tenant, customer, conversation, text, db)
-
-        elif "extendedTextMessage" in message:
-            # Extended text message
-            text = message.get("extendedTextMessage", {}).get("text", "")
-            await process_text_message(tenant, customer, conversation, text, db)
-
-        elif "audioMessage" in message:
-            # Audio message
-            audio_msg = message.get("audioMessage", {})
-            audio_url = audio_msg.get("url")
-
-            if audio_url:
-                await process_audio_message(tenant, customer, conversation, audio_url, db)
             else:
-                logger.warning("Audio message without URL")
-
-        elif any(k in message for k in ["imageMessage", "videoMessage", "documentMessage"]):
-            # Media message (future implementation)
-            media_type = next(k for k in ["imageMessage", "videoMessage", "documentMessage"] if k in message)
-            logger.info(f"Media message received: {media_type}")
-            await process_text_message(
-                tenant, customer, conversation,
-                "[Mensagem de mídia recebida - processamento futuro]",
-                db
-            )
-
-        else:
-            logger.warning(f"Unknown message structure: {list(message.keys())}")
+                logger.warning(f"Unknown message structure: {data.message_type}")
 
     except Exception as e:
         logger.error(f"Error handling message: {str(e)}")
+        # A redelivery may succeed where this attempt failed
+        await message_deduplicator.release(instance, key.id)
 
 
-async def handle_connection_update(payload: Dict[str, Any], db: Session):
+async def handle_connection_update(instance: Optional[str], data: ConnectionData, db: Session):
     """
     Handle connection status update
 
     Args:
-        payload: Webhook payload
+        instance: Evolution instance name (format: tenant_{uuid})
+        data: Decoded connection.update data
         db: Database session
     """
     try:
-        instance = payload.get("instance")
-        data = payload.get("data", {})
-
-        state = data.get("state")
+        state = data.state
 
         logger.info(f"Connection update for {instance}: {state}")
 
-        # Get tenant
-        tenant = await get_tenant_from_instance(instance, db)
+        # Loaded from the database, not tenant_cache: the comparison below must
+        # see what other workers wrote
+        tenant_id = tenant_id_from_instance(instance)
+        tenant = db.get(Tenant, tenant_id) if tenant_id else None
         if not tenant:
             return
 
@@ -466,6 +563,7 @@ async def handle_connection_update(payload: Dict[str, Any], db: Session):
         if tenant.whatsapp_connected != connected:
             tenant.whatsapp_connected = connected
             db.commit()
+            tenant_cache.invalidate(tenant.id)
             logger.info(f"Tenant {tenant.id} WhatsApp status updated: {connected}")
 
     except Exception as e:
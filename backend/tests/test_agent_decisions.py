@@ -0,0 +1,85 @@
+"""
+Testes para as decisões estruturadas dos agentes (tool calls tipadas)
+
+Não chama o LLM: valida o schema enviado na tool e a decodificação dos
+argumentos devolvidos pelo modelo.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.agents.decisions import (
+    DECISION_TOOL_NAME, AddressDecision, OrderDecision, PaymentDecision,
+    decision_tool, parse_decision
+)
+from app.core import metrics
+
+
+def _invalid_count(agent: str, reason: str) -> float:
+    return metrics.agent_invalid_decisions.labels(agent=agent, reason=reason)._value.get()
+
+
+def test_tool_schema_is_self_contained():
+    """Modelos aninhados são embutidos (sem $ref/$defs) no schema da função"""
+    tool = decision_tool(OrderDecision)
+    assert tool["function"]["name"] == DECISION_TOOL_NAME
+
+    schema_text = json.dumps(tool["function"]["parameters"])
+    assert "$ref" not in schema_text and "$defs" not in schema_text
+
+    produtos = tool["function"]["parameters"]["properties"]["produtos"]
+    assert "produto_nome" in produtos["items"]["properties"]
+
+
+def test_valid_order_decision():
+    arguments = json.dumps({
+        "acao": "adicionar_multiplos",
+        "produtos": [
+            {"produto_nome": "P13", "quantidade": 2},
+            {"produto_nome": "Galão 20L"}
+        ],
+        "mensagem_cliente": "Adicionei!"
+    })
+    decision = parse_decision("OrderAgent", OrderDecision, arguments)
+
+    assert decision.acao == "adicionar_multiplos"
+    assert [p.quantidade for p in decision.produtos] == [2, 1]
+
+
+def test_payment_defaults_fill_missing_fields():
+    """Campos opcionais ausentes recebem os mesmos padrões do fluxo antigo"""
+    decision = parse_decision("PaymentAgent", PaymentDecision, '{"metodo": "pix", "confirmado": true}')
+
+    data = decision.model_dump()
+    assert data["troco_para"] is None
+    assert data["validacao_troco"]["valido"] is True
+    assert data["mensagem_cliente"] == ""
+
+
+def test_unknown_action_is_schema_error():
+    """Ação fora do enum é descartada e contada como schema inválido"""
+    before = _invalid_count("OrderAgent", "schema")
+    decision = parse_decision("OrderAgent", OrderDecision, '{"acao": "cancelar_tudo"}')
+
+    assert decision is None
+    assert _invalid_count("OrderAgent", "schema") == before + 1
+
+
+def test_truncated_json_is_invalid_json():
+    before = _invalid_count("ValidationAgent", "invalid_json")
+    decision = parse_decision("ValidationAgent", AddressDecision, '{"completo": true, "rua": "Rua A')
+
+    assert decision is None
+    assert _invalid_count("ValidationAgent", "invalid_json") == before + 1
+
+
+def test_missing_tool_call():
+    """Modelo respondeu texto em vez de chamar a função"""
+    before = _invalid_count("PaymentAgent", "missing_tool_call")
+
+    assert parse_decision("PaymentAgent", PaymentDecision, None) is None
+    assert _invalid_count("PaymentAgent", "missing_tool_call") == before + 1
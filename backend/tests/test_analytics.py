@@ -0,0 +1,38 @@
+"""
+Testes da conversão segura dos itens de pedido no refresh de analytics
+
+Não acessa o banco: valida o padrão que decide o que é número (o mesmo
+regex vai para o operador ~ do Postgres) e o SQL gerado.
+"""
+import re
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.analytics import NUMERIC_PATTERN, item_numeric
+
+
+def test_numeric_pattern_accepts_numbers():
+    for value in ["2", " 3 ", "2.5", "-1", "110.00", "1e2"]:
+        assert re.match(NUMERIC_PATTERN, value), value
+
+
+def test_malformed_item_values_are_not_cast():
+    # Linha de item como a extração do LLM às vezes grava
+    item = {"product_name": "Água 20L", "quantity": "dois", "price": "", "subtotal": "2 un"}
+
+    for value in item.values():
+        assert not re.match(NUMERIC_PATTERN, value), value
+    assert not re.match(NUMERIC_PATTERN, "12,50")
+
+
+def test_cast_only_inside_guard():
+    sql = item_numeric("quantity")
+
+    assert sql == (
+        f"(CASE WHEN (e->>'quantity') ~ '{NUMERIC_PATTERN}' "
+        f"THEN (e->>'quantity')::numeric END)"
+    )
@@ -0,0 +1,102 @@
+"""
+Testes do uso do FAQ cache pelo AttendanceAgent._handle_general
+
+O contexto é montado como o webhook monta (reply_with_agents): a mensagem
+do cliente já está no histórico quando o agente responde. LLM e cache são
+falsos.
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.agents import attendance
+from app.agents.attendance import AttendanceAgent
+from app.agents.base import AgentContext
+
+QUESTION = "Que horas vocês fecham?"
+ANSWER = "Fechamos às 18h 😊"
+
+
+class FakeFaqCache:
+    def __init__(self):
+        self.stored = []
+
+    async def lookup(self, tenant_id, question):
+        return None
+
+    async def store(self, tenant_id, question, answer):
+        self.stored.append((tenant_id, question, answer))
+
+
+def _turn(role, content):
+    return {"role": role, "content": content, "timestamp": datetime.now().isoformat(), "type": "text"}
+
+
+def _agent(monkeypatch, reply=ANSWER):
+    # Sem __init__: não cria o cliente da OpenAI
+    agent = AttendanceAgent.__new__(AttendanceAgent)
+
+    async def fake_call_llm(messages):
+        return reply
+
+    monkeypatch.setattr(agent, "_call_llm", fake_call_llm)
+    cache = FakeFaqCache()
+    monkeypatch.setattr(attendance, "faq_cache", cache)
+    return agent, cache
+
+
+def _context(history):
+    return AgentContext(
+        tenant_id=uuid4(),
+        customer_phone="5534999998888",
+        conversation_id=uuid4(),
+        session_data={},
+        message_history=history,
+    )
+
+
+def _tenant(context):
+    return SimpleNamespace(id=context.tenant_id, company_name="Gás Teste", phone="5534999999999", address=None)
+
+
+@pytest.mark.asyncio
+async def test_first_question_is_stored(monkeypatch):
+    agent, cache = _agent(monkeypatch)
+    context = _context([_turn("user", QUESTION)])
+
+    response = await agent._handle_general(QUESTION, _tenant(context), context)
+
+    assert response == ANSWER
+    assert cache.stored == [(context.tenant_id, QUESTION, ANSWER)]
+
+
+@pytest.mark.asyncio
+async def test_answer_with_earlier_turns_is_not_stored(monkeypatch):
+    agent, cache = _agent(monkeypatch)
+    context = _context([
+        _turn("user", "Quero um botijão"),
+        _turn("assistant", "Claro! Qual o endereço?"),
+        _turn("user", QUESTION),
+    ])
+
+    await agent._handle_general(QUESTION, _tenant(context), context)
+
+    assert cache.stored == []
+
+
+@pytest.mark.asyncio
+async def test_llm_error_is_not_stored(monkeypatch):
+    agent, cache = _agent(monkeypatch, reply=AttendanceAgent.LLM_ERROR_REPLY)
+    context = _context([_turn("user", QUESTION)])
+
+    await agent._handle_general(QUESTION, _tenant(context), context)
+
+    assert cache.stored == []
@@ -0,0 +1,76 @@
+"""
+Testes do VAD por energia (corte de silêncio antes do Whisper)
+
+Sinais sintéticos: "fala" é um tom modulado, "silêncio" é ruído fraco.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.audio_compaction import SAMPLE_RATE, frame_levels, trim_silence
+
+RNG = np.random.default_rng(7)
+
+
+def _speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    return 8000 * envelope * np.sin(2 * np.pi * 220 * t)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return RNG.normal(0, 30, int(seconds * SAMPLE_RATE))
+
+
+def _note(*parts) -> np.ndarray:
+    return np.concatenate(parts).astype(np.int16)
+
+
+def _seconds(samples: np.ndarray) -> float:
+    return len(samples) / SAMPLE_RATE
+
+
+def test_trims_leading_and_trailing_silence():
+    note = _note(_silence(2.0), _speech(3.0), _silence(4.0))
+
+    speech = trim_silence(note)
+
+    # 3s de fala + folga de 0.2s de cada lado
+    assert 3.0 <= _seconds(speech) <= 3.5
+
+
+def test_inner_silence_is_shortened_not_removed():
+    note = _note(_speech(1.0), _silence(5.0), _speech(1.0))
+
+    speech = trim_silence(note, max_inner_silence=0.4)
+
+    # 2s de fala + folgas (0.4s) + pausa mantida (0.4s)
+    assert 2.6 <= _seconds(speech) <= 3.0
+    levels = frame_levels(speech)
+    assert (levels < -45).sum() >= 10
+
+
+def test_all_speech_is_kept():
+    note = _note(_speech(4.0))
+
+    assert _seconds(trim_silence(note)) == _seconds(note)
+
+
+def test_silence_only_returns_empty():
+    assert len(trim_silence(_note(_silence(3.0)))) == 0
+    assert len(trim_silence(np.zeros(100, dtype=np.int16))) == 0
+
+
+def test_noisy_background_raises_threshold():
+    """Ruído de rua acima do limiar fixo não conta como fala"""
+    street = RNG.normal(0, 400, int(3.0 * SAMPLE_RATE))
+    note = _note(street, _speech(2.0) + RNG.normal(0, 400, 2 * SAMPLE_RATE), street)
+
+    speech = trim_silence(note)
+
+    assert 2.0 <= _seconds(speech) <= 2.5
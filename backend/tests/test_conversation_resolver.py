@@ -0,0 +1,107 @@
+"""
+Testes do resolvedor de tenant/cliente/conversa do webhook
+
+Não acessa o banco: valida o SQL dos upserts (alvo do ON CONFLICT) e o
+cache de tenant com uma sessão falsa.
+"""
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from sqlalchemy.dialects import postgresql
+
+from app.services.conversation_resolver import (
+    TenantCache,
+    conversation_upsert,
+    customer_upsert,
+    tenant_id_from_instance,
+)
+
+TENANT = uuid.UUID("0b6f6a8e-8f0e-4a51-9a43-5b1d5c3e7a10")
+
+
+def _sql(statement) -> str:
+    return " ".join(str(statement.compile(dialect=postgresql.dialect())).split())
+
+
+class FakeQuery:
+    def __init__(self, session):
+        self.session = session
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        self.session.queries += 1
+        return self.session.row
+
+
+class FakeSession:
+    def __init__(self, row):
+        self.row = row
+        self.queries = 0
+        self.expunged = []
+
+    def query(self, model):
+        return FakeQuery(self)
+
+    def expunge(self, obj):
+        self.expunged.append(obj)
+
+    def merge(self, obj, load=True):
+        assert load is False
+        return SimpleNamespace(merged_from=obj)
+
+
+def test_tenant_id_from_instance():
+    assert tenant_id_from_instance(f"tenant_{TENANT}") == TENANT
+    assert tenant_id_from_instance("tenant_nao-e-uuid") is None
+    assert tenant_id_from_instance("outra_instancia") is None
+    assert tenant_id_from_instance(None) is None
+
+
+def test_customer_upsert_is_one_statement():
+    sql = _sql(customer_upsert(TENANT, "5534999998888", "Ana", uuid.uuid4()))
+
+    assert sql.startswith("WITH inserted_customer AS (INSERT INTO customers")
+    assert "ON CONFLICT (tenant_id, whatsapp_number) DO NOTHING RETURNING" in sql
+    assert "UNION ALL" in sql
+    assert "NOT (EXISTS (SELECT inserted_customer.id FROM inserted_customer))" in sql
+
+
+def test_conversation_upsert_targets_partial_index():
+    sql = _sql(conversation_upsert(TENANT, uuid.uuid4(), "5534999998888", uuid.uuid4()))
+
+    assert "ON CONFLICT (customer_id) WHERE status = 'active' DO NOTHING" in sql
+    assert "conversations.status = %(status_1)s" in sql
+
+
+def test_tenant_cache_serves_without_query():
+    tenant = SimpleNamespace(id=TENANT)
+    cache = TenantCache()
+
+    first_session = FakeSession(tenant)
+    assert cache.get(first_session, TENANT).merged_from is tenant
+    assert first_session.expunged == [tenant]
+
+    second_session = FakeSession(tenant)
+    assert cache.get(second_session, TENANT).merged_from is tenant
+    assert second_session.queries == 0
+
+    cache.invalidate(TENANT)
+    assert cache.get(second_session, TENANT).merged_from is tenant
+    assert second_session.queries == 1
+
+
+def test_unknown_tenant_is_not_cached():
+    cache = TenantCache()
+    session = FakeSession(None)
+
+    assert cache.get(session, TENANT) is None
+    assert cache.get(session, TENANT) is None
+    assert session.queries == 2
@@ -0,0 +1,49 @@
+"""
+Testes para CustomerSearchService - Classificação e normalização da busca
+
+Não acessa o banco: valida apenas como o termo digitado pelo operador
+é interpretado (telefone x nome) antes de montar a query indexada.
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.customer_search import classify_query, fold_text
+
+
+def test_fold_text_removes_accents_and_case():
+    """Nome com acento deve casar com a busca sem acento"""
+    assert fold_text("  JOÃO  da Conceição ") == "joao da conceicao"
+    assert fold_text("Antônia Simões") == "antonia simoes"
+
+
+def test_phone_query_with_formatting():
+    """Telefone formatado vira só dígitos"""
+    result = classify_query("+55 (34) 99999-8888")
+    assert result == {"kind": "phone", "value": "5534999998888"}
+
+
+def test_short_phone_suffix():
+    """Final do telefone (3+ dígitos) ainda é busca por telefone"""
+    assert classify_query("8888") == {"kind": "phone", "value": "8888"}
+
+
+def test_too_few_digits_is_not_phone():
+    """Menos de 3 dígitos não usa índice de telefone"""
+    assert classify_query("12")["kind"] == "name"
+    assert classify_query("1")["kind"] == "empty"
+
+
+def test_name_query_is_folded():
+    """Busca por nome é normalizada como o índice lower(f_unaccent(name))"""
+    assert classify_query("José Ribeiro") == {"kind": "name", "value": "jose ribeiro"}
+
+
+def test_empty_query():
+    """Termos vazios não geram busca"""
+    assert classify_query("")["kind"] == "empty"
+    assert classify_query("   ")["kind"] == "empty"
+    assert classify_query(None)["kind"] == "empty"
@@ -0,0 +1,113 @@
+"""
+Testes da decodificação tipada dos webhooks da Evolution
+
+Usa os payloads de scripts/fixtures/evolution_webhooks.json (mesmos do
+benchmark_webhook_decode.py).
+"""
+import json
+import sys
+from pathlib import Path
+
+import msgspec
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.transcription_cache import media_hash
+from app.services.webhook_log import event_category
+from app.webhooks.evolution_payload import AUDIO, MEDIA, TEXT, UNKNOWN, decode_webhook
+
+FIXTURES_FILE = backend_path.parent / "scripts" / "fixtures" / "evolution_webhooks.json"
+
+FIXTURES = {
+    fixture["name"]: fixture["payload"]
+    for fixture in json.loads(FIXTURES_FILE.read_text(encoding="utf-8"))["payloads"]
+}
+
+
+def _decode(name):
+    return decode_webhook(json.dumps(FIXTURES[name], ensure_ascii=False).encode())
+
+
+def test_text_messages():
+    data = _decode("text_conversation").message()
+    assert data.kind == TEXT
+    assert data.text.startswith("Oi, boa tarde!")
+    assert data.key.remote_jid == "5534999998888@s.whatsapp.net"
+    assert data.push_name == "Maria Souza"
+
+    reply = _decode("text_extended_reply").message()
+    assert reply.kind == TEXT
+    assert reply.text == "Pode ser no pix"
+
+
+def test_audio_message_fields():
+    webhook = _decode("audio_ptt_inline_base64")
+    data = webhook.message()
+
+    assert data.kind == AUDIO
+    assert data.message.base64 == FIXTURES["audio_ptt_inline_base64"]["data"]["message"]["base64"]
+    assert data.message.audio_message.seconds == 7
+    assert data.message.audio_message.mimetype == "audio/ogg; codecs=opus"
+    assert data.message.audio_message.file_sha256
+
+    assert _decode("audio_ptt_url").message().message.base64 is None
+
+
+def test_audio_leaf_fields_with_other_types():
+    # Versões da Evolution que serializam fileSha256 como objeto de bytes
+    payload = json.loads(json.dumps(FIXTURES["audio_ptt_url"]))
+    data = payload["data"]
+    data["pushName"] = None
+    audio = data["message"]["audioMessage"]
+    audio["fileSha256"] = {"0": 12, "1": 200, "2": 7}
+    audio["seconds"] = "7"
+    audio["mimetype"] = {"type": "audio/ogg"}
+
+    decoded = decode_webhook(json.dumps(payload).encode()).message()
+
+    assert decoded.kind == AUDIO
+    assert decoded.push_name is None
+    assert decoded.message.audio_message.seconds == 7
+    assert decoded.message.audio_message.mimetype is None
+    assert decoded.message.audio_message.url == audio["url"]
+    assert media_hash(decoded.message.audio_message.file_sha256) is None
+
+
+def test_media_and_unknown_messages():
+    data = _decode("image_with_caption").message()
+    assert data.kind == MEDIA
+    assert data.media_type == "imageMessage"
+
+    payload = dict(FIXTURES["text_conversation"], data={"key": {"id": "X"}, "message": {"stickerMessage": {}}})
+    assert decode_webhook(json.dumps(payload).encode()).message().kind == UNKNOWN
+
+
+def test_unhandled_events_skip_data():
+    webhook = _decode("presence_update")
+
+    assert webhook.event == "presence.update"
+    assert not webhook.handled
+    assert webhook._message is None
+
+
+@pytest.mark.parametrize("name", sorted(FIXTURES))
+def test_category_matches_log_rule(name):
+    # Mesma chave de amostragem que o log usa para payloads em dict
+    assert _decode(name).category == event_category(FIXTURES[name])
+
+
+def test_connection_state():
+    webhook = _decode("connection_update")
+
+    assert webhook.handled
+    assert webhook.connection().state == "open"
+
+
+def test_invalid_body():
+    with pytest.raises(msgspec.DecodeError):
+        decode_webhook(b"not json")
+    with pytest.raises(msgspec.DecodeError):
+        decode_webhook(b"[]")
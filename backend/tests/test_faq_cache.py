@@ -0,0 +1,71 @@
+"""
+Testes do índice de similaridade do FAQ cache (sem Redis)
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.faq_cache import FaqIndex, normalize_question, quantity_tokens
+
+QUESTIONS = [
+    "que horas voces fecham?",
+    "aceita cartao?",
+    "qual o preco do gas?",
+    "voces entregam no domingo?",
+    "qual o preco do botijao 13kg?",
+    "voces tem botijao de 13kg?",
+]
+
+
+def _index() -> FaqIndex:
+    return FaqIndex([(normalize_question(q), f"resposta: {q}") for q in QUESTIONS])
+
+
+def test_normalize_question():
+    assert normalize_question("  Aceita CARTÃO?? ") == "aceita cartao"
+
+
+def test_variations_match_cached_question():
+    index = _index()
+
+    for variation, original in [
+        ("Que horas fecha?", "que horas voces fecham?"),
+        ("aceita cartão", "aceita cartao?"),
+        ("entregam domingo?", "voces entregam no domingo?"),
+        ("qual preço do botijão de 13 kg", "qual o preco do botijao 13kg?"),
+    ]:
+        score, _, answer = index.best_match(normalize_question(variation))
+        assert score >= 0.75, variation
+        assert answer == f"resposta: {original}"
+
+
+def test_different_questions_stay_below_threshold():
+    index = _index()
+
+    for question in ["qual o preço da água?", "quero um gás", "vocês abrem no domingo?"]:
+        score, _, _ = index.best_match(normalize_question(question))
+        assert score < 0.75, question
+
+    # Outro tamanho/produto: quase os mesmos n-gramas, resposta errada
+    for question in [
+        "qual o preco do botijao 45kg",
+        "qual o preco do botijao p45",
+        "voces tem botijao de 45kg",
+        "qual o preco da agua 20 litros",
+    ]:
+        match = index.best_match(normalize_question(question))
+        assert match is None or match[0] < 0.75, question
+
+
+def test_quantity_tokens():
+    assert quantity_tokens("botijao 13kg") == quantity_tokens("botijao de 13 kg") == {"13", "kg"}
+    assert quantity_tokens("galao 20 litros") == quantity_tokens("galao 20l") == {"20", "l"}
+    assert quantity_tokens("botijao p45") == {"45"}
+    assert quantity_tokens("aceita cartao") == frozenset()
+
+
+def test_empty_index():
+    assert FaqIndex([]).best_match("aceita cartao") is None
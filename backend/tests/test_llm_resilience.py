@@ -0,0 +1,117 @@
+"""
+Testes para o circuit breaker e a janela de latência do LLM gateway
+
+Usa um relógio falso: nenhum teste espera o tempo real passar.
+"""
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.llm_resilience import CircuitBreaker, LatencyWindow
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(clock=None):
+    return CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=clock or FakeClock())
+
+
+def test_opens_after_consecutive_failures():
+    """Abre só na terceira falha seguida"""
+    breaker = _breaker()
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is False
+    assert breaker.record_failure() is True
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+
+
+def test_success_resets_failure_count():
+    """Falhas intercaladas com sucesso não abrem o circuito"""
+    breaker = _breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is True
+
+
+def test_half_open_allows_single_probe():
+    """Depois do reset_timeout só uma chamada de teste passa"""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 29
+    assert breaker.allow() is False
+
+    clock.now += 2
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is False
+
+
+def test_probe_success_closes_circuit():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow() is True
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is True
+
+
+def test_probe_failure_reopens_circuit():
+    """Falha no teste reabre e reinicia a contagem do reset_timeout"""
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow() is True
+
+    assert breaker.record_failure() is True
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 10
+    assert breaker.allow() is False
+
+
+def test_latency_window_needs_min_samples():
+    """Sem amostras suficientes não há p95 (e portanto não há hedge)"""
+    window = LatencyWindow(size=100, min_samples=20)
+    for _ in range(19):
+        window.observe("OrderAgent", "gpt-4-turbo-preview", 1.0)
+    assert window.percentile("OrderAgent", "gpt-4-turbo-preview") is None
+
+
+def test_latency_window_p95():
+    window = LatencyWindow(size=100, min_samples=20)
+    for i in range(1, 101):
+        window.observe("OrderAgent", "gpt-4-turbo-preview", i / 10)
+    assert window.percentile("OrderAgent", "gpt-4-turbo-preview") == 9.5
+    # Janela é por agente/modelo
+    assert window.percentile("OrderAgent", "gpt-4o-mini") is None
+
+
+def test_latency_window_keeps_only_recent_samples():
+    """Amostras antigas saem da janela"""
+    window = LatencyWindow(size=20, min_samples=20)
+    for _ in range(20):
+        window.observe("a", "m", 10.0)
+    for _ in range(20):
+        window.observe("a", "m", 1.0)
+    assert window.percentile("a", "m") == 1.0
@@ -0,0 +1,151 @@
+"""
+Testes para as cotas por tenant e a fila justa do LLM scheduler
+
+A janela de tokens usa um relógio falso; as esperas da fila são curtas.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.llm_scheduler import LLMQuotaExceeded, LLMScheduler, PlanQuota
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+BASIC = PlanQuota(weight=1, max_concurrency=2, tokens_per_minute=1000, max_queue=10)
+PREMIUM = PlanQuota(weight=3, max_concurrency=10, tokens_per_minute=1000, max_queue=10)
+
+
+@pytest.mark.asyncio
+async def test_tenant_concurrency_limit_queues_extra_calls():
+    """A terceira chamada do tenant espera até uma das duas primeiras liberar"""
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=1.0)
+    await scheduler.acquire("a", BASIC)
+    await scheduler.acquire("a", BASIC)
+
+    third = asyncio.ensure_future(scheduler.acquire("a", BASIC))
+    await asyncio.sleep(0)
+    assert not third.done()
+    assert scheduler.queued("a") == 1
+
+    scheduler.release("a")
+    await third
+    assert scheduler.queued("a") == 0
+
+
+@pytest.mark.asyncio
+async def test_busy_tenant_does_not_block_others():
+    """Tenant no limite não impede outro tenant de conseguir vaga"""
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=1.0)
+    await scheduler.acquire("a", BASIC)
+    await scheduler.acquire("a", BASIC)
+    waiting = asyncio.ensure_future(scheduler.acquire("a", BASIC))
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(scheduler.acquire("b", BASIC), timeout=0.1)
+
+    waiting.cancel()
+
+
+@pytest.mark.asyncio
+async def test_queue_full_is_shed():
+    """Fila do tenant acima de max_queue: recusa na hora"""
+    quota = PlanQuota(weight=1, max_concurrency=1, tokens_per_minute=1000, max_queue=1)
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=1.0)
+    await scheduler.acquire("a", quota)
+    queued = asyncio.ensure_future(scheduler.acquire("a", quota))
+    await asyncio.sleep(0)
+
+    with pytest.raises(LLMQuotaExceeded) as exc:
+        await scheduler.acquire("a", quota)
+    assert exc.value.reason == "queue_full"
+
+    queued.cancel()
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_is_shed_and_leaves_queue():
+    """Sem vaga dentro do prazo: recusa e sai da fila"""
+    quota = PlanQuota(weight=1, max_concurrency=1, tokens_per_minute=1000, max_queue=5)
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=0.05)
+    await scheduler.acquire("a", quota)
+
+    with pytest.raises(LLMQuotaExceeded) as exc:
+        await scheduler.acquire("a", quota)
+    assert exc.value.reason == "wait_timeout"
+    assert scheduler.queued("a") == 0
+
+
+@pytest.mark.asyncio
+async def test_token_budget_blocks_until_window_expires():
+    """Tokens/minuto esgotados: espera os tokens antigos saírem da janela"""
+    clock = FakeClock()
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=1.0, clock=clock)
+
+    async with scheduler.slot("a", BASIC):
+        scheduler.record_tokens("a", 1500)
+    assert scheduler.tokens_in_window("a") == 1500
+
+    with pytest.raises(LLMQuotaExceeded):
+        await scheduler.acquire("a", BASIC, timeout=0.05)
+
+    clock.now += 61
+    assert scheduler.tokens_in_window("a") == 0
+    await asyncio.wait_for(scheduler.acquire("a", BASIC), timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_weighted_round_robin_across_tenants():
+    """Com a capacidade global esgotada, as vagas seguem o peso dos planos"""
+    scheduler = LLMScheduler(max_concurrency=1, max_wait=5.0)
+    await scheduler.acquire("holder", PREMIUM)
+
+    order = []
+
+    async def call(tenant, quota):
+        await scheduler.acquire(tenant, quota)
+        order.append(tenant)
+
+    tasks = [asyncio.ensure_future(call("basic", BASIC)) for _ in range(4)]
+    tasks += [asyncio.ensure_future(call("premium", PREMIUM)) for _ in range(4)]
+    await asyncio.sleep(0)
+
+    holder = "holder"
+    for granted in range(1, 9):
+        scheduler.release(holder)
+        while len(order) < granted:
+            await asyncio.sleep(0)
+        holder = order[-1]
+
+    await asyncio.gather(*tasks)
+    # Peso 3 x 1: três vagas do premium para cada uma do basic
+    assert order[:4].count("premium") == 3
+    assert order[:4].count("basic") == 1
+
+
+@pytest.mark.asyncio
+async def test_release_on_cancelled_wait_does_not_leak_slot():
+    """Chamada cancelada na fila não fica com vaga presa"""
+    quota = PlanQuota(weight=1, max_concurrency=1, tokens_per_minute=1000, max_queue=5)
+    scheduler = LLMScheduler(max_concurrency=10, max_wait=1.0)
+    await scheduler.acquire("a", quota)
+
+    waiting = asyncio.ensure_future(scheduler.acquire("a", quota))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.sleep(0)
+
+    scheduler.release("a")
+    await asyncio.wait_for(scheduler.acquire("a", quota), timeout=0.1)
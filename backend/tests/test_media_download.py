@@ -0,0 +1,75 @@
+"""
+Testes da decodificação em streaming do base64 da Evolution
+
+A resposta do endpoint chega em pedaços de tamanhos arbitrários; o
+conteúdo tem que sair igual e o teto tem que valer antes do fim.
+"""
+import base64
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.media_download import Base64StreamDecoder, MediaTooLarge
+
+AUDIO = os.urandom(50_000)
+
+
+def _response(encoded: str) -> bytes:
+    return json.dumps({
+        "mediaType": "audioMessage",
+        "fileName": "audio.oga",
+        "mimetype": "audio/ogg; codecs=opus",
+        "base64": encoded,
+        "size": {"fileLength": str(len(AUDIO))},
+    }).encode()
+
+
+def _feed(decoder: Base64StreamDecoder, body: bytes, chunk_size: int) -> None:
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start:start + chunk_size])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1000, 1 << 20])
+def test_decodes_across_chunk_boundaries(chunk_size):
+    decoder = Base64StreamDecoder(max_bytes=len(AUDIO))
+
+    _feed(decoder, _response(base64.b64encode(AUDIO).decode()), chunk_size)
+
+    assert decoder.done
+    assert bytes(decoder.data) == AUDIO
+
+
+def test_escaped_slashes_are_unescaped():
+    """Serializadores que escapam "/" como "\\/" (JSON válido)"""
+    body = _response(base64.b64encode(AUDIO).decode()).replace(b"/", b"\\/")
+    decoder = Base64StreamDecoder(max_bytes=len(AUDIO))
+
+    _feed(decoder, body, 5)
+
+    assert bytes(decoder.data) == AUDIO
+
+
+def test_cap_aborts_before_the_end():
+    decoder = Base64StreamDecoder(max_bytes=10_000)
+    body = _response(base64.b64encode(AUDIO).decode())
+
+    with pytest.raises(MediaTooLarge):
+        _feed(decoder, body, 1000)
+
+    assert len(decoder.data) <= 10_000 + 1000
+
+
+def test_response_without_base64_is_not_done():
+    decoder = Base64StreamDecoder(max_bytes=len(AUDIO))
+
+    _feed(decoder, json.dumps({"base64": None, "error": "not found"}).encode(), 4)
+
+    assert not decoder.done
+    assert not decoder.data
@@ -0,0 +1,105 @@
+"""
+Testes da montagem dos system prompts com prefixo estável
+
+O início do prompt (instruções + dados do tenant) precisa ser idêntico
+entre turnos para o provedor reaproveitar o cache de prompt.
+"""
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.agents.base import AgentContext
+from app.agents.order import OrderAgent
+from app.agents.payment import PaymentAgent
+from app.agents.prompts import DYNAMIC_HEADER
+from app.services.llm_gateway import estimate_cost
+from app.services.tenant_catalog import TenantCatalog, tenant_catalog
+
+
+def _agent(agent_class):
+    # Sem __init__: não cria o ChatOpenAI
+    agent = object.__new__(agent_class)
+    agent.agent_name = agent_class.__name__
+    return agent
+
+
+def _context(tenant_id, order, history):
+    return AgentContext(
+        tenant_id=tenant_id,
+        customer_phone="5511999999999",
+        conversation_id=uuid4(),
+        session_data={"current_order": order},
+        message_history=history,
+    )
+
+
+def _seed_catalog(tenant_id) -> TenantCatalog:
+    catalog = TenantCatalog(
+        tenant_id=tenant_id,
+        company_name="Gás Teste",
+        products_text="1. Botijão P13 - R$ 110.00",
+        payment_methods=["Dinheiro", "Cartão"],
+        pix_enabled=True,
+    )
+    tenant_catalog._entries[tenant_id] = (float("inf"), catalog)
+    return catalog
+
+
+def test_order_prompt_prefix_is_stable_across_turns():
+    tenant_id = uuid4()
+    _seed_catalog(tenant_id)
+    agent = _agent(OrderAgent)
+
+    first = agent._build_system_prompt_ai(_context(tenant_id, {}, []), db=None)
+    second = agent._build_system_prompt_ai(_context(
+        tenant_id,
+        {"items": [{"quantity": 2, "product_name": "Botijão P13", "subtotal": 220.0}], "total": 220.0},
+        [{"role": "assistant", "content": "Deseja adicionar mais?"}]
+    ), db=None)
+
+    prefix_first, dynamic_first = first.split(DYNAMIC_HEADER)
+    prefix_second, dynamic_second = second.split(DYNAMIC_HEADER)
+
+    assert prefix_first == prefix_second
+    assert "Botijão P13 - R$ 110.00" in prefix_first
+    assert "Carrinho vazio" in dynamic_first
+    assert "Deseja adicionar mais?" in dynamic_second
+
+
+def test_payment_total_stays_out_of_prefix():
+    tenant_id = uuid4()
+    _seed_catalog(tenant_id)
+    agent = _agent(PaymentAgent)
+
+    prompt = agent._build_system_prompt_ai(_context(tenant_id, {"total": 137.5}, []), db=None)
+    prefix, dynamic = prompt.split(DYNAMIC_HEADER)
+
+    assert "- PIX (disponível)" in prefix
+    assert "137.50" not in prefix
+    assert "R$ 137.50" in dynamic
+
+
+def test_invalidate_drops_compiled_prefixes():
+    tenant_id = uuid4()
+    catalog = _seed_catalog(tenant_id)
+    catalog.prefix("OrderAgent", lambda c: "antigo")
+
+    tenant_catalog.invalidate(tenant_id)
+
+    assert tenant_id not in tenant_catalog._entries
+
+
+def test_cached_tokens_are_billed_at_cached_price():
+    full = estimate_cost("gpt-4o-mini", 1000, 0)
+    half_cached = estimate_cost("gpt-4o-mini", 1000, 0, cached_tokens=500)
+
+    assert half_cached < full
+    assert round(half_cached * 1_000_000, 6) == round(500 * 0.15 + 500 * 0.075, 6)
+    # Sem desconto de cache: mesmo custo
+    assert estimate_cost("gpt-4-turbo-preview", 1000, 0, cached_tokens=500) == estimate_cost(
+        "gpt-4-turbo-preview", 1000, 0
+    )
@@ -0,0 +1,75 @@
+"""
+Testes das respostas por template (turnos de rotina sem LLM)
+"""
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import reply_templates
+from app.services.intent_classifier import match_routine
+from app.services.reply_templates import ReplyTemplates
+from app.services.tenant_catalog import TenantCatalog
+
+
+def _catalog(**overrides) -> TenantCatalog:
+    data = dict(
+        tenant_id=uuid4(),
+        company_name="Gás Teste",
+        products=[("Botijão P13", 110.0, "13kg"), ("Galão 20L", 12.5, None)],
+        payment_methods=["Dinheiro", "PIX", "Cartão"],
+        pix_enabled=True,
+        pix_key="gas@teste.com",
+        payment_instructions="Desconto de $5 no PIX",
+    )
+    data.update(overrides)
+    return TenantCatalog(**data)
+
+
+def test_match_routine_ignores_case_accents_and_punctuation():
+    assert match_routine("Olá!") == "greeting"
+    assert match_routine("  Só isso.  ") == "answer_no"
+    assert match_routine("CARTÃO") == "pay_card"
+    assert match_routine("Quais produtos vocês têm?") == "product_inquiry"
+
+
+def test_match_routine_leaves_free_form_to_llm():
+    assert match_routine("quero 2 botijões e um galão") is None
+    assert match_routine("oi, entregam no centro?") is None
+    assert match_routine("") is None
+
+
+def test_greeting_includes_catalog():
+    templates = ReplyTemplates(_catalog())
+    text = templates.greeting()
+
+    assert "Gás Teste" in text
+    assert "1. *Botijão P13*" in text
+    assert "R$ 12,50" in text
+
+
+def test_payment_options_only_list_enabled_methods():
+    templates = ReplyTemplates(_catalog(pix_enabled=False))
+    text = templates.payment_options(122.5)
+
+    assert "R$ 122,50" in text
+    assert "PIX" not in text
+    assert "Dinheiro" in text and "Cartão" in text
+    assert not templates.pix_available
+
+
+def test_pix_template_keeps_tenant_dollar_signs():
+    text = ReplyTemplates(_catalog()).pix_payment(110)
+
+    assert "R$ 110,00" in text
+    assert "gas@teste.com" in text
+    assert "Desconto de $5 no PIX" in text
+
+
+def test_cash_payment_change():
+    assert "Troco:* R$ 40,00" in reply_templates.cash_payment(110, 150)
+    assert "Sem necessidade de troco" in reply_templates.cash_payment(110, 110)
+    assert reply_templates.cash_payment(110, 50).startswith("❌")
@@ -202,7 +202,6 @@ def test_dependencies_needed():
     print("    - googlemaps")
     print("    - redis")
     print("    - aiohttp")
-    print("    - pydub")
 
     print("\n  Install with:")
     print("    pip install -r requirements.txt")
@@ -0,0 +1,95 @@
+"""
+Testes da escolha de backend de transcrição e do fallback para o Whisper API
+
+Nenhum modelo é carregado: os backends são substituídos por falsos.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import transcription_backends as backends_module
+from app.services.transcription_backends import (
+    LocalWhisperBackend,
+    TranscriptionBackend,
+    TranscriptionBackendError,
+    TranscriptionBackends,
+    WhisperAPIBackend,
+)
+
+UPLOAD = ("audio.ogg", b"OggS", "audio/ogg")
+
+
+class FakeBackend(TranscriptionBackend):
+    def __init__(self, name, text=None):
+        self.name = name
+        self.text = text
+        self.calls = 0
+
+    @property
+    def variant(self):
+        return self.name
+
+    async def transcribe(self, upload, duration=0):
+        self.calls += 1
+        if self.text is None:
+            raise TranscriptionBackendError("modelo não carregou")
+        return self.text
+
+
+def test_unknown_or_missing_backend_uses_whisper_api(monkeypatch):
+    monkeypatch.setattr(backends_module, "local_stt_available", lambda: False)
+    registry = TranscriptionBackends()
+
+    assert isinstance(registry.resolve("nao_existe"), WhisperAPIBackend)
+    assert isinstance(registry.resolve("local"), WhisperAPIBackend)
+    assert isinstance(registry.resolve(None), WhisperAPIBackend)
+
+
+def test_local_backend_is_created_once(monkeypatch):
+    monkeypatch.setattr(backends_module, "local_stt_available", lambda: True)
+    registry = TranscriptionBackends()
+
+    local = registry.resolve("LOCAL")
+
+    assert isinstance(local, LocalWhisperBackend)
+    assert registry.resolve("local") is local
+    assert local.variant != registry.default.variant
+
+
+@pytest.mark.asyncio
+async def test_failing_backend_falls_back_to_default():
+    registry = TranscriptionBackends()
+    registry.default = FakeBackend("whisper_api", text="quero um gás")
+    broken = FakeBackend("local")
+
+    text, used = await registry.transcribe(broken, UPLOAD, 3)
+
+    assert text == "quero um gás"
+    assert used is registry.default
+    assert broken.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_default_backend_failure_is_raised():
+    registry = TranscriptionBackends()
+    registry.default = FakeBackend("whisper_api")
+
+    with pytest.raises(TranscriptionBackendError):
+        await registry.transcribe(registry.default, UPLOAD, 3)
+
+
+def test_incomplete_backend_fails_on_creation():
+    class NoTranscribe(TranscriptionBackend):
+        name = "incompleto"
+
+        @property
+        def variant(self):
+            return self.name
+
+    with pytest.raises(TypeError):
+        NoTranscribe()
@@ -0,0 +1,102 @@
+"""
+Testes do cache de transcrições (hash do áudio, LRU local e Redis)
+
+O Redis é substituído por um dicionário; sem ele o cache só vira miss.
+"""
+import base64
+import hashlib
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.transcription_cache import (
+    TranscriptionCache,
+    content_hash,
+    media_hash,
+    transcription_variant,
+)
+
+AUDIO = b"OggS fake voice note"
+VARIANT = transcription_variant("whisper-1", "pt", "prompt")
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def setex(self, key, ttl, value):
+        raise ConnectionError("redis down")
+
+
+def _use_redis(monkeypatch, client):
+    monkeypatch.setitem(sys.modules, "app.core.cache", SimpleNamespace(redis_client=client))
+
+
+def test_media_hash_matches_content_hash():
+    """fileSha256 da Evolution (base64 ou hex) aponta para a mesma chave dos bytes"""
+    digest = hashlib.sha256(AUDIO).digest()
+
+    assert media_hash(base64.b64encode(digest).decode()) == content_hash(AUDIO)
+    assert media_hash(digest.hex().upper()) == content_hash(AUDIO)
+    assert media_hash({"0": 12, "1": 34}) is None
+    assert media_hash("nao-e-hash") is None
+    assert media_hash(base64.b64encode(b"curto").decode()) is None
+
+
+def test_variant_changes_with_prompt():
+    assert transcription_variant("whisper-1", "pt", "outro prompt") != VARIANT
+
+
+@pytest.mark.asyncio
+async def test_store_then_get_from_redis_in_another_process(monkeypatch):
+    redis = FakeRedis()
+    _use_redis(monkeypatch, redis)
+    audio_hash = content_hash(AUDIO)
+
+    await TranscriptionCache().store(audio_hash, VARIANT, "quero um gás")
+
+    # Outro worker: LRU vazio, acha no Redis
+    other = TranscriptionCache()
+    assert await other.get(audio_hash, VARIANT) == "quero um gás"
+    assert await other.get(audio_hash, transcription_variant("whisper-1", "en", "prompt")) is None
+
+
+@pytest.mark.asyncio
+async def test_local_lru_serves_hits_and_evicts_oldest(monkeypatch):
+    _use_redis(monkeypatch, BrokenRedis())
+    cache = TranscriptionCache(local_entries=2)
+
+    await cache.store("a", VARIANT, "texto a")
+    await cache.store("b", VARIANT, "texto b")
+    assert await cache.get("a", VARIANT) == "texto a"
+
+    # "b" é o menos usado e sai
+    await cache.store("c", VARIANT, "texto c")
+    assert await cache.get("b", VARIANT) is None
+    assert await cache.get("a", VARIANT) == "texto a"
+    assert await cache.get("c", VARIANT) == "texto c"
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_is_a_miss(monkeypatch):
+    _use_redis(monkeypatch, BrokenRedis())
+
+    assert await TranscriptionCache().get(content_hash(AUDIO), VARIANT) is None
+    assert await TranscriptionCache().get(None, VARIANT) is None
@@ -0,0 +1,80 @@
+"""
+Testes do pool de transcrição (limite de Whisper simultâneos e fila)
+
+O audio_processor é substituído por uma transcrição falsa controlada pelo teste.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import transcription_pool as pool_module
+from app.services.transcription_pool import TranscriptionPool
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.active = 0
+        self.peak = 0
+
+    async def process_whatsapp_audio(self, audio_data):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await self.release.wait()
+            return {"text": audio_data["url"], "success": True}
+        finally:
+            self.active -= 1
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_concurrent_transcriptions(monkeypatch):
+    """Nunca mais transcrições simultâneas que workers; o resto espera na fila"""
+    processor = FakeProcessor()
+    monkeypatch.setattr(pool_module, "audio_processor", processor)
+    monkeypatch.setattr(pool_module.settings, "AUDIO_ACK_QUEUE_DEPTH", 2)
+    pool = TranscriptionPool(workers=2)
+
+    tasks = [asyncio.ensure_future(pool.transcribe({"url": f"a{i}"})) for i in range(5)]
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+    assert pool.running == 2
+    assert pool.waiting == 3
+    assert pool.is_backlogged()
+
+    processor.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert [r["text"] for r in results] == [f"a{i}" for i in range(5)]
+    assert processor.peak == 2
+    assert pool.running == 0 and pool.waiting == 0
+    assert not pool.is_backlogged()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_leaves_queue(monkeypatch):
+    """Webhook cancelado enquanto espera não deixa contagem presa na fila"""
+    processor = FakeProcessor()
+    monkeypatch.setattr(pool_module, "audio_processor", processor)
+    pool = TranscriptionPool(workers=1)
+
+    running = asyncio.ensure_future(pool.transcribe({"url": "a"}))
+    waiting = asyncio.ensure_future(pool.transcribe({"url": "b"}))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    assert pool.waiting == 1
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert pool.waiting == 0
+
+    processor.release.set()
+    assert (await running)["text"] == "a"
@@ -0,0 +1,86 @@
+"""
+Testes do dedup de webhooks (mesma mensagem entregue duas vezes)
+
+O Redis é substituído por um dicionário com SET NX; sem ele vale o
+registro em memória.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.webhook_dedup import MessageDeduplicator
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class BrokenRedis:
+    async def set(self, key, value, nx=False, ex=None):
+        raise ConnectionError("redis down")
+
+    async def delete(self, key):
+        raise ConnectionError("redis down")
+
+
+def _use_redis(monkeypatch, client):
+    monkeypatch.setitem(sys.modules, "app.core.cache", SimpleNamespace(redis_client=client))
+
+
+@pytest.mark.asyncio
+async def test_second_delivery_is_dropped_across_workers(monkeypatch):
+    _use_redis(monkeypatch, FakeRedis())
+    worker_a, worker_b = MessageDeduplicator(), MessageDeduplicator()
+
+    assert await worker_a.claim("tenant_1", "3EB0ABC")
+    assert not await worker_b.claim("tenant_1", "3EB0ABC")
+    # Mesmo id em outra instância é outra mensagem
+    assert await worker_b.claim("tenant_2", "3EB0ABC")
+
+
+@pytest.mark.asyncio
+async def test_release_allows_retry_after_failure(monkeypatch):
+    _use_redis(monkeypatch, FakeRedis())
+    dedup = MessageDeduplicator()
+
+    assert await dedup.claim("tenant_1", "3EB0ABC")
+    await dedup.release("tenant_1", "3EB0ABC")
+
+    assert await dedup.claim("tenant_1", "3EB0ABC")
+
+
+@pytest.mark.asyncio
+async def test_without_message_id_always_processes(monkeypatch):
+    _use_redis(monkeypatch, FakeRedis())
+    dedup = MessageDeduplicator()
+
+    assert await dedup.claim("tenant_1", None)
+    assert await dedup.claim("tenant_1", None)
+
+
+@pytest.mark.asyncio
+async def test_local_registry_when_redis_is_down(monkeypatch):
+    _use_redis(monkeypatch, BrokenRedis())
+    dedup = MessageDeduplicator()
+
+    assert await dedup.claim("tenant_1", "3EB0ABC")
+    assert not await dedup.claim("tenant_1", "3EB0ABC")
+
+    await dedup.release("tenant_1", "3EB0ABC")
+    assert await dedup.claim("tenant_1", "3EB0ABC")
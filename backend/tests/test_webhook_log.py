@@ -0,0 +1,130 @@
+"""
+Testes do gravador de logs de webhook (amostragem, buffer e lotes)
+
+A gravação no banco é substituída por uma lista; nada de Postgres aqui.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services import webhook_log as log_module
+from app.services.webhook_log import (
+    WebhookLogWriter,
+    event_category,
+    loggable_payload,
+    tenant_from_instance,
+)
+
+TENANT = "0b6f6a8e-8f0e-4a51-9a43-5b1d5c3e7a10"
+
+
+def _message(from_me=False, **message):
+    return {
+        "event": "messages.upsert",
+        "instance": f"tenant_{TENANT}",
+        "data": {"key": {"fromMe": from_me, "id": "ABC"}, "message": message},
+    }
+
+
+@pytest.fixture
+def log_settings(monkeypatch):
+    settings = log_module.settings
+    monkeypatch.setattr(settings, "WEBHOOK_LOG_ENABLED", True)
+    monkeypatch.setattr(settings, "WEBHOOK_LOG_SAMPLE_RATES", {
+        "messages.upsert": 1.0,
+        "messages.upsert:fromMe": 0.0,
+    })
+    monkeypatch.setattr(settings, "WEBHOOK_LOG_DEFAULT_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "WEBHOOK_LOG_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "WEBHOOK_LOG_MAX_BUFFER", 5)
+    return settings
+
+
+def test_event_category_and_tenant():
+    assert event_category(_message()) == "messages.upsert"
+    assert event_category(_message(from_me=True)) == "messages.upsert:fromMe"
+    assert event_category({"event": "connection.update", "data": {"state": "open"}}) == "connection.update"
+    assert str(tenant_from_instance(f"tenant_{TENANT}")) == TENANT
+    assert tenant_from_instance("tenant_x") is None
+    assert tenant_from_instance(None) is None
+
+
+def test_inline_media_is_not_logged():
+    payload = _message(audioMessage={"seconds": 4}, base64="A" * 1000)
+
+    logged = loggable_payload(payload)
+
+    assert logged["data"]["message"]["base64"] == "<omitted 1000 chars>"
+    assert logged["data"]["message"]["audioMessage"] == {"seconds": 4}
+    assert payload["data"]["message"]["base64"] == "A" * 1000
+
+
+def test_sampling_by_event_type(log_settings):
+    writer = WebhookLogWriter(write=lambda rows: None)
+
+    writer.record(_message(conversation="oi"), processed=True)
+    writer.record(_message(from_me=True, conversation="resposta do bot"), processed=True)
+    writer.record({"event": "presence.update"})
+    # Erro grava mesmo com amostragem 0
+    writer.record({"event": "presence.update"}, error="boom")
+
+    assert [entry["event_type"] for entry in writer._buffer] == ["messages.upsert", "presence.update"]
+    assert writer._buffer[1]["error"] == "boom"
+
+
+def test_buffer_drops_oldest_when_full(log_settings):
+    writer = WebhookLogWriter(write=lambda rows: None)
+
+    for i in range(8):
+        writer.record(_message(conversation=f"msg {i}"))
+
+    assert len(writer._buffer) == 5
+    assert writer._buffer[0]["payload"]["data"]["message"]["conversation"] == "msg 3"
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_in_batches(log_settings):
+    batches = []
+    writer = WebhookLogWriter(write=batches.append)
+
+    for i in range(5):
+        writer.record(_message(conversation=f"msg {i}"), processed=True)
+    await writer.stop()
+
+    assert [len(batch) for batch in batches] == [3, 2]
+    assert batches[0][0]["processed"] is True
+    assert str(batches[0][0]["tenant_id"]) == TENANT
+    assert not writer._buffer
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_dropped_not_retried_forever(log_settings):
+    def broken(rows):
+        raise RuntimeError("db down")
+
+    writer = WebhookLogWriter(write=broken)
+    writer.record(_message(conversation="oi"))
+
+    assert await writer.flush() == 0
+    assert not writer._buffer
+
+
+def test_deferred_payload_only_built_when_sampled(log_settings):
+    writer = WebhookLogWriter(write=lambda rows: None)
+    built = []
+
+    def load():
+        built.append(True)
+        return _message(conversation="oi")
+
+    writer.record_deferred("messages.upsert:fromMe", f"tenant_{TENANT}", load)
+    assert not built and not writer._buffer
+
+    writer.record_deferred("messages.upsert", f"tenant_{TENANT}", load, processed=True)
+    assert len(built) == 1
+    assert writer._buffer[0]["event_type"] == "messages.upsert"
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { OrdersList } from '@/components/dashboard/OrdersList';
@@ -10,7 +10,8 @@ import { ProductsList } from '@/components/dashboard/ProductsList';
 import { DeliveryDriversList } from '@/components/dashboard/DeliveryDriversList';
 import { DeliveryConfigTab } from '@/components/dashboard/delivery/DeliveryConfigTab';
 import { TrialBanner, TrialStatusCard } from '@/components/TrialBanner';
-import { useWebSocket } from '@/hooks/useWebSocket';
+import { useWebSocket, WebSocketMessage } from '@/hooks/useWebSocket';
+import { emitDashboardEvent, FALLBACK_POLL_INTERVAL } from '@/hooks/useDashboardEvents';
 import { api } from '@/lib/api';
 
 interface DashboardSummary {
@@ -40,16 +41,39 @@ export default function DashboardPage() {
     }
   }, []);
 
+  const hasConnectedRef = useRef(false);
+
+  // Aplica o delta do evento ao resumo sem consultar a API
+  const applySummaryDelta = (delta?: Record<string, number>) => {
+    if (!delta || Object.keys(delta).length === 0) return;
+
+    setSummary((current) => {
+      if (!current) return current;
+      const next = { ...current };
+      for (const [key, value] of Object.entries(delta)) {
+        const field = key as keyof DashboardSummary;
+        if (field in next) {
+          next[field] = Math.max(0, (next[field] || 0) + value);
+        }
+      }
+      return next;
+    });
+  };
+
   // WebSocket para atualizações em tempo real
-  const { isConnected, lastMessage } = useWebSocket({
+  const { isConnected } = useWebSocket({
     tenantId,
-    onMessage: (message) => {
-      console.log('Nova mensagem WebSocket:', message);
-
-      // Atualizar dados quando receber notificações
-      if (message.type === 'new_order' || message.type === 'order_updated') {
+    onMessage: (message: WebSocketMessage) => {
+      applySummaryDelta(message.summary_delta);
+      emitDashboardEvent(message);
+    },
+    onConnect: () => {
+      // Eventos perdidos enquanto desconectado: ressincroniza tudo
+      if (hasConnectedRef.current) {
         fetchSummary();
+        emitDashboardEvent({ type: 'resync', data: {}, timestamp: new Date().toISOString() });
       }
+      hasConnectedRef.current = true;
     },
   });
 
@@ -67,8 +91,8 @@ export default function DashboardPage() {
   useEffect(() => {
     fetchSummary();
 
-    // Atualizar a cada 30 segundos
-    const interval = setInterval(fetchSummary, 30000);
+    // Polling só de segurança; as atualizações chegam pelo WebSocket
+    const interval = setInterval(fetchSummary, FALLBACK_POLL_INTERVAL);
 
     return () => clearInterval(interval);
   }, []);
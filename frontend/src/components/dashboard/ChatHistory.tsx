@@ -7,6 +7,7 @@ import { Badge } from '@/components/ui/badge';
 import { AudioMessage } from './AudioMessage';
 import { DateRangeFilter } from './DateRangeFilter';
 import { api } from '@/lib/api';
+import { useDashboardEvents, FALLBACK_POLL_INTERVAL } from '@/hooks/useDashboardEvents';
 
 interface Message {
   role: string;
@@ -92,21 +93,47 @@ export function ChatHistory() {
   };
 
   useEffect(() => {
-    console.log('[ChatHistory] Iniciando auto-refresh a cada 3 segundos');
     fetchConversations();
 
-    // Atualizar a cada 3 segundos (para desenvolvimento)
-    const interval = setInterval(() => {
-      console.log('[ChatHistory] Executando refresh automático...');
-      fetchConversations();
-    }, 3000);
+    // Polling só de segurança; mensagens novas chegam via WebSocket
+    const interval = setInterval(fetchConversations, FALLBACK_POLL_INTERVAL);
 
-    return () => {
-      console.log('[ChatHistory] Limpando interval');
-      clearInterval(interval);
-    };
+    return () => clearInterval(interval);
   }, [filter, dateFilter]);
 
+  useDashboardEvents(
+    ['message_received', 'message_sent', 'conversation_started', 'intervention_started', 'intervention_ended', 'resync'],
+    (message) => {
+      const conversationId: string | undefined = message.data.conversation_id;
+      const known = conversations.some((c) => c.id === conversationId);
+
+      // Conversa nova (ou fora da lista carregada): só então consulta a API
+      if (message.type === 'resync' || message.type === 'conversation_started' || !known) {
+        fetchConversations();
+        return;
+      }
+
+      if (message.type === 'intervention_started' || message.type === 'intervention_ended') {
+        const active = message.type === 'intervention_started';
+        setConversations((current) =>
+          current.map((c) => (c.id === conversationId ? { ...c, human_intervention: active } : c))
+        );
+        return;
+      }
+
+      setConversations((current) =>
+        current.map((c) =>
+          c.id === conversationId ? { ...c, messages: [...(c.messages || []), message.data.message] } : c
+        )
+      );
+
+      // O evento traz só uma prévia do texto; a conversa aberta busca o conteúdo completo
+      if (selectedConversation?.conversation_id === conversationId) {
+        fetchConversationDetails(conversationId!);
+      }
+    }
+  );
+
   if (loading) {
     return (
       <div className="flex items-center justify-center p-8">
@@ -8,6 +8,7 @@ import { Badge } from '@/components/ui/badge';
 import { AudioMessage } from './AudioMessage';
 import { DateRangeFilter } from './DateRangeFilter';
 import { api } from '@/lib/api';
+import { useDashboardEvents, FALLBACK_POLL_INTERVAL } from '@/hooks/useDashboardEvents';
 
 interface ActiveIntervention {
   intervention_id: string;
@@ -126,8 +127,8 @@ export function InterventionPanel() {
   useEffect(() => {
     fetchInterventions();
 
-    // Atualizar a cada 5 segundos
-    const interval = setInterval(fetchInterventions, 5000);
+    // Polling só de segurança; intervenções chegam via WebSocket
+    const interval = setInterval(fetchInterventions, FALLBACK_POLL_INTERVAL);
 
     return () => clearInterval(interval);
   }, [dateFilter]);
@@ -135,15 +136,30 @@ export function InterventionPanel() {
   useEffect(() => {
     if (selectedIntervention) {
       fetchConversationDetails(selectedIntervention.conversation_id);
+    }
+  }, [selectedIntervention]);
 
-      // Atualizar mensagens a cada 3 segundos durante intervenção
-      const interval = setInterval(() => {
-        fetchConversationDetails(selectedIntervention.conversation_id);
-      }, 3000);
+  useDashboardEvents(
+    ['intervention_started', 'intervention_ended', 'message_received', 'message_sent', 'resync'],
+    (message) => {
+      const conversationId: string | undefined = message.data.conversation_id;
+
+      if (message.type === 'intervention_started' || message.type === 'intervention_ended' || message.type === 'resync') {
+        fetchInterventions();
+      }
 
-      return () => clearInterval(interval);
+      if (message.type === 'intervention_ended' && selectedIntervention?.conversation_id === conversationId) {
+        setSelectedIntervention(null);
+        setConversationDetails(null);
+        return;
+      }
+
+      // Só a conversa aberta precisa das mensagens novas
+      if (selectedIntervention && (message.type === 'resync' || selectedIntervention.conversation_id === conversationId)) {
+        fetchConversationDetails(selectedIntervention.conversation_id);
+      }
     }
-  }, [selectedIntervention]);
+  );
 
   // Auto-scroll para última mensagem
   useEffect(() => {
@@ -7,6 +7,7 @@ import { Badge } from '@/components/ui/badge';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog';
 import { DateRangeFilter } from './DateRangeFilter';
 import { api } from '@/lib/api';
+import { useDashboardEvents, FALLBACK_POLL_INTERVAL } from '@/hooks/useDashboardEvents';
 
 interface Order {
   id: string;
@@ -169,12 +170,37 @@ export function OrdersList() {
   useEffect(() => {
     fetchOrders();
 
-    // Atualizar a cada 10 segundos
-    const interval = setInterval(fetchOrders, 10000);
+    // Polling só de segurança; pedidos novos e mudanças chegam via WebSocket
+    const interval = setInterval(fetchOrders, FALLBACK_POLL_INTERVAL);
 
     return () => clearInterval(interval);
   }, [filter, dateFilter]);
 
+  // Aplica eventos de pedido direto na lista, sem consultar a API
+  useDashboardEvents(['order_created', 'order_status_changed', 'resync'], (message) => {
+    if (message.type === 'resync') {
+      fetchOrders();
+      return;
+    }
+
+    const order: Order = message.data.order;
+    const matchesFilter = !filter || order.status === filter;
+    // Pedido recém-criado só entra se o período filtrado incluir hoje
+    const matchesDate = !dateFilter.to || order.created_at.slice(0, 10) <= dateFilter.to;
+
+    setOrders((current) => {
+      const exists = current.some((o) => o.id === order.id);
+
+      if (!matchesFilter) {
+        return current.filter((o) => o.id !== order.id);
+      }
+      if (exists) {
+        return current.map((o) => (o.id === order.id ? { ...o, ...order } : o));
+      }
+      return matchesDate ? [order, ...current] : current;
+    });
+  });
+
   const updateOrderStatus = async (orderId: string, newStatus: string) => {
     try {
       console.log('🔄 Atualizando pedido', orderId, 'para status:', newStatus);
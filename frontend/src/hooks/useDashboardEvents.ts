@@ -0,0 +1,41 @@
+/**
+ * Barramento de eventos do dashboard
+ * A página do dashboard mantém a única conexão WebSocket e repassa cada
+ * evento de domínio aos componentes (pedidos, conversas, intervenções),
+ * que aplicam o delta localmente em vez de refazer o polling.
+ */
+import { useEffect, useRef } from 'react';
+import type { WebSocketMessage } from './useWebSocket';
+
+const EVENT_NAME = 'gasbot:dashboard-event';
+
+// Sem eventos por este tempo, o componente volta a consultar a API
+// (cobre WebSocket caído ou evento perdido)
+export const FALLBACK_POLL_INTERVAL = 120000;
+
+export function emitDashboardEvent(message: WebSocketMessage) {
+  window.dispatchEvent(new CustomEvent<WebSocketMessage>(EVENT_NAME, { detail: message }));
+}
+
+export function useDashboardEvents(
+  types: string[],
+  handler: (message: WebSocketMessage) => void
+) {
+  const handlerRef = useRef(handler);
+  handlerRef.current = handler;
+  const typesKey = types.join(',');
+
+  useEffect(() => {
+    const accepted = new Set(typesKey.split(','));
+
+    const listener = (event: Event) => {
+      const message = (event as CustomEvent<WebSocketMessage>).detail;
+      if (accepted.has(message.type)) {
+        handlerRef.current(message);
+      }
+    };
+
+    window.addEventListener(EVENT_NAME, listener);
+    return () => window.removeEventListener(EVENT_NAME, listener);
+  }, [typesKey]);
+}
@@ -4,9 +4,10 @@
  */
 import { useEffect, useRef, useState, useCallback } from 'react';
 
-interface WebSocketMessage {
+export interface WebSocketMessage {
   type: string;
   data: any;
+  summary_delta?: Record<string, number>;
   timestamp: string;
 }
 
@@ -31,8 +32,17 @@ export function useWebSocket({
   const [lastMessage, setLastMessage] = useState<WebSocketMessage | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout>();
+  const closedByUserRef = useRef(false);
+
+  // Callbacks em refs: funções inline do componente mudam a cada render
+  // e não podem derrubar/reabrir a conexão
+  const handlersRef = useRef({ onMessage, onConnect, onDisconnect, onError });
+  handlersRef.current = { onMessage, onConnect, onDisconnect, onError };
 
   const connect = useCallback(() => {
+    if (!tenantId) return;
+    closedByUserRef.current = false;
+
     try {
       // URL do WebSocket - usar wss:// em produção
       const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
@@ -43,7 +53,7 @@ export function useWebSocket({
       ws.onopen = () => {
         console.log('WebSocket conectado');
         setIsConnected(true);
-        onConnect?.();
+        handlersRef.current.onConnect?.();
 
         // Enviar ping a cada 30 segundos para manter conexão
         const pingInterval = setInterval(() => {
@@ -62,7 +72,7 @@ export function useWebSocket({
         try {
           const message: WebSocketMessage = JSON.parse(event.data);
           setLastMessage(message);
-          onMessage?.(message);
+          handlersRef.current.onMessage?.(message);
         } catch (error) {
           console.error('Erro ao parsear mensagem WebSocket:', error);
         }
@@ -70,13 +80,15 @@ export function useWebSocket({
 
       ws.onerror = (error) => {
         console.error('Erro no WebSocket:', error);
-        onError?.(error);
+        handlersRef.current.onError?.(error);
       };
 
       ws.onclose = () => {
         console.log('WebSocket desconectado');
         setIsConnected(false);
-        onDisconnect?.();
+        handlersRef.current.onDisconnect?.();
+
+        if (closedByUserRef.current) return;
 
         // Tentar reconectar
         reconnectTimeoutRef.current = setTimeout(() => {
@@ -89,9 +101,11 @@ export function useWebSocket({
     } catch (error) {
       console.error('Erro ao criar WebSocket:', error);
     }
-  }, [tenantId, onMessage, onConnect, onDisconnect, onError, reconnectInterval]);
+  }, [tenantId, reconnectInterval]);
 
   const disconnect = useCallback(() => {
+    closedByUserRef.current = true;
+
     if (reconnectTimeoutRef.current) {
       clearTimeout(reconnectTimeoutRef.current);
     }
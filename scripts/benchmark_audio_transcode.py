@@ -0,0 +1,171 @@
+"""
+Benchmark da Conversão de Áudio - BotGas
+
+Mede a conversão de notas de voz com N conversões simultâneas (padrão 50,
+um pico de áudios chegando juntos) em dois modos:
+
+    pipe:     AudioTranscoder (ffmpeg via stdin/stdout, pool limitado,
+              event loop livre) - o caminho atual
+    blocking: ffmpeg com arquivos temporários chamado de forma síncrona
+              no event loop, como o pydub fazia antes
+
+Reporta vazão (notas/s e segundos de áudio/s), latência p50/p95 por nota
+e o atraso máximo do event loop (um timer de 10ms rodando em paralelo):
+no modo blocking o loop para durante cada conversão, e com ele o webhook.
+
+Notas de voz do WhatsApp (OGG/Opus) vão direto para o Whisper e não passam
+por aqui; a conversão só acontece em formatos como AMR/3GP.
+
+Pré-requisitos:
+    - ffmpeg no PATH (gera o áudio sintético de teste)
+    - .env do backend (o módulo lê as configurações)
+
+Uso:
+    python scripts/benchmark_audio_transcode.py
+    python scripts/benchmark_audio_transcode.py --notes 50 --seconds 15 --workers 4
+    python scripts/benchmark_audio_transcode.py --input nota.ogg --output resultado.json
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+# Carrega variáveis de ambiente
+from dotenv import load_dotenv
+load_dotenv(os.path.join(root_dir, '.env'))
+
+from app.services.audio_transcoder import FFMPEG_OUTPUT_ARGS, AudioTranscoder
+
+TICK_SECONDS = 0.01
+
+
+def synthetic_voice_note(seconds: float) -> bytes:
+    """Áudio OGG/Opus mono 16kHz com ruído modulado (parecido com voz para o encoder)"""
+    return subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"anoisesrc=d={seconds}:c=pink:a=0.3",
+            "-af", "volume='0.5+0.5*sin(2*PI*3*t)':eval=frame",
+            "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "16k", "-f", "ogg", "pipe:1",
+        ],
+        check=True,
+        capture_output=True
+    ).stdout
+
+
+def blocking_transcode(data: bytes) -> bytes:
+    """Como o pydub: arquivo de entrada, ffmpeg síncrono, arquivo de saída"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "in.ogg")
+        target = os.path.join(tmp, "out.mp3")
+        with open(source, "wb") as f:
+            f.write(data)
+        subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", source,
+             *FFMPEG_OUTPUT_ARGS["mp3"], target],
+            check=True,
+            capture_output=True
+        )
+        with open(target, "rb") as f:
+            return f.read()
+
+
+async def loop_lag_monitor(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def run_mode(mode: str, data: bytes, notes: int, workers: int) -> dict:
+    transcoder = AudioTranscoder(max_concurrency=workers, timeout=120.0)
+    timings = []
+    lags: list = []
+    stop = asyncio.Event()
+
+    async def one() -> None:
+        started = time.perf_counter()
+        if mode == "pipe":
+            await transcoder.transcode(data, "mp3")
+        else:
+            blocking_transcode(data)
+        timings.append(time.perf_counter() - started)
+
+    monitor = asyncio.create_task(loop_lag_monitor(stop, lags))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(notes)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "notes_per_s": round(notes / elapsed, 2),
+        "p50_ms": round(statistics.median(timings) * 1000, 1),
+        "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))] * 1000, 1),
+        "max_loop_lag_ms": round(max(lags, default=0.0) * 1000, 1),
+    }
+
+
+async def main_async(args) -> dict:
+    if args.input:
+        # --seconds deve informar a duração do arquivo
+        with open(args.input, "rb") as f:
+            data = f.read()
+    else:
+        data = synthetic_voice_note(args.seconds)
+    seconds = args.seconds
+
+    workers = args.workers or os.cpu_count() or 2
+    report = {
+        "notes": args.notes,
+        "audio_seconds": seconds,
+        "input_bytes": len(data),
+        "workers": workers,
+        "modes": {},
+    }
+
+    for mode in args.modes:
+        print(f"Modo {mode}: {args.notes} conversões simultâneas...")
+        result = await run_mode(mode, data, args.notes, workers)
+        result["audio_seconds_per_s"] = round(result["notes_per_s"] * seconds, 1)
+        report["modes"][mode] = result
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da conversão de áudio via ffmpeg")
+    parser.add_argument("--notes", type=int, default=50, help="Conversões simultâneas")
+    parser.add_argument("--seconds", type=float, default=12.0, help="Duração do áudio sintético")
+    parser.add_argument("--input", type=str, help="Usa este arquivo de áudio em vez do sintético")
+    parser.add_argument("--workers", type=int, default=0, help="Processos ffmpeg simultâneos (0 = núcleos)")
+    parser.add_argument("--modes", nargs="+", default=["pipe", "blocking"], choices=["pipe", "blocking"])
+    parser.add_argument("--output", type=str, help="Salva o relatório em JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
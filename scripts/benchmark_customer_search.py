@@ -0,0 +1,267 @@
+"""
+Benchmark da Busca de Clientes (typeahead) - BotGas
+
+Popula um tenant sintético com N clientes (nomes brasileiros com acento e
+telefones no formato do WhatsApp) e mede a latência do
+CustomerSearchService.search() com uma mistura de buscas reais de operador:
+prefixo de nome, nome sem acento, nome com erro de digitação,
+prefixo de telefone e final do telefone.
+
+Meta: p95 < 20ms com 500k clientes por tenant.
+
+Pré-requisitos:
+    - Banco com migrations aplicadas (alembic upgrade head)
+    - .env com DATABASE_URL
+
+Uso:
+    python scripts/benchmark_customer_search.py
+    python scripts/benchmark_customer_search.py --customers 500000 --queries 1000
+    python scripts/benchmark_customer_search.py --tenant-id <uuid> --skip-seed
+"""
+
+import sys
+import os
+import io
+import time
+import json
+import random
+import argparse
+import statistics
+from uuid import uuid4, UUID
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+# Carrega variáveis de ambiente
+from dotenv import load_dotenv
+load_dotenv(os.path.join(root_dir, '.env'))
+
+from sqlalchemy import text
+
+from app.database.base import engine, SessionLocal
+from app.database.models import Customer
+from app.services.customer_search import CustomerSearchService, fold_text
+
+FIRST_NAMES = [
+    "João", "José", "Antônio", "Francisco", "Carlos", "Paulo", "Pedro", "Lucas",
+    "Luís", "Marcos", "Luciana", "Maria", "Ana", "Francisca", "Antônia", "Adriana",
+    "Juliana", "Márcia", "Fernanda", "Patrícia", "Aline", "Sebastião", "Conceição",
+    "Vitória", "Inês", "Cecília", "Mônica", "Jéssica", "Otávio", "Caetano",
+]
+
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves",
+    "Pereira", "Lima", "Gomes", "Ribeiro", "Carvalho", "Araújo", "Conceição",
+    "Gonçalves", "Magalhães", "Simões", "Brandão", "Falcão", "Damião", "Assunção",
+]
+
+DDDS = ["11", "21", "31", "34", "41", "51", "61", "62", "71", "81", "85"]
+
+BATCH_SIZE = 50_000
+
+
+def random_name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def random_phone(rng: random.Random) -> str:
+    return f"55{rng.choice(DDDS)}9{rng.randint(10_000_000, 99_999_999)}"
+
+
+def create_tenant() -> UUID:
+    """Cria um tenant descartável para o benchmark"""
+    tenant_id = uuid4()
+    with engine.begin() as conn:
+        conn.execute(
+            text("""
+                INSERT INTO tenants (id, company_name, phone, email, subscription_status, created_at, updated_at)
+                VALUES (:id, :name, :phone, :email, 'trial', now(), now())
+            """),
+            {
+                "id": tenant_id,
+                "name": "Benchmark Busca Clientes",
+                "phone": "5534000000000",
+                "email": f"bench-{tenant_id}@gasbot.local",
+            }
+        )
+    return tenant_id
+
+
+def seed_customers(tenant_id: UUID, total: int, rng: random.Random) -> None:
+    """Popula clientes via COPY (muito mais rápido que INSERT por linha)"""
+    raw = engine.raw_connection()
+    now = datetime.utcnow()
+
+    try:
+        cursor = raw.cursor()
+        inserted = 0
+
+        while inserted < total:
+            batch = min(BATCH_SIZE, total - inserted)
+            buffer = io.StringIO()
+
+            for _ in range(batch):
+                has_orders = rng.random() < 0.7
+                last_order = (now - timedelta(days=rng.randint(0, 365))).isoformat() if has_orders else "\\N"
+                buffer.write(
+                    f"{uuid4()}\t{tenant_id}\t{random_phone(rng)}\t{random_name(rng)}\t"
+                    f"[]\t{rng.randint(0, 40) if has_orders else 0}\t0\t{now.isoformat()}\t{last_order}\n"
+                )
+
+            buffer.seek(0)
+            cursor.copy_expert(
+                "COPY customers (id, tenant_id, whatsapp_number, name, addresses, "
+                "order_count, total_spent, created_at, last_order_at) FROM STDIN",
+                buffer
+            )
+            raw.commit()
+
+            inserted += batch
+            print(f"  {inserted:,}/{total:,} clientes inseridos")
+
+        cursor.execute("ANALYZE customers")
+        raw.commit()
+
+    finally:
+        raw.close()
+
+
+def sample_queries(tenant_id: UUID, count: int, rng: random.Random) -> list:
+    """Gera buscas a partir de clientes reais do tenant"""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT name, whatsapp_number FROM customers WHERE tenant_id = :t ORDER BY random() LIMIT :n"),
+            {"t": tenant_id, "n": count}
+        ).fetchall()
+
+    queries = []
+    for name, phone in rows:
+        kind = rng.choice(["name_prefix", "name_unaccented", "name_typo", "phone_prefix", "phone_suffix"])
+        first, last = name.split()[0], name.split()[-1]
+
+        if kind == "name_prefix":
+            term = first[:rng.randint(3, len(first))]
+        elif kind == "name_unaccented":
+            term = fold_text(f"{first} {last}")
+        elif kind == "name_typo":
+            pos = rng.randint(1, len(last) - 2)
+            term = f"{first} {last[:pos]}{last[pos + 1]}{last[pos]}{last[pos + 2:]}"
+        elif kind == "phone_prefix":
+            term = phone[:rng.randint(6, 9)]
+        else:
+            term = phone[-rng.randint(4, 8):]
+
+        queries.append((kind, term))
+
+    return queries
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_benchmark(tenant_id: UUID, queries: list, warmup: int) -> dict:
+    db = SessionLocal()
+    service = CustomerSearchService(db)
+    timings = {}
+
+    try:
+        for _, term in queries[:warmup]:
+            service.search(tenant_id, term)
+
+        for kind, term in queries:
+            start = time.perf_counter()
+            service.search(tenant_id, term)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            timings.setdefault(kind, []).append(elapsed_ms)
+
+        # Mostra o plano de uma busca de cada tipo (confirma uso dos índices)
+        explained = {}
+        seen = set()
+        for kind, term in queries:
+            if kind in seen:
+                continue
+            seen.add(kind)
+            search_filter = service.build_filter(term)
+            compiled = db.query(Customer.id).filter(
+                Customer.tenant_id == tenant_id,
+                search_filter
+            ).statement.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = db.execute(text(f"EXPLAIN {compiled}")).fetchall()
+            explained[kind] = [row[0] for row in plan]
+
+    finally:
+        db.close()
+
+    all_timings = [t for values in timings.values() for t in values]
+    report = {
+        "total_queries": len(all_timings),
+        "p50_ms": round(percentile(all_timings, 50), 2),
+        "p95_ms": round(percentile(all_timings, 95), 2),
+        "p99_ms": round(percentile(all_timings, 99), 2),
+        "mean_ms": round(statistics.mean(all_timings), 2),
+        "by_kind": {
+            kind: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+            for kind, values in timings.items()
+        },
+        "plans": explained,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do typeahead de clientes")
+    parser.add_argument("--customers", type=int, default=500_000, help="Clientes a popular")
+    parser.add_argument("--queries", type=int, default=1000, help="Buscas a executar")
+    parser.add_argument("--warmup", type=int, default=50, help="Buscas de aquecimento")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatório")
+    parser.add_argument("--tenant-id", type=str, help="Reutiliza um tenant já populado")
+    parser.add_argument("--skip-seed", action="store_true", help="Não insere clientes")
+    parser.add_argument("--cleanup", action="store_true", help="Remove o tenant sintético ao final")
+    parser.add_argument("--output", type=str, help="Salva o relatório em JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tenant_id = UUID(args.tenant_id) if args.tenant_id else create_tenant()
+    print(f"Tenant do benchmark: {tenant_id}")
+
+    if not args.skip_seed:
+        print(f"Populando {args.customers:,} clientes...")
+        seed_customers(tenant_id, args.customers, rng)
+
+    queries = sample_queries(tenant_id, args.queries, rng)
+    print(f"Executando {len(queries)} buscas...")
+    report = run_benchmark(tenant_id, queries, args.warmup)
+    report["tenant_id"] = str(tenant_id)
+    report["customers"] = args.customers
+    report["target_p95_ms"] = 20
+    report["passed"] = report["p95_ms"] < 20
+
+    print(json.dumps({k: v for k, v in report.items() if k != "plans"}, indent=2, ensure_ascii=False))
+    for kind, plan in report["plans"].items():
+        print(f"\n--- Plano ({kind}) ---")
+        print("\n".join(plan))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.cleanup and not args.tenant_id:
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM customers WHERE tenant_id = :t"), {"t": tenant_id})
+            conn.execute(text("DELETE FROM tenants WHERE id = :t"), {"t": tenant_id})
+        print("\nTenant sintético removido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,552 @@
+"""
+Benchmark ponta a ponta: replay de conversas pelo webhook - BotGas
+
+Simula clientes conversando com o bot: cada conversa é uma sequência de
+mensagens enviadas como payloads messages.upsert da Evolution para
+POST /api/v1/webhook/evolution, uma de cada vez (como um cliente real),
+com várias conversas em paralelo (--concurrency).
+
+As conversas são montadas a partir de:
+    - gasbot-finetuning-dataset.jsonl: mensagem de abertura do pedido e o
+      que ela já informa (produto, endereço, pagamento)
+    - cenários de scripts/test_agent_analysis.py (AGENT_TESTS): saudações,
+      perguntas gerais, endereços e formas de pagamento
+e completadas com os turnos que faltam para fechar o pedido (endereço,
+confirmação, pagamento).
+
+O backend deve estar apontado para os serviços fake (nenhum custo externo):
+    python scripts/fakes/openai_server.py --port 8089
+    python scripts/fakes/evolution_server.py --port 8090
+    python scripts/fakes/maps_server.py --port 8091
+    # .env do backend:
+    #   OPENAI_BASE_URL=http://localhost:8089/v1
+    #   EVOLUTION_API_URL=http://localhost:8090
+    #   GOOGLE_MAPS_BASE_URL=http://localhost:8091
+    #   GOOGLE_MAPS_API_KEY=AIzaFakeKeyForLocalBenchmarks000000000
+    uvicorn app.main:app --port 8000
+
+Relatório (JSON com o mesmo formato entre commits, ver --output/--compare):
+    - Vazão (turnos/s) e latência do turno p50/p95/p99 (tempo da requisição
+      ao webhook, que processa a mensagem e envia a resposta)
+    - Tempo médio por etapa (setup, inbound, agents, reply) e por chamada de
+      LLM por agente, a partir da diferença do /metrics do backend
+    - Consultas SQL por turno (gasbot_db_queries_total)
+    - Respostas recebidas pelo fake da Evolution
+
+Pré-requisitos:
+    - Banco com migrations aplicadas (alembic upgrade head) e .env com
+      DATABASE_URL, para criar o tenant sintético (ou --tenant-id)
+    - Backend com um único worker, ou PROMETHEUS_MULTIPROC_DIR definido
+
+Uso:
+    python scripts/benchmark_replay.py --conversations 200 --concurrency 20
+    python scripts/benchmark_replay.py --tenant-id <uuid> --output bench.json
+    python scripts/benchmark_replay.py --output novo.json --compare bench.json
+"""
+
+import sys
+import os
+import ast
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import uuid4, UUID
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+# Carrega variáveis de ambiente
+from dotenv import load_dotenv
+load_dotenv(os.path.join(root_dir, '.env'))
+
+DATASET_FILE = os.path.join(root_dir, 'gasbot-finetuning-dataset.jsonl')
+SCENARIOS_FILE = os.path.join(root_dir, 'scripts', 'test_agent_analysis.py')
+
+WEBHOOK_PATH = "/api/v1/webhook/evolution"
+
+CONFIRMATIONS = ["sim", "isso", "pode ser", "ok, pode mandar", "sim, está certo", "confirmo"]
+CLOSINGS = ["obrigado", "valeu!", "ok, aguardo", "obrigada 🙏"]
+STREETS = ["Rua das Flores", "Avenida Brasil", "Rua São José", "Rua Tiradentes", "Avenida Rondon Pacheco"]
+
+PRODUCTS = [
+    ("Botijão P13", 110.00, "Gás de cozinha 13kg"),
+    ("Botijão P20", 180.00, "Gás 20kg"),
+    ("Botijão P45", 390.00, "Gás 45kg"),
+    ("Galão 20L", 15.00, "Água mineral 20 litros"),
+]
+
+# Métricas do backend lidas antes e depois da execução
+STAGE_METRIC = "gasbot_webhook_stage_seconds"
+LLM_METRIC = "gasbot_llm_call_duration_seconds"
+DB_METRIC = "gasbot_db_queries_total"
+TURNS_METRIC = "gasbot_bot_turns_total"
+
+
+# ----------------------------------------------------------------------
+# Conversas
+# ----------------------------------------------------------------------
+
+def load_scenarios(path: str = SCENARIOS_FILE) -> Dict[str, List[str]]:
+    """Mensagens de AGENT_TESTS, lidas sem importar o script (que carrega os agentes)"""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "AGENT_TESTS" for target in node.targets
+        ):
+            tests = ast.literal_eval(node.value)
+            return {
+                agent: [test["message"] for test in spec["tests"]]
+                for agent, spec in tests.items()
+            }
+
+    raise ValueError(f"AGENT_TESTS não encontrado em {path}")
+
+
+def load_openers(path: str) -> List[Dict[str, Any]]:
+    """Mensagem do cliente + o que a extração esperada já encontrou nela"""
+    openers = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            example = json.loads(line)
+            messages = example["messages"]
+            user = next(m["content"] for m in messages if m["role"] == "user")
+            arguments = json.loads(messages[-1]["tool_calls"][0]["function"]["arguments"])
+            address = arguments.get("address") or {}
+            payment = arguments.get("payment") or {}
+            openers.append({
+                "message": user,
+                "has_address": bool(address.get("street")),
+                "neighborhood": address.get("neighborhood"),
+                "has_payment": payment.get("method") not in (None, "", "unknown"),
+            })
+    return openers
+
+
+def build_conversations(
+    count: int,
+    openers: List[Dict[str, Any]],
+    scenarios: Dict[str, List[str]],
+    neighborhoods: List[str],
+    rng: random.Random
+) -> List[List[str]]:
+    greetings = scenarios.get("AttendanceAgent", ["Olá"])
+    addresses = scenarios.get("ValidationAgent", [])
+    payments = scenarios.get("PaymentAgent", ["Vou pagar no dinheiro"])
+    order_requests = scenarios.get("OrderAgent", [])
+
+    conversations = []
+    for _ in range(count):
+        opener = rng.choice(openers)
+        turns = [rng.choice(greetings)]
+
+        # Parte das conversas abre com os pedidos dos cenários dos agentes
+        if order_requests and rng.random() < 0.2:
+            turns.append(rng.choice(order_requests))
+            opener = {"has_address": False, "has_payment": False}
+        else:
+            turns.append(opener["message"])
+
+        if not opener["has_address"]:
+            if addresses and rng.random() < 0.25:
+                turns.append(rng.choice(addresses))
+            else:
+                turns.append(
+                    f"{rng.choice(STREETS)}, {rng.randint(10, 2500)}, {rng.choice(neighborhoods)}"
+                )
+
+        turns.append(rng.choice(CONFIRMATIONS))
+
+        if not opener["has_payment"]:
+            turns.append(rng.choice(payments))
+
+        if rng.random() < 0.5:
+            turns.append(rng.choice(CLOSINGS))
+
+        conversations.append(turns)
+
+    return conversations
+
+
+def upsert_payload(instance: str, phone: str, text: str) -> Dict[str, Any]:
+    """Payload messages.upsert como a Evolution v2 envia para mensagens de texto"""
+    return {
+        "event": "messages.upsert",
+        "instance": instance,
+        "data": {
+            "key": {
+                "remoteJid": f"{phone}@s.whatsapp.net",
+                "fromMe": False,
+                "id": uuid4().hex[:20].upper(),
+            },
+            "pushName": "Cliente Benchmark",
+            "message": {"conversation": text},
+            "messageType": "conversation",
+            "messageTimestamp": int(time.time()),
+        },
+    }
+
+
+# ----------------------------------------------------------------------
+# Tenant sintético
+# ----------------------------------------------------------------------
+
+def create_tenant(neighborhoods: List[str], plan: Optional[str]) -> UUID:
+    """Tenant com produtos e entrega por bairro cobrindo os bairros das conversas"""
+    from app.database.base import SessionLocal
+    from app.database.models import DeliveryArea, NeighborhoodConfig, Product, Tenant
+
+    db = SessionLocal()
+    try:
+        tenant = Tenant(
+            company_name="Benchmark Replay Gás",
+            phone="5534000000000",
+            email=f"bench-replay-{uuid4()}@gasbot.local",
+            address={"street": "Rua Teste, 123", "neighborhood": "Centro", "city": "Uberlândia", "state": "MG"},
+            subscription_status="active",
+            subscription_plan=plan,
+            payment_methods=["pix", "dinheiro", "cartao"],
+            pix_enabled=True,
+            pix_key="34999999999",
+            pix_name="Benchmark Replay Gás LTDA",
+        )
+        db.add(tenant)
+        db.flush()
+
+        for name, price, description in PRODUCTS:
+            db.add(Product(tenant_id=tenant.id, name=name, price=price, description=description))
+
+        area = DeliveryArea(tenant_id=tenant.id, delivery_mode="neighborhood", default_fee=5)
+        db.add(area)
+        db.flush()
+
+        for neighborhood in neighborhoods:
+            db.add(NeighborhoodConfig(
+                tenant_id=tenant.id,
+                delivery_area_id=area.id,
+                neighborhood_name=neighborhood,
+                city="Uberlândia",
+                state="MG",
+                delivery_type="paid",
+                delivery_fee=5,
+                delivery_time_minutes=45,
+            ))
+
+        db.commit()
+        return tenant.id
+    finally:
+        db.close()
+
+
+def delete_tenant(tenant_id: UUID) -> None:
+    from app.database.base import SessionLocal
+    from app.database.models import Tenant
+
+    db = SessionLocal()
+    try:
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+        if tenant:
+            db.delete(tenant)
+            db.commit()
+    finally:
+        db.close()
+
+
+# ----------------------------------------------------------------------
+# Métricas do backend
+# ----------------------------------------------------------------------
+
+async def scrape(client: httpx.AsyncClient, backend_url: str) -> Dict[tuple, float]:
+    """Amostras de /metrics: (nome, labels ordenados) -> valor"""
+    response = await client.get(f"{backend_url}/metrics")
+    response.raise_for_status()
+
+    samples = {}
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def metrics_delta(before: Dict[tuple, float], after: Dict[tuple, float]) -> Dict[tuple, float]:
+    return {key: value - before.get(key, 0.0) for key, value in after.items()}
+
+
+def _sum_by(delta: Dict[tuple, float], name: str, label: str) -> Dict[str, float]:
+    totals: Dict[str, float] = defaultdict(float)
+    for (sample_name, labels), value in delta.items():
+        if sample_name == name:
+            totals[dict(labels).get(label, "")] += value
+    return totals
+
+
+def histogram_means(delta: Dict[tuple, float], metric: str, label: str) -> Dict[str, Dict[str, float]]:
+    sums = _sum_by(delta, f"{metric}_sum", label)
+    counts = _sum_by(delta, f"{metric}_count", label)
+    return {
+        key: {"count": int(counts[key]), "mean_ms": round(sums.get(key, 0.0) / counts[key] * 1000, 2)}
+        for key in sorted(counts)
+        if counts[key] > 0
+    }
+
+
+# ----------------------------------------------------------------------
+# Execução
+# ----------------------------------------------------------------------
+
+async def run_conversation(
+    client: httpx.AsyncClient,
+    url: str,
+    instance: str,
+    phone: str,
+    turns: List[str],
+    think_time: float,
+    results: Dict[str, list]
+) -> None:
+    for text in turns:
+        started = time.perf_counter()
+        try:
+            response = await client.post(url, json=upsert_payload(instance, phone, text))
+            ok = response.status_code == 200 and response.json().get("status") == "ok"
+        except httpx.HTTPError:
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        results["latencies"].append(elapsed_ms)
+        if not ok:
+            results["errors"].append(text)
+
+        if think_time:
+            await asyncio.sleep(think_time)
+
+
+async def replay(
+    backend_url: str,
+    instance: str,
+    conversations: List[List[str]],
+    concurrency: int,
+    think_time: float,
+    timeout: float
+) -> Dict[str, Any]:
+    url = f"{backend_url}{WEBHOOK_PATH}"
+    # Telefones novos a cada execução: conversas de execuções anteriores não interferem
+    phones = [f"55349{random.randint(10_000_000, 99_999_999)}" for _ in conversations]
+    results: Dict[str, list] = {"latencies": [], "errors": []}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    limits = httpx.Limits(max_connections=concurrency + 5, max_keepalive_connections=concurrency + 5)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+
+        async def one(phone: str, turns: List[str]) -> None:
+            async with semaphore:
+                await run_conversation(client, url, instance, phone, turns, think_time, results)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(phone, turns) for phone, turns in zip(phones, conversations)))
+        results["duration"] = time.perf_counter() - started
+
+    results["phones"] = phones
+    return results
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=root_dir, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def fake_call(client: httpx.AsyncClient, base_url: Optional[str], method: str, path: str):
+    if not base_url:
+        return None
+    try:
+        response = await client.request(method, f"{base_url.rstrip('/')}{path}")
+        return response.json()
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+async def run_benchmark(args, tenant_id: UUID, conversations: List[List[str]]) -> Dict[str, Any]:
+    backend_url = args.backend_url.rstrip('/')
+    instance = f"tenant_{tenant_id}"
+    fakes = {"openai": args.openai_url, "evolution": args.evolution_url, "maps": args.maps_url}
+
+    if args.warmup:
+        print(f"Aquecimento: {args.warmup} conversas...")
+        await replay(backend_url, instance, conversations[:args.warmup], args.concurrency,
+                     args.think_time, args.timeout)
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        before = await scrape(client, backend_url)
+        for base_url in fakes.values():
+            await fake_call(client, base_url, "POST", "/_fake/stats/reset")
+
+    measured = conversations[args.warmup:]
+    total_turns = sum(len(turns) for turns in measured)
+    print(f"Executando {len(measured)} conversas ({total_turns} turnos), concorrência {args.concurrency}...")
+    results = await replay(backend_url, instance, measured, args.concurrency, args.think_time, args.timeout)
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        # O envio da resposta termina antes do webhook responder; a folga cobre
+        # atualizações de métricas feitas fora do caminho da resposta
+        await asyncio.sleep(1.0)
+        after = await scrape(client, backend_url)
+        fake_stats = {
+            name: await fake_call(client, base_url, "GET", "/_fake/stats")
+            for name, base_url in fakes.items()
+        }
+
+    delta = metrics_delta(before, after)
+    latencies = results["latencies"]
+    turns = len(latencies)
+    db_queries = _sum_by(delta, DB_METRIC, "statement")
+    replies = None
+    if fake_stats["evolution"]:
+        replies = int(fake_stats["evolution"].get("sendText:ok", 0))
+
+    return {
+        "label": args.label or git_commit(),
+        "commit": git_commit(),
+        "started_at": datetime.utcnow().isoformat(),
+        "config": {
+            "conversations": len(measured),
+            "concurrency": args.concurrency,
+            "think_time_s": args.think_time,
+            "seed": args.seed,
+            "dataset": os.path.basename(args.dataset),
+        },
+        "turns": turns,
+        "errors": len(results["errors"]),
+        "duration_s": round(results["duration"], 2),
+        "throughput_turns_per_s": round(turns / results["duration"], 2) if results["duration"] else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1),
+            "p95": round(percentile(latencies, 95), 1),
+            "p99": round(percentile(latencies, 99), 1),
+            "mean": round(statistics.mean(latencies), 1),
+            "max": round(max(latencies), 1),
+        },
+        "stages": histogram_means(delta, STAGE_METRIC, "stage"),
+        "llm_calls": histogram_means(delta, LLM_METRIC, "agent"),
+        "llm_calls_per_turn": round(
+            sum(_sum_by(delta, f"{LLM_METRIC}_count", "agent").values()) / turns, 2
+        ) if turns else 0.0,
+        "bot_turns_by_llm_calls": {
+            key: int(value) for key, value in sorted(_sum_by(delta, TURNS_METRIC, "llm_calls").items())
+        },
+        "db_queries_per_turn": {
+            "total": round(sum(db_queries.values()) / turns, 2) if turns else 0.0,
+            **{key: round(value / turns, 2) for key, value in sorted(db_queries.items()) if turns},
+        },
+        "replies": replies,
+        "fakes": fake_stats,
+    }
+
+
+COMPARED = [
+    ("throughput_turns_per_s", "vazão (turnos/s)"),
+    ("latency_ms.p50", "p50 (ms)"),
+    ("latency_ms.p95", "p95 (ms)"),
+    ("latency_ms.p99", "p99 (ms)"),
+    ("llm_calls_per_turn", "chamadas de LLM por turno"),
+    ("db_queries_per_turn.total", "consultas SQL por turno"),
+]
+
+
+def _lookup(report: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = report
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def print_comparison(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    print(f"\n--- Comparação: {previous.get('label')} -> {current.get('label')} ---")
+    for path, title in COMPARED:
+        old, new = _lookup(previous, path), _lookup(current, path)
+        if old is None or new is None:
+            continue
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "-"
+        print(f"  {title:<28} {old:>10} -> {new:<10} {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de conversas pelo webhook e latência ponta a ponta")
+    parser.add_argument("--backend-url", default="http://localhost:8000")
+    parser.add_argument("--openai-url", default="http://localhost:8089",
+                        help="Fake da OpenAI (estatísticas; vazio para ignorar)")
+    parser.add_argument("--evolution-url", default="http://localhost:8090",
+                        help="Fake da Evolution (respostas enviadas; vazio para ignorar)")
+    parser.add_argument("--maps-url", default="http://localhost:8091",
+                        help="Fake do Google Maps (estatísticas; vazio para ignorar)")
+    parser.add_argument("--dataset", default=DATASET_FILE, help="Dataset de mensagens de abertura")
+    parser.add_argument("--conversations", type=int, default=100, help="Conversas medidas")
+    parser.add_argument("--warmup", type=int, default=5, help="Conversas de aquecimento (não medidas)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Conversas em paralelo")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pausa entre mensagens de um cliente")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout de cada requisição")
+    parser.add_argument("--seed", type=int, default=42, help="Semente das conversas")
+    parser.add_argument("--plan", default=None, help="subscription_plan do tenant sintético")
+    parser.add_argument("--tenant-id", type=str, help="Reutiliza um tenant já configurado")
+    parser.add_argument("--cleanup", action="store_true", help="Remove o tenant sintético ao final")
+    parser.add_argument("--label", type=str, help="Identificação do resultado (padrão: commit atual)")
+    parser.add_argument("--output", type=str, help="Salva o relatório em JSON")
+    parser.add_argument("--compare", type=str, help="Relatório JSON anterior para comparar")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    openers = load_openers(args.dataset)
+    scenarios = load_scenarios()
+    neighborhoods = sorted({o["neighborhood"] for o in openers if o["neighborhood"]} | {"Centro"})
+    conversations = build_conversations(args.conversations + args.warmup, openers, scenarios, neighborhoods, rng)
+
+    tenant_id = UUID(args.tenant_id) if args.tenant_id else create_tenant(neighborhoods, args.plan)
+    print(f"Tenant do benchmark: {tenant_id}")
+
+    try:
+        report = asyncio.run(run_benchmark(args, tenant_id, conversations))
+    finally:
+        if args.cleanup and not args.tenant_id:
+            delete_tenant(tenant_id)
+            print("Tenant sintético removido")
+
+    report["tenant_id"] = str(tenant_id)
+    print(json.dumps({k: v for k, v in report.items() if k != "fakes"}, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark dos Backends de Transcrição - BotGas
+
+Compara os motores de app.services.transcription_backends ("whisper_api" e
+"local") num conjunto de frases de pedido de gás/água gravadas:
+
+    - latência por nota (p50/p95, sem o aquecimento do modelo)
+    - vazão com N transcrições simultâneas (notas/s e segundos de áudio/s)
+    - WER (word error rate) contra o texto de referência
+
+O conjunto é uma pasta com manifest.jsonl, uma linha por nota:
+    {"audio": "pedido_01.ogg", "text": "quero um botijão de 13 quilos"}
+
+Sem gravações reais, --synthesize gera o conjunto a partir de PHRASES com o
+TTS da OpenAI (vozes alternadas, convertido para OGG/Opus como o WhatsApp).
+Gravações de clientes reais dão um WER mais honesto.
+
+Pré-requisitos:
+    - ffmpeg no PATH (duração das notas e conversão do TTS)
+    - .env do backend com OPENAI_API_KEY (whisper_api e --synthesize)
+    - pip install faster-whisper (backend local)
+
+Uso:
+    python scripts/benchmark_transcription.py --synthesize dados/frases_gas
+    python scripts/benchmark_transcription.py --dataset dados/frases_gas
+    python scripts/benchmark_transcription.py --dataset dados/frases_gas --backends local --concurrency 4 --output local.json
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+# Carrega variáveis de ambiente
+from dotenv import load_dotenv
+load_dotenv(os.path.join(root_dir, '.env'))
+
+from app.services.audio_processor import audio_processor
+from app.services.audio_transcoder import TranscodeError, audio_transcoder
+from app.services.faq_cache import normalize_question
+from app.services.transcription_backends import (
+    LocalWhisperBackend,
+    WhisperAPIBackend,
+    local_stt_available,
+)
+
+PHRASES = [
+    "Oi, quero um botijão de gás de 13 quilos",
+    "Boa tarde, vocês entregam na Rua das Flores, número 250, no Centro?",
+    "Me vê dois galões de água de 20 litros, por favor",
+    "Quanto está o gás hoje?",
+    "Quero um gás P13 e um galão de água, vou pagar no Pix",
+    "Meu endereço é Avenida Brasil, 1500, apartamento 302, bairro Santa Mônica",
+    "Pode mandar o gás que eu pago em dinheiro, preciso de troco para cem",
+    "Vocês aceitam cartão de débito na entrega?",
+    "Quanto tempo demora para chegar aqui no Jardim Europa?",
+    "Quero trocar o botijão, o meu acabou agora de manhã",
+    "É a mesma entrega de sempre, rua Goiás, 45, fundos",
+    "Tem gás de 45 quilos?",
+    "Três galões de água mineral e um gás, por favor",
+    "Cancela o pedido, moço, já comprei em outro lugar",
+    "Vocês abrem domingo de manhã?",
+    "O entregador já saiu? Faz quarenta minutos que eu pedi",
+    "Quero o gás, mas só posso receber depois das cinco da tarde",
+    "Manda para a casa da minha mãe, rua Pernambuco, 812, Saraiva",
+    "Tem desconto se eu levar dois botijões?",
+    "Oi, bom dia, é da distribuidora? Queria saber o preço da água",
+]
+
+TTS_VOICES = ["alloy", "nova", "onyx", "shimmer", "echo"]
+
+# Números por extenso e em algarismos contam como a mesma palavra
+NUMBER_WORDS = {
+    "um": "1", "uma": "1", "dois": "2", "duas": "2", "tres": "3", "quatro": "4",
+    "cinco": "5", "seis": "6", "sete": "7", "oito": "8", "nove": "9", "dez": "10",
+    "treze": "13", "vinte": "20", "quarenta": "40", "quarenta e cinco": "45", "cem": "100",
+}
+
+
+def words(text: str) -> list:
+    normalized = normalize_question(text)
+    for spelled in sorted(NUMBER_WORDS, key=len, reverse=True):
+        normalized = f" {normalized} ".replace(f" {spelled} ", f" {NUMBER_WORDS[spelled]} ").strip()
+    return normalized.split()
+
+
+def edit_distance(reference: list, hypothesis: list) -> int:
+    """Levenshtein por palavra (substituição, inserção e remoção custam 1)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1]
+
+
+async def audio_seconds(data: bytes) -> float:
+    # PCM 16kHz mono 16 bits = 32000 bytes por segundo
+    return len(await audio_transcoder.transcode(data, "pcm")) / 32000
+
+
+async def synthesize(directory: str) -> None:
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "manifest.jsonl"), "w", encoding="utf-8") as manifest:
+        for i, phrase in enumerate(PHRASES, 1):
+            speech = await audio_processor.text_to_speech(phrase, voice=TTS_VOICES[i % len(TTS_VOICES)])
+            try:
+                data, name = await audio_transcoder.transcode(speech, "ogg"), f"frase_{i:02d}.ogg"
+            except TranscodeError:
+                data, name = speech, f"frase_{i:02d}.mp3"
+            with open(os.path.join(directory, name), "wb") as f:
+                f.write(data)
+            manifest.write(json.dumps({"audio": name, "text": phrase}, ensure_ascii=False) + "\n")
+            print(f"  {name}: {phrase}")
+
+
+async def load_dataset(directory: str) -> list:
+    samples = []
+    with open(os.path.join(directory, "manifest.jsonl"), encoding="utf-8") as manifest:
+        for line in manifest:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            with open(os.path.join(directory, entry["audio"]), "rb") as f:
+                data = f.read()
+            extension = os.path.splitext(entry["audio"])[1].lstrip(".").lower()
+            mimetype = {"ogg": "audio/ogg", "oga": "audio/ogg", "opus": "audio/ogg", "mp3": "audio/mpeg",
+                        "m4a": "audio/mp4", "wav": "audio/wav"}.get(extension, f"audio/{extension}")
+            seconds = entry.get("seconds") or await audio_seconds(data)
+            samples.append({
+                "name": entry["audio"],
+                "text": entry["text"],
+                "upload": await audio_processor._prepare_audio(data, mimetype),
+                "seconds": seconds,
+            })
+    return samples
+
+
+async def run_backend(backend, samples: list, concurrency: int) -> dict:
+    # Aquecimento: carrega o modelo local / abre conexões
+    await backend.transcribe(samples[0]["upload"], samples[0]["seconds"])
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def one(sample: dict) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            text = await backend.transcribe(sample["upload"], sample["seconds"])
+            elapsed = time.perf_counter() - started
+        reference, hypothesis = words(sample["text"]), words(text)
+        results.append({
+            "name": sample["name"],
+            "latency_s": round(elapsed, 3),
+            "errors": edit_distance(reference, hypothesis),
+            "reference_words": len(reference),
+            "reference": sample["text"],
+            "hypothesis": text,
+        })
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(sample) for sample in samples))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(r["latency_s"] for r in results)
+    total_seconds = sum(s["seconds"] for s in samples)
+    return {
+        "notes": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "notes_per_s": round(len(samples) / elapsed, 2),
+        "audio_seconds_per_s": round(total_seconds / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        "wer": round(sum(r["errors"] for r in results) / max(1, sum(r["reference_words"] for r in results)), 4),
+        "worst": sorted(results, key=lambda r: r["errors"], reverse=True)[:5],
+    }
+
+
+async def main_async(args) -> dict:
+    if args.synthesize:
+        print(f"Gerando {len(PHRASES)} frases em {args.synthesize}...")
+        await synthesize(args.synthesize)
+        args.dataset = args.dataset or args.synthesize
+
+    if not args.dataset:
+        raise SystemExit("Informe --dataset (ou --synthesize)")
+
+    samples = await load_dataset(args.dataset)
+    report = {
+        "dataset": args.dataset,
+        "notes": len(samples),
+        "audio_seconds": round(sum(s["seconds"] for s in samples), 1),
+        "concurrency": args.concurrency,
+        "backends": {},
+    }
+
+    for name in args.backends:
+        if name == "local":
+            if not local_stt_available():
+                print("Backend local ignorado: pip install faster-whisper")
+                continue
+            backend = LocalWhisperBackend(model=args.local_model, workers=args.concurrency)
+            report["local_model"] = f"{backend.model} ({backend.compute_type}, beam {backend.beam_size})"
+        else:
+            backend = WhisperAPIBackend()
+
+        print(f"Backend {name}: {len(samples)} notas, {args.concurrency} simultâneas...")
+        try:
+            report["backends"][name] = await run_backend(backend, samples, args.concurrency)
+        finally:
+            await backend.close()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos backends de transcrição (latência, vazão, WER)")
+    parser.add_argument("--dataset", type=str, help="Pasta com manifest.jsonl e os áudios")
+    parser.add_argument("--synthesize", type=str, help="Gera o conjunto de PHRASES via TTS nesta pasta")
+    parser.add_argument("--backends", nargs="+", default=["whisper_api", "local"], choices=["whisper_api", "local"])
+    parser.add_argument("--concurrency", type=int, default=2, help="Transcrições simultâneas (e processos do local)")
+    parser.add_argument("--local-model", type=str, default=None, help="Modelo do faster-whisper (padrão LOCAL_STT_MODEL)")
+    parser.add_argument("--output", type=str, help="Salva o relatório em JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark da Decodificação de Webhooks da Evolution - BotGas
+
+Compara, para cada payload de scripts/fixtures/evolution_webhooks.json,
+o custo de ler o webhook até saber o que fazer com ele:
+
+    dict:  json.loads do corpo inteiro + procura manual das chaves de
+           message (como o webhook fazia com request.json())
+    typed: app.webhooks.evolution_payload (msgspec: envelope primeiro,
+           data só nos eventos tratados, tipo da mensagem na decodificação)
+
+Os dois caminhos fazem o mesmo trabalho: tipo de evento, categoria do log,
+remetente, texto / referência do áudio e estado da conexão. Reporta µs por
+payload e a média ponderada pela mistura de tráfego (campo weight).
+
+O base64 inline das notas de voz é inflado para --audio-kb (uma nota de
+~10s em OGG/Opus tem ~25KB).
+
+Pré-requisitos:
+    - msgspec instalado (requirements do backend)
+
+Uso:
+    python scripts/benchmark_webhook_decode.py
+    python scripts/benchmark_webhook_decode.py --audio-kb 64 --iterations 20000
+    python scripts/benchmark_webhook_decode.py --output resultado.json
+"""
+
+import sys
+import os
+import json
+import base64
+import argparse
+import timeit
+from typing import Any, Dict, List
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+from app.webhooks.evolution_payload import AUDIO, TEXT, decode_webhook
+
+FIXTURES_FILE = os.path.join(root_dir, 'scripts', 'fixtures', 'evolution_webhooks.json')
+
+
+def load_fixtures(path: str, audio_kb: int) -> List[Dict[str, Any]]:
+    """Fixtures com o corpo HTTP já serializado (bytes), como chega no webhook"""
+    with open(path, encoding="utf-8") as f:
+        fixtures = json.load(f)["payloads"]
+
+    inline_audio = base64.b64encode(os.urandom(audio_kb * 1024)).decode()
+    for fixture in fixtures:
+        message = fixture["payload"].get("data", {})
+        message = message.get("message") if isinstance(message, dict) else None
+        if isinstance(message, dict) and "base64" in message:
+            message["base64"] = inline_audio
+        fixture["body"] = json.dumps(fixture["payload"], ensure_ascii=False).encode()
+    return fixtures
+
+
+def read_dict(body: bytes) -> tuple:
+    """Caminho antigo: dict inteiro e chaves procuradas à mão"""
+    payload = json.loads(body)
+    event = payload.get("event")
+
+    data = payload.get("data")
+    from_me = isinstance(data, dict) and bool((data.get("key") or {}).get("fromMe"))
+    category = f"{event}:fromMe" if from_me else event
+
+    if event == "messages.upsert":
+        key = data.get("key", {})
+        message = data.get("message", {})
+        sender = key.get("remoteJid", "")
+        if "conversation" in message:
+            return category, sender, TEXT, message.get("conversation", "")
+        if "extendedTextMessage" in message:
+            return category, sender, TEXT, message.get("extendedTextMessage", {}).get("text", "")
+        if "audioMessage" in message:
+            audio = message.get("audioMessage", {})
+            return category, sender, AUDIO, message.get("base64") or audio.get("url")
+        if any(k in message for k in ["imageMessage", "videoMessage", "documentMessage"]):
+            return category, sender, "media", None
+        return category, sender, "unknown", None
+
+    if event == "connection.update":
+        return category, data.get("state")
+
+    return (category,)
+
+
+def read_typed(body: bytes) -> tuple:
+    """Caminho novo: envelope tipado, data decodificado só se o evento é tratado"""
+    webhook = decode_webhook(body)
+    event = webhook.event
+
+    if event == "messages.upsert":
+        data = webhook.message()
+        kind = data.kind
+        if kind == TEXT:
+            return webhook.category, data.key.remote_jid, kind, data.text
+        if kind == AUDIO:
+            message = data.message
+            return webhook.category, data.key.remote_jid, kind, message.base64 or message.audio_message.url
+        return webhook.category, data.key.remote_jid, kind, None
+
+    if event == "connection.update":
+        return webhook.category, webhook.connection().state
+
+    return (webhook.category,)
+
+
+def per_call_us(fn, body: bytes, iterations: int) -> float:
+    best = min(timeit.repeat(lambda: fn(body), number=iterations, repeat=5))
+    return best / iterations * 1_000_000
+
+
+def run_benchmark(fixtures: List[Dict[str, Any]], iterations: int) -> Dict[str, Any]:
+    rows = []
+    for fixture in fixtures:
+        body = fixture["body"]
+        expected, got = read_dict(body), read_typed(body)
+        if expected != got:
+            raise SystemExit(f"{fixture['name']}: resultados diferentes\n  dict:  {expected}\n  typed: {got}")
+
+        dict_us = per_call_us(read_dict, body, iterations)
+        typed_us = per_call_us(read_typed, body, iterations)
+        rows.append({
+            "name": fixture["name"],
+            "weight": fixture["weight"],
+            "bytes": len(body),
+            "dict_us": round(dict_us, 2),
+            "typed_us": round(typed_us, 2),
+            "speedup": round(dict_us / typed_us, 2),
+        })
+
+    total_weight = sum(row["weight"] for row in rows)
+    mix_dict = sum(row["dict_us"] * row["weight"] for row in rows) / total_weight
+    mix_typed = sum(row["typed_us"] * row["weight"] for row in rows) / total_weight
+    return {
+        "iterations": iterations,
+        "payloads": rows,
+        "mix": {
+            "dict_us": round(mix_dict, 2),
+            "typed_us": round(mix_typed, 2),
+            "speedup": round(mix_dict / mix_typed, 2),
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'payload':<26} {'bytes':>8} {'dict µs':>9} {'typed µs':>9} {'speedup':>8}")
+    print("-" * 64)
+    for row in report["payloads"]:
+        print(
+            f"{row['name']:<26} {row['bytes']:>8} {row['dict_us']:>9.2f} "
+            f"{row['typed_us']:>9.2f} {row['speedup']:>7.2f}x"
+        )
+    mix = report["mix"]
+    print("-" * 64)
+    print(f"{'mistura ponderada':<26} {'':>8} {mix['dict_us']:>9.2f} {mix['typed_us']:>9.2f} {mix['speedup']:>7.2f}x\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da decodificação de webhooks da Evolution")
+    parser.add_argument("--fixtures", default=FIXTURES_FILE, help="Arquivo de payloads")
+    parser.add_argument("--audio-kb", type=int, default=24, help="Tamanho do áudio inline (KB antes do base64)")
+    parser.add_argument("--iterations", type=int, default=5000, help="Chamadas por medição")
+    parser.add_argument("--output", help="Salva o relatório em JSON")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures, args.audio_kb)
+    report = run_benchmark(fixtures, args.iterations)
+    report["audio_kb"] = args.audio_kb
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
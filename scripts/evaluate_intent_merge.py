@@ -0,0 +1,292 @@
+"""
+Avaliação: intent dentro da extração x chamada separada - BotGas
+
+Compara os dois pipelines do MasterAgent para cada mensagem:
+
+    duas chamadas:  MessageExtractor.extract()  +  IntentClassifier.classify()
+    uma chamada:    MessageExtractor(include_intent=True).extract()
+
+Mede, por pipeline:
+    - Acurácia da extração (produto, quantidade, pagamento, rua, número,
+      bairro) contra as respostas esperadas de gasbot-validation.jsonl,
+      para garantir que pedir o intent não piora a extração
+    - Acurácia do intent nos casos rotulados (CONTEXT_CASES abaixo +
+      --cases), que incluem a última mensagem do bot
+    - Concordância de intent entre os pipelines nas mensagens do
+      gasbot-validation.jsonl (que não têm rótulo de intent)
+    - Latência p50/p95 por mensagem, chamadas e tokens de LLM
+
+Pré-requisitos:
+    - .env com OPENAI_API_KEY (ou OPENAI_BASE_URL apontando para
+      scripts/fakes/openai_server.py, para testar o script sem custo)
+
+Uso:
+    python scripts/evaluate_intent_merge.py
+    python scripts/evaluate_intent_merge.py --limit 20 --output resultado.json
+    python scripts/evaluate_intent_merge.py --cases meus_casos.jsonl
+
+Formato de --cases (uma linha por caso):
+    {"message": "finalizar", "last_bot_message": "Deseja adicionar mais?", "intent": "answer_no"}
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Adiciona o diretório raiz ao path para importar os módulos do backend
+root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+backend_dir = os.path.join(root_dir, 'backend')
+sys.path.insert(0, root_dir)
+sys.path.insert(0, backend_dir)
+
+# Carrega variáveis de ambiente
+from dotenv import load_dotenv
+load_dotenv(os.path.join(root_dir, '.env'))
+
+from app.agents.message_extractor import MessageExtractor
+from app.services.intent_classifier import IntentClassifier
+from app.core import metrics
+
+VALIDATION_FILE = os.path.join(root_dir, 'gasbot-validation.jsonl')
+
+ADD_MORE = "Adicionei 1x Botijão P13 ao seu pedido! Deseja adicionar mais alguma coisa ou finalizar?"
+CONFIRM_ORDER = "Seu pedido: 1x Botijão P13 - R$ 110,00. Está correto? Podemos continuar?"
+CONFIRM_ADDRESS = "Entrega na Rua das Flores, 123 - Centro. Está tudo certo?"
+
+# Casos rotulados com contexto: é onde o intent depende da pergunta do bot
+CONTEXT_CASES = [
+    {"message": "finalizar", "last_bot_message": ADD_MORE, "intent": "answer_no"},
+    {"message": "só isso", "last_bot_message": ADD_MORE, "intent": "answer_no"},
+    {"message": "pronto", "last_bot_message": ADD_MORE, "intent": "answer_no"},
+    {"message": "nao obrigado", "last_bot_message": ADD_MORE, "intent": "answer_no"},
+    {"message": "sim", "last_bot_message": ADD_MORE, "intent": "answer_yes"},
+    {"message": "quero sim, mais uma", "last_bot_message": ADD_MORE, "intent": "answer_yes"},
+    {"message": "isso mesmo", "last_bot_message": CONFIRM_ORDER, "intent": "answer_yes"},
+    {"message": "pode seguir", "last_bot_message": CONFIRM_ORDER, "intent": "answer_yes"},
+    {"message": "beleza", "last_bot_message": CONFIRM_ADDRESS, "intent": "answer_yes"},
+    {"message": "não, o número é 321", "last_bot_message": CONFIRM_ADDRESS, "intent": "answer_no"},
+    {"message": "bom dia", "last_bot_message": None, "intent": "greeting"},
+    {"message": "oi tudo bem?", "last_bot_message": None, "intent": "greeting"},
+    {"message": "quais produtos vocês tem?", "last_bot_message": None, "intent": "product_inquiry"},
+    {"message": "quanto tá o galão de água?", "last_bot_message": None, "intent": "product_inquiry"},
+    {"message": "quero falar com um atendente", "last_bot_message": None, "intent": "help"},
+    {"message": "preciso de ajuda com meu pedido de ontem", "last_bot_message": None, "intent": "help"},
+    {"message": "vocês entregam no domingo?", "last_bot_message": None, "intent": "general"},
+]
+
+EXTRACTION_FIELDS = [
+    ("product", "name"),
+    ("product", "quantity"),
+    ("payment", "method"),
+    ("address", "street"),
+    ("address", "number"),
+    ("address", "neighborhood"),
+]
+
+
+def fold(value: Any) -> str:
+    """Normaliza para comparação (sem acento, minúsculo, vazio == None)"""
+    if value is None:
+        return ""
+    text = unicodedata.normalize("NFKD", str(value))
+    return "".join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+def load_validation(limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Mensagem do cliente + argumentos esperados da tool call"""
+    rows = []
+    with open(VALIDATION_FILE, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            messages = record["messages"]
+            user = next(m["content"] for m in messages if m["role"] == "user")
+            expected = next(
+                json.loads(m["tool_calls"][0]["function"]["arguments"])
+                for m in messages if m["role"] == "assistant"
+            )
+            rows.append({"message": user, "expected": expected})
+    return rows[:limit] if limit else rows
+
+
+def load_cases(path: Optional[str]) -> List[Dict[str, Any]]:
+    cases = list(CONTEXT_CASES)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            cases.extend(json.loads(line) for line in f if line.strip())
+    return cases
+
+
+def token_total() -> float:
+    """Tokens consumidos até agora, somados do contador do LLM gateway"""
+    total = 0.0
+    for family in metrics.llm_tokens.collect():
+        for sample in family.samples:
+            # "cached" já está contido em "prompt"
+            if sample.name.endswith("_total") and sample.labels.get("kind") != "cached":
+                total += sample.value
+    return total
+
+
+class Pipeline:
+    """Um dos dois jeitos de obter extração + intent para uma mensagem"""
+
+    def __init__(self, name: str, merged: bool):
+        self.name = name
+        self.merged = merged
+        self.extractor = MessageExtractor(include_intent=merged)
+        self.classifier = IntentClassifier()
+        self.latencies: List[float] = []
+        self.calls = 0
+        self.tokens = 0.0
+        self.fallbacks = 0
+
+    async def run(self, message: str, last_bot_message: Optional[str]) -> Dict[str, Any]:
+        tokens_before = token_total()
+        started = time.perf_counter()
+
+        if self.merged:
+            extracted = await self.extractor.extract(message, last_bot_message=last_bot_message)
+            self.calls += 1
+            intent = extracted.get("intent")
+            if not intent:
+                # Mesmo fallback do MasterAgent._route_to_agent
+                intent = await self.classifier.classify(message, last_bot_message)
+                self.calls += 1
+                self.fallbacks += 1
+        else:
+            extracted = await self.extractor.extract(message)
+            intent = await self.classifier.classify(message, last_bot_message)
+            self.calls += 2
+
+        self.latencies.append(time.perf_counter() - started)
+        self.tokens += token_total() - tokens_before
+        return {"extracted": extracted, "intent": intent}
+
+    def latency_summary(self) -> Dict[str, float]:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {}
+        return {
+            "p50_ms": round(statistics.median(ordered) * 1000, 1),
+            "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 1),
+            "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+        }
+
+
+def extraction_hits(extracted: Dict[str, Any], expected: Dict[str, Any]) -> Dict[str, bool]:
+    hits = {}
+    has_product = bool((expected.get("product") or {}).get("name"))
+    for section, field in EXTRACTION_FIELDS:
+        if (section, field) == ("product", "quantity") and not has_product:
+            # Sem produto esperado, a quantidade não importa
+            continue
+        expected_value = (expected.get(section) or {}).get(field)
+        actual_value = (extracted.get(section) or {}).get(field)
+        hits[f"{section}.{field}"] = fold(expected_value) == fold(actual_value)
+    return hits
+
+
+async def evaluate(args) -> Dict[str, Any]:
+    pipelines = [Pipeline("duas_chamadas", merged=False), Pipeline("uma_chamada", merged=True)]
+    validation = load_validation(args.limit)
+    cases = load_cases(args.cases)
+
+    field_hits = {p.name: {} for p in pipelines}
+    intent_hits = {p.name: 0 for p in pipelines}
+    intent_errors = {p.name: [] for p in pipelines}
+    agreement = 0
+
+    print(f"Extração: {len(validation)} mensagens de {os.path.basename(VALIDATION_FILE)}")
+    for index, row in enumerate(validation, 1):
+        intents = {}
+        for pipeline in pipelines:
+            result = await pipeline.run(row["message"], None)
+            intents[pipeline.name] = result["intent"]
+            for field, hit in extraction_hits(result["extracted"], row["expected"]).items():
+                counts = field_hits[pipeline.name].setdefault(field, [0, 0])
+                counts[0] += int(hit)
+                counts[1] += 1
+        agreement += int(len(set(intents.values())) == 1)
+        print(f"  [{index}/{len(validation)}] {row['message'][:50]!r} -> {intents}")
+
+    print(f"\nIntent: {len(cases)} casos rotulados")
+    for case in cases:
+        for pipeline in pipelines:
+            result = await pipeline.run(case["message"], case.get("last_bot_message"))
+            if result["intent"] == case["intent"]:
+                intent_hits[pipeline.name] += 1
+            else:
+                intent_errors[pipeline.name].append({
+                    "message": case["message"],
+                    "expected": case["intent"],
+                    "got": result["intent"],
+                })
+
+    report = {"validation_messages": len(validation), "intent_cases": len(cases), "pipelines": {}}
+    for pipeline in pipelines:
+        fields = {
+            field: round(hit / total, 3)
+            for field, (hit, total) in sorted(field_hits[pipeline.name].items())
+        }
+        runs = len(pipeline.latencies)
+        report["pipelines"][pipeline.name] = {
+            "extraction_accuracy": fields,
+            "intent_accuracy": round(intent_hits[pipeline.name] / len(cases), 3) if cases else None,
+            "intent_errors": intent_errors[pipeline.name],
+            "latency": pipeline.latency_summary(),
+            "llm_calls_per_message": round(pipeline.calls / runs, 2) if runs else 0,
+            "tokens_per_message": round(pipeline.tokens / runs, 1) if runs else 0,
+            "classifier_fallbacks": pipeline.fallbacks,
+        }
+    report["intent_agreement_on_validation"] = (
+        round(agreement / len(validation), 3) if validation else None
+    )
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n" + "=" * 70)
+    print("RESULTADO")
+    print("=" * 70)
+    for name, data in report["pipelines"].items():
+        print(f"\n{name}:")
+        print(f"  Intent (casos rotulados): {data['intent_accuracy']}")
+        print(f"  Latência: {data['latency']}")
+        print(f"  Chamadas LLM/mensagem: {data['llm_calls_per_message']} | "
+              f"Tokens/mensagem: {data['tokens_per_message']}")
+        if data["classifier_fallbacks"]:
+            print(f"  Intent inválido do extractor (usou classifier): {data['classifier_fallbacks']}")
+        print("  Extração:")
+        for field, accuracy in data["extraction_accuracy"].items():
+            print(f"    {field:<22} {accuracy:.1%}")
+        for error in data["intent_errors"]:
+            print(f"  ✗ {error['message']!r}: esperado {error['expected']}, veio {error['got']}")
+    print(f"\nConcordância de intent no validation set: {report['intent_agreement_on_validation']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara intent na extração x IntentClassifier")
+    parser.add_argument("--limit", type=int, default=None, help="Máximo de mensagens do validation set")
+    parser.add_argument("--cases", default=None, help="JSONL com casos de intent rotulados adicionais")
+    parser.add_argument("--output", default=None, help="Salva o relatório em JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(evaluate(args))
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nRelatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Servidor fake da Evolution API - BotGas
+
+Recebe as chamadas que o backend faz à Evolution (envio de mensagens,
+presença, leitura, status da instância) e guarda as mensagens enviadas
+por número, para que benchmarks e testes confiram as respostas do bot
+sem um WhatsApp de verdade.
+
+- POST /message/sendText/{instance}, /message/sendWhatsAppAudio/{instance},
+  /message/sendMedia/{instance}
+- POST /chat/presence/{instance}, /chat/markMessageRead/{instance},
+  /chat/fetchProfilePictureUrl/{instance}
+- GET  /instance/connectionState/{instance}
+- GET  /_fake/outbox?number=...&since=... -> mensagens enviadas
+- GET/POST /_fake/config, GET /_fake/stats
+
+Uso:
+    python scripts/fakes/evolution_server.py --port 8090 --latency lognormal:0.15,0.5
+
+E no .env do backend:
+    EVOLUTION_API_URL=http://localhost:8090
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from latency import FaultProfile, LatencyProfile, ServiceBehavior
+
+app = FastAPI(title="Fake Evolution API")
+
+behavior = ServiceBehavior()
+stats: Counter = Counter()
+
+# Últimas mensagens enviadas por número (memória limitada em testes longos)
+OUTBOX_PER_NUMBER = 50
+outbox: Dict[str, Deque[Dict]] = defaultdict(lambda: deque(maxlen=OUTBOX_PER_NUMBER))
+
+
+def _error_response(fault: str) -> JSONResponse:
+    status_code = 429 if fault == "rate_limited" else 500
+    return JSONResponse(status_code=status_code, content={"status": status_code, "error": f"{fault} (fake)"})
+
+
+def _sent(instance: str, number: str, kind: str, content: str) -> Dict:
+    message_id = uuid4().hex[:20].upper()
+    outbox[number].append({
+        "id": message_id,
+        "instance": instance,
+        "type": kind,
+        "content": content,
+        "sent_at": time.time(),
+    })
+    return {
+        "key": {"remoteJid": f"{number}@s.whatsapp.net", "fromMe": True, "id": message_id},
+        "status": "PENDING",
+        "messageTimestamp": int(time.time()),
+    }
+
+
+async def _send(route: str, instance: str, request: Request, kind: str, field: str):
+    body = await request.json()
+
+    fault = await behavior.delay(route)
+    if fault:
+        stats[f"{route}:{fault}"] += 1
+        return _error_response(fault)
+
+    stats[f"{route}:ok"] += 1
+    return _sent(instance, str(body.get("number", "")), kind, str(body.get(field, "")))
+
+
+@app.post("/message/sendText/{instance}")
+async def send_text(instance: str, request: Request):
+    return await _send("sendText", instance, request, "text", "text")
+
+
+@app.post("/message/sendWhatsAppAudio/{instance}")
+async def send_audio(instance: str, request: Request):
+    return await _send("sendWhatsAppAudio", instance, request, "audio", "audio")
+
+
+@app.post("/message/sendMedia/{instance}")
+async def send_media(instance: str, request: Request):
+    return await _send("sendMedia", instance, request, "media", "caption")
+
+
+@app.post("/chat/presence/{instance}")
+async def presence(instance: str, request: Request):
+    await request.body()
+    await behavior.delay("presence")
+    stats["presence:ok"] += 1
+    return {"status": "ok"}
+
+
+@app.post("/chat/markMessageRead/{instance}")
+async def mark_read(instance: str, request: Request):
+    await request.body()
+    await behavior.delay("markMessageRead")
+    stats["markMessageRead:ok"] += 1
+    return {"message": "Read messages", "read": "success"}
+
+
+@app.post("/chat/fetchProfilePictureUrl/{instance}")
+async def profile_picture(instance: str, request: Request):
+    body = await request.json()
+    stats["fetchProfilePictureUrl:ok"] += 1
+    return {"wuid": f"{body.get('number', '')}@s.whatsapp.net", "profilePictureUrl": None}
+
+
+@app.get("/instance/connectionState/{instance}")
+async def connection_state(instance: str):
+    stats["connectionState:ok"] += 1
+    return {"instance": {"instanceName": instance, "state": "open"}}
+
+
+@app.get("/_fake/outbox")
+async def get_outbox(number: Optional[str] = None, since: float = 0.0):
+    numbers: List[str] = [number] if number else list(outbox.keys())
+    return {
+        n: [m for m in outbox.get(n, ()) if m["sent_at"] > since]
+        for n in numbers
+    }
+
+
+@app.get("/_fake/config")
+async def get_config():
+    return behavior.snapshot()
+
+
+@app.post("/_fake/config")
+async def set_config(request: Request):
+    try:
+        behavior.update(await request.json())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    return await get_config()
+
+
+@app.get("/_fake/stats")
+async def get_stats():
+    return {**dict(stats), "numbers": len(outbox)}
+
+
+@app.post("/_fake/stats/reset")
+async def reset_stats():
+    stats.clear()
+    outbox.clear()
+    return {"status": "ok"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor fake da Evolution API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:0.15,0.5",
+                        help="Latência dos envios (ver scripts/fakes/latency.py)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para resultados reproduzíveis")
+    args = parser.parse_args()
+
+    behavior.latency = LatencyProfile.parse(args.latency)
+    behavior.faults = FaultProfile(error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    if args.seed is not None:
+        behavior.rng.seed(args.seed)
+
+    print(f"Fake Evolution API em http://{args.host}:{args.port}")
+    print(f"  envios: {behavior.snapshot()}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Perfis de latência e falhas dos serviços fake (scripts/fakes)
+
+Especificação de latência (segundos), usada nas opções de linha de comando:
+    none                 sem atraso
+    fixed:0.5            sempre 0,5s
+    uniform:0.2-1.5      uniforme entre 0,2s e 1,5s
+    normal:1.0,0.3       normal com média 1,0s e desvio 0,3s (mínimo 0)
+    lognormal:0.8,0.6    lognormal com mediana 0,8s e sigma 0,6 (cauda longa)
+
+Falhas são sorteadas por requisição, na ordem: travamento (slow), 429, 500.
+"""
+import asyncio
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+
+@dataclass
+class LatencyProfile:
+    kind: str = "none"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        spec = (spec or "none").strip().lower()
+        if spec == "none":
+            return cls()
+
+        kind, _, args = spec.partition(":")
+        try:
+            if kind == "fixed":
+                return cls(kind, float(args))
+            if kind == "uniform":
+                low, high = args.split("-")
+                return cls(kind, float(low), float(high))
+            if kind in ("normal", "lognormal"):
+                first, second = args.split(",")
+                return cls(kind, float(first), float(second))
+        except ValueError:
+            pass
+        raise ValueError(f"Perfil de latência inválido: {spec!r}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.a, self.b))
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        return 0.0
+
+    def describe(self) -> str:
+        if self.kind == "none":
+            return "none"
+        if self.kind == "fixed":
+            return f"fixed:{self.a}"
+        if self.kind == "uniform":
+            return f"uniform:{self.a}-{self.b}"
+        return f"{self.kind}:{self.a},{self.b}"
+
+
+@dataclass
+class FaultProfile:
+    error_rate: float = 0.0        # HTTP 500
+    rate_limit_rate: float = 0.0   # HTTP 429
+    slow_rate: float = 0.0         # requisição que "trava"
+    slow_seconds: float = 30.0
+
+    def draw(self, rng: random.Random) -> Optional[str]:
+        """None (requisição normal), "slow", "rate_limited" ou "error" """
+        roll = rng.random()
+        if roll < self.slow_rate:
+            return "slow"
+        roll -= self.slow_rate
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        roll -= self.rate_limit_rate
+        if roll < self.error_rate:
+            return "error"
+        return None
+
+
+@dataclass
+class ServiceBehavior:
+    """Latência padrão, sobreposições por chave (modelo, rota) e falhas"""
+
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    overrides: Dict[str, LatencyProfile] = field(default_factory=dict)
+    faults: FaultProfile = field(default_factory=FaultProfile)
+    rng: random.Random = field(default_factory=random.Random)
+
+    def latency_for(self, key: Optional[str] = None) -> float:
+        profile = self.overrides.get(key, self.latency) if key else self.latency
+        return profile.sample(self.rng)
+
+    async def delay(self, key: Optional[str] = None) -> Optional[str]:
+        """Aplica o atraso sorteado e devolve a falha a simular (se houver)"""
+        fault = self.faults.draw(self.rng)
+        await asyncio.sleep(self.faults.slow_seconds if fault == "slow" else self.latency_for(key))
+        return None if fault == "slow" else fault
+
+    def update(self, config: Dict) -> None:
+        """Altera o comportamento em tempo de execução (POST /_fake/config)"""
+        if "latency" in config:
+            self.latency = LatencyProfile.parse(config["latency"])
+        for key, spec in (config.get("overrides") or {}).items():
+            self.overrides[key] = LatencyProfile.parse(spec)
+        for name in ("error_rate", "rate_limit_rate", "slow_rate", "slow_seconds"):
+            if name in config:
+                setattr(self.faults, name, float(config[name]))
+        if "seed" in config:
+            self.rng.seed(config["seed"])
+
+    def snapshot(self) -> Dict:
+        return {
+            "latency": self.latency.describe(),
+            "overrides": {key: p.describe() for key, p in self.overrides.items()},
+            "error_rate": self.faults.error_rate,
+            "rate_limit_rate": self.faults.rate_limit_rate,
+            "slow_rate": self.faults.slow_rate,
+            "slow_seconds": self.faults.slow_seconds,
+        }
@@ -0,0 +1,207 @@
+"""
+Servidor fake da API de Geocoding do Google Maps - BotGas
+
+Responde GET /maps/api/geocode/json no formato que o cliente googlemaps
+devolve aos agentes (formatted_address, address_components, geometry).
+O endereço é lido por regras simples ("Rua X, 123, Bairro, Cidade"):
+bairro = terceiro trecho separado por vírgula (ou --default-neighborhood),
+cidade/UF = filtro components da requisição (ou --city/--state).
+As coordenadas são derivadas do texto, então o mesmo endereço sempre cai
+no mesmo ponto, a até --spread-km do centro.
+
+- GET  /maps/api/geocode/json
+- GET/POST /_fake/config -> ver/alterar latência, falhas e taxa de ZERO_RESULTS
+- GET  /_fake/stats
+
+Uso:
+    python scripts/fakes/maps_server.py --port 8091 --latency lognormal:0.12,0.4
+
+E no .env do backend (a chave precisa ter o formato de uma chave real):
+    GOOGLE_MAPS_BASE_URL=http://localhost:8091
+    GOOGLE_MAPS_API_KEY=AIzaFakeKeyForLocalBenchmarks000000000
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import sys
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from latency import FaultProfile, LatencyProfile, ServiceBehavior
+
+app = FastAPI(title="Fake Google Maps")
+
+behavior = ServiceBehavior()
+stats: Counter = Counter()
+
+settings: Dict[str, Any] = {
+    "city": "Uberlândia",
+    "state": "MG",
+    "center": (-18.9186, -48.2772),
+    "spread_km": 8.0,
+    "default_neighborhood": "Centro",
+    "zero_results_rate": 0.0,
+}
+
+
+def _error_response(fault: str) -> JSONResponse:
+    # A API do Maps responde 200 com status de erro; o googlemaps converte
+    # OVER_QUERY_LIMIT em retry e os demais em ApiError
+    if fault == "rate_limited":
+        return JSONResponse({"status": "OVER_QUERY_LIMIT", "results": []})
+    return JSONResponse(status_code=500, content={"status": "UNKNOWN_ERROR", "results": []})
+
+
+def _parse_components(value: Optional[str]) -> Dict[str, str]:
+    """components=locality:Uberlândia|administrative_area:MG|country:BR"""
+    parsed = {}
+    for part in (value or "").split("|"):
+        key, _, component = part.partition(":")
+        if key and component:
+            parsed[key] = component
+    return parsed
+
+
+def _coordinates(address: str) -> Dict[str, float]:
+    digest = hashlib.sha1(address.lower().encode("utf-8")).digest()
+    angle = int.from_bytes(digest[:4], "big") / 2 ** 32 * 2 * math.pi
+    distance = int.from_bytes(digest[4:8], "big") / 2 ** 32 * settings["spread_km"]
+    lat, lng = settings["center"]
+    return {
+        "lat": lat + distance / 111.0 * math.cos(angle),
+        "lng": lng + distance / (111.0 * math.cos(math.radians(lat))) * math.sin(angle),
+    }
+
+
+def geocode(address: str, components: Dict[str, str]) -> List[Dict[str, Any]]:
+    parts = [part.strip() for part in address.split(",") if part.strip()]
+    street = parts[0] if parts else address
+    number = next((p for p in parts[1:] if p.isdigit()), "")
+    others = [p for p in parts[1:] if not p.isdigit()]
+    neighborhood = others[0] if others else settings["default_neighborhood"]
+    city = components.get("locality", settings["city"])
+    state = components.get("administrative_area", settings["state"])
+
+    address_components = [
+        {"long_name": street, "short_name": street, "types": ["route"]},
+        {"long_name": neighborhood, "short_name": neighborhood,
+         "types": ["political", "sublocality", "sublocality_level_1"]},
+        {"long_name": city, "short_name": city, "types": ["locality", "political"]},
+        {"long_name": state, "short_name": state,
+         "types": ["administrative_area_level_1", "political"]},
+        {"long_name": "Brasil", "short_name": "BR", "types": ["country", "political"]},
+        {"long_name": "38400-000", "short_name": "38400-000", "types": ["postal_code"]},
+    ]
+    if number:
+        address_components.insert(0, {"long_name": number, "short_name": number, "types": ["street_number"]})
+
+    location = f"{street}, {number}" if number else street
+    formatted = f"{location} - {neighborhood}, {city} - {state}, Brasil"
+    return [{
+        "formatted_address": formatted,
+        "address_components": address_components,
+        "geometry": {"location": _coordinates(address), "location_type": "ROOFTOP"},
+        "place_id": hashlib.sha1(formatted.encode("utf-8")).hexdigest(),
+        "types": ["street_address"],
+    }]
+
+
+@app.get("/maps/api/geocode/json")
+async def geocode_json(request: Request):
+    params = request.query_params
+    address = params.get("address", "")
+
+    fault = await behavior.delay("geocode")
+    if fault:
+        stats[f"geocode:{fault}"] += 1
+        return _error_response(fault)
+
+    if not address or behavior.rng.random() < settings["zero_results_rate"]:
+        stats["geocode:zero_results"] += 1
+        return {"status": "ZERO_RESULTS", "results": []}
+
+    stats["geocode:ok"] += 1
+    return {"status": "OK", "results": geocode(address, _parse_components(params.get("components")))}
+
+
+@app.get("/_fake/config")
+async def get_config():
+    return {**behavior.snapshot(), **settings, "center": list(settings["center"])}
+
+
+@app.post("/_fake/config")
+async def set_config(request: Request):
+    config = await request.json()
+    try:
+        behavior.update(config)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    for name in ("city", "state", "default_neighborhood"):
+        if name in config:
+            settings[name] = config[name]
+    for name in ("spread_km", "zero_results_rate"):
+        if name in config:
+            settings[name] = float(config[name])
+    return await get_config()
+
+
+@app.get("/_fake/stats")
+async def get_stats():
+    return dict(stats)
+
+
+@app.post("/_fake/stats/reset")
+async def reset_stats():
+    stats.clear()
+    return {"status": "ok"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor fake da API de Geocoding do Google Maps")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--latency", default="lognormal:0.12,0.4",
+                        help="Latência do geocode (ver scripts/fakes/latency.py)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fração de respostas OVER_QUERY_LIMIT")
+    parser.add_argument("--zero-results-rate", type=float, default=0.0,
+                        help="Fração de endereços não encontrados")
+    parser.add_argument("--city", default=settings["city"], help="Cidade quando a requisição não filtra")
+    parser.add_argument("--state", default=settings["state"], help="UF quando a requisição não filtra")
+    parser.add_argument("--center", default="-18.9186,-48.2772", help="Centro das coordenadas (lat,lng)")
+    parser.add_argument("--spread-km", type=float, default=8.0, help="Distância máxima do centro")
+    parser.add_argument("--default-neighborhood", default=settings["default_neighborhood"],
+                        help="Bairro quando o endereço não informa")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para resultados reproduzíveis")
+    args = parser.parse_args()
+
+    lat, lng = (float(v) for v in args.center.split(","))
+    settings.update({
+        "city": args.city,
+        "state": args.state,
+        "center": (lat, lng),
+        "spread_km": args.spread_km,
+        "default_neighborhood": args.default_neighborhood,
+        "zero_results_rate": args.zero_results_rate,
+    })
+    behavior.latency = LatencyProfile.parse(args.latency)
+    behavior.faults = FaultProfile(error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    if args.seed is not None:
+        behavior.rng.seed(args.seed)
+
+    print(f"Fake Google Maps em http://{args.host}:{args.port}")
+    print(f"  geocode: {behavior.snapshot()}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""
+Servidor fake compatível com a API da OpenAI - BotGas
+
+Permite rodar o bot e benchmarks de carga sem gastar créditos da OpenAI.
+Implementa o que o backend usa:
+
+- POST /v1/chat/completions
+    * tool_choice extract_order_info -> tool call com produto, endereço,
+      pagamento e metadata extraídos por regras simples
+    * prompt do IntentClassifier -> uma palavra (answer_yes, greeting...)
+    * prompt do MasterAgent (orquestrador) -> JSON com o agente escolhido
+    * tool registrar_decisao (Attendance/Order/Validation/Payment) ->
+      decisão válida para o schema de cada agente
+    * demais prompts -> JSON com os campos que os agentes leem
+      (texto, mensagem_cliente, acao...)
+- POST /v1/audio/transcriptions -> texto fixo configurável
+- GET  /v1/models
+- GET/POST /_fake/config -> ver/alterar latência e falhas em execução
+- GET  /_fake/stats -> contadores de requisições por rota e resultado
+
+As respostas são plausíveis, não inteligentes: servem para medir vazão e
+latência do pipeline, não a qualidade das respostas.
+
+Uso:
+    python scripts/fakes/openai_server.py --port 8089
+    python scripts/fakes/openai_server.py --chat-latency lognormal:0.8,0.6 \\
+        --model-latency gpt-4-turbo-preview=lognormal:2.5,0.7 \\
+        --error-rate 0.02 --rate-limit-rate 0.01 --slow-rate 0.01
+
+E no .env do backend:
+    OPENAI_BASE_URL=http://localhost:8089/v1
+
+Alterar em execução:
+    curl -X POST localhost:8089/_fake/config -H 'Content-Type: application/json' \\
+        -d '{"chat": {"latency": "fixed:3", "error_rate": 0.1}}'
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from latency import FaultProfile, LatencyProfile, ServiceBehavior
+
+app = FastAPI(title="Fake OpenAI")
+
+behaviors: Dict[str, ServiceBehavior] = {
+    "chat": ServiceBehavior(),
+    "audio": ServiceBehavior(),
+}
+stats: Counter = Counter()
+
+DEFAULT_TRANSCRIPTION = "Oi, quero uma botija P13 na Rua das Flores, 123, bairro Centro. Pago no pix."
+transcription_text = DEFAULT_TRANSCRIPTION
+
+
+# ----------------------------------------------------------------------
+# Erros no formato da OpenAI (o SDK converte em RateLimitError etc.)
+# ----------------------------------------------------------------------
+
+def _error_response(fault: str) -> JSONResponse:
+    if fault == "rate_limited":
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={"error": {
+                "message": "Rate limit reached (fake)",
+                "type": "requests",
+                "code": "rate_limit_exceeded",
+            }},
+        )
+    return JSONResponse(
+        status_code=500,
+        content={"error": {
+            "message": "The server had an error while processing your request (fake)",
+            "type": "server_error",
+            "code": None,
+        }},
+    )
+
+
+def _tokens(text: str) -> int:
+    # ~4 caracteres por token, suficiente para custo/TPM nos benchmarks
+    return max(1, len(text) // 4)
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+# ----------------------------------------------------------------------
+# Respostas por tipo de chamada
+# ----------------------------------------------------------------------
+
+NUMBER_WORDS = {"um": 1, "uma": 1, "dois": 2, "duas": 2, "tres": 3, "quatro": 4, "cinco": 5}
+
+
+def extract_order_info(message: str) -> Dict[str, Any]:
+    """Equivalente por regras do modelo fine-tuned (mesmo schema da tool)"""
+    folded = _fold(message)
+
+    product = {"name": "", "quantity": 0, "confidence": 0.0}
+    size = re.search(r"\bp\s?(5|8|13|20|45)\b", folded)
+    if size:
+        product = {"name": f"Botijão P{size.group(1)}", "quantity": 1, "confidence": 0.95}
+    elif re.search(r"galao|agua", folded):
+        product = {"name": "Galão 20L", "quantity": 1, "confidence": 0.9}
+    elif re.search(r"botij|gas", folded):
+        product = {"name": "Botijão P13", "quantity": 1, "confidence": 0.7}
+
+    if product["name"]:
+        quantity = re.search(r"\b(\d{1,2}|um|uma|dois|duas|tres|quatro|cinco)\s+(botij|galao|gas|p\s?\d)", folded)
+        if quantity:
+            word = quantity.group(1)
+            product["quantity"] = int(word) if word.isdigit() else NUMBER_WORDS[word]
+
+    address: Dict[str, Any] = {"confidence": 0.0}
+    street = re.search(
+        r"\b((?:rua|r\.|avenida|av\.?|travessa|alameda|estrada)\s+[^,\d]+?)\s*,?\s*(?:n[o°º]?\s*)?(\d+)",
+        message,
+        re.IGNORECASE,
+    )
+    if street:
+        address.update({"street": street.group(1).strip(), "number": street.group(2), "confidence": 0.9})
+    neighborhood = re.search(r"\bbairro\s+([^,.\n]+)", message, re.IGNORECASE)
+    if neighborhood:
+        address["neighborhood"] = neighborhood.group(1).strip()
+        address["confidence"] = max(address["confidence"], 0.6)
+    complement = re.search(r"\b(apto?\.?\s*\d+|bloco\s+\w+|casa\s+\d+)", message, re.IGNORECASE)
+    if complement:
+        address["complement"] = complement.group(1)
+
+    payment: Dict[str, Any] = {"method": "unknown", "confidence": 0.0}
+    if "pix" in folded:
+        payment = {"method": "pix", "confidence": 0.95}
+    elif re.search(r"cartao|debito|credito", folded):
+        payment = {"method": "cartao", "confidence": 0.9}
+    elif re.search(r"dinheiro|troco", folded):
+        payment = {"method": "dinheiro", "confidence": 0.9}
+    change = re.search(r"troco\s+(?:para|pra|de)\s+(?:r\$\s*)?(\d+)", folded)
+    if change:
+        payment["change_for"] = float(change.group(1))
+
+    is_urgent = bool(re.search(r"urgente|rapido|logo|agora", folded))
+    return {
+        "product": product,
+        "address": address,
+        "payment": payment,
+        "metadata": {
+            "is_urgent": is_urgent,
+            "has_complement": bool(complement),
+            "has_change_request": bool(change),
+            "customer_tone": "urgent" if is_urgent else "neutral",
+        },
+    }
+
+
+def classify_intent(prompt: str) -> str:
+    match = re.search(r'MENSAGEM(?: DO CLIENTE)?:\s*"(.*?)"', prompt, re.DOTALL)
+    folded = _fold(match.group(1) if match else prompt)
+
+    if re.search(r"\b(atendente|humano|ajuda)\b", folded):
+        return "help"
+    if re.search(r"\b(nao|finalizar|pronto|so isso|fechar)\b", folded):
+        return "answer_no"
+    if re.search(r"\b(sim|ok|pode|beleza|confirmo|isso mesmo)\b", folded):
+        return "answer_yes"
+    if re.search(r"\b(oi|ola|bom dia|boa tarde|boa noite)\b", folded):
+        return "greeting"
+    if re.search(r"produto|cardapio|catalogo|o que tem|preco|quanto", folded):
+        return "product_inquiry"
+    return "general"
+
+
+def route_agent(message: str) -> str:
+    folded = _fold(message)
+    if re.search(r"\b(pix|dinheiro|cartao|troco)\b", folded):
+        return "PaymentAgent"
+    if re.search(r"\b(rua|avenida|av|bairro|travessa|numero)\b", folded):
+        return "ValidationAgent"
+    if re.search(r"\b(p5|p8|p13|p20|p45|botija|botijao|galao|quero)\b", folded):
+        return "OrderAgent"
+    return "AttendanceAgent"
+
+
+def agent_decision(system_prompt: str, user_message: str) -> Dict[str, Any]:
+    if "ORQUESTRADOR" in system_prompt:
+        return {
+            "raciocinio": "decisão do servidor fake por palavras-chave",
+            "agente": route_agent(user_message),
+            "contexto_adicional": {
+                "cliente_confirmando": False,
+                "cliente_finalizando": False,
+                "cliente_corrigindo": False,
+            },
+        }
+
+    # Campos lidos pelos agentes especializados; cada um ignora os demais
+    reply = "Certo! Pode me informar o endereço de entrega e a forma de pagamento?"
+    return {
+        "texto": reply,
+        "mensagem_cliente": reply,
+        "acao": "esclarecer",
+        "proximo_passo": None,
+        "metodo": "desconhecido",
+        "confirmado": False,
+        "completo": False,
+        "faltando": ["rua", "numero", "bairro"],
+    }
+
+
+def structured_decision(properties: Dict[str, Any], user_message: str) -> Dict[str, Any]:
+    """
+    Argumentos da tool registrar_decisao (app/agents/decisions.py); o
+    agente é reconhecido pelos campos do schema
+    """
+    extracted = extract_order_info(user_message)
+    reply = "Certo! Pode me informar o endereço de entrega e a forma de pagamento?"
+
+    if "metodo" in properties:
+        method = extracted["payment"]["method"]
+        method = "desconhecido" if method == "unknown" else method
+        confirmed = method in ("pix", "cartao") or extracted["payment"].get("change_for") is not None
+        return {
+            "metodo": method,
+            "troco_para": extracted["payment"].get("change_for"),
+            "validacao_troco": {"valido": True, "motivo": None},
+            "confirmado": confirmed,
+            "mensagem_cliente": "" if confirmed else "Como você prefere pagar?",
+            "proximo_passo": "confirmar_pedido" if confirmed else (
+                "pedir_troco" if method == "dinheiro" else "esclarecer"
+            ),
+        }
+
+    if "completo" in properties:
+        address = extracted["address"]
+        fields = {"rua": address.get("street"), "numero": address.get("number"), "bairro": address.get("neighborhood")}
+        missing = [name for name, value in fields.items() if not value]
+        return {
+            **fields,
+            "completo": not missing,
+            "complemento": address.get("complement"),
+            "referencia": None,
+            "faltando": missing,
+            "mensagem_cliente": "Perfeito! Vou validar seu endereço..." if not missing
+            else f"Pode me informar: {', '.join(missing)}?",
+        }
+
+    if "acao" in properties:
+        product = extracted["product"]
+        if product["name"]:
+            return {
+                "acao": "adicionar",
+                "produto_nome": product["name"].replace("Botijão ", ""),
+                "quantidade": product["quantity"] or 1,
+                "produtos": [],
+                "mensagem_cliente": f"Adicionei {product['quantity'] or 1}x {product['name']}! Deseja adicionar mais alguma coisa?",
+                "proximo_passo": "continuar_comprando",
+            }
+        if classify_intent(f'MENSAGEM: "{user_message}"') == "answer_no":
+            return {"acao": "finalizar", "mensagem_cliente": "Certo! Qual o endereço de entrega?",
+                    "proximo_passo": "pedir_endereco"}
+        return {"acao": "esclarecer", "mensagem_cliente": "Qual produto você gostaria?",
+                "proximo_passo": "esclarecer"}
+
+    wants_order = route_agent(user_message) != "AttendanceAgent"
+    return {
+        "mensagem_cliente": "Olá! Temos Botijão P13 e Galão 20L. O que você precisa hoje?" if not wants_order else reply,
+        "quer_fazer_pedido": wants_order,
+    }
+
+
+def _completion(model: str, message: Dict[str, Any], prompt_text: str, finish_reason: str) -> Dict[str, Any]:
+    completion_text = message.get("content") or json.dumps(message.get("tool_calls") or [])
+    prompt_tokens = _tokens(prompt_text)
+    completion_tokens = _tokens(completion_text)
+    return {
+        "id": f"chatcmpl-fake-{uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+# ----------------------------------------------------------------------
+# Rotas
+# ----------------------------------------------------------------------
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-4o-mini")
+    messages: List[Dict[str, Any]] = body.get("messages") or []
+
+    fault = await behaviors["chat"].delay(model)
+    if fault:
+        stats[f"chat:{fault}"] += 1
+        return _error_response(fault)
+
+    prompt_text = "\n".join(_message_text(m) for m in messages)
+    system_prompt = "\n".join(_message_text(m) for m in messages if m.get("role") == "system")
+    user_messages = [_message_text(m) for m in messages if m.get("role") == "user"]
+    last_user = user_messages[-1] if user_messages else ""
+
+    tools = {t.get("function", {}).get("name"): t.get("function", {}) for t in body.get("tools") or []}
+    if "extract_order_info" in tools:
+        stats["chat:tool_call"] += 1
+        arguments = extract_order_info(last_user)
+        # Schema com intent (settings.EXTRACTOR_INCLUDES_INTENT)
+        if "intent" in tools["extract_order_info"].get("parameters", {}).get("properties", {}):
+            arguments["intent"] = classify_intent(f'MENSAGEM: "{last_user}"')
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{uuid4().hex[:24]}",
+                "type": "function",
+                "function": {
+                    "name": "extract_order_info",
+                    "arguments": json.dumps(arguments, ensure_ascii=False),
+                },
+            }],
+        }
+        return _completion(model, message, prompt_text, "tool_calls")
+
+    if "registrar_decisao" in tools:
+        stats["chat:decision"] += 1
+        properties = tools["registrar_decisao"].get("parameters", {}).get("properties", {})
+        message = {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{uuid4().hex[:24]}",
+                "type": "function",
+                "function": {
+                    "name": "registrar_decisao",
+                    "arguments": json.dumps(structured_decision(properties, last_user), ensure_ascii=False),
+                },
+            }],
+        }
+        return _completion(model, message, prompt_text, "tool_calls")
+
+    if "Classifique a intenção" in prompt_text:
+        stats["chat:intent"] += 1
+        content = classify_intent(prompt_text)
+    else:
+        stats["chat:agent"] += 1
+        content = json.dumps(agent_decision(system_prompt, last_user), ensure_ascii=False)
+
+    return _completion(model, {"role": "assistant", "content": content}, prompt_text, "stop")
+
+
+@app.post("/v1/audio/transcriptions")
+async def audio_transcriptions(
+    file: UploadFile = File(...),
+    model: str = Form("whisper-1"),
+    language: Optional[str] = Form(None),
+    response_format: str = Form("json"),
+):
+    await file.read()
+
+    fault = await behaviors["audio"].delay(model)
+    if fault:
+        stats[f"audio:{fault}"] += 1
+        return _error_response(fault)
+
+    stats["audio:ok"] += 1
+    if response_format == "text":
+        return PlainTextResponse(transcription_text)
+    return {"text": transcription_text}
+
+
+@app.get("/v1/models")
+async def list_models():
+    models = ["gpt-4-turbo-preview", "gpt-4o-mini", "whisper-1"]
+    return {
+        "object": "list",
+        "data": [{"id": m, "object": "model", "created": 0, "owned_by": "fake"} for m in models],
+    }
+
+
+@app.get("/_fake/config")
+async def get_config():
+    return {
+        "chat": behaviors["chat"].snapshot(),
+        "audio": behaviors["audio"].snapshot(),
+        "transcription_text": transcription_text,
+    }
+
+
+@app.post("/_fake/config")
+async def set_config(request: Request):
+    global transcription_text
+    config = await request.json()
+    try:
+        for name, behavior in behaviors.items():
+            if name in config:
+                behavior.update(config[name])
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    if "transcription_text" in config:
+        transcription_text = config["transcription_text"]
+    return await get_config()
+
+
+@app.get("/_fake/stats")
+async def get_stats():
+    return dict(stats)
+
+
+@app.post("/_fake/stats/reset")
+async def reset_stats():
+    stats.clear()
+    return {"status": "ok"}
+
+
+def _model_overrides(values: List[str]) -> Dict[str, LatencyProfile]:
+    overrides = {}
+    for value in values:
+        model, _, spec = value.partition("=")
+        overrides[model] = LatencyProfile.parse(spec)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor fake compatível com a API da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--chat-latency", default="lognormal:0.8,0.5",
+                        help="Latência do chat (ver scripts/fakes/latency.py)")
+    parser.add_argument("--audio-latency", default="lognormal:1.5,0.4",
+                        help="Latência da transcrição")
+    parser.add_argument("--model-latency", action="append", default=[],
+                        metavar="MODELO=PERFIL",
+                        help="Latência específica de um modelo (repetível)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fração de respostas 429")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Fração de requisições travadas")
+    parser.add_argument("--slow-seconds", type=float, default=30.0, help="Duração do travamento")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para resultados reproduzíveis")
+    parser.add_argument("--transcription", default=DEFAULT_TRANSCRIPTION,
+                        help="Texto devolvido pela transcrição")
+    args = parser.parse_args()
+
+    global transcription_text
+    transcription_text = args.transcription
+
+    overrides = _model_overrides(args.model_latency)
+    for name, spec in (("chat", args.chat_latency), ("audio", args.audio_latency)):
+        behavior = behaviors[name]
+        behavior.latency = LatencyProfile.parse(spec)
+        behavior.overrides = dict(overrides)
+        behavior.faults = FaultProfile(
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            slow_rate=args.slow_rate,
+            slow_seconds=args.slow_seconds,
+        )
+        if args.seed is not None:
+            behavior.rng.seed(args.seed)
+
+    print(f"Fake OpenAI em http://{args.host}:{args.port}/v1")
+    print(f"  chat:  {behaviors['chat'].snapshot()}")
+    print(f"  audio: {behaviors['audio'].snapshot()}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()